@@ -0,0 +1,43 @@
+"""Hatch build hook that packages the .github/ templates into the wheel.
+
+The templates are serialized with their manifest into a single resource,
+``default_cicd_public/templates.bundle.json``, which the installed tool loads
+with ``importlib.resources``. Editable installs are left alone; they keep
+reading the checkout's .github/ so template edits take effect immediately.
+"""
+
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from hatchling.builders.hooks.plugin.interface import BuildHookInterface
+
+
+class TemplateBundleHook(BuildHookInterface):  # type: ignore[type-arg]
+    """Adds the packaged template bundle to standard wheel builds."""
+
+    PLUGIN_NAME = "custom"
+
+    def initialize(self, version: str, build_data: dict[str, Any]) -> None:
+        """Serialize .github/ and force-include it into the wheel."""
+        if self.target_name != "wheel" or version == "editable":
+            return
+
+        root = Path(self.root)
+        sys.path.insert(0, str(root / "src"))
+        from default_cicd_public.adapters.filesystem.bundle import FilesystemBundleLoader
+        from default_cicd_public.adapters.packaged import RESOURCE_NAME, dump_bundle
+
+        bundle = FilesystemBundleLoader()(root / ".github")
+        self._output_dir = Path(tempfile.mkdtemp(prefix="template-bundle-"))
+        resource = self._output_dir / RESOURCE_NAME
+        resource.write_bytes(dump_bundle(bundle, version=self.metadata.version))
+        build_data["force_include"][str(resource)] = f"default_cicd_public/{RESOURCE_NAME}"
+
+    def finalize(self, version: str, build_data: dict[str, Any], artifact_path: str) -> None:
+        """Remove the temporary resource."""
+        output_dir: Path | None = getattr(self, "_output_dir", None)
+        if output_dir is not None:
+            shutil.rmtree(output_dir, ignore_errors=True)
@@ -1,15 +1,64 @@
 """The distribute command for copying CI/CD templates to projects."""
 
+import json
+import math
+import shlex
 import sys
+import time
+from collections.abc import Iterable
 from pathlib import Path
+from typing import TextIO, cast
 
 import rich_click as click
 from rich.console import Console
 from rich.table import Table
 
+from default_cicd_public.adapters.cli.constants import (
+    ENVVAR_PREFIX,
+    SIZE_SUFFIXES,
+    TEMPLATE_SEPARATOR,
+)
 from default_cicd_public.adapters.cli.typed_click import option
+from default_cicd_public.adapters.profiling import phase
+from default_cicd_public.application.distribution import (
+    DEFAULT_COMMIT_MESSAGE,
+    backup_run,
+    commit_changes,
+    copy_to_projects,
+    discover_targets,
+    format_commit_message,
+    load_bundles,
+    plan_copies,
+    record_copy_history,
+    record_run,
+    render_for_projects,
+    run_key,
+)
 from default_cicd_public.application.ports import AppServices
-from default_cicd_public.domain.models import CopyResult, CopyStatus
+from default_cicd_public.application.scan_report import suggest_excludes
+from default_cicd_public.domain.models import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_MAX_WATCHED_DIRECTORIES,
+    MARKER_FILE,
+    CommitResult,
+    CommitStatus,
+    ConcurrencyBounds,
+    CopyResult,
+    CopyStatus,
+    DiscoveredProject,
+    IOLimits,
+    LaneStats,
+    LockPolicy,
+    ScanReport,
+    TemplateFamily,
+    WalkedDirectories,
+)
+
+DEFAULT_LOCKING = LockPolicy()
+
+# Runs identical to a recorded one are skipped for at most this long, so that
+# projects created under the search root since are found eventually.
+DEFAULT_MAX_AGE = 24 * 60 * 60.0
 
 
 def get_default_search_root() -> Path:
@@ -20,18 +69,369 @@ def get_default_search_root() -> Path:
     return Path("/")
 
 
+def read_target_roots(lines: Iterable[str]) -> list[Path]:
+    """
+    Read project roots from newline-separated paths or NDJSON.
+
+    Each non-blank line is either a plain path, a JSON string, or a JSON object
+    with a ``root_path`` (or ``root`` / ``path``) key. Lines starting with ``#``
+    are comments. Duplicates are dropped, keeping the first occurrence.
+
+    Args:
+        lines: Lines of the targets file.
+
+    Returns:
+        The project roots in input order.
+
+    Raises:
+        click.BadParameter: If a JSON line has no usable path.
+    """
+    roots: dict[Path, None] = {}
+    for number, raw in enumerate(lines, start=1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith(("{", '"')):
+            roots[_parse_json_target(line, number)] = None
+        else:
+            roots[Path(line)] = None
+    return list(roots)
+
+
+def _parse_json_target(line: str, number: int) -> Path:
+    """Extract the project root from one NDJSON line."""
+    try:
+        value: object = json.loads(line)
+    except json.JSONDecodeError as e:
+        msg = f"line {number}: invalid JSON: {e}"
+        raise click.BadParameter(msg, param_hint="--targets-from") from e
+    if isinstance(value, dict):
+        record = cast("dict[str, object]", value)
+        for key in ("root_path", "root", "path"):
+            candidate = record.get(key)
+            if isinstance(candidate, str) and candidate:
+                return Path(candidate)
+    elif isinstance(value, str) and value:
+        return Path(value)
+    msg = f"line {number}: expected a path string or an object with a root_path key"
+    raise click.BadParameter(msg, param_hint="--targets-from")
+
+
+def parse_size(ctx: click.Context, param: click.Parameter, value: str | None) -> float | None:
+    """Click callback turning ``512K`` / ``20M`` / ``1.5G`` into a byte count."""
+    if value is None:
+        return None
+    text = value.strip().upper().removesuffix("B").removesuffix("I")
+    suffix = text[-1:] if text[-1:] in SIZE_SUFFIXES else ""
+    number = text[: len(text) - len(suffix)]
+    try:
+        size = float(number) * SIZE_SUFFIXES[suffix]
+    except ValueError:
+        size = 0.0
+    # float() also parses nan, inf and overflowing exponents
+    if not math.isfinite(size) or size <= 0:
+        msg = f"expected a positive size such as 512K or 20M, got {value!r}"
+        raise click.BadParameter(msg, ctx=ctx, param=param)
+    return size
+
+
+def require_finite(ctx: click.Context, param: click.Parameter, value: float | None) -> float | None:
+    """Click callback rejecting the ``nan`` and ``inf`` that float options accept."""
+    if value is not None and not math.isfinite(value):
+        msg = f"expected a finite number, got {value!r}"
+        raise click.BadParameter(msg, ctx=ctx, param=param)
+    return value
+
+
+def parse_template_families(values: tuple[str, ...]) -> list[TemplateFamily]:
+    """
+    Parse ``MARKER=SOURCE`` pairs into template families.
+
+    Args:
+        values: Raw ``--template`` option values.
+
+    Returns:
+        One TemplateFamily per value, in the order given.
+
+    Raises:
+        click.BadParameter: If a value is malformed, a marker is repeated, or a
+            source is not a directory.
+    """
+    families: list[TemplateFamily] = []
+    seen: set[Path] = set()
+    for value in values:
+        marker_text, separator, source_text = value.partition(TEMPLATE_SEPARATOR)
+        if not separator or not marker_text or not source_text:
+            msg = f"expected MARKER{TEMPLATE_SEPARATOR}SOURCE, got {value!r}"
+            raise click.BadParameter(msg, param_hint="--template")
+        marker = Path(marker_text)
+        if marker.is_absolute():
+            msg = f"marker must be relative to the project root: {marker_text}"
+            raise click.BadParameter(msg, param_hint="--template")
+        if marker in seen:
+            msg = f"marker given more than once: {marker_text}"
+            raise click.BadParameter(msg, param_hint="--template")
+        source = Path(source_text)
+        if not source.is_dir():
+            msg = f"source is not a directory: {source_text}"
+            raise click.BadParameter(msg, param_hint="--template")
+        seen.add(marker)
+        families.append(TemplateFamily(marker=marker, source_github_path=source.resolve()))
+    return families
+
+
+def resolve_families(
+    services: AppServices, source: Path | None, templates: tuple[str, ...]
+) -> list[TemplateFamily]:
+    """
+    Build the marker -> source registry from ``--template`` or ``--source``.
+
+    Without either, the templates packaged with the tool are used, falling back
+    to the checkout's .github/ when running from source.
+
+    Args:
+        services: The application services, asked for the default source.
+        source: The ``--source`` option value.
+        templates: Raw ``--template`` option values; they replace ``--source``.
+
+    Returns:
+        The template families of the run.
+    """
+    families = parse_template_families(templates)
+    if families:
+        return families
+    if source is not None:
+        return [TemplateFamily(marker=MARKER_FILE, source_github_path=source.resolve())]
+    if services.load_packaged_templates() is not None:
+        return [TemplateFamily(marker=MARKER_FILE)]
+    return [
+        TemplateFamily(marker=MARKER_FILE, source_github_path=services.get_source_github_path())
+    ]
+
+
 @click.command()
 @option(
     "--source",
     type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
     default=None,
-    help="Source .github/ directory to copy from. Auto-detected if not specified.",
+    help=(
+        "Source .github/ directory to copy from. Defaults to the templates packaged with "
+        "the tool, or the checkout's .github/ when running from source."
+    ),
 )
 @option(
     "--search-root",
+    "search_roots",
     type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+    multiple=True,
+    help=(
+        "Root directory to search from. Repeatable; roots are scanned concurrently and "
+        "roots inside another are dropped. Defaults to filesystem root (/ or C:\\)."
+    ),
+)
+@option(
+    "--exclude",
+    multiple=True,
+    metavar="PATTERN",
+    help=(
+        "Do not descend into matching directories. Shell-style; patterns with a slash "
+        "match the whole path (/srv/share/dumps), others the name (datasets). Repeatable."
+    ),
+)
+@option(
+    "--scan-report",
+    is_flag=True,
+    default=False,
+    help=(
+        "Report the most expensive subtrees of the walk that contain no projects, with "
+        "suggested --exclude rules. Always walks, even if nothing changed."
+    ),
+)
+@option(
+    "--scan-report-top",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    metavar="N",
+    help="Number of subtrees listed by --scan-report.",
+)
+@option(
+    "--targets-from",
+    type=click.File("r", encoding="utf-8"),
+    default=None,
+    metavar="PATH|-",
+    help=(
+        "Skip discovery and read project roots from a file or stdin (one path per line, "
+        "or NDJSON objects with a root_path key). Markers are validated concurrently."
+    ),
+)
+@option(
+    "--template",
+    "templates",
+    multiple=True,
+    metavar="MARKER=SOURCE",
+    help=(
+        "Template family: projects carrying MARKER (relative to the project root) receive "
+        "the .github/ directory SOURCE. Repeatable; all markers are matched in one scan. "
+        "Replaces --source."
+    ),
+)
+@option(
+    "--max-metadata-ops",
+    type=click.FloatRange(min=0, min_open=True),
+    callback=require_finite,
+    default=None,
+    envvar=f"{ENVVAR_PREFIX}_MAX_METADATA_OPS",
+    show_envvar=True,
+    metavar="RATE",
+    help="Limit directory listings, stats and mkdirs to RATE per second.",
+)
+@option(
+    "--max-writes",
+    type=click.FloatRange(min=0, min_open=True),
+    callback=require_finite,
     default=None,
-    help="Root directory to search from. Defaults to filesystem root (/ or C:\\).",
+    envvar=f"{ENVVAR_PREFIX}_MAX_WRITES",
+    show_envvar=True,
+    metavar="RATE",
+    help="Limit file writes to RATE per second.",
+)
+@option(
+    "--max-bytes",
+    callback=parse_size,
+    default=None,
+    envvar=f"{ENVVAR_PREFIX}_MAX_BYTES",
+    show_envvar=True,
+    metavar="SIZE",
+    help="Limit written bytes per second (suffixes K, M, G).",
+)
+@option(
+    "--min-workers",
+    type=click.IntRange(min=1),
+    default=DEFAULT_CONCURRENCY.min_workers,
+    show_default=True,
+    envvar=f"{ENVVAR_PREFIX}_MIN_WORKERS",
+    show_envvar=True,
+    help="Lower bound of concurrent operations per mount; the scheduler starts here.",
+)
+@option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=DEFAULT_CONCURRENCY.max_workers,
+    show_default=True,
+    envvar=f"{ENVVAR_PREFIX}_MAX_WORKERS",
+    show_envvar=True,
+    help="Upper bound of concurrent operations per mount.",
+)
+@option(
+    "--backup-dir",
+    type=click.Path(file_okay=False, dir_okay=True, path_type=Path),
+    default=None,
+    envvar=f"{ENVVAR_PREFIX}_BACKUP_DIR",
+    show_envvar=True,
+    help=(
+        "Content-addressed store for the files a run overwrites, shared by all runs. "
+        "Defaults to $XDG_STATE_HOME/default-cicd-public/backups."
+    ),
+)
+@option(
+    "--no-backup",
+    is_flag=True,
+    default=False,
+    help="Overwrite files without keeping their previous versions for rollback.",
+)
+@option(
+    "--lock-wait",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_LOCKING.wait_seconds,
+    show_default=True,
+    envvar=f"{ENVVAR_PREFIX}_LOCK_WAIT",
+    show_envvar=True,
+    metavar="SECONDS",
+    help=(
+        "How long to wait for a project locked by another distributor before reporting it "
+        "as locked; 0 skips locked projects immediately."
+    ),
+)
+@option(
+    "--lock-lease",
+    type=click.FloatRange(min=0, min_open=True),
+    default=DEFAULT_LOCKING.lease_seconds,
+    show_default=True,
+    envvar=f"{ENVVAR_PREFIX}_LOCK_LEASE",
+    show_envvar=True,
+    metavar="SECONDS",
+    help="How long an unrenewed project lock stays valid before others may break it.",
+)
+@option(
+    "--no-lock",
+    is_flag=True,
+    default=False,
+    help="Write projects without taking their lock files.",
+)
+@option(
+    "--commit",
+    is_flag=True,
+    default=False,
+    help=(
+        "Commit the changed template files in every updated project's git repository; "
+        "projects whose files were already up to date are not touched."
+    ),
+)
+@option(
+    "--commit-message",
+    default=DEFAULT_COMMIT_MESSAGE,
+    show_default=True,
+    envvar=f"{ENVVAR_PREFIX}_COMMIT_MESSAGE",
+    show_envvar=True,
+    metavar="TEMPLATE",
+    help="Commit message with the fields {project}, {path}, {count} and {files}.",
+)
+@option(
+    "--push",
+    is_flag=True,
+    default=False,
+    help="Push every new commit to its branch's upstream (implies --commit).",
+)
+@option(
+    "--git-jobs",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    envvar=f"{ENVVAR_PREFIX}_GIT_JOBS",
+    show_envvar=True,
+    help="Maximum number of repositories committed at once.",
+)
+@option(
+    "--force",
+    is_flag=True,
+    default=False,
+    help="Distribute even if nothing changed since the last identical run.",
+)
+@option(
+    "--max-age",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_MAX_AGE,
+    show_default=True,
+    envvar=f"{ENVVAR_PREFIX}_MAX_AGE",
+    show_envvar=True,
+    metavar="SECONDS",
+    help=(
+        "How long an identical successful run may be skipped while its targets and "
+        "the directories it walked are unchanged."
+    ),
+)
+@option(
+    "--max-watched-dirs",
+    type=click.IntRange(min=0),
+    default=DEFAULT_MAX_WATCHED_DIRECTORIES,
+    show_default=True,
+    envvar=f"{ENVVAR_PREFIX}_MAX_WATCHED_DIRS",
+    show_envvar=True,
+    help=(
+        "Record a run for --max-age only if its walk listed at most this many "
+        "directories; checking a record costs one stat per listed directory."
+    ),
 )
 @option(
     "--dry-run",
@@ -50,7 +450,29 @@ def get_default_search_root() -> Path:
 def distribute(
     services: AppServices,
     source: Path | None,
-    search_root: Path | None,
+    search_roots: tuple[Path, ...],
+    exclude: tuple[str, ...],
+    scan_report: bool,
+    scan_report_top: int,
+    targets_from: TextIO | None,
+    templates: tuple[str, ...],
+    max_metadata_ops: float | None,
+    max_writes: float | None,
+    max_bytes: float | None,
+    min_workers: int,
+    max_workers: int,
+    backup_dir: Path | None,
+    no_backup: bool,
+    lock_wait: float,
+    lock_lease: float,
+    no_lock: bool,
+    commit: bool,
+    commit_message: str,
+    push: bool,
+    git_jobs: int,
+    force: bool,
+    max_age: float,
+    max_watched_dirs: int,
     dry_run: bool,
     verbose: bool,
 ) -> None:
@@ -58,59 +480,250 @@ def distribute(
 
     Searches for projects containing .github/workflows/default_cicd_public.yml
     and copies all files from this project's .github/ directory to each target.
+    With --template, each marker routes its projects to its own source bundle.
+
+    After a successful run, the bundle digests, the targets and cheap
+    validators of their files and of every walked directory are recorded. An
+    identical later run exits right away while none of them changed, so it
+    still picks up new projects (see --force, --max-age and --max-watched-dirs).
     """
     console = Console()
 
-    # Determine search root
-    if search_root is None:
-        search_root = get_default_search_root()
-
-    # Get our source .github path
-    if source is not None:
-        source_github_path = source.resolve()
-    else:
-        source_github_path = services.get_source_github_path()
-    our_project_root = source_github_path.parent.resolve()
+    if targets_from is not None and search_roots:
+        msg = "--targets-from and --search-root are mutually exclusive"
+        raise click.UsageError(msg)
+    if targets_from is not None and scan_report:
+        msg = "--scan-report needs a filesystem walk and cannot be used with --targets-from"
+        raise click.UsageError(msg)
+    if min_workers > max_workers:
+        msg = f"--min-workers ({min_workers}) must not exceed --max-workers ({max_workers})"
+        raise click.UsageError(msg)
+    bounds = ConcurrencyBounds(min_workers=min_workers, max_workers=max_workers)
+    commit = commit or push
+    if commit:
+        _check_commit_message(commit_message)
+
+    # Determine search roots
+    if not search_roots:
+        search_roots = (get_default_search_root(),)
+
+    # Build the marker -> source registry
+    families = resolve_families(services, source, templates)
+    limits = IOLimits(
+        metadata_ops_per_second=max_metadata_ops,
+        writes_per_second=max_writes,
+        bytes_per_second=max_bytes,
+    )
+    services.configure_io_limits(limits)
+    services.configure_locking(
+        LockPolicy(enabled=not no_lock, wait_seconds=lock_wait, lease_seconds=lock_lease)
+    )
 
     if verbose:
-        console.print(f"[dim]Source .github/:[/] {source_github_path}")
-        console.print(f"[dim]Search root:[/] {search_root}")
+        for family in families:
+            source_text = family.source_github_path or "packaged with the tool"
+            console.print(f"[dim]Source .github/:[/] {source_text}")
+            if len(families) > 1:
+                console.print(f"[dim]  for marker:[/] {family.marker}")
+        if targets_from is not None:
+            console.print(f"[dim]Targets from:[/] {targets_from.name}")
+        else:
+            for search_root in search_roots:
+                console.print(f"[dim]Search root:[/] {search_root}")
+        if not limits.is_unlimited:
+            console.print(f"[dim]I/O budget:[/] {_describe_limits(limits)}")
         if dry_run:
             console.print("[yellow]DRY RUN - no changes will be made[/]")
         console.print()
 
-    # Discover and process projects
-    results: list[CopyResult] = []
-
-    with console.status("[bold blue]Searching for projects...", spinner="dots"):
-        discovered = list(services.discover_projects(search_root))
-
-    # Filter out our own project
-    projects_to_process = [p for p in discovered if p.root_path.resolve() != our_project_root]
+    # Skip the walk and the copies if the last identical run still holds
+    roots = read_target_roots(targets_from) if targets_from is not None else None
+    bundles = load_bundles(services, families)
+    key = run_key(families, bundles, search_roots=search_roots, target_roots=roots, exclude=exclude)
+    if not (dry_run or force or scan_report):
+        previous = services.find_unchanged_run(key, max_age=max_age)
+        if previous is not None:
+            finished = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(previous.finished))
+            console.print(
+                f"[green]Nothing changed since the run at {finished} "
+                f"({previous.projects} project(s)); use --force to distribute anyway.[/]"
+            )
+            return
+
+    # Discover projects, skipping our own project(s)
+    walked = WalkedDirectories(limit=max_watched_dirs)
+    if roots is not None:
+        with console.status(f"[bold blue]Validating {len(roots)} target(s)...", spinner="dots"):
+            discovery = discover_targets(services, families, target_roots=roots, phase=phase)
+        _print_rejected_targets(console, discovery.rejected_targets, verbose)
+    else:
+        scan_costs = ScanReport(limit=scan_report_top) if scan_report else None
+        with console.status("[bold blue]Searching for projects...", spinner="dots"):
+            discovery = discover_targets(
+                services,
+                families,
+                search_roots=search_roots,
+                concurrency=bounds,
+                exclude=exclude,
+                scan_report=scan_costs,
+                walked=walked,
+                phase=phase,
+            )
+        if scan_costs is not None:
+            _print_scan_report(console, scan_costs)
 
-    if not projects_to_process:
+    if not discovery.projects:
         console.print("[yellow]No target projects found.[/]")
         return
 
-    console.print(f"Found [bold]{len(projects_to_process)}[/] target project(s)")
+    console.print(f"Found [bold]{len(discovery.projects)}[/] target project(s)")
     console.print()
 
-    # Process each project
-    for project in projects_to_process:
-        with console.status(f"[bold blue]Processing {project.root_path}...", spinner="dots"):
-            result = services.copy_templates(
-                source_github_path,
-                project,
-                dry_run=dry_run,
+    # Process projects concurrently, tuning the copies in flight per mount
+    with console.status("[bold blue]Rendering templates...", spinner="dots"):
+        rendered = render_for_projects(services, bundles, discovery.projects, phase=phase)
+    if verbose and rendered.contexts:
+        console.print(
+            f"[dim]Rendered templates:[/] {rendered.renders} render(s) for "
+            f"{rendered.contexts} distinct project context(s)"
+        )
+    # Start the copies that took longest last time first
+    plan = plan_copies(services, discovery.projects, concurrency=bounds)
+    if plan.estimate is not None and not dry_run:
+        console.print(
+            f"[dim]Estimated copy time:[/] ~{_format_duration(plan.estimate)} "
+            f"({plan.known}/{len(plan.projects)} project(s) with history)"
+        )
+    with (
+        console.status(
+            f"[bold blue]Processing {len(discovery.projects)} project(s)...", spinner="dots"
+        ),
+        backup_run(services, enabled=not (dry_run or no_backup), backup_dir=backup_dir) as backup,
+    ):
+        copies = copy_to_projects(
+            services,
+            bundles,
+            plan.projects,
+            rendered=rendered,
+            dry_run=dry_run,
+            concurrency=bounds,
+            on_result=(lambda result: _print_result(console, result, dry_run)) if verbose else None,
+            phase=phase,
+        )
+
+    commits: list[CommitResult] = []
+    if commit and not dry_run:
+        with console.status("[bold blue]Committing changed projects...", spinner="dots"):
+            commits = commit_changes(
+                services,
+                copies.results,
+                message=commit_message,
+                push=push,
+                max_workers=git_jobs,
+                phase=phase,
             )
-            results.append(result)
-
-        if verbose:
-            _print_result(console, result, dry_run)
 
     # Print summary
     console.print()
-    _print_summary(console, results, dry_run)
+    _print_concurrency(console, discovery.lanes, copies.lanes)
+    _print_summary(console, copies.results, dry_run)
+    _print_contended(console, copies.results)
+    if commit and not dry_run:
+        _print_commits(console, commits, verbose)
+    if backup is not None and backup.files:
+        hint = f"default-cicd-public rollback {backup.run_id}"
+        if backup_dir is not None:
+            hint += f" --backup-dir {backup_dir}"
+        console.print(
+            f"[dim]Backed up {backup.files} file(s); undo with:[/] {hint}", soft_wrap=True
+        )
+    if not dry_run:
+        record_copy_history(services, copies)
+        if verbose and plan.estimate is not None:
+            console.print(
+                f"[dim]Copy time:[/] {_format_duration(copies.seconds)} "
+                f"(estimated ~{_format_duration(plan.estimate)})"
+            )
+        recorded = record_run(services, key, bundles, discovery, copies, commits, walked)
+        if verbose and recorded is not None:
+            console.print(
+                "[dim]Recorded the run; identical runs are skipped until a target changes.[/]"
+            )
+        elif verbose and walked.overflowed:
+            console.print(
+                f"[dim]Not recorded: the walk listed more than {max_watched_dirs} "
+                "directories (--max-watched-dirs), so identical runs walk again.[/]"
+            )
+
+
+def _check_commit_message(template: str) -> None:
+    """Reject a commit message template before anything is copied."""
+    sample = DiscoveredProject(root_path=Path("project"), github_path=Path("project/.github"))
+    try:
+        format_commit_message(template, CopyResult(project=sample, status=CopyStatus.SUCCESS))
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--commit-message") from e
+
+
+def _format_duration(seconds: float) -> str:
+    """Render a duration as seconds, or minutes and seconds from a minute on."""
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, rest = divmod(round(seconds), 60)
+    return f"{minutes}m {rest:02d}s"
+
+
+def _describe_limits(limits: IOLimits) -> str:
+    """Render the configured I/O limits for verbose output."""
+    parts: list[str] = []
+    if limits.metadata_ops_per_second is not None:
+        parts.append(f"{limits.metadata_ops_per_second:g} metadata ops/s")
+    if limits.writes_per_second is not None:
+        parts.append(f"{limits.writes_per_second:g} writes/s")
+    if limits.bytes_per_second is not None:
+        parts.append(f"{limits.bytes_per_second:,.0f} bytes/s")
+    return ", ".join(parts)
+
+
+def _print_scan_report(console: Console, report: ScanReport) -> None:
+    """Print the costliest project-free subtrees of the walk and rules to skip them."""
+    console.print(
+        f"[dim]Scanned {report.directories:,} directories and {report.entries:,} entries "
+        f"in {report.seconds:.2f}s of listing time.[/]"
+    )
+    if not report.subtrees:
+        console.print("[dim]Every scanned subtree contains a project.[/]")
+        return
+    table = Table(title="Most Expensive Subtrees Without Projects")
+    table.add_column("Subtree")
+    table.add_column("Directories", justify="right")
+    table.add_column("Entries", justify="right")
+    table.add_column("Time", justify="right")
+    table.add_column("Share", justify="right")
+    for subtree in report.subtrees:
+        share = subtree.seconds / report.seconds if report.seconds else 0.0
+        table.add_row(
+            str(subtree.path),
+            f"{subtree.directories:,}",
+            f"{subtree.entries:,}",
+            f"{subtree.seconds:.2f}s",
+            f"{share:.0%}",
+        )
+    console.print(table)
+    suggested = suggest_excludes(report.subtrees, report.project_names)
+    rules = " ".join(f"--exclude {shlex.quote(rule)}" for rule in suggested)
+    console.print(f"[dim]Suggested skip rules:[/] {rules}", soft_wrap=True)
+    console.print()
+
+
+def _print_rejected_targets(console: Console, rejected: list[Path], verbose: bool) -> None:
+    """Report listed targets that do not carry a marker."""
+    if not rejected:
+        return
+    console.print(f"[yellow]Skipped {len(rejected)} listed target(s) without a marker file.[/]")
+    if verbose:
+        for root in rejected:
+            console.print(f"  [dim]{root}[/]")
 
 
 def _print_result(console: Console, result: CopyResult, dry_run: bool) -> None:
@@ -121,6 +734,7 @@ def _print_result(console: Console, result: CopyResult, dry_run: bool) -> None:
         CopyStatus.SKIPPED_SELF: "[dim]- SKIPPED (self)[/]",
         CopyStatus.PERMISSION_DENIED: "[red]✗ PERMISSION DENIED[/]",
         CopyStatus.ERROR: "[red]✗ ERROR[/]",
+        CopyStatus.LOCKED: "[yellow]⧗ LOCKED[/]",
     }
 
     status_text = status_styles.get(result.status, f"[yellow]? {result.status.value}[/]")
@@ -148,6 +762,7 @@ def _print_summary(console: Console, results: list[CopyResult], dry_run: bool) -
         (CopyStatus.SUCCESS, "green"),
         (CopyStatus.DRY_RUN, "cyan"),
         (CopyStatus.SKIPPED_SELF, "dim"),
+        (CopyStatus.LOCKED, "yellow"),
         (CopyStatus.PERMISSION_DENIED, "red"),
         (CopyStatus.ERROR, "red"),
     ]
@@ -166,3 +781,74 @@ def _print_summary(console: Console, results: list[CopyResult], dry_run: bool) -
         console.print(f"\n[cyan]Would update {successful}/{total} projects.[/]")
     else:
         console.print(f"\n[green]Updated {successful}/{total} projects.[/]")
+
+
+def _print_contended(console: Console, results: list[CopyResult]) -> None:
+    """List the projects skipped because another distributor held their lock."""
+    locked = [result for result in results if result.status == CopyStatus.LOCKED]
+    if not locked:
+        return
+    table = Table(title="Contended Projects")
+    table.add_column("Project")
+    table.add_column("Holder")
+    for result in sorted(locked, key=lambda result: result.project.root_path):
+        table.add_row(str(result.project.root_path), result.error_message or "")
+    console.print(table)
+    console.print("[yellow]Run again to update the contended projects.[/]")
+
+
+def _print_commits(console: Console, commits: list[CommitResult], verbose: bool) -> None:
+    """Summarize the git commits and list every project that failed."""
+    if not commits:
+        console.print("[dim]No project had changes to commit.[/]")
+        return
+    counts: dict[CommitStatus, int] = {}
+    for result in commits:
+        counts[result.status] = counts.get(result.status, 0) + 1
+
+    table = Table(title="Commits")
+    table.add_column("Status", style="bold")
+    table.add_column("Count", justify="right")
+    for status, style in (
+        (CommitStatus.PUSHED, "green"),
+        (CommitStatus.COMMITTED, "green"),
+        (CommitStatus.NOTHING_TO_COMMIT, "dim"),
+        (CommitStatus.NOT_A_REPOSITORY, "yellow"),
+        (CommitStatus.ERROR, "red"),
+    ):
+        if status in counts:
+            table.add_row(f"[{style}]{status.value}[/]", str(counts[status]))
+    console.print(table)
+
+    for result in commits:
+        if result.status == CommitStatus.ERROR:
+            console.print(f"  [red]✗ {result.project.root_path}:[/] {result.error_message}")
+        elif verbose and result.commit is not None:
+            console.print(f"  [green]✓ {result.project.root_path}:[/] {result.commit[:12]}")
+
+
+def _print_concurrency(console: Console, discovery: list[LaneStats], copy: list[LaneStats]) -> None:
+    """Print the concurrency the adaptive scheduler chose per mount."""
+    table = Table(title="Concurrency")
+    table.add_column("Phase")
+    table.add_column("Mount")
+    table.add_column("Workers", justify="right")
+    table.add_column("Peak", justify="right")
+    table.add_column("Ops", justify="right")
+    table.add_column("Ops/s", justify="right")
+    table.add_column("Mean latency", justify="right")
+
+    for phase_name, lanes in (("discover", discovery), ("copy", copy)):
+        for lane in lanes:
+            table.add_row(
+                phase_name,
+                lane.label,
+                str(lane.workers),
+                str(lane.peak_in_flight),
+                str(lane.operations),
+                f"{lane.throughput:,.0f}",
+                f"{lane.mean_latency * 1000:.1f} ms",
+            )
+
+    if table.row_count:
+        console.print(table)
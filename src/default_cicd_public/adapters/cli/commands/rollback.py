@@ -0,0 +1,84 @@
+"""The rollback command for undoing a distribution run."""
+
+from pathlib import Path
+
+import rich_click as click
+from rich.console import Console
+
+from default_cicd_public.adapters.cli.constants import ENVVAR_PREFIX
+from default_cicd_public.adapters.cli.typed_click import argument, option
+from default_cicd_public.adapters.filesystem.backup import BackupIndexError, validate_run_id
+from default_cicd_public.application.ports import AppServices
+
+
+def _check_run_id(ctx: click.Context, param: click.Parameter, value: str) -> str:
+    """Click callback rejecting anything but the run IDs distribute prints."""
+    try:
+        return validate_run_id(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e), ctx=ctx, param=param) from e
+
+
+@click.command()
+@argument("run_id", callback=_check_run_id)
+@option(
+    "--backup-dir",
+    type=click.Path(file_okay=False, dir_okay=True, path_type=Path),
+    default=None,
+    envvar=f"{ENVVAR_PREFIX}_BACKUP_DIR",
+    show_envvar=True,
+    help="Backup store the run was recorded in. Defaults to the distribute default.",
+)
+@option(
+    "--dry-run",
+    is_flag=True,
+    default=False,
+    help="Show what would be restored without making changes.",
+)
+@option(
+    "-v",
+    "--verbose",
+    is_flag=True,
+    default=False,
+    help="List every restored and removed file.",
+)
+@click.pass_obj
+def rollback(
+    services: AppServices,
+    run_id: str,
+    backup_dir: Path | None,
+    dry_run: bool,
+    verbose: bool,
+) -> None:
+    """Restore the files a distribution run changed.
+
+    Files the run overwrote get their previous contents and modes back from the
+    backup store; files the run created are removed. RUN_ID is printed at the
+    end of every distribute run that backed up files.
+    """
+    console = Console()
+    try:
+        report = services.rollback_run(run_id, backup_dir, dry_run=dry_run)
+    except FileNotFoundError as e:
+        msg = f"No backup run {run_id!r} found"
+        raise click.ClickException(msg) from e
+    except BackupIndexError as e:
+        raise click.ClickException(str(e)) from e
+
+    if verbose:
+        for path in report.restored:
+            console.print(f"  [green]restore[/] {path}")
+        for path in report.removed:
+            console.print(f"  [yellow]remove[/]  {path}")
+    for path, error in report.errors.items():
+        console.print(f"  [red]✗ {path}:[/] {error}")
+
+    verb = "Would restore" if dry_run else "Restored"
+    console.print(
+        f"\n{verb} {len(report.restored)} file(s) and "
+        f"{'would remove' if dry_run else 'removed'} {len(report.removed)} created file(s) "
+        f"of run {run_id}."
+    )
+    if not report.is_success:
+        msg = f"{len(report.errors)} file(s) could not be rolled back"
+        raise click.ClickException(msg)
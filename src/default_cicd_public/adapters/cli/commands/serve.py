@@ -0,0 +1,292 @@
+"""The serve and client commands for the long-running distribution daemon."""
+
+import json
+import socket
+from pathlib import Path
+from typing import cast
+
+import rich_click as click
+from rich.console import Console
+from rich.table import Table
+
+from default_cicd_public.adapters.cli.commands.distribute import (
+    get_default_search_root,
+    resolve_families,
+)
+from default_cicd_public.adapters.cli.constants import ENVVAR_PREFIX
+from default_cicd_public.adapters.cli.typed_click import argument, option
+from default_cicd_public.adapters.daemon import (
+    COMMANDS,
+    DEFAULT_INDEX_TTL,
+    DistributionDaemon,
+    ProtocolError,
+    default_socket_path,
+    send_request,
+)
+from default_cicd_public.application.ports import AppServices
+from default_cicd_public.domain.models import DEFAULT_CONCURRENCY, ConcurrencyBounds
+
+_socket_option = option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    envvar=f"{ENVVAR_PREFIX}_SOCKET",
+    show_envvar=True,
+    help=(
+        "Unix socket of the daemon. Defaults to $XDG_RUNTIME_DIR/default-cicd-public.sock "
+        "or a per-user socket in the temporary directory."
+    ),
+)
+
+
+def _require_unix_sockets() -> None:
+    """Fail with a clear message on platforms without Unix sockets."""
+    if not hasattr(socket, "AF_UNIX"):
+        msg = "The daemon needs Unix domain sockets, which this platform does not provide."
+        raise click.ClickException(msg)
+
+
+@click.command()
+@_socket_option
+@option(
+    "--source",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+    default=None,
+    help="Source .github/ directory to copy from. Defaults as for distribute.",
+)
+@option(
+    "--template",
+    "templates",
+    multiple=True,
+    metavar="MARKER=SOURCE",
+    help="Template family as for distribute. Repeatable; replaces --source.",
+)
+@option(
+    "--search-root",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+    default=None,
+    help="Search root for requests that name none. Defaults to filesystem root (/ or C:\\).",
+)
+@option(
+    "--index-ttl",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_INDEX_TTL,
+    show_default=True,
+    envvar=f"{ENVVAR_PREFIX}_INDEX_TTL",
+    show_envvar=True,
+    metavar="SECONDS",
+    help=(
+        "Reuse the project index of a search root for this long; meanwhile requests only "
+        "re-validate the known projects instead of walking the tree."
+    ),
+)
+@option(
+    "--backup-dir",
+    type=click.Path(file_okay=False, dir_okay=True, path_type=Path),
+    default=None,
+    envvar=f"{ENVVAR_PREFIX}_BACKUP_DIR",
+    show_envvar=True,
+    help="Backup store for overwritten files. Defaults as for distribute.",
+)
+@option(
+    "--no-backup",
+    is_flag=True,
+    default=False,
+    help="Overwrite files without keeping their previous versions for rollback.",
+)
+@option(
+    "--min-workers",
+    type=click.IntRange(min=1),
+    default=DEFAULT_CONCURRENCY.min_workers,
+    show_default=True,
+    envvar=f"{ENVVAR_PREFIX}_MIN_WORKERS",
+    show_envvar=True,
+    help="Lower bound of concurrent operations per mount.",
+)
+@option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=DEFAULT_CONCURRENCY.max_workers,
+    show_default=True,
+    envvar=f"{ENVVAR_PREFIX}_MAX_WORKERS",
+    show_envvar=True,
+    help="Upper bound of concurrent operations per mount.",
+)
+@click.pass_obj
+def serve(
+    services: AppServices,
+    socket_path: Path | None,
+    source: Path | None,
+    templates: tuple[str, ...],
+    search_root: Path | None,
+    index_ttl: float,
+    backup_dir: Path | None,
+    no_backup: bool,
+    min_workers: int,
+    max_workers: int,
+) -> None:
+    """Run a daemon that serves distribute, dry-run and status requests.
+
+    The daemon keeps the services, the loaded templates and the discovered
+    projects in memory, so repeated requests from `client` skip interpreter
+    startup and the filesystem walk. Stop it with Ctrl+C; a socket left
+    behind by a killed daemon is replaced on the next start.
+    """
+    _require_unix_sockets()
+    # Unix-only; imported here so the rest of the CLI still loads everywhere.
+    from default_cicd_public.adapters.daemon.server import DaemonServer
+
+    if min_workers > max_workers:
+        msg = f"--min-workers ({min_workers}) must not exceed --max-workers ({max_workers})"
+        raise click.UsageError(msg)
+    socket_path = socket_path or default_socket_path()
+    app = DistributionDaemon(
+        services,
+        resolve_families(services, source, templates),
+        search_root=(search_root or get_default_search_root()).resolve(),
+        concurrency=ConcurrencyBounds(min_workers=min_workers, max_workers=max_workers),
+        index_ttl=index_ttl,
+        backup=not no_backup,
+        backup_dir=backup_dir,
+    )
+
+    console = Console(stderr=True)
+    try:
+        server = DaemonServer(socket_path, app)
+    except OSError as e:
+        raise click.ClickException(str(e)) from e
+    with server:
+        console.print(f"[green]Listening on[/] {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            console.print("[dim]Shutting down[/]")
+
+
+@click.command()
+@argument("command", type=click.Choice(COMMANDS))
+@_socket_option
+@option(
+    "--search-root",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+    default=None,
+    help="Search root for this request. Defaults to the daemon's.",
+)
+@option(
+    "--rescan",
+    is_flag=True,
+    default=False,
+    help="Walk the search root again instead of reusing the daemon's project index.",
+)
+@option(
+    "--json",
+    "as_json",
+    is_flag=True,
+    default=False,
+    help="Print the daemon's raw JSON response.",
+)
+def client(
+    command: str,
+    socket_path: Path | None,
+    search_root: Path | None,
+    rescan: bool,
+    as_json: bool,
+) -> None:
+    """Send a distribute, dry-run or status request to a running daemon."""
+    _require_unix_sockets()
+    socket_path = socket_path or default_socket_path()
+    request: dict[str, object] = {"command": command}
+    if search_root is not None:
+        request["search_root"] = str(search_root.resolve())
+    if rescan:
+        request["rescan"] = True
+
+    try:
+        response = send_request(socket_path, request)
+    except (FileNotFoundError, ConnectionRefusedError) as e:
+        msg = f"No daemon is listening on {socket_path}; start one with 'serve'."
+        raise click.ClickException(msg) from e
+    except (OSError, ProtocolError) as e:
+        raise click.ClickException(str(e)) from e
+
+    if as_json:
+        click.echo(json.dumps(response, indent=2))
+    if response.get("ok") is not True:
+        raise click.ClickException(str(response.get("error", "request failed")))
+    if as_json:
+        return
+
+    console = Console()
+    if command == "status":
+        _print_status(console, response)
+    else:
+        _print_response(console, response)
+
+
+def _print_status(console: Console, response: dict[str, object]) -> None:
+    """Print a status response as a key/value table."""
+    table = Table(title="Daemon Status", show_header=False)
+    table.add_column("Key", style="bold")
+    table.add_column("Value")
+    table.add_row("PID", str(response.get("pid")))
+    table.add_row("Uptime", f"{_number(response.get('uptime')):.0f} s")
+    table.add_row("Requests", str(response.get("requests")))
+    table.add_row("Busy", "yes" if response.get("busy") else "no")
+    table.add_row("Search root", str(response.get("search_root")))
+    for entry in _records(response.get("templates")):
+        table.add_row("Template", f"{entry.get('marker')} <- {entry.get('source')}")
+    for entry in _records(response.get("index")):
+        table.add_row(
+            "Index",
+            f"{entry.get('search_root')}: {entry.get('projects')} project(s), "
+            f"{_number(entry.get('age')):.0f} s old",
+        )
+    console.print(table)
+
+
+def _print_response(console: Console, response: dict[str, object]) -> None:
+    """Print a distribute or dry-run response."""
+    for result in _records(response.get("results")):
+        if result.get("error_message"):
+            console.print(
+                f"  {result.get('root_path')}: [red]{result.get('status')}[/] "
+                f"{result.get('error_message')}"
+            )
+    counts = {str(key): value for key, value in _record(response.get("counts")).items()}
+    if counts:
+        table = Table(title="Distribution Summary")
+        table.add_column("Status", style="bold")
+        table.add_column("Count", justify="right")
+        for status, count in sorted(counts.items()):
+            table.add_row(status, str(count))
+        console.print(table)
+    verb = "Would update" if response.get("command") == "dry-run" else "Updated"
+    console.print(
+        f"\n{verb} {response.get('updated')}/{response.get('projects')} projects "
+        f"[dim](index {response.get('index')}, {_number(response.get('elapsed')):.3f} s)[/]"
+    )
+    backup_run_id = response.get("backup_run")
+    if isinstance(backup_run_id, str):
+        console.print(
+            f"[dim]Undo with:[/] default-cicd-public rollback {backup_run_id}", soft_wrap=True
+        )
+
+
+def _record(value: object) -> dict[str, object]:
+    """Return ``value`` as a JSON object, or an empty one."""
+    if isinstance(value, dict):
+        return {str(key): item for key, item in cast("dict[object, object]", value).items()}
+    return {}
+
+
+def _records(value: object) -> list[dict[str, object]]:
+    """Return the JSON objects of a JSON array."""
+    if not isinstance(value, list):
+        return []
+    return [_record(item) for item in cast("list[object]", value)]
+
+
+def _number(value: object) -> float:
+    """Return a JSON number as float, or 0."""
+    return float(value) if isinstance(value, int | float) else 0.0
@@ -0,0 +1,242 @@
+"""The status command for reporting template drift without writing anything."""
+
+import json
+from pathlib import Path
+from typing import TextIO
+
+import rich_click as click
+from rich.console import Console
+from rich.table import Table
+
+from default_cicd_public.adapters.cli.commands.distribute import (
+    get_default_search_root,
+    read_target_roots,
+    resolve_families,
+)
+from default_cicd_public.adapters.cli.constants import ENVVAR_PREFIX
+from default_cicd_public.adapters.cli.typed_click import option
+from default_cicd_public.adapters.profiling import phase
+from default_cicd_public.application.distribution import (
+    check_projects,
+    discover_targets,
+    load_bundles,
+    render_for_projects,
+)
+from default_cicd_public.application.ports import AppServices
+from default_cicd_public.domain.models import (
+    DEFAULT_CONCURRENCY,
+    ConcurrencyBounds,
+    DriftState,
+    ProjectDrift,
+)
+
+STATE_STYLES = {
+    DriftState.CURRENT: "green",
+    DriftState.DRIFTED: "yellow",
+    DriftState.UNREACHABLE: "red",
+}
+
+
+def drift_to_json(result: ProjectDrift) -> dict[str, object]:
+    """Serialize the drift of one project."""
+    return {
+        "root_path": str(result.project.root_path),
+        "marker": result.project.marker.as_posix(),
+        "state": result.state.value,
+        "modified": [path.as_posix() for path in result.modified],
+        "missing": [path.as_posix() for path in result.missing],
+        "extra": [path.as_posix() for path in result.extra],
+        "error_message": result.error_message,
+    }
+
+
+@click.command()
+@option(
+    "--source",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+    default=None,
+    help="Source .github/ directory to compare with. Defaults as for distribute.",
+)
+@option(
+    "--search-root",
+    "search_roots",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+    multiple=True,
+    help="Root directory to search. Repeatable. Defaults to filesystem root (/ or C:\\).",
+)
+@option(
+    "--exclude",
+    multiple=True,
+    metavar="PATTERN",
+    help="Do not descend into matching directories, as for distribute. Repeatable.",
+)
+@option(
+    "--targets-from",
+    type=click.File("r", encoding="utf-8"),
+    default=None,
+    metavar="PATH|-",
+    help="Skip discovery and read project roots from a file or stdin, as for distribute.",
+)
+@option(
+    "--template",
+    "templates",
+    multiple=True,
+    metavar="MARKER=SOURCE",
+    help="Template family as for distribute. Repeatable; replaces --source.",
+)
+@option(
+    "--min-workers",
+    type=click.IntRange(min=1),
+    default=DEFAULT_CONCURRENCY.min_workers,
+    show_default=True,
+    envvar=f"{ENVVAR_PREFIX}_MIN_WORKERS",
+    show_envvar=True,
+    help="Lower bound of concurrent operations per mount.",
+)
+@option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=DEFAULT_CONCURRENCY.max_workers,
+    show_default=True,
+    envvar=f"{ENVVAR_PREFIX}_MAX_WORKERS",
+    show_envvar=True,
+    help="Upper bound of concurrent operations per mount.",
+)
+@option(
+    "--json",
+    "json_output",
+    is_flag=True,
+    default=False,
+    help="Print the drift of every project as JSON instead of a table.",
+)
+@option(
+    "--exit-code",
+    is_flag=True,
+    default=False,
+    help="Exit with status 1 if any project is drifted or unreachable.",
+)
+@option(
+    "-v",
+    "--verbose",
+    is_flag=True,
+    default=False,
+    help="List current projects too, and every differing file.",
+)
+@click.pass_obj
+@click.pass_context
+def status(
+    ctx: click.Context,
+    services: AppServices,
+    source: Path | None,
+    search_roots: tuple[Path, ...],
+    exclude: tuple[str, ...],
+    targets_from: TextIO | None,
+    templates: tuple[str, ...],
+    min_workers: int,
+    max_workers: int,
+    json_output: bool,
+    exit_code: bool,
+    verbose: bool,
+) -> None:
+    """Report which projects carry current, drifted or unreachable templates.
+
+    Compares every target's .github/ with the source bundle without writing
+    anything: files are matched by size and mode first and only read and
+    hashed when those agree. Files the bundle does not have are listed as
+    extra but leave a project current.
+    """
+    if targets_from is not None and search_roots:
+        msg = "--targets-from and --search-root are mutually exclusive"
+        raise click.UsageError(msg)
+    if min_workers > max_workers:
+        msg = f"--min-workers ({min_workers}) must not exceed --max-workers ({max_workers})"
+        raise click.UsageError(msg)
+    bounds = ConcurrencyBounds(min_workers=min_workers, max_workers=max_workers)
+    # Progress goes to stderr so that --json output stays parseable.
+    console = Console(stderr=json_output)
+
+    families = resolve_families(services, source, templates)
+    with console.status("[bold blue]Searching for projects...", spinner="dots"):
+        if targets_from is not None:
+            discovery = discover_targets(
+                services, families, target_roots=read_target_roots(targets_from), phase=phase
+            )
+        else:
+            discovery = discover_targets(
+                services,
+                families,
+                search_roots=search_roots or (get_default_search_root(),),
+                concurrency=bounds,
+                exclude=exclude,
+                phase=phase,
+            )
+
+    bundles = load_bundles(services, families)
+    with console.status(
+        f"[bold blue]Comparing {len(discovery.projects)} project(s)...", spinner="dots"
+    ):
+        rendered = render_for_projects(services, bundles, discovery.projects, phase=phase)
+        outcome = check_projects(
+            services,
+            bundles,
+            discovery.projects,
+            rendered=rendered,
+            concurrency=bounds,
+            phase=phase,
+        )
+
+    counts = dict.fromkeys(DriftState, 0)
+    for result in outcome.results:
+        counts[result.state] += 1
+
+    if json_output:
+        document = {
+            "counts": {state.value: count for state, count in counts.items()},
+            "projects": [drift_to_json(result) for result in outcome.results],
+        }
+        click.echo(json.dumps(document, indent=2))
+    else:
+        _print_drift(console, outcome.results, verbose)
+        console.print(
+            ", ".join(
+                f"[{STATE_STYLES[state]}]{count} {state.value}[/]"
+                for state, count in counts.items()
+            )
+            + "."
+        )
+
+    if exit_code and counts[DriftState.CURRENT] != len(outcome.results):
+        ctx.exit(1)
+
+
+def _print_drift(console: Console, results: list[ProjectDrift], verbose: bool) -> None:
+    """Print a table of the drifted and unreachable (with --verbose: all) projects."""
+    shown = [r for r in results if verbose or r.state != DriftState.CURRENT]
+    if not shown:
+        return
+    table = Table(title="Template Status")
+    table.add_column("Project")
+    table.add_column("State")
+    table.add_column("Modified", justify="right")
+    table.add_column("Missing", justify="right")
+    table.add_column("Extra", justify="right")
+    for result in shown:
+        style = STATE_STYLES[result.state]
+        table.add_row(
+            str(result.project.root_path),
+            f"[{style}]{result.state.value}[/]",
+            str(len(result.modified)),
+            str(len(result.missing)),
+            str(len(result.extra)),
+        )
+    console.print(table)
+
+    for result in shown:
+        if result.error_message:
+            console.print(f"  [red]{result.project.root_path}:[/] {result.error_message}")
+        if not verbose or not (result.state == DriftState.DRIFTED or result.extra):
+            continue
+        console.print(f"  [bold]{result.project.root_path}[/]")
+        for prefix, paths in (("~", result.modified), ("-", result.missing), ("+", result.extra)):
+            for path in paths:
+                console.print(f"    {prefix} {path.as_posix()}")
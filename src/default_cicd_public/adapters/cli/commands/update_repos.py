@@ -0,0 +1,177 @@
+"""The update-repos command for committing templates into bare repositories."""
+
+from pathlib import Path
+
+import rich_click as click
+from rich.console import Console
+from rich.table import Table
+
+from default_cicd_public.adapters.cli.commands.distribute import (
+    get_default_search_root,
+    resolve_families,
+)
+from default_cicd_public.adapters.cli.constants import ENVVAR_PREFIX
+from default_cicd_public.adapters.cli.typed_click import option
+from default_cicd_public.adapters.profiling import phase
+from default_cicd_public.application.distribution import (
+    DEFAULT_COMMIT_MESSAGE,
+    format_repository_message,
+    load_bundles,
+    update_repositories,
+)
+from default_cicd_public.application.ports import AppServices
+from default_cicd_public.domain.models import BareRepository, RepositoryResult, RepositoryStatus
+
+STATUS_STYLES = {
+    RepositoryStatus.UPDATED: "green",
+    RepositoryStatus.DRY_RUN: "cyan",
+    RepositoryStatus.UNCHANGED: "dim",
+    RepositoryStatus.ERROR: "red",
+}
+
+
+@click.command(name="update-repos")
+@option(
+    "--source",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+    default=None,
+    help="Source .github/ directory to commit. Defaults as for distribute.",
+)
+@option(
+    "--search-root",
+    "search_roots",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+    multiple=True,
+    help="Root directory to search for bare repositories. Repeatable.",
+)
+@option(
+    "--exclude",
+    multiple=True,
+    metavar="PATTERN",
+    help="Do not descend into matching directories, as for distribute. Repeatable.",
+)
+@option(
+    "--template",
+    "templates",
+    multiple=True,
+    metavar="MARKER=SOURCE",
+    help="Template family as for distribute. Repeatable; replaces --source.",
+)
+@option(
+    "--branch",
+    default=None,
+    metavar="NAME",
+    help=(
+        "Branch to commit to, created from HEAD if missing. "
+        "Defaults to the branch each repository's HEAD points to."
+    ),
+)
+@option(
+    "--commit-message",
+    default=DEFAULT_COMMIT_MESSAGE,
+    show_default=True,
+    envvar=f"{ENVVAR_PREFIX}_COMMIT_MESSAGE",
+    show_envvar=True,
+    metavar="TEMPLATE",
+    help="Commit message with the fields {project}, {path}, {count} and {files}.",
+)
+@option(
+    "--git-jobs",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    envvar=f"{ENVVAR_PREFIX}_GIT_JOBS",
+    show_envvar=True,
+    help="Maximum number of repositories processed at once.",
+)
+@option(
+    "--dry-run",
+    is_flag=True,
+    default=False,
+    help="Show which repositories would get a commit without writing anything.",
+)
+@option(
+    "-v",
+    "--verbose",
+    is_flag=True,
+    default=False,
+    help="List every changed repository and its files.",
+)
+@click.pass_obj
+def update_repos(
+    services: AppServices,
+    source: Path | None,
+    search_roots: tuple[Path, ...],
+    exclude: tuple[str, ...],
+    templates: tuple[str, ...],
+    branch: str | None,
+    commit_message: str,
+    git_jobs: int,
+    dry_run: bool,
+    verbose: bool,
+) -> None:
+    """Commit the templates directly into bare git repositories.
+
+    Finds bare repositories whose HEAD tree carries the marker file and
+    commits the template bundle into their .github/ on --branch, without a
+    checkout: each repository is compared and written by a single
+    git fast-import process. Repositories already carrying every template
+    get no commit. Templates with placeholders are not supported here.
+    """
+    sample = BareRepository(git_dir=Path("project.git"), ref="", parent="")
+    try:
+        format_repository_message(commit_message, sample, [])
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--commit-message") from e
+    console = Console()
+
+    families = resolve_families(services, source, templates)
+    bundles = load_bundles(services, families)
+    with console.status("[bold blue]Updating bare repositories...", spinner="dots"):
+        results = update_repositories(
+            services,
+            bundles,
+            search_roots or (get_default_search_root(),),
+            branch=branch,
+            exclude=exclude,
+            message=commit_message,
+            dry_run=dry_run,
+            max_workers=git_jobs,
+            phase=phase,
+        )
+
+    _print_results(console, results, verbose)
+    errors = sum(result.status == RepositoryStatus.ERROR for result in results)
+    if errors:
+        msg = f"{errors} repository(s) could not be updated"
+        raise click.ClickException(msg)
+
+
+def _print_results(console: Console, results: list[RepositoryResult], verbose: bool) -> None:
+    """Summarize the repositories by status and list failures (with --verbose: changes)."""
+    if not results:
+        console.print("[yellow]No bare repository carries the marker file.[/]")
+        return
+    counts = dict.fromkeys(RepositoryStatus, 0)
+    for result in results:
+        counts[result.status] += 1
+
+    table = Table(title="Bare Repositories")
+    table.add_column("Status", style="bold")
+    table.add_column("Count", justify="right")
+    for status, count in counts.items():
+        if count:
+            table.add_row(f"[{STATUS_STYLES[status]}]{status.value}[/]", str(count))
+    console.print(table)
+
+    for result in results:
+        git_dir = result.repository.git_dir
+        if result.status == RepositoryStatus.ERROR:
+            console.print(f"  [red]✗ {git_dir}:[/] {result.error_message}", soft_wrap=True)
+            continue
+        if not verbose or not result.files_changed:
+            continue
+        commit = f" {result.commit[:12]}" if result.commit else ""
+        console.print(f"  [green]✓ {git_dir}[/] {result.repository.ref}{commit}", soft_wrap=True)
+        for path in result.files_changed:
+            console.print(f"    ~ .github/{path.as_posix()}")
@@ -1,11 +1,17 @@
 """CLI constants and configuration."""
 
-from pathlib import Path
-
 import rich_click as click
 
-# The marker file that identifies projects using our CI/CD templates
-MARKER_FILE = Path(".github") / "workflows" / "default_cicd_public.yml"
+from default_cicd_public.domain.models import MARKER_FILE
+
+# Separator between marker and source in --template MARKER=SOURCE
+TEMPLATE_SEPARATOR = "="
+
+# Prefix of environment variables that provide option defaults
+ENVVAR_PREFIX = "DEFAULT_CICD_PUBLIC"
+
+# Multipliers for size suffixes accepted by byte-valued options
+SIZE_SUFFIXES: dict[str, int] = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
 
 # Click context settings
 CLICK_CONTEXT_SETTINGS: dict[str, object] = {
@@ -19,3 +25,11 @@ click.rich_click.USE_MARKDOWN = False
 click.rich_click.SHOW_ARGUMENTS = True
 click.rich_click.GROUP_ARGUMENTS_OPTIONS = True
 click.rich_click.STYLE_ERRORS_SUGGESTION = "dim"
+
+__all__ = [
+    "CLICK_CONTEXT_SETTINGS",
+    "ENVVAR_PREFIX",
+    "MARKER_FILE",
+    "SIZE_SUFFIXES",
+    "TEMPLATE_SEPARATOR",
+]
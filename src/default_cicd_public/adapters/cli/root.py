@@ -1,19 +1,77 @@
 """Root CLI command group."""
 
+from pathlib import Path
+
 import rich_click as click
+from rich.console import Console
 
 from default_cicd_public.__init__conf__ import __app_name__, __version__
 from default_cicd_public.adapters.cli.constants import CLICK_CONTEXT_SETTINGS
-from default_cicd_public.adapters.cli.typed_click import version_option
+from default_cicd_public.adapters.cli.typed_click import option, version_option
+from default_cicd_public.adapters.profiling import (
+    PHASES,
+    PROFILE_MODES,
+    RunProfiler,
+    profile_stamp,
+)
 
 
 @click.group(context_settings=CLICK_CONTEXT_SETTINGS)
 @version_option(__version__, "-V", "--version", prog_name=__app_name__)
-def cli() -> None:
+@option(
+    "--profile",
+    "profile_mode",
+    type=click.Choice(PROFILE_MODES),
+    default=None,
+    help="Profile the run: cprofile writes pstats, sampling writes collapsed stacks.",
+)
+@option(
+    "--profile-phase",
+    type=click.Choice(PHASES),
+    multiple=True,
+    help="Only profile this phase (repeatable). Defaults to the whole run.",
+)
+@option(
+    "--profile-dir",
+    type=click.Path(file_okay=False, dir_okay=True, path_type=Path),
+    default=None,
+    help="Directory for profile output. Defaults to ./profiles/<timestamp>.",
+)
+@click.pass_context
+def cli(
+    ctx: click.Context,
+    profile_mode: str | None,
+    profile_phase: tuple[str, ...],
+    profile_dir: Path | None,
+) -> None:
     """Default CI/CD Public - Distribute CI/CD templates to your projects."""
+    if profile_mode is None:
+        return
+
+    if profile_dir is None:
+        profile_dir = Path("profiles") / profile_stamp()
+    profiler = RunProfiler(profile_mode, profile_dir, frozenset(profile_phase))
+    profiler.start()
+
+    def _finish_profile() -> None:
+        written = profiler.stop()
+        console = Console(stderr=True)
+        for path in written:
+            console.print(f"[dim]Profile written:[/] {path}")
+
+    ctx.call_on_close(_finish_profile)
 
 
 # Import and register commands
 from default_cicd_public.adapters.cli.commands.distribute import distribute  # noqa: E402
+from default_cicd_public.adapters.cli.commands.rollback import rollback  # noqa: E402
+from default_cicd_public.adapters.cli.commands.serve import client, serve  # noqa: E402
+from default_cicd_public.adapters.cli.commands.status import status  # noqa: E402
+from default_cicd_public.adapters.cli.commands.update_repos import update_repos  # noqa: E402
 
 cli.add_command(distribute)
+cli.add_command(rollback)
+cli.add_command(serve)
+cli.add_command(status)
+cli.add_command(client)
+cli.add_command(update_repos)
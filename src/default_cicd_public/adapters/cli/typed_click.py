@@ -21,9 +21,14 @@ def option(*param_decls: str, **attrs: Any) -> _CommandDecorator:
     return click.option(*param_decls, **attrs)  # pyright: ignore[reportUnknownMemberType]
 
 
+def argument(*param_decls: str, **attrs: Any) -> _CommandDecorator:
+    """Typed wrapper over :func:`rich_click.argument`. See module docstring."""
+    return click.argument(*param_decls, **attrs)  # pyright: ignore[reportUnknownMemberType]
+
+
 def version_option(*param_decls: str, **attrs: Any) -> _CommandDecorator:
     """Typed wrapper over :func:`rich_click.version_option`. See module docstring."""
     return click.version_option(*param_decls, **attrs)  # pyright: ignore[reportUnknownMemberType]
 
 
-__all__ = ["option", "version_option"]
+__all__ = ["argument", "option", "version_option"]
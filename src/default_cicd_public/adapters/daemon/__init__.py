@@ -0,0 +1,18 @@
+"""Long-running daemon that serves distributions from warm state."""
+
+from default_cicd_public.adapters.daemon.client import send_request
+from default_cicd_public.adapters.daemon.protocol import (
+    COMMANDS,
+    ProtocolError,
+    default_socket_path,
+)
+from default_cicd_public.adapters.daemon.service import DEFAULT_INDEX_TTL, DistributionDaemon
+
+__all__ = [
+    "COMMANDS",
+    "DEFAULT_INDEX_TTL",
+    "DistributionDaemon",
+    "ProtocolError",
+    "default_socket_path",
+    "send_request",
+]
@@ -0,0 +1,40 @@
+"""Client side of the daemon protocol."""
+
+import socket
+from pathlib import Path
+
+from default_cicd_public.adapters.daemon.protocol import ProtocolError, decode, encode
+
+
+def send_request(
+    socket_path: Path, request: dict[str, object], *, timeout: float | None = None
+) -> dict[str, object]:
+    """
+    Send one request to the daemon and wait for its response.
+
+    Args:
+        socket_path: Path of the daemon's Unix socket.
+        request: The request object.
+        timeout: Seconds to wait for the connection and the response; None
+            waits as long as the distribution takes.
+
+    Returns:
+        The decoded response.
+
+    Raises:
+        OSError: If the daemon cannot be reached.
+        ProtocolError: If the daemon's answer is not a protocol message.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        connection.connect(str(socket_path))
+        connection.sendall(encode(request))
+        with connection.makefile("rb") as stream:
+            line = stream.readline()
+    if not line:
+        msg = "the daemon closed the connection without a response"
+        raise ProtocolError(msg)
+    return decode(line)
+
+
+__all__ = ["send_request"]
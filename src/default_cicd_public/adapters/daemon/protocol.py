@@ -0,0 +1,101 @@
+"""Newline-delimited JSON protocol spoken between the daemon and its client.
+
+Every request and response is a single JSON object on one line. Requests carry
+a ``command`` (``distribute``, ``dry-run`` or ``status``) plus optional
+arguments; responses carry ``ok`` and either the command's payload or an
+``error`` message. A connection may send several requests in turn.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import cast
+
+from default_cicd_public.domain.models import CopyResult, LaneStats
+
+COMMANDS = ("distribute", "dry-run", "status")
+SOCKET_NAME = "default-cicd-public.sock"
+
+# Upper bound for one encoded request, so a stray client cannot make the
+# daemon buffer an unbounded line.
+MAX_REQUEST_BYTES = 1 << 20
+
+
+class ProtocolError(ValueError):
+    """Raised for messages that are not valid protocol objects."""
+
+
+def default_socket_path() -> Path:
+    """Return the per-user socket path, preferring ``$XDG_RUNTIME_DIR``."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / SOCKET_NAME
+    uid = os.getuid() if sys.platform != "win32" else 0
+    return Path(tempfile.gettempdir()) / f"default-cicd-public-{uid}.sock"
+
+
+def encode(message: dict[str, object]) -> bytes:
+    """Encode one message as a JSON line."""
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+def decode(line: bytes) -> dict[str, object]:
+    """
+    Decode one JSON line into a message.
+
+    Args:
+        line: The raw line, with or without its trailing newline.
+
+    Returns:
+        The decoded message.
+
+    Raises:
+        ProtocolError: If the line is not a JSON object.
+    """
+    try:
+        value: object = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        msg = f"invalid JSON: {e}"
+        raise ProtocolError(msg) from e
+    if not isinstance(value, dict):
+        msg = "expected a JSON object"
+        raise ProtocolError(msg)
+    return cast("dict[str, object]", value)
+
+
+def result_to_json(result: CopyResult) -> dict[str, object]:
+    """Serialize a copy result for a response."""
+    return {
+        "root_path": str(result.project.root_path),
+        "marker": result.project.marker.as_posix(),
+        "status": result.status.value,
+        "files_copied": [path.as_posix() for path in result.files_copied],
+        "files_changed": [path.as_posix() for path in result.files_changed],
+        "error_message": result.error_message,
+    }
+
+
+def lane_to_json(lane: LaneStats) -> dict[str, object]:
+    """Serialize the statistics of one scheduler lane for a response."""
+    return {
+        "label": lane.label,
+        "workers": lane.workers,
+        "peak_in_flight": lane.peak_in_flight,
+        "operations": lane.operations,
+        "throughput": lane.throughput,
+        "mean_latency": lane.mean_latency,
+    }
+
+
+__all__ = [
+    "COMMANDS",
+    "MAX_REQUEST_BYTES",
+    "ProtocolError",
+    "decode",
+    "default_socket_path",
+    "encode",
+    "lane_to_json",
+    "result_to_json",
+]
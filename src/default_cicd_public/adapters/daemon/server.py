@@ -0,0 +1,94 @@
+"""Unix socket transport of the distribution daemon.
+
+This module needs ``socket.AF_UNIX`` and is therefore only imported on
+platforms that provide it.
+"""
+
+import contextlib
+import os
+import socket
+import socketserver
+from pathlib import Path
+from typing import cast
+
+from default_cicd_public.adapters.daemon.protocol import (
+    MAX_REQUEST_BYTES,
+    ProtocolError,
+    decode,
+    encode,
+)
+from default_cicd_public.adapters.daemon.service import DistributionDaemon
+
+
+class DaemonAlreadyRunningError(OSError):
+    """Raised when another daemon already listens on the socket."""
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Answers the requests of one connection, one JSON line at a time."""
+
+    def handle(self) -> None:
+        """Read requests until the client closes the connection."""
+        app = cast("DaemonServer", self.server).app
+        while True:
+            line = self.rfile.readline(MAX_REQUEST_BYTES + 1)
+            if not line:
+                return
+            if len(line) > MAX_REQUEST_BYTES:
+                self.wfile.write(encode({"ok": False, "error": "request too large"}))
+                return
+            response: dict[str, object]
+            try:
+                response = app.handle(decode(line))
+            except ProtocolError as e:
+                response = {"ok": False, "error": str(e)}
+            self.wfile.write(encode(response))
+            self.wfile.flush()
+
+
+class DaemonServer(socketserver.ThreadingUnixStreamServer):
+    """Threaded Unix socket server that removes its socket file on close."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, app: DistributionDaemon) -> None:
+        """
+        Bind the socket, replacing a stale socket file left by a dead daemon.
+
+        Args:
+            socket_path: Filesystem path of the socket.
+            app: The daemon answering the requests.
+
+        Raises:
+            DaemonAlreadyRunningError: If a live daemon owns ``socket_path``.
+        """
+        self.app = app
+        self.socket_path = socket_path
+        _remove_stale_socket(socket_path)
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(str(socket_path), _RequestHandler)
+        # Only the owner may talk to the daemon.
+        os.chmod(socket_path, 0o600)
+
+    def server_close(self) -> None:
+        """Close the socket and remove its file."""
+        super().server_close()
+        with contextlib.suppress(FileNotFoundError):
+            self.socket_path.unlink()
+
+
+def _remove_stale_socket(socket_path: Path) -> None:
+    """Delete ``socket_path`` unless a daemon still accepts connections on it."""
+    if not socket_path.exists():
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(str(socket_path))
+        except (ConnectionRefusedError, FileNotFoundError):
+            socket_path.unlink(missing_ok=True)
+            return
+    msg = f"a daemon is already listening on {socket_path}"
+    raise DaemonAlreadyRunningError(msg)
+
+
+__all__ = ["DaemonAlreadyRunningError", "DaemonServer"]
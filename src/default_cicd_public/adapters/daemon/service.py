@@ -0,0 +1,252 @@
+"""Request handling of the distribution daemon, independent of the transport.
+
+The daemon keeps three things warm between requests:
+
+- the application services, built once at startup;
+- the template bundles, which the loader caches and only re-reads when the
+  source directory's stat signature changes, and their compiled and rendered
+  forms cached by the renderer;
+- a project index per search root. While an index is younger than the TTL a
+  request only re-validates the known project roots (one stat per project)
+  instead of walking the tree again. Projects whose marker disappeared drop
+  out immediately; new projects show up once the index expires or a request
+  asks for a rescan.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from default_cicd_public.adapters.daemon.protocol import (
+    COMMANDS,
+    ProtocolError,
+    lane_to_json,
+    result_to_json,
+)
+from default_cicd_public.adapters.filesystem.locking import ProjectLockedError
+from default_cicd_public.adapters.git.committer import GitError
+from default_cicd_public.application.distribution import (
+    DiscoveryOutcome,
+    backup_run,
+    copy_to_projects,
+    discover_targets,
+    load_bundles,
+    plan_copies,
+    record_copy_history,
+    render_for_projects,
+)
+from default_cicd_public.application.ports import AppServices
+from default_cicd_public.domain.models import (
+    DEFAULT_CONCURRENCY,
+    ConcurrencyBounds,
+    CopyStatus,
+    TemplateFamily,
+)
+
+# Seconds a project index is trusted before the next request walks again
+DEFAULT_INDEX_TTL = 300.0
+
+_log = logging.getLogger(__name__)
+
+
+@dataclass
+class _IndexEntry:
+    """Projects found below one search root and when they were found."""
+
+    outcome: DiscoveryOutcome
+    scanned_at: float
+
+
+class DistributionDaemon:
+    """Serves distribute, dry-run and status requests from warm state."""
+
+    def __init__(
+        self,
+        services: AppServices,
+        families: Sequence[TemplateFamily],
+        *,
+        search_root: Path,
+        concurrency: ConcurrencyBounds = DEFAULT_CONCURRENCY,
+        index_ttl: float = DEFAULT_INDEX_TTL,
+        backup: bool = True,
+        backup_dir: Path | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Configure the daemon.
+
+        Args:
+            services: The application services, shared by all requests.
+            families: Template families distributed by every request.
+            search_root: Search root used when a request names none.
+            concurrency: Bounds for the adaptive discovery and copy schedulers.
+            index_ttl: Seconds a project index is reused before walking again.
+            backup: If True, distributions back up the files they overwrite.
+            backup_dir: Backup directory. None uses the default location.
+            clock: Monotonic clock, injectable for tests.
+        """
+        self.services = services
+        self.families = list(families)
+        self.search_root = search_root
+        self.concurrency = concurrency
+        self.index_ttl = index_ttl
+        self.backup = backup
+        self.backup_dir = backup_dir
+        self._clock = clock
+        self._started = clock()
+        self._requests = 0
+        self._index: dict[Path, _IndexEntry] = {}
+        # Distributions write to the same projects, so they run one at a time.
+        self._run_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    def handle(self, request: dict[str, object]) -> dict[str, object]:
+        """
+        Answer one request.
+
+        Args:
+            request: A decoded protocol request.
+
+        Returns:
+            The response; ``ok`` is False with an ``error`` message when the
+            request is invalid or the run failed.
+        """
+        with self._stats_lock:
+            self._requests += 1
+        command = request.get("command")
+        try:
+            if command == "status":
+                return self._status()
+            if command in ("distribute", "dry-run"):
+                return self._distribute(request, dry_run=command == "dry-run")
+            msg = f"unknown command {command!r}; expected one of {', '.join(COMMANDS)}"
+            raise ProtocolError(msg)
+        except (ProtocolError, OSError) as e:
+            return {"ok": False, "error": str(e)}
+        except (ValueError, GitError, ProjectLockedError) as e:
+            # Bad bundles, templates or project values, and failed git runs
+            _log.warning("%s request failed", command, exc_info=True)
+            return {"ok": False, "error": str(e)}
+        except Exception as e:
+            # A failed run must not drop the connection without an answer.
+            _log.exception("%s request failed unexpectedly", command)
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    def _distribute(self, request: dict[str, object], *, dry_run: bool) -> dict[str, object]:
+        """Distribute the templates, reusing the project index when it is fresh."""
+        search_root = self._search_root_of(request)
+        rescan = request.get("rescan", False)
+        if not isinstance(rescan, bool):
+            msg = "rescan must be true or false"
+            raise ProtocolError(msg)
+
+        with self._run_lock:
+            started = self._clock()
+            discovery, index_state = self._targets(search_root, rescan=rescan)
+            bundles = load_bundles(self.services, self.families)
+            rendered = render_for_projects(self.services, bundles, discovery.projects)
+            with backup_run(
+                self.services, enabled=self.backup and not dry_run, backup_dir=self.backup_dir
+            ) as backup:
+                plan = plan_copies(self.services, discovery.projects, concurrency=self.concurrency)
+                copies = copy_to_projects(
+                    self.services,
+                    bundles,
+                    plan.projects,
+                    rendered=rendered,
+                    dry_run=dry_run,
+                    concurrency=self.concurrency,
+                )
+            if not dry_run:
+                record_copy_history(self.services, copies)
+            elapsed = self._clock() - started
+
+        counts: dict[str, int] = {}
+        for result in copies.results:
+            counts[result.status.value] = counts.get(result.status.value, 0) + 1
+        results = sorted(copies.results, key=lambda result: result.project.root_path)
+        return {
+            "ok": True,
+            "command": "dry-run" if dry_run else "distribute",
+            "search_root": str(search_root),
+            "index": index_state,
+            "projects": len(discovery.projects),
+            "updated": counts.get(CopyStatus.SUCCESS.value, 0)
+            + counts.get(CopyStatus.DRY_RUN.value, 0),
+            "counts": counts,
+            "renders": rendered.renders,
+            "backup_run": backup.run_id if backup is not None and backup.files else None,
+            "results": [result_to_json(result) for result in results],
+            "discover_lanes": [lane_to_json(lane) for lane in discovery.lanes],
+            "copy_lanes": [lane_to_json(lane) for lane in copies.lanes],
+            "elapsed": elapsed,
+            "estimate": plan.estimate,
+        }
+
+    def _targets(self, search_root: Path, *, rescan: bool) -> tuple[DiscoveryOutcome, str]:
+        """Return the target projects and whether the index was ``warm`` or ``scanned``."""
+        now = self._clock()
+        entry = self._index.get(search_root)
+        if entry is not None and not rescan and now - entry.scanned_at < self.index_ttl:
+            known = [project.root_path for project in entry.outcome.projects]
+            outcome = discover_targets(self.services, self.families, target_roots=known)
+            entry.outcome = DiscoveryOutcome(projects=outcome.projects)
+            return outcome, "warm"
+
+        outcome = discover_targets(
+            self.services, self.families, search_roots=[search_root], concurrency=self.concurrency
+        )
+        self._index[search_root] = _IndexEntry(outcome=outcome, scanned_at=now)
+        return outcome, "scanned"
+
+    def _search_root_of(self, request: dict[str, object]) -> Path:
+        """Return the request's search root, or the daemon's default."""
+        value = request.get("search_root")
+        if value is None:
+            return self.search_root
+        if not isinstance(value, str) or not value:
+            msg = "search_root must be a non-empty string"
+            raise ProtocolError(msg)
+        search_root = Path(value)
+        if not search_root.is_dir():
+            msg = f"search_root is not a directory: {value}"
+            raise ProtocolError(msg)
+        return search_root.resolve()
+
+    def _status(self) -> dict[str, object]:
+        """Describe the daemon and its warm state."""
+        now = self._clock()
+        with self._stats_lock:
+            requests = self._requests
+        return {
+            "ok": True,
+            "command": "status",
+            "pid": os.getpid(),
+            "uptime": now - self._started,
+            "requests": requests,
+            "busy": self._run_lock.locked(),
+            "search_root": str(self.search_root),
+            "index_ttl": self.index_ttl,
+            "templates": [
+                {
+                    "marker": family.marker.as_posix(),
+                    "source": str(family.source_github_path or "packaged"),
+                }
+                for family in self.families
+            ],
+            "index": [
+                {
+                    "search_root": str(root),
+                    "projects": len(entry.outcome.projects),
+                    "age": now - entry.scanned_at,
+                }
+                for root, entry in sorted(self._index.items())
+            ],
+        }
+
+
+__all__ = ["DEFAULT_INDEX_TTL", "DistributionDaemon"]
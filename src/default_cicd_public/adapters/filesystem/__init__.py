@@ -1,6 +1,25 @@
 """Filesystem adapters for project discovery and template copying."""
 
+from default_cicd_public.adapters.filesystem.backup import BackupStore
+from default_cicd_public.adapters.filesystem.bundle import FilesystemBundleLoader
 from default_cicd_public.adapters.filesystem.copier import FilesystemCopier
 from default_cicd_public.adapters.filesystem.discovery import FilesystemDiscovery
+from default_cicd_public.adapters.filesystem.drift import FilesystemDriftChecker
+from default_cicd_public.adapters.filesystem.history import CopyHistoryStore
+from default_cicd_public.adapters.filesystem.locking import ProjectLocks
+from default_cicd_public.adapters.filesystem.rendering import TemplateRenderer
+from default_cicd_public.adapters.filesystem.runstate import RunStateStore
+from default_cicd_public.adapters.filesystem.targets import FilesystemTargetValidator
 
-__all__ = ["FilesystemCopier", "FilesystemDiscovery"]
+__all__ = [
+    "BackupStore",
+    "CopyHistoryStore",
+    "FilesystemBundleLoader",
+    "FilesystemCopier",
+    "FilesystemDiscovery",
+    "FilesystemDriftChecker",
+    "FilesystemTargetValidator",
+    "ProjectLocks",
+    "RunStateStore",
+    "TemplateRenderer",
+]
@@ -0,0 +1,389 @@
+"""Content-addressed backups of the files a distribution overwrites.
+
+Layout below the backup directory::
+
+    objects/ab/cdef...   previous file contents, named by SHA-256 digest
+    runs/<RUN_ID>.jsonl  one line per file the run touched
+
+Objects are shared by all runs and targets. Hundreds of projects usually carry
+the same old version of a workflow, so the store keeps one copy of it and the
+backup I/O of a run is a read per target file plus one write per distinct
+previous version. The copier hands over the bytes it already read to compare,
+so a backed-up file is not read twice, and files a run leaves unchanged are not
+backed up at all.
+
+Each index line records the target path, its project root and the digest and
+mode it had before the run, or a null digest if the run created the file.
+Rolling back restores the recorded state of every path, holding each
+project's lock like a distribution does. A run that crashed mid-write may
+leave a truncated last line, which is ignored.
+"""
+
+import hashlib
+import json
+import os
+import re
+import secrets
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, cast
+
+from default_cicd_public.adapters.filesystem.locking import ProjectLockedError, ProjectLocks
+from default_cicd_public.adapters.filesystem.throttle import IOThrottle
+from default_cicd_public.domain.models import BackupRun, RollbackReport
+
+STATE_DIR_NAME = "default-cicd-public"
+
+# Run IDs as created by BackupStore.begin_run: local time and a random suffix
+RUN_ID_PATTERN = re.compile(r"^\d{8}-\d{6}-[0-9a-f]{6}$")
+
+
+class BackupIndexError(ValueError):
+    """Raised when a run's backup index cannot be parsed."""
+
+
+def validate_run_id(run_id: str) -> str:
+    """
+    Check that ``run_id`` has the form of the IDs :class:`BackupStore` creates.
+
+    Returns:
+        The run ID.
+
+    Raises:
+        ValueError: If it does not, e.g. because it would name a path outside
+            the store's run directory.
+    """
+    if not RUN_ID_PATTERN.match(run_id):
+        msg = f"invalid run ID {run_id!r}; expected the form YYYYMMDD-HHMMSS-xxxxxx"
+        raise ValueError(msg)
+    return run_id
+
+
+def default_state_dir() -> Path:
+    """Return the tool's per-user directory in the platform's state location."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or str(Path.home() / "AppData" / "Local")
+    else:
+        base = os.environ.get("XDG_STATE_HOME") or str(Path.home() / ".local" / "state")
+    return Path(base) / STATE_DIR_NAME
+
+
+def default_backup_dir() -> Path:
+    """Return the per-user backup directory in the platform's state location."""
+    return default_state_dir() / "backups"
+
+
+class BackupStore:
+    """Deduplicating store for files about to be overwritten.
+
+    One run is active at a time; :meth:`save` records into it from any number
+    of copy threads.
+    """
+
+    def __init__(
+        self,
+        root: Path | None = None,
+        throttle: IOThrottle | None = None,
+        locks: ProjectLocks | None = None,
+    ) -> None:
+        """
+        Configure the store.
+
+        Args:
+            root: Backup directory. Defaults to :func:`default_backup_dir`.
+            throttle: Shared I/O budget; each backed-up file takes one
+                metadata token and each new object a write token plus its size.
+                None means unthrottled.
+            locks: Project locks held while a rollback writes to a project,
+                shared with the copier. None means no locking.
+        """
+        self.root = root or default_backup_dir()
+        self.throttle = throttle or IOThrottle()
+        self.locks = locks
+        self._lock = threading.Lock()
+        self._run: BackupRun | None = None
+        self._run_root = self.root
+        self._index: IO[str] | None = None
+        self._known_objects: set[str] = set()
+
+    @property
+    def active(self) -> bool:
+        """Return True while a run records backups."""
+        return self._run is not None
+
+    def begin_run(self, backup_dir: Path | None = None) -> BackupRun:
+        """
+        Start recording a run.
+
+        Args:
+            backup_dir: Backup directory for this run. None uses the store's.
+
+        Returns:
+            The new run.
+
+        Raises:
+            RuntimeError: If a run is already active.
+        """
+        with self._lock:
+            if self._run is not None:
+                msg = f"Backup run {self._run.run_id} is still active"
+                raise RuntimeError(msg)
+            run_root = backup_dir or self.root
+            if run_root != self._run_root:
+                self._known_objects.clear()
+            self._run_root = run_root
+            run = BackupRun(run_id=f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}")
+            runs_dir = run_root / "runs"
+            runs_dir.mkdir(parents=True, exist_ok=True)
+            self._index = (runs_dir / f"{run.run_id}.jsonl").open("x", encoding="utf-8")
+            self._run = run
+            return run
+
+    def end_run(self) -> BackupRun | None:
+        """
+        Stop recording and close the run's index.
+
+        Returns:
+            The finished run with its file count, or None if none was active.
+        """
+        with self._lock:
+            run, index = self._run, self._index
+            self._run = None
+            self._index = None
+        if index is not None:
+            index.close()
+        return run
+
+    def save(self, target_file: Path, project_root: Path | None = None) -> None:
+        """
+        Record the current state of ``target_file`` before it is overwritten.
+
+        Does nothing when no run is active.
+
+        Args:
+            target_file: The file about to be overwritten.
+            project_root: The project the file belongs to, locked during a
+                rollback. None derives it from the ``.github`` directory.
+
+        Raises:
+            OSError: If the file cannot be read or the backup cannot be
+                written; the caller must not overwrite the file then.
+        """
+        if self._run is None:
+            return
+        self.throttle.metadata()
+        try:
+            content = target_file.read_bytes()
+            mode = target_file.stat().st_mode & 0o7777
+        except FileNotFoundError:
+            self.save_previous(target_file, None, project_root)
+            return
+        self.save_previous(target_file, (content, mode), project_root)
+
+    def save_previous(
+        self,
+        target_file: Path,
+        previous: tuple[bytes, int] | None,
+        project_root: Path | None = None,
+    ) -> None:
+        """
+        Record a state of ``target_file`` the caller has already read.
+
+        Does nothing when no run is active.
+
+        Args:
+            target_file: The file about to be overwritten.
+            previous: Its current content and mode, or None if it does not
+                exist yet.
+            project_root: The project the file belongs to, as for :meth:`save`.
+
+        Raises:
+            OSError: If the backup cannot be written; the caller must not
+                overwrite the file then.
+        """
+        if self._run is None:
+            return
+        if previous is None:
+            self._record(target_file, project_root, None, None)
+            return
+        content, mode = previous
+        digest = hashlib.sha256(content).hexdigest()
+        self._store_object(digest, content)
+        self._record(target_file, project_root, digest, mode)
+
+    def rollback(
+        self, run_id: str, backup_dir: Path | None = None, *, dry_run: bool = False
+    ) -> RollbackReport:
+        """
+        Restore every file a run touched to its state before the run.
+
+        Args:
+            run_id: The run to undo.
+            backup_dir: Backup directory holding the run. None uses the store's.
+            dry_run: If True, only report what would be restored.
+
+        Returns:
+            The restored and removed paths and per-path errors; the files of
+            a project locked by another distributor are reported as errors.
+
+        Raises:
+            ValueError: If ``run_id`` is not a run ID.
+            FileNotFoundError: If the run has no index.
+            BackupIndexError: If the run's index is corrupt.
+        """
+        root = backup_dir or self.root
+        index_path = root / "runs" / f"{validate_run_id(run_id)}.jsonl"
+        report = RollbackReport(run_id=run_id)
+        by_project: defaultdict[Path, list[_IndexEntry]] = defaultdict(list)
+        for entry in _read_index(index_path):
+            by_project[entry.project_root].append(entry)
+        for project_root, entries in by_project.items():
+            if dry_run or self.locks is None:
+                self._restore(root, entries, report, dry_run=dry_run)
+                continue
+            try:
+                with self.locks.hold(project_root):
+                    self._restore(root, entries, report, dry_run=dry_run)
+            except ProjectLockedError as e:
+                for entry in entries:
+                    report.errors[entry.path] = str(e)
+            except OSError as e:
+                for entry in entries:
+                    report.errors.setdefault(entry.path, str(e))
+        return report
+
+    def _restore(
+        self, root: Path, entries: list["_IndexEntry"], report: RollbackReport, *, dry_run: bool
+    ) -> None:
+        """Restore the recorded state of one project's files into ``report``."""
+        for entry in entries:
+            path, digest = entry.path, entry.digest
+            try:
+                if digest is None:
+                    if not dry_run:
+                        path.unlink(missing_ok=True)
+                    report.removed.append(path)
+                    continue
+                content = _object_path(root, digest).read_bytes()
+                if hashlib.sha256(content).hexdigest() != digest:
+                    report.errors[path] = f"backup object {digest} is corrupt"
+                    continue
+                if not dry_run:
+                    self.throttle.write(len(content))
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    path.write_bytes(content)
+                    if entry.mode is not None:
+                        os.chmod(path, entry.mode)
+                report.restored.append(path)
+            except OSError as e:
+                report.errors[path] = str(e)
+
+    def _store_object(self, digest: str, content: bytes) -> None:
+        """Write an object unless the store already has it."""
+        root = self._run_root
+        if digest in self._known_objects:
+            return
+        path = _object_path(root, digest)
+        if not path.exists():
+            self.throttle.write(len(content))
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary name first so readers never see half an object.
+            fd, temporary = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as stream:
+                    stream.write(content)
+                os.replace(temporary, path)
+            except BaseException:
+                Path(temporary).unlink(missing_ok=True)
+                raise
+        with self._lock:
+            self._known_objects.add(digest)
+
+    def _record(
+        self, target_file: Path, project_root: Path | None, digest: str | None, mode: int | None
+    ) -> None:
+        """Append one entry to the active run's index."""
+        root = project_root if project_root is not None else _project_root_of(target_file)
+        line = json.dumps(
+            {"path": str(target_file), "root": str(root), "digest": digest, "mode": mode}
+        )
+        with self._lock:
+            if self._run is None or self._index is None:
+                return
+            self._index.write(line + "\n")
+            self._index.flush()
+            self._run.files += 1
+
+
+def _object_path(root: Path, digest: str) -> Path:
+    """Return where the object ``digest`` is stored."""
+    return root / "objects" / digest[:2] / digest[2:]
+
+
+@dataclass(frozen=True)
+class _IndexEntry:
+    """The state of one file before a run, as recorded in the run's index."""
+
+    path: Path
+    project_root: Path
+    digest: str | None
+    mode: int | None
+
+
+def _project_root_of(target_file: Path) -> Path:
+    """Return the project of a template file: the parent of its ``.github``."""
+    for parent in target_file.parents:
+        if parent.name == ".github":
+            return parent.parent
+    return target_file.parent
+
+
+def _read_index(index_path: Path) -> list[_IndexEntry]:
+    """
+    Return the first recorded state of every path in a run's index.
+
+    Raises:
+        BackupIndexError: If a line other than a truncated last one is not a
+            valid entry.
+    """
+    entries: dict[Path, _IndexEntry] = {}
+    with index_path.open(encoding="utf-8") as stream:
+        lines = stream.readlines()
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = cast("dict[str, object]", json.loads(line))
+            path = Path(cast("str", record["path"]))
+        except (ValueError, KeyError, TypeError) as e:
+            if number == len(lines) and not line.endswith("\n"):
+                # The run stopped while writing its last entry, before it
+                # overwrote the file.
+                break
+            msg = f"corrupt backup index {index_path}, line {number}: {e}"
+            raise BackupIndexError(msg) from e
+        root, digest, mode = record.get("root"), record.get("digest"), record.get("mode")
+        entries.setdefault(
+            path,
+            _IndexEntry(
+                path=path,
+                project_root=Path(root) if isinstance(root, str) else _project_root_of(path),
+                digest=digest if isinstance(digest, str) else None,
+                mode=mode if isinstance(mode, int) else None,
+            ),
+        )
+    return list(entries.values())
+
+
+__all__ = [
+    "BackupIndexError",
+    "BackupStore",
+    "default_backup_dir",
+    "default_state_dir",
+    "validate_run_id",
+]
@@ -0,0 +1,75 @@
+"""Loading template bundles from a source .github/ directory."""
+
+import hashlib
+import stat
+import threading
+from pathlib import Path
+
+from default_cicd_public.domain.models import TemplateBundle, TemplateFile
+
+# (relative path, mtime_ns, size, mode) of every file in a source directory
+_Signature = tuple[tuple[str, int, int, int], ...]
+
+
+class FilesystemBundleLoader:
+    """Reads a source .github/ directory into an in-memory TemplateBundle.
+
+    Bundles are cached per source directory and only re-read when a cheap stat
+    signature of the directory changes, so a long-running process reads each
+    template once.
+    """
+
+    def __init__(self) -> None:
+        """Create a loader with an empty cache."""
+        self._cache: dict[Path, tuple[_Signature, TemplateBundle]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, source_github_path: Path) -> TemplateBundle:
+        """
+        Load the templates below ``source_github_path``.
+
+        Args:
+            source_github_path: Path to the source .github/ directory.
+
+        Returns:
+            The bundle of all regular files, with modes and SHA-256 digests.
+
+        Raises:
+            OSError: If the directory or one of its files cannot be read.
+        """
+        source = source_github_path.resolve()
+        files = sorted(item for item in source.rglob("*") if item.is_file())
+        stats = {item: item.stat() for item in files}
+        signature: _Signature = tuple(
+            (
+                item.relative_to(source).as_posix(),
+                stats[item].st_mtime_ns,
+                stats[item].st_size,
+                stats[item].st_mode,
+            )
+            for item in files
+        )
+
+        with self._lock:
+            cached = self._cache.get(source)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        bundle = TemplateBundle(
+            source=str(source),
+            files=tuple(_read(item, source, stats[item].st_mode) for item in files),
+        )
+        with self._lock:
+            self._cache[source] = (signature, bundle)
+        return bundle
+
+
+def _read(item: Path, source: Path, mode: int) -> TemplateFile:
+    """Read one template file."""
+    content = item.read_bytes()
+    return TemplateFile(
+        path=item.relative_to(source),
+        mode=stat.S_IMODE(mode),
+        digest=hashlib.sha256(content).hexdigest(),
+        content=content,
+    )
@@ -1,47 +1,87 @@
 """Filesystem-based template copier."""
 
-import shutil
+import os
 from pathlib import Path
 
-from default_cicd_public.domain.models import CopyResult, CopyStatus, DiscoveredProject
+from default_cicd_public.adapters.filesystem.backup import BackupStore
+from default_cicd_public.adapters.filesystem.locking import ProjectLockedError, ProjectLocks
+from default_cicd_public.adapters.filesystem.throttle import IOThrottle
+from default_cicd_public.domain.models import (
+    CopyResult,
+    CopyStatus,
+    DiscoveredProject,
+    TemplateBundle,
+)
 
 
 class FilesystemCopier:
     """Copies template files to target projects."""
 
+    def __init__(
+        self,
+        throttle: IOThrottle | None = None,
+        backups: BackupStore | None = None,
+        locks: ProjectLocks | None = None,
+    ) -> None:
+        """
+        Configure the copier.
+
+        Args:
+            throttle: Shared I/O budget for operations on the target side;
+                each mkdir takes a metadata token and each file a write token
+                plus its size in bytes. None means unthrottled.
+            backups: Store receiving every file before it is changed while
+                one of its runs is active. None means no backups.
+            locks: Project locks held around each copy so that concurrent
+                distributors never write the same project at once. None
+                means no locking.
+        """
+        self.throttle = throttle or IOThrottle()
+        self.backups = backups
+        self.locks = locks
+
     def __call__(
         self,
-        source_github_path: Path,
+        bundle: TemplateBundle,
         target_project: DiscoveredProject,
         *,
         dry_run: bool = False,
     ) -> CopyResult:
         """
-        Copy all files from source .github/ to target project's .github/.
+        Write all files of the bundle to the target project's .github/.
 
         Args:
-            source_github_path: Path to the source .github/ directory.
+            bundle: The templates loaded from the source .github/ directory.
             target_project: The target project to copy templates to.
             dry_run: If True, simulate the copy without making changes.
 
         Returns:
             CopyResult with the status and details of the operation.
         """
-        files_to_copy = self._collect_files(source_github_path)
-
         if dry_run:
             return CopyResult(
                 project=target_project,
                 status=CopyStatus.DRY_RUN,
-                files_copied=files_to_copy,
+                files_copied=bundle.paths,
             )
 
         try:
-            copied_files = self._copy_files(source_github_path, target_project.github_path)
+            if self.locks is None:
+                copied_files, changed_files = self._write_files(bundle, target_project)
+            else:
+                with self.locks.hold(target_project.root_path):
+                    copied_files, changed_files = self._write_files(bundle, target_project)
             return CopyResult(
                 project=target_project,
                 status=CopyStatus.SUCCESS,
                 files_copied=copied_files,
+                files_changed=changed_files,
+            )
+        except ProjectLockedError as e:
+            return CopyResult(
+                project=target_project,
+                status=CopyStatus.LOCKED,
+                error_message=str(e),
             )
         except PermissionError as e:
             return CopyResult(
@@ -56,30 +96,61 @@ class FilesystemCopier:
                 error_message=str(e),
             )
 
-    def _collect_files(self, source_path: Path) -> list[Path]:
-        """Collect all files to be copied (relative paths)."""
-        files: list[Path] = []
-        for item in source_path.rglob("*"):
-            if item.is_file():
-                files.append(item.relative_to(source_path))
-        return sorted(files)
+    def _write_files(
+        self, bundle: TemplateBundle, target_project: DiscoveredProject
+    ) -> tuple[list[Path], list[Path]]:
+        """
+        Write all bundle files below the project's .github/, preserving structure and modes.
+
+        Files that already have the template's content and mode are neither
+        backed up nor rewritten.
 
-    def _copy_files(self, source_path: Path, target_path: Path) -> list[Path]:
-        """Copy all files from source to target, preserving structure."""
+        Returns:
+            The bundle's paths and the subset whose content or mode changed,
+            both sorted and relative to the project's .github/.
+        """
+        target_path = target_project.github_path
         copied: list[Path] = []
+        changed: list[Path] = []
+        created: set[Path] = set()
+
+        for template in bundle.files:
+            target_file = target_path / template.path
 
-        for item in source_path.rglob("*"):
-            if not item.is_file():
+            # Create parent directories if needed (once per directory)
+            if target_file.parent not in created:
+                self.throttle.metadata()
+                target_file.parent.mkdir(parents=True, exist_ok=True)
+                created.add(target_file.parent)
+
+            copied.append(template.path)
+            previous = self._read_previous(target_file)
+            if previous == (template.content, template.mode):
                 continue
+            changed.append(template.path)
+
+            # Keep the previous version; a failed backup aborts the copy
+            if self.backups is not None:
+                self.backups.save_previous(target_file, previous, target_project.root_path)
 
-            relative = item.relative_to(source_path)
-            target_file = target_path / relative
+            # Write the file
+            self.throttle.write(len(template.content))
+            target_file.write_bytes(template.content)
+            os.chmod(target_file, template.mode)
 
-            # Create parent directories if needed
-            target_file.parent.mkdir(parents=True, exist_ok=True)
+        return sorted(copied), sorted(changed)
 
-            # Copy the file
-            shutil.copy2(item, target_file)
-            copied.append(relative)
+    def _read_previous(self, target_file: Path) -> tuple[bytes, int] | None:
+        """
+        Return the content and mode of ``target_file``, or None if it does not exist.
 
-        return sorted(copied)
+        Raises:
+            OSError: If the file exists but cannot be read; it is then neither
+                backed up nor overwritten.
+        """
+        self.throttle.metadata()
+        try:
+            mode = target_file.stat().st_mode & 0o7777
+            return target_file.read_bytes(), mode
+        except FileNotFoundError:
+            return None
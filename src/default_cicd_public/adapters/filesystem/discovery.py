@@ -1,9 +1,55 @@
-"""Filesystem-based project discovery."""
+"""Filesystem-based project discovery.
 
-from collections.abc import Iterator
+Memory use
+----------
+Directories are listed with ``os.scandir`` in chunks of at most
+``chunk_size`` entries. Non-directories are dropped at the ``DirEntry`` level,
+so files never become ``Path`` objects or cost a stat, and a chunk only keeps
+the subdirectories that still need visiting. A directory wider than one chunk
+keeps its listing open and is resumed after the subtrees of the chunk's
+subdirectories have been walked.
+
+The frontier - directories found but not yet scanned, and the continuations
+of partly listed ones - is capped by ``max_pending`` across all devices. Each
+scan gets an allowance from the scheduler and stops reading once its
+subdirectories and its own continuation would exceed it; when the frontier
+is full, scans wait for running ones to finish. Only while nothing at all is
+running does one scan start beyond the cap, with room for one subdirectory.
+So at most ``max_pending`` plus one directory per level of depth (plus the
+search roots, if there are more of them) are pending at any time, whatever
+the width of the tree, the chunk size or the number of workers. A listing is
+only kept open by a pending continuation or a running scan, so open listings
+obey the same bound. With the default of 4096 the frontier stays around a
+MiB. A walk that fills it runs fewer scans at once and splits wide listings
+into smaller chunks, so the cap trades speed on huge trees for memory.
+
+The walk reaches the tree only through a :class:`WalkFilesystem` - listing,
+stat and resolving roots - so the same code runs on the local disk
+(:class:`LocalFilesystem`) and on the in-memory trees used for benchmarks.
+"""
+
+import fnmatch
+import os
+import stat
+import threading
+import time
+from collections.abc import Collection, Iterable, Iterator, Sequence
+from dataclasses import dataclass, field, replace
 from pathlib import Path
+from typing import Protocol
 
-from default_cicd_public.domain.models import DiscoveredProject
+from default_cicd_public.adapters.filesystem.throttle import IOThrottle
+from default_cicd_public.application.concurrency import AdaptiveScheduler
+from default_cicd_public.application.scan_report import ScanCostTracker
+from default_cicd_public.domain.models import (
+    DEFAULT_CONCURRENCY,
+    MARKER_FILE,
+    ConcurrencyBounds,
+    ConcurrencyReport,
+    DiscoveredProject,
+    ScanReport,
+    WalkedDirectories,
+)
 
 # Directories to skip during traversal
 SKIP_DIRS = frozenset(
@@ -32,65 +78,461 @@ SKIP_DIRS = frozenset(
     }
 )
 
-MARKER_FILE = Path(".github") / "workflows" / "default_cicd_public.yml"
+# Suffixes of the wildcard entries in SKIP_DIRS (e.g. "*.egg-info")
+SKIP_SUFFIXES = tuple(skip.lstrip("*") for skip in SKIP_DIRS if "*" in skip)
+
+# Entries read from a listing per scan; bounds the memory of wide directories
+DEFAULT_CHUNK_SIZE = 1024
+# Directories the walk may hold pending at once, across all devices
+DEFAULT_MAX_PENDING = 4096
+
+
+class _Stat(Protocol):
+    """The fields of a stat result the walk reads, as in ``os.stat_result``."""
+
+    @property
+    def st_mode(self) -> int: ...
+
+    @property
+    def st_dev(self) -> int: ...
+
+    @property
+    def st_ino(self) -> int: ...
+
+
+class _Entry(Protocol):
+    """One entry of a listing, as in ``os.DirEntry``."""
+
+    @property
+    def name(self) -> str: ...
+
+    @property
+    def path(self) -> str: ...
+
+    def is_dir(self) -> bool: ...
+
+    def stat(self) -> _Stat: ...
+
+
+class _Listing(Protocol):
+    """An open directory listing, as returned by ``os.scandir``."""
+
+    def __iter__(self) -> Iterator[_Entry]: ...
+
+    def __next__(self) -> _Entry: ...
+
+    def close(self) -> None: ...
+
+
+class WalkFilesystem(Protocol):
+    """The operations discovery performs on a tree."""
+
+    def scandir(self, path: Path) -> _Listing:
+        """Open a listing of ``path`` whose entries know their type."""
+        ...
+
+    def stat(self, path: Path) -> _Stat:
+        """Return the mode, device and inode of ``path``, following symlinks."""
+        ...
+
+    def resolve(self, path: Path) -> Path:
+        """Return the absolute, normalised form of a search root."""
+        ...
+
+
+class LocalFilesystem:
+    """The local filesystem, through ``os.scandir`` and ``os.stat``."""
+
+    def scandir(self, path: Path) -> _Listing:
+        """Open a listing of ``path``."""
+        return os.scandir(path)
+
+    def stat(self, path: Path) -> _Stat:
+        """Return the stat result of ``path``."""
+        return path.stat()
+
+    def resolve(self, path: Path) -> Path:
+        """Resolve symlinks and make ``path`` absolute."""
+        return path.resolve()
+
+
+@dataclass(frozen=True)
+class _Directory:
+    """A directory waiting to be scanned, the device it lives on and its inode."""
+
+    path: Path
+    device: int
+    inode: int
+    # Set when the directory was partly listed and its scan continues here
+    listing: _Listing | None = field(default=None, compare=False)
+    # Most follow-ups - subdirectories and a continuation - the scan may return
+    allowance: int | None = field(default=None, compare=False)
+
+
+@dataclass(frozen=True)
+class _Scan:
+    """Outcome of scanning one chunk of a directory."""
+
+    directory: _Directory
+    project: DiscoveredProject | None
+    subdirectories: list[_Directory]
+    # The rest of the listing, if the chunk did not exhaust it
+    continuation: _Directory | None = None
+    entries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def resumed(self) -> bool:
+        """Return True if this chunk continues an earlier scan of the directory."""
+        return self.directory.listing is not None
+
+    def follow_ups(self) -> list[_Directory]:
+        """Return the items to scan next, the continuation first."""
+        # The scheduler runs the newest items first, so the rest of a wide
+        # directory waits until the subtrees of this chunk are walked.
+        if self.continuation is None:
+            return self.subdirectories
+        return [self.continuation, *self.subdirectories]
+
+
+class _OpenListings:
+    """Listings of wide directories waiting to be resumed.
+
+    Closes them if the walk is abandoned. A listing is checked out while a
+    worker reads it, so it is never closed under a reader.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._waiting: set[_Listing] = set()
+        self._closed = False
+
+    def check_out(self, listing: _Listing) -> bool:
+        """Take ``listing`` for reading; False if the walk was abandoned."""
+        with self._lock:
+            self._waiting.discard(listing)
+            return not self._closed
+
+    def check_in(self, listing: _Listing) -> bool:
+        """Keep ``listing`` for a later chunk; closes it if the walk was abandoned."""
+        with self._lock:
+            if not self._closed:
+                self._waiting.add(listing)
+                return True
+        listing.close()
+        return False
+
+    def close(self) -> None:
+        """Close every waiting listing and refuse new ones."""
+        with self._lock:
+            self._closed = True
+            waiting, self._waiting = self._waiting, set()
+        for listing in waiting:
+            listing.close()
 
 
 class FilesystemDiscovery:
     """Discovers projects containing the marker workflow file."""
 
-    def __call__(self, search_root: Path) -> Iterator[DiscoveredProject]:
+    def __init__(
+        self,
+        throttle: IOThrottle | None = None,
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        filesystem: WalkFilesystem | None = None,
+    ) -> None:
         """
-        Recursively search for projects containing the marker file.
+        Configure discovery.
 
         Args:
-            search_root: The root directory to start searching from.
+            throttle: Shared I/O budget; every chunk of a listing and every
+                stat takes one metadata token. None means unthrottled.
+            chunk_size: Entries read from a directory listing per scan.
+            max_pending: Directories the walk may hold pending at once; see
+                the module documentation for the exact bound.
+            filesystem: The tree to walk. None means the local filesystem.
+        """
+        self.throttle = throttle or IOThrottle()
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending
+        self.filesystem = filesystem or LocalFilesystem()
+
+    def __call__(
+        self,
+        search_roots: Sequence[Path],
+        markers: Sequence[Path] = (MARKER_FILE,),
+        *,
+        concurrency: ConcurrencyBounds = DEFAULT_CONCURRENCY,
+        report: ConcurrencyReport | None = None,
+        exclude: Sequence[str] = (),
+        scan_report: ScanReport | None = None,
+        walked: WalkedDirectories | None = None,
+    ) -> Iterator[DiscoveredProject]:
+        """
+        Recursively search for projects containing any of the marker files.
+
+        All markers are checked in the same walk, so N template families cost a
+        single scan of the tree. Directories are listed concurrently, with the
+        number of listings in flight tuned per device by an adaptive scheduler.
+
+        The roots are resolved and scanned by the same scheduler, so roots on
+        different shares are walked at the same time. Roots that are the same
+        directory (by device and inode) or lie inside another root are
+        dropped. A project reached twice anyway, e.g. through a symlink or a
+        bind mount, is reported once.
+
+        Args:
+            search_roots: The root directories to search.
+            markers: Marker paths relative to a project root, in priority order.
+            concurrency: Bounds for the listings in flight per device.
+            report: If given, receives the concurrency chosen per device.
+            exclude: Patterns of directories not to descend into (see
+                :func:`is_excluded`), in addition to the built-in skip list.
+            scan_report: If given, receives the cost of the walk per subtree.
+            walked: If given, receives every directory that was listed, up to
+                its limit.
 
         Yields:
-            DiscoveredProject instances for each matching project.
+            DiscoveredProject instances for each matching project, in no
+            particular order.
         """
-        yield from self._walk(search_root)
+        marker_tuple = tuple(markers)
+        patterns = tuple(exclude)
+        roots = self._roots(search_roots)
+        if not roots:
+            return
+        root_paths = {root.path for root in roots}
+        tracker = ScanCostTracker(scan_report) if scan_report is not None else None
+        listings = _OpenListings()
 
-    def _walk(self, directory: Path) -> Iterator[DiscoveredProject]:
-        """Recursively walk the directory tree."""
+        # Only project directories are remembered, so the walk itself stays
+        # free of per-directory state.
+        seen: set[tuple[int, int]] = set()
+        scheduler = AdaptiveScheduler[_Directory, _Scan](concurrency)
         try:
-            entries = list(directory.iterdir())
-        except PermissionError:
-            return
+            for scan in scheduler.run(
+                roots,
+                lambda directory: self._scan(directory, marker_tuple, patterns, listings),
+                lane_of=lambda directory: directory.device,
+                label_of=lambda directory: str(directory.path),
+                expand=_Scan.follow_ups,
+                max_pending=self.max_pending,
+                allow=lambda directory, allowance: replace(directory, allowance=allowance),
+            ):
+                if walked is not None and not scan.resumed:
+                    walked.add(scan.directory.path)
+                if tracker is not None and scan.resumed:
+                    tracker.resume(
+                        scan.directory.path,
+                        entries=scan.entries,
+                        seconds=scan.seconds,
+                        subdirectories=len(scan.subdirectories),
+                        more=scan.continuation is not None,
+                    )
+                elif tracker is not None:
+                    tracker.visit(
+                        scan.directory.path,
+                        is_root=scan.directory.path in root_paths,
+                        entries=scan.entries,
+                        seconds=scan.seconds,
+                        project=scan.project is not None,
+                        subdirectories=len(scan.subdirectories),
+                        more=scan.continuation is not None,
+                    )
+                if scan.project is None:
+                    continue
+                identity = (scan.directory.device, scan.directory.inode)
+                if identity not in seen:
+                    seen.add(identity)
+                    yield scan.project
+        finally:
+            listings.close()
+            if report is not None:
+                report.lanes.extend(scheduler.report())
+                report.peak_pending = max(report.peak_pending, scheduler.peak_pending)
+            if tracker is not None:
+                tracker.close()
+
+    def _roots(self, search_roots: Sequence[Path]) -> list[_Directory]:
+        """Resolve the roots and drop unreadable, duplicate and nested ones."""
+        directories: dict[Path, _Directory] = {}
+        identities: set[tuple[int, int]] = set()
+        for search_root in search_roots:
+            self.throttle.metadata()
+            try:
+                path = self.filesystem.resolve(search_root)
+                root_stat = self.filesystem.stat(path)
+            except OSError:
+                continue
+            identity = (root_stat.st_dev, root_stat.st_ino)
+            if identity in identities:
+                continue
+            identities.add(identity)
+            directories[path] = _Directory(path, root_stat.st_dev, root_stat.st_ino)
+        return [directories[path] for path in collapse_roots(directories)]
+
+    def _scan(
+        self,
+        directory: _Directory,
+        markers: tuple[Path, ...],
+        exclude: tuple[str, ...],
+        listings: _OpenListings,
+    ) -> _Scan:
+        """List one chunk of a directory: report a project and the subdirectories to visit."""
+        started = time.perf_counter()
+        self.throttle.metadata()
+        listing = directory.listing
+        try:
+            if listing is None:
+                listing = self.filesystem.scandir(directory.path)
+            elif not listings.check_out(listing):
+                return _Scan(directory=directory, project=None, subdirectories=[])
         except OSError:
-            return
+            # Permission denied, stale file handle, vanished directory, ...
+            return _Scan(
+                directory=directory,
+                project=None,
+                subdirectories=[],
+                seconds=time.perf_counter() - started,
+            )
 
-        # Check if this directory contains the marker file
-        marker_path = directory / MARKER_FILE
+        tops = {marker.parts[0] for marker in markers}
+        seen_tops: set[str] = set()
+        candidates: list[_Entry] = []
+        # Leave room in the allowance for the continuation.
+        room = self.chunk_size if directory.allowance is None else directory.allowance - 1
+        entries = 0
+        exhausted = True
         try:
-            has_marker = marker_path.exists() and marker_path.is_file()
+            for entry in listing:
+                entries += 1
+                name = entry.name
+                if name in tops:
+                    seen_tops.add(name)
+                # The entry type comes with the listing on most filesystems,
+                # so files are dropped without a stat or a Path.
+                if not is_skipped(name) and entry.is_dir():
+                    candidates.append(entry)
+                if entries >= self.chunk_size or len(candidates) >= room:
+                    exhausted = False
+                    break
         except OSError:
-            has_marker = False
+            # The directory vanished or went stale while being listed.
+            exhausted = True
 
-        if has_marker:
-            github_path = directory / ".github"
-            yield DiscoveredProject(root_path=directory, github_path=github_path)
+        # Check if this directory contains one of the marker files. A directory
+        # wider than one chunk checks the markers directly, so the project is
+        # known with its first chunk.
+        project = None
+        if directory.listing is None:
+            marker = self._find_marker(directory.path, seen_tops if exhausted else None, markers)
+            if marker is not None:
+                project = DiscoveredProject(
+                    root_path=directory.path,
+                    github_path=directory.path / ".github",
+                    marker=marker,
+                    device=directory.device,
+                )
 
-        # Recurse into subdirectories
-        for entry in entries:
+        subdirectories: list[_Directory] = []
+        for entry in candidates:
+            path = Path(entry.path)
+            if exclude and is_excluded(path, exclude):
+                continue
+            self.throttle.metadata()
             try:
-                is_directory = entry.is_dir()
+                entry_stat = entry.stat()
             except OSError:
                 # Stale file handle or other filesystem errors
                 continue
+            if stat.S_ISDIR(entry_stat.st_mode):
+                subdirectories.append(_Directory(path, entry_stat.st_dev, entry_stat.st_ino))
 
-            if not is_directory:
-                continue
+        continuation = None
+        if exhausted:
+            listing.close()
+        elif listings.check_in(listing):
+            continuation = _Directory(
+                directory.path, directory.device, directory.inode, listing=listing
+            )
 
-            # Skip common non-project directories
-            if entry.name in SKIP_DIRS:
-                continue
+        return _Scan(
+            directory=directory,
+            project=project,
+            subdirectories=subdirectories,
+            continuation=continuation,
+            entries=entries,
+            seconds=time.perf_counter() - started,
+        )
 
-            # Skip hidden directories (except .github which we already checked)
-            if entry.name.startswith(".") and entry.name != ".github":
-                continue
+    def _find_marker(
+        self, directory: Path, names: Collection[str] | None, markers: tuple[Path, ...]
+    ) -> Path | None:
+        """Return the first marker present in ``directory``, or None.
 
-            # Skip if matches a pattern (e.g., *.egg-info)
-            if any(entry.name.endswith(skip.lstrip("*")) for skip in SKIP_DIRS if "*" in skip):
+        ``names`` are the listed top-level entries among the markers' first
+        parts, or None if the listing is not complete.
+        """
+        for marker in markers:
+            # The listing already tells us whether the marker's top-level entry
+            # exists, so most directories cost no extra stat at all.
+            if names is not None and marker.parts[0] not in names:
                 continue
+            self.throttle.metadata()
+            try:
+                if stat.S_ISREG(self.filesystem.stat(directory / marker).st_mode):
+                    return marker
+            except OSError:
+                continue
+        return None
+
+
+def collapse_roots(roots: Iterable[Path]) -> list[Path]:
+    """
+    Drop duplicate roots and roots inside another root.
+
+    The paths are compared as given, so callers normalise them first.
+
+    Args:
+        roots: Absolute, normalised search roots.
+
+    Returns:
+        The remaining roots, sorted.
+    """
+    kept: list[Path] = []
+    # Sorting puts every root after the roots that contain it.
+    for root in sorted(set(roots)):
+        if not any(root.is_relative_to(parent) for parent in kept):
+            kept.append(root)
+    return kept
+
+
+def is_excluded(path: Path, patterns: Sequence[str]) -> bool:
+    """
+    Return True if the directory ``path`` matches one of the exclude patterns.
+
+    Patterns are shell-style (``fnmatch``). A pattern containing a slash is
+    matched against the whole path in POSIX form, e.g. ``/srv/share/dumps``
+    or ``/home/*/Downloads``; any other pattern against the directory name,
+    e.g. ``datasets`` or ``*.photoslibrary``.
+    """
+    for pattern in patterns:
+        subject = path.as_posix() if "/" in pattern else path.name
+        if fnmatch.fnmatch(subject, pattern):
+            return True
+    return False
+
+
+def is_skipped(name: str) -> bool:
+    """Return True for directory names the walk never descends into."""
+    # Skip common non-project directories
+    if name in SKIP_DIRS:
+        return True
+
+    # Skip hidden directories (except .github which we already checked)
+    if name.startswith(".") and name != ".github":
+        return True
 
-            yield from self._walk(entry)
+    # Skip if matches a pattern (e.g., *.egg-info)
+    return name.endswith(SKIP_SUFFIXES)
@@ -0,0 +1,115 @@
+"""Read-only comparison of target projects with their template bundle."""
+
+import hashlib
+import os
+import stat
+import sys
+from pathlib import Path
+
+from default_cicd_public.adapters.filesystem.throttle import IOThrottle
+from default_cicd_public.domain.models import (
+    DiscoveredProject,
+    DriftState,
+    ProjectDrift,
+    TemplateBundle,
+    TemplateFile,
+)
+
+# Windows only reports a read-only flag, so modes are not compared there.
+COMPARE_MODES = sys.platform != "win32"
+
+
+class FilesystemDriftChecker:
+    """Compares a target's .github/ with a bundle using as little I/O as possible.
+
+    The target tree is listed once with ``os.scandir``. Only files whose size
+    and mode match the bundle are read and hashed; a size or mode mismatch
+    already proves a modification, and a missing file costs nothing beyond
+    the listing.
+    """
+
+    def __init__(self, throttle: IOThrottle | None = None) -> None:
+        """
+        Configure the checker.
+
+        Args:
+            throttle: Shared I/O budget; every listing, stat and read takes one
+                metadata token. None means unthrottled.
+        """
+        self.throttle = throttle or IOThrottle()
+
+    def __call__(self, bundle: TemplateBundle, target_project: DiscoveredProject) -> ProjectDrift:
+        """
+        Compare the target's .github/ with the bundle.
+
+        Args:
+            bundle: The templates the project should carry.
+            target_project: The project to compare.
+
+        Returns:
+            The project's drift state and the differing paths; UNREACHABLE
+            with an error message if the target could not be read.
+        """
+        github = target_project.github_path
+        try:
+            present = self._list_files(github)
+            modified = sorted(
+                file.path
+                for file in bundle.files
+                if file.path in present
+                and self._differs(github / file.path, present[file.path], file)
+            )
+        except OSError as e:
+            return ProjectDrift(
+                project=target_project, state=DriftState.UNREACHABLE, error_message=str(e)
+            )
+
+        expected = {file.path for file in bundle.files}
+        missing = sorted(expected - present.keys())
+        extra = sorted(present.keys() - expected)
+        # distribute never removes files, so extra ones alone are not drift.
+        drifted = bool(modified or missing)
+        return ProjectDrift(
+            project=target_project,
+            state=DriftState.DRIFTED if drifted else DriftState.CURRENT,
+            modified=modified,
+            missing=missing,
+            extra=extra,
+        )
+
+    def _list_files(self, github: Path) -> dict[Path, os.stat_result]:
+        """Return the stat of every file below ``github`` by relative path."""
+        files: dict[Path, os.stat_result] = {}
+        pending = [Path()]
+        while pending:
+            relative = pending.pop()
+            self.throttle.metadata()
+            try:
+                with os.scandir(github / relative) as entries:
+                    for entry in entries:
+                        # The entry type comes with the listing on most
+                        # filesystems; only files need a stat for their size.
+                        if entry.is_dir():
+                            pending.append(relative / entry.name)
+                            continue
+                        self.throttle.metadata()
+                        entry_stat = entry.stat()
+                        if stat.S_ISREG(entry_stat.st_mode):
+                            files[relative / entry.name] = entry_stat
+            except FileNotFoundError:
+                # A missing .github/ means every template is missing.
+                if relative != Path():
+                    raise
+        return files
+
+    def _differs(self, path: Path, present: os.stat_result, file: TemplateFile) -> bool:
+        """Return True unless ``path`` has the template's size, mode and digest."""
+        if present.st_size != len(file.content):
+            return True
+        if COMPARE_MODES and present.st_mode & 0o7777 != file.mode:
+            return True
+        self.throttle.metadata()
+        return hashlib.sha256(path.read_bytes()).hexdigest() != file.digest
+
+
+__all__ = ["FilesystemDriftChecker"]
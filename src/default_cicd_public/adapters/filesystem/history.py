@@ -0,0 +1,161 @@
+"""A small local history of how long copying to each project took.
+
+The history lives in one SQLite database below the state directory::
+
+    copy-history.sqlite3
+
+``copy_durations`` holds one row per project root with an exponentially
+weighted average of its copy times, so a single slow run shifts the estimate
+without replacing it; rows not refreshed within the retention period are
+pruned. ``runs`` holds the average parallelism of the last recorded run.
+
+The history is advisory: a missing, locked or corrupt database reads as empty
+and failed writes are dropped, so it can never fail a distribution.
+"""
+
+import contextlib
+import sqlite3
+import time
+from collections.abc import Callable, Generator, Mapping, Sequence
+from pathlib import Path
+
+from default_cicd_public.adapters.filesystem.backup import default_state_dir
+from default_cicd_public.domain.models import CopyHistory
+
+# Weight of the newest duration in the running average.
+DEFAULT_SMOOTHING = 0.5
+# Projects not copied to for this long are forgotten.
+DEFAULT_RETENTION = 90 * 24 * 3600.0
+# Seconds to wait for a concurrent run holding the database.
+LOCK_TIMEOUT = 2.0
+# SQLite limits the number of parameters of one statement.
+_LOOKUP_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS copy_durations (
+    root TEXT PRIMARY KEY,
+    seconds REAL NOT NULL,
+    samples INTEGER NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    parallelism REAL NOT NULL,
+    finished REAL NOT NULL
+);
+"""
+
+
+def default_history_path() -> Path:
+    """Return the per-user copy history database."""
+    return default_state_dir() / "copy-history.sqlite3"
+
+
+class CopyHistoryStore:
+    """Remembers per-project copy durations across runs."""
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        *,
+        smoothing: float = DEFAULT_SMOOTHING,
+        retention: float = DEFAULT_RETENTION,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Configure the store.
+
+        Args:
+            path: The database file. Defaults to :func:`default_history_path`.
+            smoothing: Weight between 0 and 1 of a new duration against the
+                recorded average.
+            retention: Seconds after which a project's duration is dropped.
+            clock: Wall clock used for row ages, replaceable in tests.
+        """
+        if not 0 < smoothing <= 1:
+            msg = f"smoothing must be in (0, 1], got {smoothing}"
+            raise ValueError(msg)
+        self.path = path or default_history_path()
+        self.smoothing = smoothing
+        self.retention = retention
+        self._clock = clock
+
+    def load(self, roots: Sequence[Path]) -> CopyHistory:
+        """
+        Return the recorded durations of ``roots``.
+
+        Args:
+            roots: Project roots about to be copied to.
+
+        Returns:
+            The known durations and the last run's parallelism, or an empty
+            history if the database is missing or unreadable.
+        """
+        if not self.path.is_file():
+            return CopyHistory()
+        keys = list(dict.fromkeys(str(root) for root in roots))
+        durations: dict[Path, float] = {}
+        try:
+            with self._connect() as connection:
+                for start in range(0, len(keys), _LOOKUP_BATCH):
+                    batch = keys[start : start + _LOOKUP_BATCH]
+                    rows = connection.execute(
+                        "SELECT root, seconds FROM copy_durations"
+                        f" WHERE root IN ({', '.join('?' * len(batch))})",
+                        batch,
+                    )
+                    durations.update((Path(root), float(seconds)) for root, seconds in rows)
+                run = connection.execute("SELECT parallelism FROM runs WHERE id = 1").fetchone()
+        except (sqlite3.Error, OSError):
+            return CopyHistory()
+        return CopyHistory(
+            durations=durations, parallelism=float(run[0]) if run is not None else None
+        )
+
+    def record(self, durations: Mapping[Path, float], *, parallelism: float) -> None:
+        """
+        Fold one run's copy durations into the averages.
+
+        Args:
+            durations: Seconds each project's copy took, by project root.
+            parallelism: Average number of copies the run had in flight.
+        """
+        now = self._clock()
+        weight = self.smoothing
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self._connect() as connection:
+                connection.executemany(
+                    "INSERT INTO copy_durations (root, seconds, samples, updated)"
+                    " VALUES (?, ?, 1, ?)"
+                    " ON CONFLICT (root) DO UPDATE SET"
+                    " seconds = ? * excluded.seconds + (1 - ?) * seconds,"
+                    " samples = samples + 1, updated = excluded.updated",
+                    [
+                        (str(root), seconds, now, weight, weight)
+                        for root, seconds in durations.items()
+                    ],
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO runs (id, parallelism, finished) VALUES (1, ?, ?)",
+                    (parallelism, now),
+                )
+                connection.execute(
+                    "DELETE FROM copy_durations WHERE updated < ?", (now - self.retention,)
+                )
+        except (sqlite3.Error, OSError):
+            return
+
+    @contextlib.contextmanager
+    def _connect(self) -> Generator[sqlite3.Connection, None, None]:
+        """Open the database in one transaction, creating its tables if needed."""
+        connection = sqlite3.connect(self.path, timeout=LOCK_TIMEOUT)
+        try:
+            with connection:
+                connection.executescript(_SCHEMA)
+                yield connection
+        finally:
+            connection.close()
+
+
+__all__ = ["CopyHistoryStore", "default_history_path"]
@@ -0,0 +1,327 @@
+"""Advisory per-project locks shared by distributors on any host.
+
+A lock is a small JSON file in the project root naming its owner (host, PID
+and a random token) and the time its lease expires. It is created NFS-safely:
+the owner record is written to a uniquely named file first and then hard-linked
+to the lock name, which succeeds for exactly one creator. If the server's reply
+to the link is lost, the link count of the unique file tells whether the link
+was made.
+
+Locks are advisory. Tools that do not take them are not kept out. While a
+lock is held, a heartbeat thread renews its lease several times per lease
+period, so a copy or commit slower than the lease keeps its lock. A lock whose
+lease has expired is therefore assumed to belong to a crashed distributor and
+is broken by the next one that wants it. Leases compare wall-clock times, so
+the hosts sharing a tree need roughly synchronized clocks.
+"""
+
+import errno
+import json
+import os
+import secrets
+import socket
+import threading
+import time
+from collections.abc import Callable, Generator
+from contextlib import contextmanager, suppress
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import cast
+
+from default_cicd_public.adapters.filesystem.throttle import IOThrottle
+from default_cicd_public.domain.models import LockPolicy
+
+LOCK_FILE_NAME = ".default-cicd-public.lock"
+
+# Polling interval while waiting for a held lock, doubled up to the maximum
+INITIAL_POLL_SECONDS = 0.05
+MAX_POLL_SECONDS = 1.0
+
+# Times a held lock's lease is renewed per lease period
+RENEWALS_PER_LEASE = 3
+
+
+@dataclass(frozen=True)
+class LockOwner:
+    """The distributor holding a project lock."""
+
+    host: str
+    pid: int
+    token: str
+    expires: float
+
+    def describe(self) -> str:
+        """Return the owner for messages, e.g. ``build01:4242``."""
+        return f"{self.host}:{self.pid}"
+
+
+@dataclass(eq=False)
+class _HeldLock:
+    """A lock held through :meth:`ProjectLocks.hold` and the state of its renewal."""
+
+    lock_path: Path
+    owner: LockOwner
+    lease_seconds: float
+    # time.monotonic() at which the lease is renewed next
+    renew_at: float
+    released: bool = False
+    mutex: threading.Lock = field(default_factory=threading.Lock)
+
+
+class ProjectLockedError(Exception):
+    """Raised when a project stays locked by another distributor."""
+
+    def __init__(self, project_root: Path, owner: LockOwner | None) -> None:
+        """
+        Describe the contended project.
+
+        Args:
+            project_root: The locked project.
+            owner: The lock's owner, or None if the lock file was unreadable.
+        """
+        self.project_root = project_root
+        self.owner = owner
+        holder = owner.describe() if owner is not None else "an unknown owner"
+        super().__init__(f"Locked by {holder}")
+
+
+class ProjectLocks:
+    """Takes and releases the lock files of target projects."""
+
+    def __init__(
+        self,
+        policy: LockPolicy | None = None,
+        throttle: IOThrottle | None = None,
+        *,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        Configure locking.
+
+        Args:
+            policy: Initial policy. None uses the defaults of LockPolicy.
+            throttle: Shared I/O budget; each lock attempt and release takes
+                one metadata token. None means unthrottled.
+            clock: Wall clock used for leases, replaceable in tests.
+            sleep: Sleep function used while waiting, replaceable in tests.
+        """
+        self.policy = policy or LockPolicy()
+        self.throttle = throttle or IOThrottle()
+        self.host = socket.gethostname()
+        self.pid = os.getpid()
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        # Locks held through this instance, renewed by the heartbeat thread
+        self._held: set[_HeldLock] = set()
+        self._heartbeat_wakeup = threading.Condition(self._lock)
+        self._heartbeat: threading.Thread | None = None
+
+    def configure(self, policy: LockPolicy) -> None:
+        """Apply a new policy to the following acquisitions."""
+        with self._lock:
+            self.policy = policy
+
+    @contextmanager
+    def hold(self, project_root: Path) -> Generator[None, None, None]:
+        """
+        Hold the lock of ``project_root`` for the duration of the block.
+
+        Args:
+            project_root: The project to lock.
+
+        Raises:
+            ProjectLockedError: If another owner held the lock for the whole
+                wait of the policy.
+            OSError: If the lock file cannot be written.
+        """
+        policy = self.policy
+        if not policy.enabled:
+            yield
+            return
+        lock_path = project_root / LOCK_FILE_NAME
+        owner = self._acquire(project_root, lock_path, policy)
+        held = self._start_renewing(lock_path, owner, policy.lease_seconds)
+        try:
+            yield
+        finally:
+            self._release(lock_path, self._stop_renewing(held))
+
+    def _acquire(self, project_root: Path, lock_path: Path, policy: LockPolicy) -> LockOwner:
+        """Take the lock, breaking expired ones and waiting as the policy allows."""
+        deadline = time.monotonic() + policy.wait_seconds
+        poll = INITIAL_POLL_SECONDS
+        while True:
+            owner = LockOwner(
+                host=self.host,
+                pid=self.pid,
+                token=secrets.token_hex(8),
+                expires=self._clock() + policy.lease_seconds,
+            )
+            if self._try_create(lock_path, owner):
+                return owner
+            holder = _read_owner(lock_path)
+            if self._expired(lock_path, holder, policy):
+                self._break(lock_path, holder)
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ProjectLockedError(project_root, holder)
+            self._sleep(min(poll, remaining))
+            poll = min(poll * 2, MAX_POLL_SECONDS)
+
+    def _expired(self, lock_path: Path, holder: LockOwner | None, policy: LockPolicy) -> bool:
+        """Return True if the lease of the current lock has run out."""
+        if holder is not None:
+            return holder.expires < self._clock()
+        # Unreadable lock files expire a lease after their last modification.
+        try:
+            return lock_path.stat().st_mtime + policy.lease_seconds < self._clock()
+        except FileNotFoundError:
+            return False
+
+    def _try_create(self, lock_path: Path, owner: LockOwner) -> bool:
+        """Create the lock file for ``owner``; return False if it exists."""
+        self.throttle.metadata()
+        unique = lock_path.with_name(f"{LOCK_FILE_NAME}.{owner.host}.{owner.pid}.{owner.token}")
+        unique.write_text(json.dumps(asdict(owner)), encoding="utf-8")
+        try:
+            try:
+                os.link(unique, lock_path)
+            except FileExistsError:
+                # The link may have been made although the reply got lost.
+                return os.stat(unique).st_nlink == 2
+            except OSError as e:
+                if e.errno not in (errno.EPERM, errno.ENOTSUP, errno.EOPNOTSUPP):
+                    raise
+                return _create_exclusive(lock_path, unique.read_bytes())
+            return True
+        finally:
+            unique.unlink(missing_ok=True)
+
+    def _break(self, lock_path: Path, expired: LockOwner | None) -> None:
+        """Remove an expired lock unless someone replaced it meanwhile."""
+        self.throttle.metadata()
+        # Renaming is atomic, so of several distributors breaking the lock only
+        # one moves it away; the others find it gone.
+        stolen = lock_path.with_name(f"{LOCK_FILE_NAME}.broken.{secrets.token_hex(8)}")
+        try:
+            os.rename(lock_path, stolen)
+        except FileNotFoundError:
+            return
+        try:
+            current = _read_owner(stolen)
+            if current is not None and (expired is None or current.token != expired.token):
+                # A fresh lock was taken between our read and the rename.
+                with suppress(OSError):
+                    os.link(stolen, lock_path)
+        finally:
+            stolen.unlink(missing_ok=True)
+
+    def _start_renewing(self, lock_path: Path, owner: LockOwner, lease_seconds: float) -> _HeldLock:
+        """Hand a newly taken lock to the heartbeat, starting it if needed."""
+        held = _HeldLock(
+            lock_path=lock_path,
+            owner=owner,
+            lease_seconds=lease_seconds,
+            renew_at=time.monotonic() + lease_seconds / RENEWALS_PER_LEASE,
+        )
+        with self._lock:
+            self._held.add(held)
+            self._heartbeat_wakeup.notify()
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(
+                    target=self._renew_loop, name="lock-heartbeat", daemon=True
+                )
+                self._heartbeat.start()
+        return held
+
+    def _stop_renewing(self, held: _HeldLock) -> LockOwner:
+        """Take a lock back from the heartbeat; return its latest owner record."""
+        with self._lock:
+            self._held.discard(held)
+        # Waits for a renewal in progress, which would otherwise recreate the
+        # lock file after its release.
+        with held.mutex:
+            held.released = True
+            return held.owner
+
+    def _renew_loop(self) -> None:
+        """Renew the leases of the held locks as they fall due, until none is left."""
+        while True:
+            with self._lock:
+                if not self._held:
+                    self._heartbeat = None
+                    return
+                now = time.monotonic()
+                due = [held for held in self._held if held.renew_at <= now]
+                if not due:
+                    next_due = min(held.renew_at for held in self._held)
+                    self._heartbeat_wakeup.wait(next_due - now)
+                    continue
+            for held in due:
+                with held.mutex:
+                    if held.released:
+                        continue
+                    held.owner = self._renew(held.lock_path, held.owner, held.lease_seconds)
+                    held.renew_at = time.monotonic() + held.lease_seconds / RENEWALS_PER_LEASE
+
+    def _renew(self, lock_path: Path, owner: LockOwner, lease_seconds: float) -> LockOwner:
+        """Extend the lease of a lock that is still ours; return the new record."""
+        self.throttle.metadata()
+        if _read_owner(lock_path) != owner:
+            # Broken by another distributor after a stall; nothing to renew
+            return owner
+        renewed = replace(owner, expires=self._clock() + lease_seconds)
+        unique = lock_path.with_name(f"{LOCK_FILE_NAME}.{owner.host}.{owner.pid}.{owner.token}")
+        try:
+            unique.write_text(json.dumps(asdict(renewed)), encoding="utf-8")
+            os.replace(unique, lock_path)
+        except OSError:
+            unique.unlink(missing_ok=True)
+            return owner
+        return renewed
+
+    def _release(self, lock_path: Path, owner: LockOwner) -> None:
+        """Remove the lock if it is still ours."""
+        self.throttle.metadata()
+        current = _read_owner(lock_path)
+        if current is not None and current.token == owner.token:
+            lock_path.unlink(missing_ok=True)
+
+
+def _create_exclusive(lock_path: Path, content: bytes) -> bool:
+    """Create the lock with O_EXCL on filesystems without hard links."""
+    try:
+        fd = os.open(lock_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, "wb") as stream:
+        stream.write(content)
+    return True
+
+
+def _read_owner(lock_path: Path) -> LockOwner | None:
+    """Return the owner recorded in a lock file, or None if it is unreadable."""
+    try:
+        record = cast("dict[str, object]", json.loads(lock_path.read_text(encoding="utf-8")))
+        host, pid, token, expires = (
+            record["host"],
+            record["pid"],
+            record["token"],
+            record["expires"],
+        )
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if not (
+        isinstance(host, str)
+        and isinstance(pid, int)
+        and isinstance(token, str)
+        and isinstance(expires, int | float)
+    ):
+        return None
+    return LockOwner(host=host, pid=pid, token=token, expires=float(expires))
+
+
+__all__ = ["LOCK_FILE_NAME", "LockOwner", "ProjectLockedError", "ProjectLocks"]
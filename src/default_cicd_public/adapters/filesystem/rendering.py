@@ -0,0 +1,360 @@
+"""Per-project rendering of template placeholders.
+
+A template opts into rendering by using ``{{ cicd.NAME }}`` placeholders; the
+``${{ ... }}`` expressions of GitHub Actions are left alone. Bundles without
+placeholders are copied byte for byte and cost no extra I/O.
+
+The values come from the target's ``pyproject.toml``:
+
+- ``package_name``, ``import_name``, ``version`` and ``requires_python`` from
+  ``[project]``;
+- ``python_versions``, the ``3.X`` versions listed in the trove classifiers;
+- ``ci_<key>`` for every key of ``[tool.ci]``, e.g. ``ci_os`` for the runner
+  labels;
+- ``directory_name``, the name of the project directory, which is always set.
+
+Lists, tables, numbers and booleans are rendered as JSON, which is also valid
+YAML flow syntax, so ``python-version: {{ cicd.python_versions }}`` yields a
+ready matrix.
+
+Every bundle is compiled once into literal and placeholder segments. Rendered
+bundles are cached by (bundle digest, context digest), where the context digest
+covers only the names the bundle uses, so thousands of projects that agree on
+those values cost a single render. Both caches are bounded and drop their
+least recently used entries, so a long-running daemon does not accumulate
+every bundle and context it has ever seen.
+"""
+
+import hashlib
+import json
+import re
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import cast
+
+from default_cicd_public.adapters.filesystem.throttle import IOThrottle
+from default_cicd_public.domain.models import (
+    DiscoveredProject,
+    RenderedTemplates,
+    TemplateBundle,
+    TemplateFile,
+)
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+PLACEHOLDER = re.compile(rb"(?<!\$)\{\{\s*cicd\.([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+CLASSIFIER_PYTHON = re.compile(r"^Programming Language :: Python :: (3\.\d+)$")
+
+# Context reads are one small file each and mostly wait on the fileserver.
+DEFAULT_MAX_WORKERS = 32
+# Rendered bundles kept between runs, and compiled bundles (one per family).
+DEFAULT_CACHE_SIZE = 1024
+COMPILED_CACHE_SIZE = 16
+
+# Literal bytes and placeholder names, alternating, starting with a literal
+_Segments = tuple[bytes | str, ...]
+
+
+class RenderError(ValueError):
+    """Raised when a project's context cannot fill a template."""
+
+
+@dataclass(frozen=True)
+class CompiledBundle:
+    """A bundle split into literal and placeholder segments."""
+
+    bundle: TemplateBundle
+    templates: dict[Path, _Segments]
+    names: frozenset[str]
+
+    @property
+    def needs_rendering(self) -> bool:
+        """Return True if any file has a placeholder."""
+        return bool(self.templates)
+
+
+def compile_bundle(bundle: TemplateBundle) -> CompiledBundle:
+    """
+    Split every file with placeholders into segments.
+
+    Args:
+        bundle: The bundle to compile.
+
+    Returns:
+        The compiled bundle; files without placeholders are not included.
+    """
+    templates: dict[Path, _Segments] = {}
+    names: set[str] = set()
+    for file in bundle.files:
+        parts = PLACEHOLDER.split(file.content)
+        if len(parts) == 1:
+            continue
+        # re.split alternates literal text and captured names.
+        segments: list[bytes | str] = []
+        for index, part in enumerate(parts):
+            if index % 2:
+                name = part.decode("ascii")
+                names.add(name)
+                segments.append(name)
+            else:
+                segments.append(part)
+        templates[file.path] = tuple(segments)
+    return CompiledBundle(bundle=bundle, templates=templates, names=frozenset(names))
+
+
+def render_bundle(compiled: CompiledBundle, context: dict[str, str]) -> TemplateBundle:
+    """
+    Fill the placeholders of a compiled bundle.
+
+    Args:
+        compiled: The compiled bundle.
+        context: Placeholder values.
+
+    Returns:
+        A bundle with rendered contents and digests; files without
+        placeholders are shared with the source bundle.
+
+    Raises:
+        RenderError: If the context lacks a value the bundle uses.
+    """
+    missing = sorted(compiled.names - context.keys())
+    if missing:
+        msg = f"no value for {', '.join('cicd.' + name for name in missing)}"
+        raise RenderError(msg)
+
+    files: list[TemplateFile] = []
+    for file in compiled.bundle.files:
+        segments = compiled.templates.get(file.path)
+        if segments is None:
+            files.append(file)
+            continue
+        content = b"".join(
+            segment if isinstance(segment, bytes) else context[segment].encode()
+            for segment in segments
+        )
+        files.append(
+            TemplateFile(
+                path=file.path,
+                mode=file.mode,
+                digest=hashlib.sha256(content).hexdigest(),
+                content=content,
+            )
+        )
+    return TemplateBundle(source=compiled.bundle.source, files=tuple(files))
+
+
+def read_project_context(root: Path) -> dict[str, str]:
+    """
+    Collect placeholder values from a project's ``pyproject.toml``.
+
+    Args:
+        root: The project root.
+
+    Returns:
+        The context; only ``directory_name`` if the project has no
+        ``pyproject.toml``.
+
+    Raises:
+        RenderError: If ``pyproject.toml`` is not valid TOML.
+    """
+    context = {"directory_name": root.name}
+    try:
+        data = tomllib.loads((root / "pyproject.toml").read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return context
+    except (tomllib.TOMLDecodeError, UnicodeDecodeError) as e:
+        msg = f"invalid pyproject.toml: {e}"
+        raise RenderError(msg) from e
+
+    project = _table(data.get("project"))
+    name = project.get("name")
+    if isinstance(name, str):
+        context["package_name"] = name
+        context["import_name"] = re.sub(r"[-.]+", "_", name).lower()
+    for key in ("version", "requires-python"):
+        value = project.get(key)
+        if isinstance(value, str):
+            context[key.replace("-", "_")] = value
+
+    classifiers = project.get("classifiers")
+    if isinstance(classifiers, list):
+        versions = [
+            match.group(1)
+            for classifier in cast("list[object]", classifiers)
+            if isinstance(classifier, str) and (match := CLASSIFIER_PYTHON.match(classifier))
+        ]
+        if versions:
+            context["python_versions"] = json.dumps(versions)
+
+    ci = _table(_table(data.get("tool")).get("ci"))
+    for key, value in ci.items():
+        context["ci_" + key.replace("-", "_")] = _render_value(value)
+    return context
+
+
+def context_digest(context: dict[str, str], names: frozenset[str]) -> str:
+    """Return a digest of the values of ``names`` in ``context``."""
+    hasher = hashlib.sha256()
+    for name in sorted(names):
+        # Distinguish a missing value from an empty one.
+        value = "=" + context[name] if name in context else "!"
+        hasher.update(f"{name}\0{value}\n".encode())
+    return hasher.hexdigest()
+
+
+def _table(value: object) -> dict[str, object]:
+    """Return a TOML table, or an empty one for anything else."""
+    return cast("dict[str, object]", value) if isinstance(value, dict) else {}
+
+
+def _render_value(value: object) -> str:
+    """Render a TOML value for a template: strings as-is, the rest as JSON."""
+    return value if isinstance(value, str) else json.dumps(value, default=str)
+
+
+class TemplateRenderer:
+    """Renders a bundle for many projects with compile and render caches.
+
+    The caches live as long as the renderer, so a long-running daemon keeps
+    recently used compiled bundles and rendered outputs between requests;
+    both are LRU caches of bounded size.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        throttle: IOThrottle | None = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ) -> None:
+        """
+        Configure the renderer.
+
+        Args:
+            max_workers: Maximum number of projects rendered concurrently.
+            throttle: Shared I/O budget; each context read takes one metadata
+                token. None means unthrottled.
+            cache_size: Maximum number of rendered bundles kept.
+        """
+        if cache_size < 1:
+            msg = f"cache_size must be positive, got {cache_size}"
+            raise ValueError(msg)
+        self.max_workers = max_workers
+        self.throttle = throttle or IOThrottle()
+        self.cache_size = cache_size
+        self._compiled: OrderedDict[str, CompiledBundle] = OrderedDict()
+        self._rendered: OrderedDict[tuple[str, str], TemplateBundle | RenderError] = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: dict[tuple[str, str], threading.Lock] = {}
+
+    def __call__(
+        self, bundle: TemplateBundle, projects: Sequence[DiscoveredProject]
+    ) -> RenderedTemplates:
+        """
+        Render ``bundle`` for every project that needs it.
+
+        Args:
+            bundle: The family's bundle.
+            projects: Projects receiving the bundle.
+
+        Returns:
+            The rendered bundles and errors per project root, and how many
+            distinct contexts and renders there were.
+        """
+        compiled = self._compile(bundle)
+        if not compiled.needs_rendering or not projects:
+            return RenderedTemplates()
+
+        outcome = RenderedTemplates()
+        contexts: set[str] = set()
+        workers = max(1, min(self.max_workers, len(projects)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="render") as pool:
+            futures = {
+                project.root_path: pool.submit(self._render_one, compiled, project.root_path)
+                for project in projects
+            }
+            for root, future in futures.items():
+                result = future.result()
+                if result.context_digest is not None:
+                    contexts.add(result.context_digest)
+                outcome.renders += result.rendered_now
+                if isinstance(result.output, RenderError):
+                    outcome.errors[root] = str(result.output)
+                else:
+                    outcome.bundles[root] = result.output
+        outcome.contexts = len(contexts)
+        return outcome
+
+    def _compile(self, bundle: TemplateBundle) -> CompiledBundle:
+        """Return the compiled form of ``bundle``, compiling it on first use."""
+        with self._lock:
+            compiled = self._compiled.get(bundle.digest)
+            if compiled is None:
+                compiled = compile_bundle(bundle)
+                self._compiled[bundle.digest] = compiled
+                if len(self._compiled) > COMPILED_CACHE_SIZE:
+                    self._compiled.popitem(last=False)
+            else:
+                self._compiled.move_to_end(bundle.digest)
+            return compiled
+
+    def _render_one(self, compiled: CompiledBundle, root: Path) -> "_ProjectRender":
+        """Read one project's context and return its (cached) rendering."""
+        try:
+            self.throttle.metadata()
+            context = read_project_context(root)
+        except RenderError as e:
+            return _ProjectRender(None, e)
+        except OSError as e:
+            return _ProjectRender(None, RenderError(f"cannot read pyproject.toml: {e}"))
+
+        digest = context_digest(context, compiled.names)
+        key = (compiled.bundle.digest, digest)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # One thread renders a key; the others wait and reuse its output.
+        with key_lock:
+            with self._lock:
+                cached = self._rendered.get(key)
+                if cached is not None:
+                    self._rendered.move_to_end(key)
+            if cached is not None:
+                return _ProjectRender(digest, cached)
+            try:
+                output: TemplateBundle | RenderError = render_bundle(compiled, context)
+            except RenderError as e:
+                output = e
+            with self._lock:
+                self._rendered[key] = output
+                while len(self._rendered) > self.cache_size:
+                    evicted, _ = self._rendered.popitem(last=False)
+                    # A waiter still holding the evicted lock at worst renders twice.
+                    self._key_locks.pop(evicted, None)
+        return _ProjectRender(digest, output, rendered_now=True)
+
+
+@dataclass(frozen=True)
+class _ProjectRender:
+    """Rendering of one project and whether it missed the cache."""
+
+    context_digest: str | None
+    output: TemplateBundle | RenderError
+    rendered_now: bool = False
+
+
+__all__ = [
+    "CompiledBundle",
+    "RenderError",
+    "TemplateRenderer",
+    "compile_bundle",
+    "context_digest",
+    "read_project_context",
+    "render_bundle",
+]
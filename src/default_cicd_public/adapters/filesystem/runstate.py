@@ -0,0 +1,169 @@
+"""Records of finished runs that let an identical later run exit early.
+
+Layout below the state directory::
+
+    last-runs/<KEY>.json   the last successful run with that key
+
+A record lists the files the run watched and one digest over their cheap
+validators: size, modification and change times, inode and mode as reported
+by ``stat``, or the error for files that could not be stat'ed. Checking a
+record costs one stat per watched file, issued concurrently, instead of a
+walk of the search root plus a read and compare per template file.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import cast
+
+from default_cicd_public.adapters.filesystem.backup import default_state_dir
+from default_cicd_public.adapters.filesystem.throttle import IOThrottle
+from default_cicd_public.domain.models import RunRecord
+
+# Validation is one stat per file and mostly waits on the fileserver.
+DEFAULT_MAX_WORKERS = 32
+
+
+def stat_validator(path: Path) -> str:
+    """Return the cheap validator of ``path``: its stat fields, or the error."""
+    try:
+        st = os.stat(path)
+    except OSError as e:
+        return f"!{e.errno}"
+    return f"{st.st_size}:{st.st_mtime_ns}:{st.st_ctime_ns}:{st.st_ino}:{st.st_mode:o}"
+
+
+def default_run_state_dir() -> Path:
+    """Return the per-user directory of run records."""
+    return default_state_dir() / "last-runs"
+
+
+class RunStateStore:
+    """Stores the last successful run per key and checks whether it still holds."""
+
+    def __init__(
+        self,
+        root: Path | None = None,
+        throttle: IOThrottle | None = None,
+        *,
+        validator: Callable[[Path], str] = stat_validator,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Configure the store.
+
+        Args:
+            root: Directory of the records. Defaults to
+                :func:`default_run_state_dir`.
+            throttle: Shared I/O budget; each validator takes one metadata
+                token. None means unthrottled.
+            validator: Returns a string that changes whenever a watched file
+                does, replaceable for in-memory trees.
+            max_workers: Maximum number of validators computed at once.
+            clock: Wall clock used for record ages, replaceable in tests.
+        """
+        self.root = root or default_run_state_dir()
+        self.throttle = throttle or IOThrottle()
+        self.validator = validator
+        self.max_workers = max_workers
+        self._clock = clock
+
+    def record(self, key: str, watched: Sequence[Path], *, projects: int) -> RunRecord:
+        """
+        Store the run ``key`` with the current validators of ``watched``.
+
+        Args:
+            key: Identifies what the run distributed where.
+            watched: Files and directories whose change invalidates the
+                record. Those inside the store, which a search root may
+                contain, are left out since recording changes them.
+            projects: Number of targets the run updated.
+
+        Returns:
+            The stored record.
+        """
+        own = {self.root, self.root.resolve()}
+        watched = [path for path in watched if not any(path.is_relative_to(root) for root in own)]
+        # Create the store before taking the validators of its parents.
+        self.root.mkdir(parents=True, exist_ok=True)
+        run = RunRecord(key=key, finished=self._clock(), projects=projects)
+        document = {
+            "key": run.key,
+            "finished": run.finished,
+            "projects": run.projects,
+            "watched": [str(path) for path in watched],
+            "digest": self._digest(watched),
+        }
+        # Replace the record atomically so a concurrent check never reads half of it.
+        fd, temporary = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as stream:
+                json.dump(document, stream)
+            os.replace(temporary, self._path(key))
+        except BaseException:
+            Path(temporary).unlink(missing_ok=True)
+            raise
+        return run
+
+    def find_unchanged(self, key: str, *, max_age: float) -> RunRecord | None:
+        """
+        Return the record of ``key`` if it is recent and its files are unchanged.
+
+        Args:
+            key: Identifies what the run distributes where.
+            max_age: Seconds after which a record no longer counts.
+
+        Returns:
+            The record, or None if there is none, it is older than
+            ``max_age`` or a watched file changed.
+        """
+        try:
+            document = cast(
+                "dict[str, object]",
+                json.loads(self._path(key).read_text(encoding="utf-8")),
+            )
+            finished, projects = document["finished"], document["projects"]
+            watched, digest = document["watched"], document["digest"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if not (
+            isinstance(finished, int | float)
+            and isinstance(projects, int)
+            and isinstance(watched, list)
+            and isinstance(digest, str)
+        ):
+            return None
+        if self._clock() - finished > max_age:
+            return None
+        paths = [Path(str(path)) for path in cast("list[object]", watched)]
+        if self._digest(paths) != digest:
+            return None
+        return RunRecord(key=key, finished=float(finished), projects=projects)
+
+    def _digest(self, paths: Iterable[Path]) -> str:
+        """Hash the validators of ``paths`` in order, computing them concurrently."""
+        paths = list(paths)
+        hasher = hashlib.sha256()
+        workers = max(1, min(self.max_workers, len(paths)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="run-state") as pool:
+            for path, validator in zip(paths, pool.map(self._validate, paths), strict=True):
+                hasher.update(f"{path}\0{validator}\n".encode())
+        return hasher.hexdigest()
+
+    def _validate(self, path: Path) -> str:
+        """Return the validator of one watched file."""
+        self.throttle.metadata()
+        return self.validator(path)
+
+    def _path(self, key: str) -> Path:
+        """Return the record file of ``key``."""
+        return self.root / f"{key}.json"
+
+
+__all__ = ["RunStateStore", "default_run_state_dir", "stat_validator"]
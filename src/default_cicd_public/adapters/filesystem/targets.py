@@ -0,0 +1,76 @@
+"""Marker validation for project roots that are already known."""
+
+import stat
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+from default_cicd_public.adapters.filesystem.throttle import IOThrottle
+from default_cicd_public.domain.models import MARKER_FILE, DiscoveredProject
+
+# Marker checks are a handful of stats each and mostly wait on the fileserver,
+# so a generous thread count hides network round-trips.
+DEFAULT_MAX_WORKERS = 32
+
+
+class FilesystemTargetValidator:
+    """Validates the marker file of known project roots concurrently."""
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        throttle: IOThrottle | None = None,
+    ) -> None:
+        """
+        Configure the validator.
+
+        Args:
+            max_workers: Maximum number of marker checks in flight.
+            throttle: Shared I/O budget; each marker stat takes one metadata
+                token. None means unthrottled.
+        """
+        self.max_workers = max_workers
+        self.throttle = throttle or IOThrottle()
+
+    def __call__(
+        self,
+        roots: Sequence[Path],
+        markers: Sequence[Path] = (MARKER_FILE,),
+    ) -> Iterator[DiscoveredProject]:
+        """
+        Check the marker files of already-known project roots.
+
+        Args:
+            roots: Project root directories, e.g. from an inventory system.
+            markers: Marker paths relative to a project root, in priority order.
+
+        Yields:
+            DiscoveredProject instances for the roots carrying a marker, in the
+            order of ``roots``. Roots without a marker are left out.
+        """
+        if not roots:
+            return
+        marker_tuple = tuple(markers)
+        workers = max(1, min(self.max_workers, len(roots)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="validate") as pool:
+            for project in pool.map(self._check, roots, repeat(marker_tuple)):
+                if project is not None:
+                    yield project
+
+    def _check(self, root: Path, markers: tuple[Path, ...]) -> DiscoveredProject | None:
+        """Return the project for ``root`` if it carries one of the markers."""
+        for marker in markers:
+            self.throttle.metadata()
+            try:
+                marker_stat = (root / marker).stat()
+            except OSError:
+                continue
+            if stat.S_ISREG(marker_stat.st_mode):
+                return DiscoveredProject(
+                    root_path=root,
+                    github_path=root / ".github",
+                    marker=marker,
+                    device=marker_stat.st_dev,
+                )
+        return None
@@ -0,0 +1,112 @@
+"""Token-bucket I/O throttling shared by the filesystem adapters.
+
+One :class:`IOThrottle` is shared by discovery, target validation and copying,
+so a single budget covers the whole run no matter which phase is active. Each
+limit is a token bucket refilled at the configured rate; callers take tokens
+before touching the filesystem and sleep when the bucket runs dry.
+"""
+
+import threading
+import time
+from collections.abc import Callable
+
+from default_cicd_public.domain.models import IOLimits
+
+# Seconds of budget a bucket may accumulate while idle
+DEFAULT_BURST_SECONDS = 1.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at a fixed rate."""
+
+    def __init__(
+        self,
+        rate: float,
+        *,
+        burst_seconds: float = DEFAULT_BURST_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        Create a full bucket.
+
+        Args:
+            rate: Tokens added per second. Must be positive.
+            burst_seconds: Capacity of the bucket in seconds of ``rate``.
+            clock: Monotonic clock, replaceable in tests.
+            sleep: Sleep function, replaceable in tests.
+        """
+        if rate <= 0:
+            msg = f"Rate must be positive, got {rate}"
+            raise ValueError(msg)
+        self.rate = rate
+        self.capacity = max(1.0, rate * burst_seconds)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """
+        Take ``amount`` tokens, sleeping until the budget allows it.
+
+        Requests larger than the capacity are admitted by running the bucket
+        into debt, so a single big file is delayed rather than rejected.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+class IOThrottle:
+    """Metadata, write and byte budgets enforced with token buckets."""
+
+    def __init__(self, limits: IOLimits | None = None) -> None:
+        """
+        Create a throttle, unlimited unless ``limits`` says otherwise.
+
+        Args:
+            limits: Initial limits. None means unlimited.
+        """
+        self._metadata: TokenBucket | None = None
+        self._writes: TokenBucket | None = None
+        self._bytes: TokenBucket | None = None
+        self.limits = IOLimits()
+        self.configure(limits or IOLimits())
+
+    def configure(self, limits: IOLimits) -> None:
+        """Replace the limits; buckets start full."""
+        self.limits = limits
+        self._metadata = _bucket(limits.metadata_ops_per_second)
+        self._writes = _bucket(limits.writes_per_second)
+        self._bytes = _bucket(limits.bytes_per_second)
+
+    def metadata(self, count: int = 1) -> None:
+        """Account for ``count`` metadata operations (listings, stats, mkdirs)."""
+        bucket = self._metadata
+        if bucket is not None:
+            bucket.acquire(count)
+
+    def write(self, size: int) -> None:
+        """Account for writing one file of ``size`` bytes."""
+        writes = self._writes
+        if writes is not None:
+            writes.acquire()
+        data = self._bytes
+        if data is not None and size > 0:
+            data.acquire(size)
+
+
+def _bucket(rate: float | None) -> TokenBucket | None:
+    """Return a bucket for ``rate``, or None when unlimited."""
+    return None if rate is None else TokenBucket(rate)
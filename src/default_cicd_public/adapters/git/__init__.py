@@ -0,0 +1,6 @@
+"""Git adapters for committing distributed templates in target repositories."""
+
+from default_cicd_public.adapters.git.bare import BareRepositoryDiscovery, FastImportUpdater
+from default_cicd_public.adapters.git.committer import GitCommitter
+
+__all__ = ["BareRepositoryDiscovery", "FastImportUpdater", "GitCommitter"]
@@ -0,0 +1,501 @@
+"""Committing templates directly into bare repositories, without checkouts.
+
+Discovery inspects every bare repository below the search roots with a single
+``git cat-file --batch-check`` process, which resolves HEAD, the markers in
+HEAD's tree and the chosen branch at once. Updating a repository then takes a
+single ``git fast-import`` process: the stream first asks for the blob of
+every template file in the parent commit (``ls``), and only if some differ
+sends their contents and one commit replacing them.
+
+Blob contents, object ids and stream fragments are computed once per template
+file and object format and shared by all repositories, and files that match
+the parent commit are not sent at all, so the new tree reuses their blobs.
+"""
+
+import contextlib
+import hashlib
+import os
+import subprocess
+import threading
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from pathlib import Path
+from typing import IO
+
+from default_cicd_public.adapters.filesystem.discovery import (
+    collapse_roots,
+    is_excluded,
+    is_skipped,
+)
+from default_cicd_public.adapters.filesystem.rendering import compile_bundle
+from default_cicd_public.adapters.filesystem.throttle import IOThrottle
+from default_cicd_public.adapters.git.committer import (
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_TIMEOUT,
+    GitError,
+)
+from default_cicd_public.domain.models import (
+    MARKER_FILE,
+    BareRepository,
+    RepositoryResult,
+    RepositoryStatus,
+    RepositoryUpdate,
+    TemplateFile,
+)
+
+# Entries whose presence makes a directory a git directory
+GIT_DIR_ENTRIES = frozenset({"HEAD", "objects", "refs"})
+
+# Length of a hexadecimal object id per object format
+OBJECT_FORMATS = {40: "sha1", 64: "sha256"}
+
+# Prefix of a symbolic HEAD
+SYMBOLIC_REF = "ref: "
+
+# Directory of the templates in every repository's tree
+GITHUB_DIR = ".github"
+
+
+def _environment() -> dict[str, str]:
+    """Return the environment for git subprocesses."""
+    # Never wait for credentials on a terminal nobody watches.
+    return {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+
+
+def _last_line(text: str, fallback: str) -> str:
+    """Return the last non-empty line of git's output, or ``fallback``."""
+    lines = text.strip().splitlines()
+    return lines[-1] if lines else fallback
+
+
+class BareRepositoryDiscovery:
+    """Finds bare repositories whose HEAD tree carries a marker file."""
+
+    def __init__(
+        self,
+        throttle: IOThrottle | None = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        *,
+        git: str = "git",
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        """
+        Configure discovery.
+
+        Args:
+            throttle: Shared I/O budget; every listing takes one metadata
+                token. None means unthrottled.
+            max_workers: Default number of repositories inspected at once.
+            git: The git executable.
+            timeout: Seconds each git command may take.
+        """
+        self.throttle = throttle or IOThrottle()
+        self.max_workers = max_workers
+        self.git = git
+        self.timeout = timeout
+
+    def __call__(
+        self,
+        search_roots: Sequence[Path],
+        markers: Sequence[Path] = (MARKER_FILE,),
+        *,
+        branch: str | None = None,
+        exclude: Sequence[str] = (),
+        max_workers: int | None = None,
+    ) -> Iterator[BareRepository]:
+        """
+        Find bare repositories below the roots whose HEAD tree has a marker.
+
+        The walk does not descend into git directories, hidden directories or
+        the built-in skip list. Repositories git cannot read are skipped.
+
+        Args:
+            search_roots: The root directories to search.
+            markers: Marker paths relative to the repository's top level, in
+                priority order.
+            branch: Branch to commit to; None means the branch HEAD points to.
+            exclude: Patterns of directories not to descend into (see
+                :func:`~default_cicd_public.adapters.filesystem.discovery.is_excluded`).
+            max_workers: Maximum number of repositories inspected at once.
+
+        Yields:
+            The repositories in the order of the walk.
+        """
+        candidates = self._walk(search_roots, tuple(exclude))
+        workers = max(1, max_workers or self.max_workers)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="git") as pool:
+            for repository in pool.map(
+                self._inspect, candidates, repeat(tuple(markers)), repeat(branch)
+            ):
+                if repository is not None:
+                    yield repository
+
+    def _walk(self, search_roots: Sequence[Path], exclude: tuple[str, ...]) -> list[Path]:
+        """Return every git directory below the roots."""
+        found: list[Path] = []
+        pending = collapse_roots(root.resolve() for root in search_roots)
+        while pending:
+            directory = pending.pop()
+            self.throttle.metadata()
+            try:
+                with os.scandir(directory) as listing:
+                    entries = list(listing)
+            except OSError:
+                continue
+            if {entry.name for entry in entries} >= GIT_DIR_ENTRIES:
+                found.append(directory)
+                continue
+            for entry in entries:
+                # Symlinks are not followed, so the walk cannot loop.
+                if is_skipped(entry.name) or not entry.is_dir(follow_symlinks=False):
+                    continue
+                path = Path(entry.path)
+                if not (exclude and is_excluded(path, exclude)):
+                    pending.append(path)
+        return sorted(found)
+
+    def _inspect(
+        self, git_dir: Path, markers: tuple[Path, ...], branch: str | None
+    ) -> BareRepository | None:
+        """Resolve HEAD, the markers and the branch of one repository."""
+        try:
+            head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+        except (OSError, UnicodeDecodeError):
+            return None
+        if branch is not None:
+            ref = f"refs/heads/{branch}"
+        elif head.startswith(SYMBOLIC_REF):
+            ref = head.removeprefix(SYMBOLIC_REF)
+        else:
+            # A detached HEAD names no branch to commit to.
+            return None
+
+        queries = ["HEAD", *(f"HEAD:{marker.as_posix()}" for marker in markers), ref]
+        try:
+            completed = subprocess.run(
+                [self.git, f"--git-dir={git_dir}", "cat-file", "--batch-check"],
+                input="".join(f"{query}\n" for query in queries),
+                capture_output=True,
+                text=True,
+                timeout=self.timeout,
+                env=_environment(),
+                check=False,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        answers = completed.stdout.splitlines()
+        if completed.returncode or len(answers) != len(queries):
+            return None
+        # Each answer is "<oid> <type> <size>" or "<query> missing".
+        objects = [answer.split() for answer in answers]
+        head_commit, *found, tip = objects
+        if head_commit[1:2] != ["commit"]:
+            return None
+        for marker, answer in zip(markers, found, strict=True):
+            if answer[1:2] == ["blob"]:
+                parent = tip[0] if tip[1:2] == ["commit"] else head_commit[0]
+                return BareRepository(git_dir=git_dir, ref=ref, parent=parent, marker=marker)
+        return None
+
+
+@dataclass(frozen=True)
+class _Blob:
+    """A template file as fast-import sees it."""
+
+    oid: str
+    mode: str
+    # "data" command and contents, ready to follow a "blob" and "mark" line
+    data: bytes
+
+
+class FastImportUpdater:
+    """Commits template bundles into bare repositories via ``git fast-import``."""
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        *,
+        git: str = "git",
+        timeout: float = DEFAULT_TIMEOUT,
+        committer: str | None = None,
+    ) -> None:
+        """
+        Configure the updater.
+
+        Args:
+            max_workers: Default number of repositories processed at once.
+            git: The git executable.
+            timeout: Seconds the fast-import process of a repository may take.
+            committer: ``Name <email>`` of the commits. None asks git once
+                (``git var GIT_COMMITTER_IDENT``), so the usual configuration
+                and ``GIT_COMMITTER_*`` variables apply.
+        """
+        self.max_workers = max_workers
+        self.git = git
+        self.timeout = timeout
+        self.committer = committer
+        self._blobs: dict[tuple[str, str], _Blob] = {}
+        self._lock = threading.Lock()
+
+    def __call__(
+        self,
+        updates: Sequence[RepositoryUpdate],
+        *,
+        message: Callable[[BareRepository, Sequence[Path]], str],
+        dry_run: bool = False,
+        max_workers: int | None = None,
+    ) -> Iterator[RepositoryResult]:
+        """
+        Commit each bundle into its repository's .github/ without a checkout.
+
+        Args:
+            updates: Repositories and the bundles they should carry.
+            message: Returns the commit message for a repository and the
+                changed paths, relative to .github/.
+            dry_run: If True, only compare with the parent commit.
+            max_workers: Maximum number of repositories processed at once.
+
+        Yields:
+            One result per update, in the order of ``updates``.
+        """
+        if not updates:
+            return
+        committer = ""
+        if not dry_run:
+            try:
+                committer = self.committer or self._committer(updates[0].repository.git_dir)
+            except GitError as e:
+                for update in updates:
+                    yield RepositoryResult(
+                        update.repository, RepositoryStatus.ERROR, error_message=str(e)
+                    )
+                return
+        workers = max(1, min(max_workers or self.max_workers, len(updates)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="git") as pool:
+            yield from pool.map(
+                self._update, updates, repeat(message), repeat(committer), repeat(dry_run)
+            )
+
+    def _committer(self, git_dir: Path) -> str:
+        """Return git's committer identity without the date."""
+        try:
+            completed = subprocess.run(
+                [self.git, f"--git-dir={git_dir}", "var", "GIT_COMMITTER_IDENT"],
+                capture_output=True,
+                text=True,
+                timeout=self.timeout,
+                env=_environment(),
+                check=False,
+            )
+        except FileNotFoundError as e:
+            msg = f"git executable {self.git!r} not found"
+            raise GitError(msg) from e
+        except subprocess.TimeoutExpired as e:
+            msg = f"git var timed out after {self.timeout:g}s"
+            raise GitError(msg) from e
+        if completed.returncode:
+            msg = f"git var failed: {_last_line(completed.stderr, str(completed.returncode))}"
+            raise GitError(msg)
+        # "Name <email> 1718000000 +0200"
+        return completed.stdout.strip().rsplit(" ", 2)[0]
+
+    def _update(
+        self,
+        update: RepositoryUpdate,
+        message: Callable[[BareRepository, Sequence[Path]], str],
+        committer: str,
+        dry_run: bool,
+    ) -> RepositoryResult:
+        """Compare and, if needed, commit one repository's templates."""
+        repository = update.repository
+        if compile_bundle(update.bundle).needs_rendering:
+            return RepositoryResult(
+                repository,
+                RepositoryStatus.ERROR,
+                error_message="templates with placeholders need a working tree to render",
+            )
+        try:
+            object_format = OBJECT_FORMATS[len(repository.parent)]
+        except KeyError:
+            return RepositoryResult(
+                repository,
+                RepositoryStatus.ERROR,
+                error_message=f"unknown object format of commit {repository.parent}",
+            )
+        files = sorted(update.bundle.files, key=lambda file: file.path)
+        blobs = [self._blob(file, object_format) for file in files]
+
+        try:
+            process = subprocess.Popen(
+                [
+                    self.git,
+                    f"--git-dir={repository.git_dir}",
+                    "fast-import",
+                    "--quiet",
+                    "--done",
+                    "--date-format=now",
+                ],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=_environment(),
+            )
+        except OSError as e:
+            return RepositoryResult(repository, RepositoryStatus.ERROR, error_message=str(e))
+        stream = _Stream(process, self.timeout)
+        files_changed: list[Path] = []
+        try:
+            changed = [
+                (file, blob, path)
+                for file, blob in zip(files, blobs, strict=True)
+                if stream.ls(repository.parent, path := f"{GITHUB_DIR}/{file.path.as_posix()}")
+                != (blob.mode, blob.oid)
+            ]
+            files_changed = [file.path for file, _blob, _path in changed]
+            if not changed or dry_run:
+                stream.finish()
+                status = RepositoryStatus.DRY_RUN if changed else RepositoryStatus.UNCHANGED
+                return RepositoryResult(repository, status, files_changed=files_changed)
+
+            for mark, (_file, blob, _path) in enumerate(changed, start=1):
+                stream.write(b"blob\nmark :%d\n" % mark + blob.data)
+            commit_mark = len(changed) + 1
+            text = message(repository, files_changed).encode()
+            stream.write(
+                f"commit {repository.ref}\nmark :{commit_mark}\n"
+                f"committer {committer} now\n".encode()
+                + b"data %d\n%s\n" % (len(text), text)
+                + f"from {repository.parent}\n".encode()
+                + "".join(
+                    f"M {blob.mode} :{mark} {_quote(path)}\n"
+                    for mark, (_file, blob, path) in enumerate(changed, start=1)
+                ).encode()
+                + b"\n"
+            )
+            commit = stream.get_mark(commit_mark)
+            stream.finish()
+        except GitError as e:
+            return RepositoryResult(
+                repository,
+                RepositoryStatus.ERROR,
+                files_changed=files_changed,
+                error_message=str(e),
+            )
+        finally:
+            stream.close()
+        return RepositoryResult(
+            repository, RepositoryStatus.UPDATED, files_changed=files_changed, commit=commit
+        )
+
+    def _blob(self, file: TemplateFile, object_format: str) -> _Blob:
+        """Return the shared fast-import form of a template file."""
+        key = (file.digest, object_format)
+        with self._lock:
+            blob = self._blobs.get(key)
+        if blob is not None:
+            return blob
+        header = b"blob %d\0" % len(file.content)
+        blob = _Blob(
+            oid=hashlib.new(object_format, header + file.content).hexdigest(),
+            mode="100755" if file.mode & 0o111 else "100644",
+            data=b"data %d\n%s\n" % (len(file.content), file.content),
+        )
+        with self._lock:
+            return self._blobs.setdefault(key, blob)
+
+
+class _Stream:
+    """The command stream of one fast-import process and its responses."""
+
+    def __init__(self, process: "subprocess.Popen[bytes]", timeout: float) -> None:
+        assert process.stdin is not None
+        assert process.stdout is not None
+        self.process = process
+        self.commands: IO[bytes] = process.stdin
+        self.responses: IO[bytes] = process.stdout
+        self.timeout = timeout
+        self._expired = threading.Event()
+        self._timer = threading.Timer(timeout, self._expire)
+        self._timer.start()
+
+    def close(self) -> None:
+        """Stop the timeout and make sure the process is gone."""
+        self._timer.cancel()
+        self.process.kill()
+        self.process.wait()
+        for pipe in (self.commands, self.responses, self.process.stderr):
+            if pipe is not None:
+                with contextlib.suppress(OSError):
+                    pipe.close()
+
+    def write(self, data: bytes) -> None:
+        """Send commands to fast-import."""
+        try:
+            self.commands.write(data)
+        except OSError as e:
+            raise self._failure() from e
+
+    def ls(self, commit: str, path: str) -> tuple[str, str] | None:
+        """Return the mode and object id of ``path`` in ``commit``, or None."""
+        self.write(f"ls {commit} {_quote(path)}\n".encode())
+        # "<mode> <type> <oid>\t<path>" or "missing <path>"
+        response = self._read()
+        if response.startswith("missing "):
+            return None
+        mode, _kind, oid = response.split("\t", 1)[0].split(" ")
+        return mode, oid
+
+    def get_mark(self, mark: int) -> str:
+        """Return the object id of ``mark``."""
+        self.write(b"get-mark :%d\n" % mark)
+        return self._read()
+
+    def finish(self) -> None:
+        """End the stream and wait for fast-import to update the refs."""
+        self.write(b"done\n")
+        try:
+            self.commands.close()
+        except OSError as e:
+            raise self._failure() from e
+        if self.process.wait():
+            raise self._failure()
+
+    def _read(self) -> str:
+        """Return the next response line."""
+        try:
+            self.commands.flush()
+            line = self.responses.readline()
+        except OSError as e:
+            raise self._failure() from e
+        if not line.endswith(b"\n"):
+            raise self._failure()
+        return line.decode("utf-8", "surrogateescape").rstrip("\n")
+
+    def _expire(self) -> None:
+        """Kill a fast-import process that exceeded its timeout."""
+        self._expired.set()
+        self.process.kill()
+
+    def _failure(self) -> GitError:
+        """Describe why fast-import stopped."""
+        self.process.kill()
+        returncode = self.process.wait()
+        if self._expired.is_set():
+            return GitError(f"git fast-import timed out after {self.timeout:g}s")
+        assert self.process.stderr is not None
+        stderr = self.process.stderr.read().decode("utf-8", "replace")
+        detail = _last_line(stderr, f"exit status {returncode}")
+        return GitError(f"git fast-import failed: {detail}")
+
+
+def _quote(path: str) -> str:
+    """Quote a path for fast-import if it could be misread."""
+    if not path.startswith('"') and "\n" not in path and "\\" not in path:
+        return path
+    escaped = path.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'"{escaped}"'
+
+
+__all__ = ["BareRepositoryDiscovery", "FastImportUpdater"]
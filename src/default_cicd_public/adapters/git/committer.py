@@ -0,0 +1,136 @@
+"""Committing distributed templates in the target repositories with git.
+
+Every repository is handled by a short sequence of ``git`` subprocesses. These
+mostly wait on the disk and on git hooks, so a bounded thread pool runs many
+repositories at once, and no subprocess outlives its timeout.
+"""
+
+import os
+import subprocess
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+from default_cicd_public.domain.models import CommitRequest, CommitResult, CommitStatus
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_TIMEOUT = 120.0
+
+
+class GitError(Exception):
+    """Raised when a git command fails or times out."""
+
+
+class GitCommitter:
+    """Stages, commits and optionally pushes changed files per repository."""
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        *,
+        git: str = "git",
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        """
+        Configure the committer.
+
+        Args:
+            max_workers: Default number of repositories processed at once.
+            git: The git executable.
+            timeout: Seconds each git command may take.
+        """
+        self.max_workers = max_workers
+        self.git = git
+        self.timeout = timeout
+
+    def __call__(
+        self,
+        requests: Sequence[CommitRequest],
+        *,
+        push: bool = False,
+        max_workers: int | None = None,
+    ) -> Iterator[CommitResult]:
+        """
+        Stage and commit each request's paths in the project's repository.
+
+        Args:
+            requests: Projects with the paths to commit and their messages.
+            push: If True, push every new commit to the branch's upstream.
+            max_workers: Maximum number of repositories processed at once.
+                None uses the committer's default.
+
+        Yields:
+            One result per request, in the order of ``requests``.
+        """
+        if not requests:
+            return
+        workers = max(1, min(max_workers or self.max_workers, len(requests)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="git") as pool:
+            yield from pool.map(self._commit, requests, repeat(push))
+
+    def _commit(self, request: CommitRequest, push: bool) -> CommitResult:
+        """Commit one project's paths and push if asked."""
+        root = request.project.root_path
+        paths = [path.as_posix() for path in request.paths]
+        try:
+            if self._run(root, "rev-parse", "--is-inside-work-tree", check=False).returncode:
+                return CommitResult(request.project, CommitStatus.NOT_A_REPOSITORY)
+            self._run(root, "add", "--", *paths)
+            # Exit status 0 means the index already matches HEAD for these paths.
+            if not self._run(
+                root, "diff", "--cached", "--quiet", "--", *paths, check=False
+            ).returncode:
+                return CommitResult(request.project, CommitStatus.NOTHING_TO_COMMIT)
+            self._run(root, "commit", "--quiet", "--message", request.message, "--", *paths)
+            commit = self._run(root, "rev-parse", "HEAD").stdout.strip()
+        except GitError as e:
+            return CommitResult(request.project, CommitStatus.ERROR, error_message=str(e))
+
+        if not push:
+            return CommitResult(request.project, CommitStatus.COMMITTED, commit=commit)
+        try:
+            self._run(root, "push", "--quiet")
+        except GitError as e:
+            return CommitResult(
+                request.project,
+                CommitStatus.ERROR,
+                commit=commit,
+                error_message=f"committed {commit[:12]} but {e}",
+            )
+        return CommitResult(request.project, CommitStatus.PUSHED, commit=commit)
+
+    def _run(self, root: Path, *args: str, check: bool = True) -> subprocess.CompletedProcess[str]:
+        """
+        Run one git command in ``root``.
+
+        Raises:
+            GitError: If git cannot be run, times out, or (with ``check``)
+                exits with a non-zero status.
+        """
+        command = [self.git, "-C", str(root), *args]
+        # Never wait for credentials on a terminal nobody watches.
+        env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+        try:
+            completed = subprocess.run(
+                command,
+                capture_output=True,
+                text=True,
+                timeout=self.timeout,
+                env=env,
+                check=False,
+            )
+        except FileNotFoundError as e:
+            msg = f"git executable {self.git!r} not found"
+            raise GitError(msg) from e
+        except subprocess.TimeoutExpired as e:
+            msg = f"git {args[0]} timed out after {self.timeout:g}s"
+            raise GitError(msg) from e
+        if check and completed.returncode:
+            detail = (completed.stderr or completed.stdout).strip().splitlines()
+            msg = f"git {args[0]} failed: {detail[-1] if detail else completed.returncode}"
+            raise GitError(msg)
+        return completed
+
+
+__all__ = ["GitCommitter", "GitError"]
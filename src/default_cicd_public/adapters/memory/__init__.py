@@ -0,0 +1,21 @@
+"""In-memory filesystem adapters for large-scale and fault-injection testing."""
+
+from default_cicd_public.adapters.memory.copier import MemoryCopier
+from default_cicd_public.adapters.memory.discovery import MemoryDiscovery
+from default_cicd_public.adapters.memory.drift import MemoryDriftChecker
+from default_cicd_public.adapters.memory.filesystem import (
+    Fault,
+    MemoryFilesystem,
+    SyntheticTree,
+)
+from default_cicd_public.adapters.memory.targets import MemoryTargetValidator
+
+__all__ = [
+    "Fault",
+    "MemoryCopier",
+    "MemoryDiscovery",
+    "MemoryDriftChecker",
+    "MemoryFilesystem",
+    "MemoryTargetValidator",
+    "SyntheticTree",
+]
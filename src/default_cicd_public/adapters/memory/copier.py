@@ -0,0 +1,110 @@
+"""Template copier writing into a memory filesystem."""
+
+from pathlib import Path
+
+from default_cicd_public.adapters.filesystem.throttle import IOThrottle
+from default_cicd_public.adapters.memory.filesystem import MemoryFilesystem
+from default_cicd_public.domain.models import (
+    CopyResult,
+    CopyStatus,
+    DiscoveredProject,
+    TemplateBundle,
+    TemplateFile,
+)
+
+
+class MemoryCopier:
+    """Copies template files to target projects on a :class:`MemoryFilesystem`."""
+
+    def __init__(self, filesystem: MemoryFilesystem, throttle: IOThrottle | None = None) -> None:
+        """
+        Configure the copier.
+
+        Args:
+            filesystem: The tree holding the target projects.
+            throttle: Shared I/O budget; each mkdir takes a metadata token and
+                each file a write token plus its size in bytes. None means
+                unthrottled.
+        """
+        self.filesystem = filesystem
+        self.throttle = throttle or IOThrottle()
+
+    def __call__(
+        self,
+        bundle: TemplateBundle,
+        target_project: DiscoveredProject,
+        *,
+        dry_run: bool = False,
+    ) -> CopyResult:
+        """
+        Write all files of the bundle to the target project's .github/.
+
+        Args:
+            bundle: The templates to write.
+            target_project: The target project to copy templates to.
+            dry_run: If True, simulate the copy without making changes.
+
+        Returns:
+            CopyResult with the status and details of the operation.
+        """
+        if dry_run:
+            return CopyResult(
+                project=target_project,
+                status=CopyStatus.DRY_RUN,
+                files_copied=bundle.paths,
+            )
+
+        try:
+            copied_files, changed_files = self._write_files(bundle, target_project.github_path)
+            return CopyResult(
+                project=target_project,
+                status=CopyStatus.SUCCESS,
+                files_copied=copied_files,
+                files_changed=changed_files,
+            )
+        except PermissionError as e:
+            return CopyResult(
+                project=target_project,
+                status=CopyStatus.PERMISSION_DENIED,
+                error_message=str(e),
+            )
+        except OSError as e:
+            return CopyResult(
+                project=target_project,
+                status=CopyStatus.ERROR,
+                error_message=str(e),
+            )
+
+    def _write_files(
+        self, bundle: TemplateBundle, target_path: Path
+    ) -> tuple[list[Path], list[Path]]:
+        """Write the changed bundle files below ``target_path``; return all and changed paths."""
+        copied: list[Path] = []
+        changed: list[Path] = []
+        created: set[Path] = set()
+
+        for template in bundle.files:
+            target_file = target_path / template.path
+            if target_file.parent not in created:
+                self.throttle.metadata()
+                self.filesystem.makedirs(target_file.parent)
+                created.add(target_file.parent)
+
+            copied.append(template.path)
+            if not self._differs(target_file, template):
+                continue
+            changed.append(template.path)
+            self.throttle.write(len(template.content))
+            self.filesystem.write(target_file, template.content, template.mode)
+
+        return sorted(copied), sorted(changed)
+
+    def _differs(self, target_file: Path, template: TemplateFile) -> bool:
+        """Return True unless ``target_file`` already has the template's content and mode."""
+        self.throttle.metadata()
+        try:
+            if self.filesystem.stat(target_file).mode & 0o7777 != template.mode:
+                return True
+            return self.filesystem.read(target_file) != template.content
+        except OSError:
+            return True
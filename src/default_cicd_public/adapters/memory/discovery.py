@@ -0,0 +1,41 @@
+"""Project discovery on a memory filesystem."""
+
+from default_cicd_public.adapters.filesystem.discovery import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_MAX_PENDING,
+    FilesystemDiscovery,
+)
+from default_cicd_public.adapters.filesystem.throttle import IOThrottle
+from default_cicd_public.adapters.memory.filesystem import MemoryFilesystem
+
+
+class MemoryDiscovery(FilesystemDiscovery):
+    """Discovers projects on a :class:`MemoryFilesystem`.
+
+    This is the filesystem discovery itself - chunked listings, resumed wide
+    directories and the adaptive scheduler - walking the memory tree instead
+    of the disk, so benchmarks measure the real walk and its operation counts
+    and injected latency carry over.
+    """
+
+    def __init__(
+        self,
+        filesystem: MemoryFilesystem,
+        throttle: IOThrottle | None = None,
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_pending: int = DEFAULT_MAX_PENDING,
+    ) -> None:
+        """
+        Configure discovery.
+
+        Args:
+            filesystem: The tree to search.
+            throttle: Shared I/O budget; every chunk of a listing and every
+                stat takes one metadata token. None means unthrottled.
+            chunk_size: Entries read from a directory listing per scan.
+            max_pending: Directories the walk may hold pending at once.
+        """
+        super().__init__(
+            throttle, chunk_size=chunk_size, max_pending=max_pending, filesystem=filesystem
+        )
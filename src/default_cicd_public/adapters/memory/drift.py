@@ -0,0 +1,101 @@
+"""Read-only comparison of projects on a memory filesystem with their bundle."""
+
+import hashlib
+from pathlib import Path
+
+from default_cicd_public.adapters.filesystem.throttle import IOThrottle
+from default_cicd_public.adapters.memory.filesystem import MemoryFilesystem, MemoryStat
+from default_cicd_public.domain.models import (
+    DiscoveredProject,
+    DriftState,
+    ProjectDrift,
+    TemplateBundle,
+    TemplateFile,
+)
+
+
+class MemoryDriftChecker:
+    """Compares a target's .github/ on a :class:`MemoryFilesystem` with a bundle.
+
+    Mirrors the filesystem checker: one listing per directory, one stat per
+    entry, and a read only for files whose size and mode match.
+    """
+
+    def __init__(self, filesystem: MemoryFilesystem, throttle: IOThrottle | None = None) -> None:
+        """
+        Configure the checker.
+
+        Args:
+            filesystem: The tree holding the target projects.
+            throttle: Shared I/O budget; every listing, stat and read takes one
+                metadata token. None means unthrottled.
+        """
+        self.filesystem = filesystem
+        self.throttle = throttle or IOThrottle()
+
+    def __call__(self, bundle: TemplateBundle, target_project: DiscoveredProject) -> ProjectDrift:
+        """
+        Compare the target's .github/ with the bundle.
+
+        Args:
+            bundle: The templates the project should carry.
+            target_project: The project to compare.
+
+        Returns:
+            The project's drift state and the differing paths.
+        """
+        github = target_project.github_path
+        try:
+            present = self._list_files(github)
+            modified = sorted(
+                file.path
+                for file in bundle.files
+                if file.path in present
+                and self._differs(github / file.path, present[file.path], file)
+            )
+        except OSError as e:
+            return ProjectDrift(
+                project=target_project, state=DriftState.UNREACHABLE, error_message=str(e)
+            )
+
+        expected = {file.path for file in bundle.files}
+        missing = sorted(expected - present.keys())
+        extra = sorted(present.keys() - expected)
+        # distribute never removes files, so extra ones alone are not drift.
+        drifted = bool(modified or missing)
+        return ProjectDrift(
+            project=target_project,
+            state=DriftState.DRIFTED if drifted else DriftState.CURRENT,
+            modified=modified,
+            missing=missing,
+            extra=extra,
+        )
+
+    def _list_files(self, github: Path) -> dict[Path, MemoryStat]:
+        """Return the stat of every file below ``github`` by relative path."""
+        files: dict[Path, MemoryStat] = {}
+        pending = [Path()]
+        while pending:
+            relative = pending.pop()
+            self.throttle.metadata()
+            try:
+                names = self.filesystem.listdir(github / relative)
+            except FileNotFoundError:
+                if relative != Path():
+                    raise
+                continue
+            for name in names:
+                self.throttle.metadata()
+                entry_stat = self.filesystem.stat(github / relative / name)
+                if entry_stat.is_dir:
+                    pending.append(relative / name)
+                elif entry_stat.is_file:
+                    files[relative / name] = entry_stat
+        return files
+
+    def _differs(self, path: Path, present: MemoryStat, file: TemplateFile) -> bool:
+        """Return True unless ``path`` has the template's size, mode and digest."""
+        if present.size != len(file.content) or present.mode & 0o7777 != file.mode:
+            return True
+        self.throttle.metadata()
+        return hashlib.sha256(self.filesystem.read(path)).hexdigest() != file.digest
@@ -0,0 +1,576 @@
+"""An in-memory filesystem with injected latency and failures.
+
+The memory adapters run discovery and copying against a
+:class:`MemoryFilesystem` instead of the disk, so scaling, concurrency and
+error handling can be exercised on trees far larger than a test could build
+under ``tmp_path``.
+
+Trees are built either explicitly (:meth:`MemoryFilesystem.add_file`) or as a
+:class:`SyntheticTree`, whose directories are computed from their position
+when they are looked up. A synthetic tree of ten million directories costs no
+memory until something is written into it; only the directories on the path to
+a write are materialized.
+
+The tree offers the operations of
+:class:`~default_cicd_public.adapters.filesystem.discovery.WalkFilesystem`
+(:meth:`MemoryFilesystem.scandir`, :meth:`MemoryFilesystem.stat` and
+:meth:`MemoryFilesystem.resolve`), so the filesystem discovery walks it
+unchanged.
+
+Every operation the adapters perform (``list``, ``stat``, ``mkdir``,
+``write``) is counted and can be slowed down or failed through a
+:class:`Fault`. Failures are derived from a hash of the seed, the operation
+and the path, so a run fails the same operations no matter how its threads are
+scheduled.
+"""
+
+import errno
+import hashlib
+import os
+import stat
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from default_cicd_public.domain.models import MARKER_FILE
+
+OPERATIONS = ("list", "stat", "mkdir", "write")
+DEFAULT_DEVICE = 1
+DEFAULT_FILE_MODE = 0o644
+
+
+@dataclass(frozen=True)
+class Fault:
+    """Latency and failure rate injected into one kind of operation.
+
+    Attributes:
+        latency: Seconds every call sleeps before it runs.
+        failure_rate: Fraction of paths, between 0 and 1, on which the
+            operation fails.
+        error: ``errno`` of the injected failure; ``errno.EACCES`` raises a
+            PermissionError, for example.
+    """
+
+    latency: float = 0.0
+    failure_rate: float = 0.0
+    error: int = errno.EIO
+
+    def __post_init__(self) -> None:
+        """Validate the fault."""
+        if self.latency < 0:
+            msg = f"latency must not be negative, got {self.latency}"
+            raise ValueError(msg)
+        if not 0 <= self.failure_rate <= 1:
+            msg = f"failure_rate must be between 0 and 1, got {self.failure_rate}"
+            raise ValueError(msg)
+
+
+@dataclass(frozen=True)
+class SyntheticTree:
+    """Shape of a generated directory tree.
+
+    Every directory down to ``depth`` levels has ``fanout`` subdirectories
+    named ``d0``, ``d1``, ... Directories are numbered breadth-first from 0 at
+    the tree's root; every ``project_every``-th one carries ``marker``.
+
+    Attributes:
+        fanout: Subdirectories per directory.
+        depth: Levels of subdirectories below the root.
+        project_every: Spacing of projects in breadth-first order; 0 means
+            no projects.
+        marker: Marker file created in every project, relative to its root.
+    """
+
+    fanout: int
+    depth: int
+    project_every: int = 0
+    marker: Path = MARKER_FILE
+
+    @property
+    def directories(self) -> int:
+        """Return the number of directories below the root."""
+        return sum(self.fanout**level for level in range(1, self.depth + 1))
+
+    @property
+    def projects(self) -> int:
+        """Return the number of projects in the tree."""
+        if self.project_every <= 0:
+            return 0
+        return self.directories // self.project_every
+
+
+@dataclass(frozen=True)
+class MemoryStat:
+    """Result of :meth:`MemoryFilesystem.stat`.
+
+    The ``st_*`` properties mirror ``os.stat_result`` for code written against
+    the real filesystem. The tree has no links, so the inode is derived from
+    the path.
+    """
+
+    mode: int
+    size: int
+    device: int
+    inode: int = 0
+
+    @property
+    def is_dir(self) -> bool:
+        """Return True for directories."""
+        return stat.S_ISDIR(self.mode)
+
+    @property
+    def is_file(self) -> bool:
+        """Return True for regular files."""
+        return stat.S_ISREG(self.mode)
+
+    @property
+    def st_mode(self) -> int:
+        """Return the mode, like ``os.stat_result.st_mode``."""
+        return self.mode
+
+    @property
+    def st_dev(self) -> int:
+        """Return the device, like ``os.stat_result.st_dev``."""
+        return self.device
+
+    @property
+    def st_ino(self) -> int:
+        """Return the inode, like ``os.stat_result.st_ino``."""
+        return self.inode
+
+
+@dataclass(frozen=True)
+class MemoryEntry:
+    """An entry of a :meth:`MemoryFilesystem.scandir` listing, like ``os.DirEntry``.
+
+    Its type comes with the listing; :meth:`stat` is a counted operation.
+    """
+
+    name: str
+    path: str
+    directory: bool
+    filesystem: "MemoryFilesystem" = field(repr=False, compare=False)
+
+    def is_dir(self) -> bool:
+        """Return True if the entry is a directory, without a stat."""
+        return self.directory
+
+    def stat(self) -> MemoryStat:
+        """Stat the entry through the filesystem."""
+        return self.filesystem.stat(Path(self.path))
+
+
+class MemoryListing:
+    """An open listing of a memory directory, like ``os.scandir``'s iterator.
+
+    Synthetic directories are listed lazily, so reading a wide one in chunks
+    never holds all its names.
+    """
+
+    def __init__(
+        self, filesystem: "MemoryFilesystem", path: Path, entries: Iterator[tuple[str, bool]]
+    ) -> None:
+        """Wrap the (name, is directory) pairs of ``path``."""
+        self._filesystem = filesystem
+        self._prefix = str(path)
+        self._entries = entries
+
+    def __iter__(self) -> "MemoryListing":
+        """Return the listing itself."""
+        return self
+
+    def __next__(self) -> MemoryEntry:
+        """Return the next entry."""
+        name, directory = next(self._entries)
+        return MemoryEntry(name, os.path.join(self._prefix, name), directory, self._filesystem)
+
+    def close(self) -> None:
+        """Stop the listing; further reads end it."""
+        self._entries = iter(())
+
+
+@dataclass
+class _File:
+    content: bytes
+    mode: int
+
+
+@dataclass
+class _Directory:
+    device: int
+    children: "dict[str, _Node]" = field(default_factory=lambda: {})
+
+
+@dataclass(frozen=True)
+class _SyntheticDirectory:
+    """A directory of a synthetic tree, computed from its number and level."""
+
+    tree: SyntheticTree
+    number: int
+    level: int
+    device: int
+
+    @property
+    def is_project(self) -> bool:
+        every = self.tree.project_every
+        return every > 0 and self.number > 0 and self.number % every == 0
+
+    def names(self) -> list[str]:
+        return [name for name, _ in self.entries()]
+
+    def entries(self) -> Iterator[tuple[str, bool]]:
+        """Yield the (name, is directory) pairs of the directory lazily."""
+        if self._has_children:
+            for index in range(self.tree.fanout):
+                yield f"d{index}", True
+        if self.is_project:
+            yield self.tree.marker.parts[0], len(self.tree.marker.parts) > 1
+
+    def child(self, name: str) -> "_Node | None":
+        if self.is_project and name == self.tree.marker.parts[0]:
+            return self._marker_entry()
+        if not self._has_children or not name.startswith("d") or not name[1:].isdigit():
+            return None
+        index = int(name[1:])
+        if index >= self.tree.fanout or name != f"d{index}":
+            return None
+        return _SyntheticDirectory(
+            self.tree, self.number * self.tree.fanout + index + 1, self.level + 1, self.device
+        )
+
+    def materialize(self) -> _Directory:
+        directory = _Directory(self.device)
+        for name in self.names():
+            child = self.child(name)
+            if child is not None:
+                directory.children[name] = child
+        return directory
+
+    @property
+    def _has_children(self) -> bool:
+        return self.level < self.tree.depth
+
+    def _marker_entry(self) -> "_Node":
+        """Build the first component of the marker path with the marker below it."""
+        parts = self.tree.marker.parts
+        node: _Node = _File(b"", DEFAULT_FILE_MODE)
+        for name in reversed(parts[1:]):
+            node = _Directory(self.device, {name: node})
+        return node
+
+
+_Node = _File | _Directory | _SyntheticDirectory
+
+
+class MemoryFilesystem:
+    """Thread-safe in-memory directory tree.
+
+    The methods named after operations (:meth:`listdir`, :meth:`scandir`,
+    :meth:`stat`, :meth:`makedirs`, :meth:`write`) are what the memory
+    adapters call; they are counted in :attr:`operations` and subject to the
+    configured faults. The ``add_*``, :meth:`read` and :meth:`resolve`
+    methods set up and inspect the tree without either.
+    """
+
+    def __init__(
+        self,
+        faults: Mapping[str, Fault] | None = None,
+        *,
+        seed: int = 0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        Create an empty filesystem.
+
+        Args:
+            faults: Fault per operation name (see :data:`OPERATIONS`).
+                Operations without an entry run instantly and never fail.
+            seed: Selects which paths fail for the configured failure rates.
+            sleep: Sleep function used for injected latency, replaceable in
+                tests.
+
+        Raises:
+            ValueError: If ``faults`` names an unknown operation.
+        """
+        unknown = set(faults or {}) - set(OPERATIONS)
+        if unknown:
+            msg = f"Unknown operations {sorted(unknown)}; expected some of {OPERATIONS}"
+            raise ValueError(msg)
+        self.faults = dict(faults or {})
+        self.seed = seed
+        self.operations: Counter[str] = Counter()
+        self._sleep = sleep
+        self._root = _Directory(DEFAULT_DEVICE)
+        self._lock = threading.Lock()
+
+    # Setup and inspection
+
+    def add_directory(self, path: Path, *, device: int | None = None) -> None:
+        """
+        Create a directory and its parents.
+
+        Args:
+            path: The directory.
+            device: Device number of the directory and everything created
+                below it later, simulating a mount point. None inherits the
+                parent's device.
+        """
+        with self._lock:
+            directory = self._make_directories(_parts(path))
+            if device is not None:
+                directory.device = device
+
+    def add_file(
+        self, path: Path, content: bytes | str = b"", mode: int = DEFAULT_FILE_MODE
+    ) -> None:
+        """Create a file and its parent directories, replacing any existing file."""
+        data = content.encode() if isinstance(content, str) else content
+        with self._lock:
+            self._put_file(_parts(path), data, mode)
+
+    def add_project(self, root: Path, marker: Path = MARKER_FILE) -> None:
+        """Create a project directory carrying ``marker``."""
+        self.add_file(root / marker, b"name: CI\n")
+
+    def add_synthetic_tree(
+        self, path: Path, tree: SyntheticTree, *, device: int | None = None
+    ) -> None:
+        """
+        Mount a generated tree at ``path``, replacing whatever was there.
+
+        Args:
+            path: Root directory of the tree; its parents are created.
+            tree: Shape of the tree.
+            device: Device number of the tree. None inherits the parent's.
+        """
+        parts = _parts(path)
+        if not parts:
+            msg = "A synthetic tree cannot replace the filesystem root"
+            raise ValueError(msg)
+        with self._lock:
+            parent = self._make_directories(parts[:-1])
+            node = _SyntheticDirectory(tree, 0, 0, device if device is not None else parent.device)
+            parent.children[parts[-1]] = node
+
+    def read(self, path: Path) -> bytes:
+        """
+        Return the content of a file.
+
+        Raises:
+            FileNotFoundError: If ``path`` is not a file.
+        """
+        with self._lock:
+            node = self._lookup(_parts(path))
+        if not isinstance(node, _File):
+            raise FileNotFoundError(errno.ENOENT, "No such file", str(path))
+        return node.content
+
+    def fingerprint(self, path: Path) -> str:
+        """Return a string that changes with the content and mode of a file.
+
+        This is the in-memory counterpart of a stat validator; it is neither
+        counted nor faulted. A directory's changes when an entry is added or
+        removed, like its modification time; missing paths yield ``"!"``.
+        """
+        with self._lock:
+            node = self._lookup(_parts(path))
+            if isinstance(node, _Directory):
+                names = sorted(node.children)
+            elif isinstance(node, _SyntheticDirectory):
+                names = sorted(node.names())
+            else:
+                names = None
+        if isinstance(node, _File):
+            return f"{hashlib.sha256(node.content).hexdigest()}:{node.mode:o}"
+        if names is None:
+            return "!"
+        return "d:" + hashlib.sha256("\0".join(names).encode()).hexdigest()
+
+    def resolve(self, path: Path) -> Path:
+        """Normalise ``path`` lexically and anchor it at the root; there are no symlinks."""
+        return Path("/", os.path.normpath(path))
+
+    # Operations
+
+    def scandir(self, path: Path) -> MemoryListing:
+        """
+        Open a listing of a directory; counted as one ``list`` operation.
+
+        Raises:
+            FileNotFoundError: If ``path`` does not exist.
+            NotADirectoryError: If ``path`` is a file.
+            OSError: If an injected failure hits.
+        """
+        self._inject("list", path)
+        with self._lock:
+            node = self._lookup(_parts(path))
+            if isinstance(node, _Directory):
+                entries = [
+                    (name, not isinstance(child, _File)) for name, child in node.children.items()
+                ]
+                return MemoryListing(self, path, iter(entries))
+        if isinstance(node, _SyntheticDirectory):
+            return MemoryListing(self, path, node.entries())
+        raise _missing(path) if node is None else _not_a_directory(path)
+
+    def listdir(self, path: Path) -> list[str]:
+        """
+        Return the names in a directory.
+
+        Raises:
+            FileNotFoundError: If ``path`` does not exist.
+            NotADirectoryError: If ``path`` is a file.
+            OSError: If an injected failure hits.
+        """
+        self._inject("list", path)
+        with self._lock:
+            node = self._lookup(_parts(path))
+            if isinstance(node, _Directory):
+                return list(node.children)
+            if isinstance(node, _SyntheticDirectory):
+                return node.names()
+        raise _missing(path) if node is None else _not_a_directory(path)
+
+    def stat(self, path: Path) -> MemoryStat:
+        """
+        Return the type, size and device of ``path``.
+
+        Raises:
+            FileNotFoundError: If ``path`` does not exist.
+            OSError: If an injected failure hits.
+        """
+        self._inject("stat", path)
+        with self._lock:
+            device = self._root.device
+            node: _Node | None = self._root
+            for name in _parts(path):
+                node = _child(node, name)
+                if node is None:
+                    raise _missing(path)
+                if not isinstance(node, _File):
+                    device = node.device
+        inode = _inode(path)
+        if isinstance(node, _File):
+            return MemoryStat(stat.S_IFREG | node.mode, len(node.content), device, inode)
+        return MemoryStat(stat.S_IFDIR | 0o755, 0, device, inode)
+
+    def makedirs(self, path: Path) -> None:
+        """
+        Create a directory and its parents; existing directories are fine.
+
+        Raises:
+            NotADirectoryError: If a file is in the way.
+            OSError: If an injected failure hits.
+        """
+        self._inject("mkdir", path)
+        with self._lock:
+            self._make_directories(_parts(path))
+
+    def write(self, path: Path, content: bytes, mode: int = DEFAULT_FILE_MODE) -> None:
+        """
+        Write a file whose parent directory exists, replacing any existing file.
+
+        Raises:
+            FileNotFoundError: If the parent directory does not exist.
+            IsADirectoryError: If ``path`` is a directory.
+            OSError: If an injected failure hits.
+        """
+        self._inject("write", path)
+        parts = _parts(path)
+        with self._lock:
+            if not isinstance(self._lookup(parts[:-1]), _Directory | _SyntheticDirectory):
+                raise _missing(path.parent)
+            self._put_file(parts, content, mode)
+
+    # Internals, called with the lock held unless noted
+
+    def _inject(self, operation: str, path: Path) -> None:
+        """Count, delay and possibly fail one operation (without the lock)."""
+        with self._lock:
+            self.operations[operation] += 1
+        fault = self.faults.get(operation)
+        if fault is None:
+            return
+        if fault.latency:
+            self._sleep(fault.latency)
+        if fault.failure_rate and _fraction(self.seed, operation, path) < fault.failure_rate:
+            raise OSError(fault.error, f"Injected {operation} failure", str(path))
+
+    def _lookup(self, parts: tuple[str, ...]) -> "_Node | None":
+        node: _Node | None = self._root
+        for name in parts:
+            node = _child(node, name)
+            if node is None:
+                return None
+        return node
+
+    def _make_directories(self, parts: tuple[str, ...]) -> _Directory:
+        """Create and materialize every directory on the path; return the last."""
+        directory = self._root
+        for index, name in enumerate(parts):
+            child = directory.children.get(name)
+            if isinstance(child, _SyntheticDirectory):
+                child = child.materialize()
+                directory.children[name] = child
+            elif child is None:
+                child = _Directory(directory.device)
+                directory.children[name] = child
+            elif isinstance(child, _File):
+                raise _not_a_directory(Path(*parts[: index + 1]))
+            directory = child
+        return directory
+
+    def _put_file(self, parts: tuple[str, ...], content: bytes, mode: int) -> None:
+        parent = self._make_directories(parts[:-1])
+        if isinstance(parent.children.get(parts[-1]), _Directory | _SyntheticDirectory):
+            raise IsADirectoryError(errno.EISDIR, "Is a directory", str(Path(*parts)))
+        parent.children[parts[-1]] = _File(content, mode)
+
+
+def _child(node: "_Node | None", name: str) -> "_Node | None":
+    """Return the entry ``name`` of a directory node, or None."""
+    if isinstance(node, _Directory):
+        return node.children.get(name)
+    if isinstance(node, _SyntheticDirectory):
+        return node.child(name)
+    return None
+
+
+def _parts(path: Path) -> tuple[str, ...]:
+    """Return the components of ``path`` below the filesystem root."""
+    parts = path.parts
+    return parts[1:] if path.anchor else parts
+
+
+def _fraction(seed: int, operation: str, path: Path) -> float:
+    """Return a number in [0, 1) fixed by the seed, operation and path."""
+    digest = hashlib.blake2b(f"{seed}\0{operation}\0{path}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2**64
+
+
+def _inode(path: Path) -> int:
+    """Return a number identifying ``path``; the tree has no links."""
+    digest = hashlib.blake2b("\0".join(_parts(path)).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def _missing(path: Path) -> FileNotFoundError:
+    return FileNotFoundError(errno.ENOENT, "No such file or directory", str(path))
+
+
+def _not_a_directory(path: Path) -> NotADirectoryError:
+    return NotADirectoryError(errno.ENOTDIR, "Not a directory", str(path))
+
+
+__all__ = [
+    "OPERATIONS",
+    "Fault",
+    "MemoryEntry",
+    "MemoryFilesystem",
+    "MemoryListing",
+    "MemoryStat",
+    "SyntheticTree",
+]
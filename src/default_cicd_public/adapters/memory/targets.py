@@ -0,0 +1,76 @@
+"""Marker validation of known project roots on a memory filesystem."""
+
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+from default_cicd_public.adapters.filesystem.targets import DEFAULT_MAX_WORKERS
+from default_cicd_public.adapters.filesystem.throttle import IOThrottle
+from default_cicd_public.adapters.memory.filesystem import MemoryFilesystem
+from default_cicd_public.domain.models import MARKER_FILE, DiscoveredProject
+
+
+class MemoryTargetValidator:
+    """Validates the marker file of known project roots on a memory filesystem."""
+
+    def __init__(
+        self,
+        filesystem: MemoryFilesystem,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        throttle: IOThrottle | None = None,
+    ) -> None:
+        """
+        Configure the validator.
+
+        Args:
+            filesystem: The tree holding the projects.
+            max_workers: Maximum number of marker checks in flight.
+            throttle: Shared I/O budget; each marker stat takes one metadata
+                token. None means unthrottled.
+        """
+        self.filesystem = filesystem
+        self.max_workers = max_workers
+        self.throttle = throttle or IOThrottle()
+
+    def __call__(
+        self,
+        roots: Sequence[Path],
+        markers: Sequence[Path] = (MARKER_FILE,),
+    ) -> Iterator[DiscoveredProject]:
+        """
+        Check the marker files of already-known project roots.
+
+        Args:
+            roots: Project root directories.
+            markers: Marker paths relative to a project root, in priority order.
+
+        Yields:
+            DiscoveredProject instances for the roots carrying a marker, in the
+            order of ``roots``. Roots without a marker are left out.
+        """
+        if not roots:
+            return
+        marker_tuple = tuple(markers)
+        workers = max(1, min(self.max_workers, len(roots)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="validate") as pool:
+            for project in pool.map(self._check, roots, repeat(marker_tuple)):
+                if project is not None:
+                    yield project
+
+    def _check(self, root: Path, markers: tuple[Path, ...]) -> DiscoveredProject | None:
+        """Return the project for ``root`` if it carries one of the markers."""
+        for marker in markers:
+            self.throttle.metadata()
+            try:
+                marker_stat = self.filesystem.stat(root / marker)
+            except OSError:
+                continue
+            if marker_stat.is_file:
+                return DiscoveredProject(
+                    root_path=root,
+                    github_path=root / ".github",
+                    marker=marker,
+                    device=marker_stat.device,
+                )
+        return None
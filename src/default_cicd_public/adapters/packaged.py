@@ -0,0 +1,161 @@
+"""Template bundle packaged into the wheel as a single resource.
+
+At build time the ``.github/`` directory of the checkout is serialized into
+``templates.bundle.json`` inside the package: a manifest of every file's path,
+mode and SHA-256 digest plus its base64-encoded content, and the digest of the
+whole bundle. An installed tool loads its templates with one
+:mod:`importlib.resources` read and no source-side filesystem traversal.
+
+Source checkouts and editable installs carry no resource; there the loader
+returns None and callers fall back to the checkout's ``.github/``.
+"""
+
+import base64
+import json
+import sys
+import threading
+from importlib.resources import files
+from pathlib import Path
+from typing import cast
+
+from default_cicd_public.domain.models import TemplateBundle, TemplateFile
+
+if sys.version_info >= (3, 11):
+    from importlib.resources.abc import Traversable
+else:
+    from importlib.abc import Traversable
+
+RESOURCE_NAME = "templates.bundle.json"
+FORMAT_VERSION = 1
+
+
+class BundleFormatError(ValueError):
+    """Raised when a packaged bundle is malformed or inconsistent."""
+
+
+def dump_bundle(bundle: TemplateBundle, *, version: str) -> bytes:
+    """
+    Serialize a bundle and its manifest into the packaged resource format.
+
+    Args:
+        bundle: The bundle to package.
+        version: Version of the tool the bundle ships with.
+
+    Returns:
+        The UTF-8 encoded JSON document.
+    """
+    document: dict[str, object] = {
+        "format": FORMAT_VERSION,
+        "version": version,
+        "digest": bundle.digest,
+        "files": [
+            {
+                "path": file.path.as_posix(),
+                "mode": file.mode,
+                "digest": file.digest,
+                "content": base64.b64encode(file.content).decode("ascii"),
+            }
+            for file in sorted(bundle.files, key=lambda f: f.path)
+        ],
+    }
+    return json.dumps(document, indent=1, sort_keys=True).encode()
+
+
+def parse_bundle(data: bytes) -> TemplateBundle:
+    """
+    Rebuild a bundle from the packaged resource format.
+
+    The per-file digests are taken from the manifest instead of hashing the
+    contents again; the bundle digest recomputed from them must match the
+    manifest's, which catches truncated or hand-edited resources.
+
+    Args:
+        data: The resource contents.
+
+    Returns:
+        The bundle, with ``source`` naming the packaged version.
+
+    Raises:
+        BundleFormatError: If the document is malformed or its digest does not
+            match its files.
+    """
+    try:
+        document = cast("dict[str, object]", json.loads(data))
+        format_version = document.get("format")
+    except (ValueError, AttributeError) as e:
+        msg = f"malformed template bundle: {e}"
+        raise BundleFormatError(msg) from e
+    if format_version != FORMAT_VERSION:
+        msg = f"unsupported template bundle format {format_version!r}"
+        raise BundleFormatError(msg)
+
+    try:
+        entries = cast("list[dict[str, object]]", document["files"])
+        bundle = TemplateBundle(
+            source=f"packaged:{document['version']}",
+            files=tuple(
+                TemplateFile(
+                    path=Path(str(entry["path"])),
+                    mode=int(cast("int", entry["mode"])),
+                    digest=str(entry["digest"]),
+                    content=base64.b64decode(str(entry["content"]), validate=True),
+                )
+                for entry in entries
+            ),
+        )
+    except (ValueError, KeyError, TypeError) as e:
+        msg = f"malformed template bundle: {e}"
+        raise BundleFormatError(msg) from e
+
+    if bundle.digest != document.get("digest"):
+        msg = "template bundle digest does not match its manifest"
+        raise BundleFormatError(msg)
+    return bundle
+
+
+class PackagedBundleLoader:
+    """Loads the bundle packaged with the tool, reading the resource once."""
+
+    def __init__(self, resource: Traversable | None = None) -> None:
+        """
+        Configure the loader.
+
+        Args:
+            resource: The bundle resource. Defaults to ``templates.bundle.json``
+                in this package.
+        """
+        self.resource = resource or files("default_cicd_public") / RESOURCE_NAME
+        self._bundle: TemplateBundle | None = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def __call__(self) -> TemplateBundle | None:
+        """
+        Return the packaged bundle.
+
+        Returns:
+            The bundle, or None if this installation carries none.
+
+        Raises:
+            BundleFormatError: If the resource is corrupt.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._bundle = self._read()
+                self._loaded = True
+            return self._bundle
+
+    def _read(self) -> TemplateBundle | None:
+        """Read and parse the resource if it exists."""
+        if not self.resource.is_file():
+            return None
+        return parse_bundle(self.resource.read_bytes())
+
+
+__all__ = [
+    "RESOURCE_NAME",
+    "BundleFormatError",
+    "PackagedBundleLoader",
+    "dump_bundle",
+    "parse_bundle",
+]
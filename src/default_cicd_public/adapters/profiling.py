@@ -0,0 +1,248 @@
+"""Run profiling with cProfile or a lightweight stack sampler.
+
+A :class:`RunProfiler` is started once per CLI invocation and adapters mark the
+interesting parts of a run with :func:`phase`. When no profiler is active,
+:func:`phase` is a no-op, so the markers cost nothing in normal runs.
+
+Two modes are supported:
+
+- ``cprofile`` keeps one :class:`cProfile.Profile` per phase and switches between
+  them at phase boundaries. From Python 3.12 cProfile is built on
+  :mod:`sys.monitoring`, so the enabled instance sees every thread and only one
+  instance may be enabled at a time. Before 3.12 an instance only sees the
+  thread that enabled it, so every thread started while profiling (the
+  adaptive scheduler's workers, the render and git pools) enables its own
+  instance, attributed to the phase that was current when the thread started;
+  worker pools live no longer than the phase that creates them. It writes
+  ``<phase>.pstats`` per phase and a merged ``run.pstats``.
+- ``sampling`` captures the stacks of all threads at a fixed interval and writes
+  ``run.collapsed`` in the collapsed-stack format read by flamegraph tools. Every
+  stack is rooted at a ``phase:<name>`` frame, so phases show up as the first
+  level of the flame graph.
+"""
+
+import cProfile
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Generator
+from contextlib import contextmanager
+from pathlib import Path
+from types import FrameType
+
+# Phases that adapters mark; the whole run is profiled when none is selected.
+PHASES = ("discover", "render", "copy", "commit", "compare")
+PROFILE_MODES = ("cprofile", "sampling")
+
+# Label for everything outside a marked phase
+RUN_LABEL = "run"
+
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# Before 3.12 a cProfile instance only sees its own thread; from 3.12 on it sees
+# all of them and a second enabled instance raises ValueError.
+_PROFILE_PER_THREAD = sys.version_info < (3, 12)
+
+_active_profiler: "RunProfiler | None" = None
+
+
+class RunProfiler:
+    """Collects a cProfile or sampling profile for a run or selected phases."""
+
+    def __init__(
+        self,
+        mode: str,
+        output_dir: Path,
+        phases: frozenset[str] = frozenset(),
+        *,
+        sample_interval: float = DEFAULT_SAMPLE_INTERVAL,
+    ) -> None:
+        """
+        Configure the profiler without starting it.
+
+        Args:
+            mode: Either ``"cprofile"`` or ``"sampling"``.
+            output_dir: Directory receiving the profile files.
+            phases: Phases to profile. Empty means the whole run.
+            sample_interval: Seconds between stack samples in sampling mode.
+        """
+        if mode not in PROFILE_MODES:
+            msg = f"Unknown profile mode: {mode}"
+            raise ValueError(msg)
+        self.mode = mode
+        self.output_dir = output_dir
+        self.phases = phases
+        self.sample_interval = sample_interval
+        self._labels: list[str] = [RUN_LABEL]
+        self._profiles: dict[str, cProfile.Profile] = {}
+        # Profiles of threads started while profiling, with their phase
+        self._thread_profiles: list[tuple[str, cProfile.Profile]] = []
+        self._thread_lock = threading.Lock()
+        self._samples: Counter[str] = Counter()
+        self._stop_sampling = threading.Event()
+        self._sampler: threading.Thread | None = None
+
+    @property
+    def current_phase(self) -> str:
+        """Return the innermost active phase label."""
+        return self._labels[-1]
+
+    def start(self) -> None:
+        """Start profiling and make this the active profiler."""
+        global _active_profiler
+        _active_profiler = self
+        if self.mode == "cprofile":
+            if _PROFILE_PER_THREAD:
+                threading.setprofile(self._profile_thread)
+            self._enable(RUN_LABEL)
+        else:
+            self._sampler = threading.Thread(
+                target=self._sample_loop, name="profile-sampler", daemon=True
+            )
+            self._sampler.start()
+
+    def stop(self) -> list[Path]:
+        """
+        Stop profiling and write the collected profiles.
+
+        Returns:
+            Paths of the files written.
+        """
+        global _active_profiler
+        if _active_profiler is self:
+            _active_profiler = None
+        if self.mode == "cprofile":
+            if _PROFILE_PER_THREAD:
+                threading.setprofile(None)
+            self._disable(self.current_phase)
+            return self._write_pstats()
+        self._stop_sampling.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        return self._write_collapsed()
+
+    @contextmanager
+    def phase(self, name: str) -> Generator[None, None, None]:
+        """Attribute everything inside the block to the phase ``name``."""
+        outer = self.current_phase
+        if self.mode == "cprofile":
+            self._disable(outer)
+            self._labels.append(name)
+            self._enable(name)
+        else:
+            self._labels.append(name)
+        try:
+            yield
+        finally:
+            if self.mode == "cprofile":
+                self._disable(name)
+                self._labels.pop()
+                self._enable(outer)
+            else:
+                self._labels.pop()
+
+    def _is_selected(self, label: str) -> bool:
+        """Return True if samples in ``label`` should be recorded."""
+        return not self.phases or label in self.phases
+
+    def _enable(self, label: str) -> None:
+        """Enable the cProfile instance for ``label`` if it is selected."""
+        if self._is_selected(label):
+            self._profiles.setdefault(label, cProfile.Profile()).enable()
+
+    def _disable(self, label: str) -> None:
+        """Disable the cProfile instance for ``label`` if it is running."""
+        profile = self._profiles.get(label)
+        if profile is not None:
+            profile.disable()
+
+    def _profile_thread(self, frame: FrameType, event: str, arg: object) -> None:
+        """Profile a new thread in the current phase; installed before 3.12 only.
+
+        Called on the thread's first profiling event, it replaces itself with
+        a cProfile instance of the thread's own.
+        """
+        label = self.current_phase
+        if not self._is_selected(label):
+            sys.setprofile(None)
+            return
+        profile = cProfile.Profile()
+        with self._thread_lock:
+            self._thread_profiles.append((label, profile))
+        profile.enable()
+
+    def _write_pstats(self) -> list[Path]:
+        """Write one pstats file per phase and a merged run file."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        by_label: dict[str, list[cProfile.Profile]] = {}
+        for label, profile in [*self._profiles.items(), *self._thread_profiles]:
+            by_label.setdefault(label, []).append(profile)
+
+        written: list[Path] = []
+        for label, profiles in by_label.items():
+            if label == RUN_LABEL:
+                continue
+            path = self.output_dir / f"{label}.pstats"
+            pstats.Stats(*profiles).dump_stats(path)
+            written.append(path)
+
+        everything = [profile for profiles in by_label.values() for profile in profiles]
+        if everything:
+            path = self.output_dir / f"{RUN_LABEL}.pstats"
+            pstats.Stats(*everything).dump_stats(path)
+            written.append(path)
+        return written
+
+    def _write_collapsed(self) -> list[Path]:
+        """Write the sampled stacks in collapsed-stack format."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"{RUN_LABEL}.collapsed"
+        lines = [f"{stack} {count}" for stack, count in sorted(self._samples.items())]
+        path.write_text("\n".join(lines) + ("\n" if lines else ""), encoding="utf-8")
+        return [path]
+
+    def _sample_loop(self) -> None:
+        """Sample every thread's stack until stopped."""
+        own_id = threading.get_ident()
+        while not self._stop_sampling.wait(self.sample_interval):
+            label = self.current_phase
+            if not self._is_selected(label):
+                continue
+            frames = sys._current_frames()  # pyright: ignore[reportPrivateUsage]
+            for thread_id, frame in frames.items():
+                if thread_id == own_id:
+                    continue
+                self._samples[f"phase:{label};{_collapse(frame)}"] += 1
+
+
+def _collapse(frame: FrameType | None) -> str:
+    """Render a frame chain root-first as semicolon-separated frame names."""
+    names: list[str] = []
+    while frame is not None:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", "?")
+        names.append(f"{module}:{code.co_name}:{code.co_firstlineno}")
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(names).replace(" ", "_")
+
+
+@contextmanager
+def phase(name: str) -> Generator[None, None, None]:
+    """Mark a phase of the run for the active profiler, if there is one."""
+    profiler = _active_profiler
+    if profiler is None:
+        yield
+        return
+    with profiler.phase(name):
+        yield
+
+
+def profile_stamp() -> str:
+    """Return a timestamp suitable for naming a profile output directory."""
+    return time.strftime("%Y%m%d-%H%M%S")
+
+
+__all__ = ["PHASES", "PROFILE_MODES", "RunProfiler", "phase", "profile_stamp"]
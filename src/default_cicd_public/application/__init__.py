@@ -2,9 +2,40 @@
 
 from default_cicd_public.application.ports import (
     AppServices,
+    BeginBackupRun,
+    CheckDrift,
+    CommitChanges,
+    ConfigureIOLimits,
+    ConfigureLocking,
     CopyTemplates,
     DiscoverProjects,
+    EndBackupRun,
+    FindUnchangedRun,
     GetSourceGithubPath,
+    LoadPackagedTemplates,
+    LoadTemplates,
+    RecordRun,
+    RenderTemplates,
+    RollbackRun,
+    ValidateTargets,
 )
 
-__all__ = ["AppServices", "CopyTemplates", "DiscoverProjects", "GetSourceGithubPath"]
+__all__ = [
+    "AppServices",
+    "BeginBackupRun",
+    "CheckDrift",
+    "CommitChanges",
+    "ConfigureIOLimits",
+    "ConfigureLocking",
+    "CopyTemplates",
+    "DiscoverProjects",
+    "EndBackupRun",
+    "FindUnchangedRun",
+    "GetSourceGithubPath",
+    "LoadPackagedTemplates",
+    "LoadTemplates",
+    "RecordRun",
+    "RenderTemplates",
+    "RollbackRun",
+    "ValidateTargets",
+]
@@ -0,0 +1,342 @@
+"""Latency-aware adaptive concurrency for filesystem work.
+
+Work items are grouped into lanes, one per mount (device), because a local SSD
+and a congested NFS export want very different numbers of operations in
+flight. Every lane has its own :class:`AIMDLimit`, which starts at the minimum,
+grows while latency stays near the lane's baseline and backs off
+multiplicatively when latency climbs, always staying within the user's bounds.
+
+A tree walk that feeds itself through ``expand`` can bound its frontier with
+``max_pending``: every item is handed an allowance of follow-ups before it
+runs, and allowances are reserved until the item completes, so the queued and
+promised follow-ups of all lanes together stay within the cap. When the cap
+is reached, items wait for running ones to finish; only when nothing runs at
+all is one item started with the minimum allowance, so a walk always makes
+progress and overshoots the cap by at most one item per level it descends
+that way.
+"""
+
+import os
+import time
+from collections import deque
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+
+from default_cicd_public.domain.models import ConcurrencyBounds, LaneStats
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# A sample counts as congested when it exceeds the baseline by this factor ...
+DEFAULT_TOLERANCE = 2.0
+# ... and by at least this many seconds, so microsecond jitter on fast local
+# disks does not look like congestion.
+DEFAULT_LATENCY_FLOOR = 0.002
+# Multiplicative decrease applied on congestion
+DEFAULT_BACKOFF = 0.75
+# How quickly the baseline follows latencies above it
+DEFAULT_BASELINE_DRIFT = 0.005
+# Smallest allowance an item runs with under max_pending: room for one new item
+# besides the item's own continuation
+MIN_ALLOWANCE = 2
+
+
+class AIMDLimit:
+    """Additive-increase / multiplicative-decrease limit driven by latency."""
+
+    def __init__(
+        self,
+        bounds: ConcurrencyBounds,
+        *,
+        tolerance: float = DEFAULT_TOLERANCE,
+        latency_floor: float = DEFAULT_LATENCY_FLOOR,
+        backoff: float = DEFAULT_BACKOFF,
+        baseline_drift: float = DEFAULT_BASELINE_DRIFT,
+    ) -> None:
+        """
+        Start at the lower bound in slow-start mode.
+
+        Args:
+            bounds: Minimum and maximum limit.
+            tolerance: Latency/baseline ratio treated as congestion.
+            latency_floor: Minimum absolute excess over the baseline, in seconds,
+                treated as congestion.
+            backoff: Factor applied to the limit on congestion.
+            baseline_drift: Fraction by which the baseline follows slower samples.
+        """
+        self.bounds = bounds
+        self.tolerance = tolerance
+        self.latency_floor = latency_floor
+        self.backoff = backoff
+        self.baseline_drift = baseline_drift
+        self.limit = float(bounds.min_workers)
+        self.baseline: float | None = None
+        self._slow_start = True
+        self._since_decrease = 0
+
+    @property
+    def current(self) -> int:
+        """Return the limit as a whole number of in-flight operations."""
+        return max(self.bounds.min_workers, min(self.bounds.max_workers, int(self.limit)))
+
+    def record(self, latency: float, in_flight: int) -> None:
+        """
+        Feed one completed operation into the controller.
+
+        Args:
+            latency: Duration of the operation in seconds.
+            in_flight: Operations still running when it completed.
+        """
+        if self.baseline is None or latency < self.baseline:
+            self.baseline = latency
+        else:
+            self.baseline += (latency - self.baseline) * self.baseline_drift
+        self._since_decrease += 1
+
+        threshold = max(self.baseline * self.tolerance, self.baseline + self.latency_floor)
+        if latency > threshold:
+            # Back off at most once per window of ``current`` samples, so one
+            # slow burst does not collapse the limit to the minimum.
+            if self._since_decrease >= self.current:
+                self.limit = max(float(self.bounds.min_workers), self.limit * self.backoff)
+                self._slow_start = False
+                self._since_decrease = 0
+            return
+
+        # Only grow when the current limit is actually being used.
+        if in_flight + 1 < self.current:
+            return
+        step = 1.0 if self._slow_start else 1.0 / self.limit
+        self.limit = min(float(self.bounds.max_workers), self.limit + step)
+
+
+@dataclass
+class _Lane(Generic[T]):
+    """Pending work and statistics of one lane."""
+
+    limit: AIMDLimit
+    pool: ThreadPoolExecutor
+    label: str
+    pending: deque[T] = field(default_factory=lambda: deque())
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    operations: int = 0
+    total_latency: float = 0.0
+    started: float | None = None
+    finished: float = 0.0
+
+
+@dataclass(frozen=True)
+class _Frontier(Generic[T]):
+    """The cap on queued follow-ups of a run and how items receive their allowance."""
+
+    max_pending: int
+    # Largest allowance of a single item
+    share: int
+    allow: Callable[[T, int], T]
+
+
+class AdaptiveScheduler(Generic[T, R]):
+    """Runs work items with a per-lane adaptive concurrency limit.
+
+    A scheduler drives a single :meth:`run`; its lanes and thread pools are
+    torn down when that run ends.
+    """
+
+    def __init__(
+        self,
+        bounds: ConcurrencyBounds,
+        *,
+        clock: Callable[[], float] = time.perf_counter,
+        limit_factory: Callable[[ConcurrencyBounds], AIMDLimit] = AIMDLimit,
+    ) -> None:
+        """
+        Configure the scheduler.
+
+        Args:
+            bounds: Bounds for every lane's limit.
+            clock: Monotonic clock used to time operations.
+            limit_factory: Builds the controller of a new lane.
+        """
+        self.bounds = bounds
+        self._clock = clock
+        self._limit_factory = limit_factory
+        self._lanes: dict[Hashable, _Lane[T]] = {}
+        # Items queued on all lanes, and allowances promised to running items
+        self._queued = 0
+        self._reserved: dict[Future[tuple[R, float]], int] = {}
+        self.peak_pending = 0
+
+    def run(
+        self,
+        items: Iterable[T],
+        work: Callable[[T], R],
+        *,
+        lane_of: Callable[[T], Hashable],
+        label_of: Callable[[T], str] = str,
+        expand: Callable[[R], Iterable[T]] | None = None,
+        max_pending: int | None = None,
+        allow: Callable[[T, int], T] | None = None,
+    ) -> Iterator[R]:
+        """
+        Run ``work`` over ``items`` and yield results as they complete.
+
+        Args:
+            items: Initial work items.
+            work: Function executed on a worker thread for each item.
+            lane_of: Key of the lane (e.g. device number) an item belongs to.
+            label_of: Path-like label of an item; a lane is labelled with the
+                common ancestor of its items.
+            expand: Optional function returning follow-up items for a result,
+                which lets a tree walk feed itself.
+            max_pending: Optional cap on the follow-up items queued across
+                all lanes; see the module documentation.
+            allow: Required with ``max_pending``. Called as ``allow(item, n)``
+                before an item runs, it returns the item to run, which must
+                expand to at most ``n`` follow-ups.
+
+        Yields:
+            Results in completion order. Exceptions raised by ``work`` are
+            re-raised here after outstanding work is cancelled.
+
+        Raises:
+            ValueError: If ``max_pending`` is below :data:`MIN_ALLOWANCE` or
+                given without ``allow``.
+        """
+        frontier: _Frontier[T] | None = None
+        if max_pending is not None:
+            if max_pending < MIN_ALLOWANCE or allow is None:
+                msg = f"max_pending needs allow and at least {MIN_ALLOWANCE}, got {max_pending}"
+                raise ValueError(msg)
+            # Split the cap so a full set of workers can run at once.
+            share = max(MIN_ALLOWANCE, max_pending // self.bounds.max_workers)
+            frontier = _Frontier(max_pending, share, allow)
+        running: dict[Future[tuple[R, float]], _Lane[T]] = {}
+        try:
+            for item in items:
+                self._enqueue(item, lane_of, label_of, initial=True)
+            while True:
+                self._fill(running, work, frontier)
+                if not running:
+                    return
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    lane = running.pop(future)
+                    self._reserved.pop(future, None)
+                    result, latency = future.result()
+                    self._complete(lane, latency)
+                    if expand is not None:
+                        for child in expand(result):
+                            self._enqueue(child, lane_of, label_of)
+                    yield result
+        finally:
+            for future in running:
+                future.cancel()
+            for lane in self._lanes.values():
+                lane.pool.shutdown(wait=False, cancel_futures=True)
+
+    def report(self) -> list[LaneStats]:
+        """Return the chosen concurrency and measured performance per lane."""
+        stats: list[LaneStats] = []
+        for lane in self._lanes.values():
+            elapsed = lane.finished - lane.started if lane.started is not None else 0.0
+            stats.append(
+                LaneStats(
+                    label=lane.label,
+                    workers=lane.limit.current,
+                    peak_in_flight=lane.peak_in_flight,
+                    operations=lane.operations,
+                    throughput=lane.operations / elapsed if elapsed > 0 else 0.0,
+                    mean_latency=lane.total_latency / lane.operations if lane.operations else 0.0,
+                )
+            )
+        return sorted(stats, key=lambda lane: lane.label)
+
+    def _enqueue(
+        self,
+        item: T,
+        lane_of: Callable[[T], Hashable],
+        label_of: Callable[[T], str],
+        *,
+        initial: bool = False,
+    ) -> None:
+        """Queue ``item`` on its lane, creating the lane on first use."""
+        key = lane_of(item)
+        label = label_of(item)
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = _Lane[T](
+                limit=self._limit_factory(self.bounds),
+                pool=ThreadPoolExecutor(
+                    max_workers=self.bounds.max_workers, thread_name_prefix="adaptive"
+                ),
+                label=label,
+            )
+            self._lanes[key] = lane
+        else:
+            lane.label = _common_ancestor(lane.label, label)
+        # Initial items run in the order given; follow-up items run newest
+        # first, which keeps a tree walk depth-first and its frontier small.
+        if initial:
+            lane.pending.appendleft(item)
+        else:
+            lane.pending.append(item)
+        self._queued += 1
+        self.peak_pending = max(self.peak_pending, self._queued)
+
+    def _fill(
+        self,
+        running: dict[Future[tuple[R, float]], _Lane[T]],
+        work: Callable[[T], R],
+        frontier: _Frontier[T] | None,
+    ) -> None:
+        """Submit pending items until every lane reaches its limit or the frontier is full."""
+        for lane in self._lanes.values():
+            while lane.pending and lane.in_flight < lane.limit.current:
+                allowance = 0
+                if frontier is not None:
+                    # The item's own place in the queue is freed when it runs.
+                    reserved = sum(self._reserved.values())
+                    free = frontier.max_pending - (self._queued - 1) - reserved
+                    allowance = min(free, frontier.share)
+                    if allowance < MIN_ALLOWANCE:
+                        if running:
+                            # Wait for a running item to give back its allowance.
+                            return
+                        allowance = MIN_ALLOWANCE
+                item = lane.pending.pop()
+                self._queued -= 1
+                if frontier is not None:
+                    item = frontier.allow(item, allowance)
+                if lane.started is None:
+                    lane.started = self._clock()
+                lane.in_flight += 1
+                lane.peak_in_flight = max(lane.peak_in_flight, lane.in_flight)
+                future = lane.pool.submit(self._timed, work, item)
+                running[future] = lane
+                if frontier is not None:
+                    self._reserved[future] = allowance
+
+    def _timed(self, work: Callable[[T], R], item: T) -> tuple[R, float]:
+        """Run ``work`` on a worker thread and measure its latency."""
+        start = self._clock()
+        result = work(item)
+        return result, self._clock() - start
+
+    def _complete(self, lane: _Lane[T], latency: float) -> None:
+        """Account for a finished operation and adjust the lane's limit."""
+        lane.in_flight -= 1
+        lane.operations += 1
+        lane.total_latency += latency
+        lane.finished = self._clock()
+        lane.limit.record(latency, lane.in_flight)
+
+
+def _common_ancestor(first: str, second: str) -> str:
+    """Return the deepest common path of two labels, or ``first`` if none."""
+    try:
+        return os.path.commonpath([first, second]) or first
+    except ValueError:
+        return first
@@ -0,0 +1,749 @@
+"""Distribution use case shared by the CLI and the daemon.
+
+The steps are kept separate so that callers can report progress between them
+and so the daemon can reuse a warm project index instead of discovering again.
+"""
+
+import hashlib
+import heapq
+import statistics
+import time
+from collections.abc import Callable, Generator, Sequence
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Protocol
+
+from default_cicd_public.application.concurrency import AdaptiveScheduler
+from default_cicd_public.application.ports import AppServices
+from default_cicd_public.domain.models import (
+    DEFAULT_CONCURRENCY,
+    BackupRun,
+    BareRepository,
+    CommitRequest,
+    CommitResult,
+    CommitStatus,
+    ConcurrencyBounds,
+    ConcurrencyReport,
+    CopyResult,
+    CopyStatus,
+    DiscoveredProject,
+    DriftState,
+    LaneStats,
+    ProjectDrift,
+    RenderedTemplates,
+    RepositoryResult,
+    RepositoryUpdate,
+    RunRecord,
+    ScanReport,
+    TemplateBundle,
+    TemplateFamily,
+    WalkedDirectories,
+)
+
+
+class PhaseMarker(Protocol):
+    """Protocol for marking phases of a run, e.g. for profiling."""
+
+    def __call__(self, name: str) -> AbstractContextManager[None]:
+        """Return a context manager spanning the phase ``name``."""
+        ...
+
+
+def no_phase(name: str) -> AbstractContextManager[None]:
+    """Phase marker that does nothing."""
+    return nullcontext()
+
+
+@dataclass
+class DiscoveryOutcome:
+    """Target projects of a run and how they were found."""
+
+    projects: list[DiscoveredProject]
+    rejected_targets: list[Path] = field(default_factory=lambda: [])
+    lanes: list[LaneStats] = field(default_factory=lambda: [])
+
+
+@dataclass
+class CopyOutcome:
+    """Results of copying templates to every target project."""
+
+    results: list[CopyResult]
+    lanes: list[LaneStats] = field(default_factory=lambda: [])
+    # Seconds each project's copy took, and the wall time of the whole phase
+    durations: dict[Path, float] = field(default_factory=lambda: {})
+    seconds: float = 0.0
+
+
+@dataclass
+class CopyPlan:
+    """Target projects in copy order and the expected duration of the copy phase."""
+
+    projects: list[DiscoveredProject]
+    # None if no project has a recorded duration
+    estimate: float | None = None
+    # Number of projects whose duration was recorded by an earlier run
+    known: int = 0
+
+
+@dataclass
+class DriftOutcome:
+    """Drift of every target project, read without writing anything."""
+
+    results: list[ProjectDrift]
+    lanes: list[LaneStats] = field(default_factory=lambda: [])
+
+
+def discover_targets(
+    services: AppServices,
+    families: Sequence[TemplateFamily],
+    *,
+    search_roots: Sequence[Path] | None = None,
+    target_roots: Sequence[Path] | None = None,
+    concurrency: ConcurrencyBounds = DEFAULT_CONCURRENCY,
+    exclude: Sequence[str] = (),
+    scan_report: ScanReport | None = None,
+    walked: WalkedDirectories | None = None,
+    phase: PhaseMarker = no_phase,
+) -> DiscoveryOutcome:
+    """
+    Find the projects to update, either by walking or from a known list.
+
+    Args:
+        services: The application services.
+        families: Template families whose markers select projects.
+        search_roots: Roots of the filesystem walk, scanned together; used
+            when ``target_roots`` is None.
+        target_roots: Known project roots to validate instead of walking.
+        concurrency: Bounds for the adaptive discovery scheduler.
+        exclude: Patterns of directories the walk does not descend into.
+        scan_report: If given, receives the cost of the walk per subtree.
+        walked: If given, receives the directories the walk listed, for
+            :func:`record_run`.
+        phase: Marks the ``discover`` phase.
+
+    Returns:
+        The target projects sorted by path, once per resolved directory and
+        without the template sources themselves, plus the listed roots that
+        carried no marker.
+    """
+    markers = [family.marker for family in families]
+    outcome = DiscoveryOutcome(projects=[])
+    with phase("discover"):
+        if target_roots is not None:
+            projects = list(services.validate_targets(target_roots, markers))
+            accepted = {project.root_path for project in projects}
+            outcome.rejected_targets = [root for root in target_roots if root not in accepted]
+        else:
+            if not search_roots:
+                msg = "discover_targets needs search_roots or target_roots"
+                raise ValueError(msg)
+            report = ConcurrencyReport()
+            projects = list(
+                services.discover_projects(
+                    search_roots,
+                    markers,
+                    concurrency=concurrency,
+                    report=report,
+                    exclude=exclude,
+                    scan_report=scan_report,
+                    walked=walked,
+                )
+            )
+            outcome.lanes = report.lanes
+
+    outcome.projects = unique_projects(exclude_sources(projects, families))
+    return outcome
+
+
+def exclude_sources(
+    projects: Sequence[DiscoveredProject], families: Sequence[TemplateFamily]
+) -> list[DiscoveredProject]:
+    """Drop the projects that hold one of the template source directories."""
+    source_roots = {
+        family.source_github_path.parent.resolve()
+        for family in families
+        if family.source_github_path is not None
+    }
+    return [project for project in projects if project.root_path.resolve() not in source_roots]
+
+
+def unique_projects(projects: Sequence[DiscoveredProject]) -> list[DiscoveredProject]:
+    """
+    Keep one project per resolved root directory.
+
+    Several spellings of a listed root, or roots reached through symlinks,
+    would otherwise be copied to twice.
+
+    Returns:
+        The projects sorted by path, keeping the first of each directory.
+    """
+    seen: set[Path] = set()
+    unique: list[DiscoveredProject] = []
+    for project in sorted(projects, key=lambda project: project.root_path):
+        resolved = project.root_path.resolve()
+        if resolved not in seen:
+            seen.add(resolved)
+            unique.append(project)
+    return unique
+
+
+def load_bundles(
+    services: AppServices, families: Sequence[TemplateFamily]
+) -> dict[Path, TemplateBundle]:
+    """
+    Load every family's bundle, keyed by marker.
+
+    Raises:
+        FileNotFoundError: If a family asks for the packaged bundle and this
+            installation carries none.
+    """
+    bundles: dict[Path, TemplateBundle] = {}
+    for family in families:
+        if family.source_github_path is not None:
+            bundles[family.marker] = services.load_templates(family.source_github_path)
+            continue
+        packaged = services.load_packaged_templates()
+        if packaged is None:
+            msg = "This installation has no packaged templates; pass a source directory"
+            raise FileNotFoundError(msg)
+        bundles[family.marker] = packaged
+    return bundles
+
+
+def render_for_projects(
+    services: AppServices,
+    bundles: dict[Path, TemplateBundle],
+    projects: Sequence[DiscoveredProject],
+    *,
+    phase: PhaseMarker = no_phase,
+) -> RenderedTemplates:
+    """
+    Render each family's bundle with the values of its target projects.
+
+    Args:
+        services: The application services.
+        bundles: Template bundles keyed by marker.
+        projects: Target projects; each is rendered with the bundle of its marker.
+        phase: Marks the ``render`` phase.
+
+    Returns:
+        The rendered bundles and errors of all families, keyed by project root.
+    """
+    rendered = RenderedTemplates()
+    with phase("render"):
+        for marker, bundle in bundles.items():
+            family_projects = [project for project in projects if project.marker == marker]
+            if family_projects:
+                rendered.merge(services.render_templates(bundle, family_projects))
+    return rendered
+
+
+@contextmanager
+def backup_run(
+    services: AppServices, *, enabled: bool = True, backup_dir: Path | None = None
+) -> Generator[BackupRun | None, None, None]:
+    """
+    Back up every file the copies inside the block overwrite.
+
+    Args:
+        services: The application services.
+        enabled: If False, nothing is backed up and the block receives None.
+        backup_dir: Backup directory. None uses the default location.
+
+    Yields:
+        The backup run; its file count is final once the block exits.
+    """
+    if not enabled:
+        yield None
+        return
+    run = services.begin_backup_run(backup_dir)
+    try:
+        yield run
+    finally:
+        services.end_backup_run()
+
+
+def copy_to_projects(
+    services: AppServices,
+    bundles: dict[Path, TemplateBundle],
+    projects: Sequence[DiscoveredProject],
+    *,
+    rendered: RenderedTemplates | None = None,
+    dry_run: bool = False,
+    concurrency: ConcurrencyBounds = DEFAULT_CONCURRENCY,
+    on_result: Callable[[CopyResult], None] | None = None,
+    phase: PhaseMarker = no_phase,
+) -> CopyOutcome:
+    """
+    Copy each project's bundle, tuning the copies in flight per mount.
+
+    Args:
+        services: The application services.
+        bundles: Template bundles keyed by marker.
+        projects: Target projects; each receives the bundle of its marker.
+        rendered: Output of :func:`render_for_projects`; projects it rendered
+            receive their own bundle, projects it failed on are not copied.
+        dry_run: If True, simulate the copies.
+        concurrency: Bounds for the adaptive copy scheduler.
+        on_result: Called with every result as it completes.
+        phase: Marks the ``copy`` phase.
+
+    Returns:
+        The copy results in completion order and the chosen concurrency.
+    """
+
+    rendered = rendered or RenderedTemplates()
+
+    def copy_one(project: DiscoveredProject) -> CopyResult:
+        error = rendered.errors.get(project.root_path)
+        if error is not None:
+            return CopyResult(
+                project=project,
+                status=CopyStatus.ERROR,
+                error_message=f"Rendering failed: {error}",
+            )
+        bundle = rendered.bundles.get(project.root_path, bundles[project.marker])
+        started = time.perf_counter()
+        result = services.copy_templates(bundle, project, dry_run=dry_run)
+        durations[project.root_path] = time.perf_counter() - started
+        return result
+
+    results: list[CopyResult] = []
+    durations: dict[Path, float] = {}
+    scheduler = AdaptiveScheduler[DiscoveredProject, CopyResult](concurrency)
+    started = time.perf_counter()
+    with phase("copy"):
+        for result in scheduler.run(
+            projects,
+            copy_one,
+            lane_of=_copy_lane,
+            label_of=lambda project: str(project.root_path),
+        ):
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+    return CopyOutcome(
+        results=results,
+        lanes=scheduler.report(),
+        durations=durations,
+        seconds=time.perf_counter() - started,
+    )
+
+
+def plan_copies(
+    services: AppServices,
+    projects: Sequence[DiscoveredProject],
+    *,
+    concurrency: ConcurrencyBounds = DEFAULT_CONCURRENCY,
+) -> CopyPlan:
+    """
+    Order the copies longest first and estimate how long they will take.
+
+    Copies are started in the order given, so starting the slowest ones
+    first keeps a few large projects from running alone at the end of the
+    phase. Durations come from the copy history of earlier runs; projects
+    without one are assumed to take the median of the known durations. The
+    estimate replays that order on as many workers as the last recorded run
+    kept busy on average.
+
+    Args:
+        services: The application services.
+        projects: Target projects in discovery order.
+        concurrency: Bounds of the copy scheduler.
+
+    Returns:
+        The projects in copy order, ties kept in discovery order, and the
+        estimate, which is None when no project has a recorded duration.
+    """
+    projects = list(projects)
+    history = services.load_copy_history([project.root_path for project in projects])
+    known = [
+        history.durations[project.root_path]
+        for project in projects
+        if project.root_path in history.durations
+    ]
+    if not known:
+        return CopyPlan(projects=projects)
+    fallback = statistics.median(known)
+    expected = {
+        project.root_path: history.durations.get(project.root_path, fallback)
+        for project in projects
+    }
+    ordered = sorted(projects, key=lambda project: -expected[project.root_path])
+
+    # Every lane can run up to max_workers copies; one worker per lane at least.
+    lanes = len({_copy_lane(project) for project in projects})
+    parallelism = history.parallelism or concurrency.min_workers * lanes
+    workers = max(1, min(round(parallelism), concurrency.max_workers * lanes, len(ordered)))
+    finish = [0.0] * workers
+    for project in ordered:
+        heapq.heapreplace(finish, finish[0] + expected[project.root_path])
+    return CopyPlan(projects=ordered, estimate=max(finish), known=len(known))
+
+
+def record_copy_history(services: AppServices, copies: CopyOutcome) -> None:
+    """
+    Remember how long the successful copies of a run took.
+
+    The run's parallelism is the total copy time over the phase's wall time,
+    i.e. the average number of copies in flight.
+
+    Args:
+        services: The application services.
+        copies: Output of :func:`copy_to_projects`; dry runs are not recorded.
+    """
+    durations = {
+        result.project.root_path: copies.durations[result.project.root_path]
+        for result in copies.results
+        if result.status == CopyStatus.SUCCESS and result.project.root_path in copies.durations
+    }
+    if not durations or copies.seconds <= 0:
+        return
+    parallelism = sum(copies.durations.values()) / copies.seconds
+    services.record_copy_history(durations, parallelism=max(1.0, parallelism))
+
+
+def check_projects(
+    services: AppServices,
+    bundles: dict[Path, TemplateBundle],
+    projects: Sequence[DiscoveredProject],
+    *,
+    rendered: RenderedTemplates | None = None,
+    concurrency: ConcurrencyBounds = DEFAULT_CONCURRENCY,
+    on_result: Callable[[ProjectDrift], None] | None = None,
+    phase: PhaseMarker = no_phase,
+) -> DriftOutcome:
+    """
+    Compare each project with its bundle, tuning the checks in flight per mount.
+
+    Args:
+        services: The application services.
+        bundles: Template bundles keyed by marker.
+        projects: Target projects; each is compared with the bundle of its marker.
+        rendered: Output of :func:`render_for_projects`; projects it rendered
+            are compared with their own bundle, projects it failed on are
+            unreachable.
+        concurrency: Bounds for the adaptive scheduler.
+        on_result: Called with every result as it completes.
+        phase: Marks the ``compare`` phase.
+
+    Returns:
+        The drift of every project sorted by path and the chosen concurrency.
+    """
+    rendered = rendered or RenderedTemplates()
+
+    def check_one(project: DiscoveredProject) -> ProjectDrift:
+        error = rendered.errors.get(project.root_path)
+        if error is not None:
+            return ProjectDrift(
+                project=project,
+                state=DriftState.UNREACHABLE,
+                error_message=f"Rendering failed: {error}",
+            )
+        bundle = rendered.bundles.get(project.root_path, bundles[project.marker])
+        return services.check_drift(bundle, project)
+
+    results: list[ProjectDrift] = []
+    scheduler = AdaptiveScheduler[DiscoveredProject, ProjectDrift](concurrency)
+    with phase("compare"):
+        for result in scheduler.run(
+            projects,
+            check_one,
+            lane_of=_copy_lane,
+            label_of=lambda project: str(project.root_path),
+        ):
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+    results.sort(key=lambda result: result.project.root_path)
+    return DriftOutcome(results=results, lanes=scheduler.report())
+
+
+DEFAULT_COMMIT_MESSAGE = "Update CI/CD templates ({count} file(s))"
+
+# Fields a commit message template may use
+COMMIT_MESSAGE_FIELDS = ("project", "path", "count", "files")
+
+
+def format_commit_message(template: str, result: CopyResult) -> str:
+    """
+    Fill a commit message template for one project.
+
+    The template uses ``str.format`` fields: ``{project}`` (directory name),
+    ``{path}`` (project root), ``{count}`` and ``{files}`` (the changed files,
+    comma-separated, relative to the project root).
+
+    Args:
+        template: The message template.
+        result: The project's copy result.
+
+    Returns:
+        The commit message.
+
+    Raises:
+        ValueError: If the template is malformed or uses unknown fields.
+    """
+    github = result.project.github_path.relative_to(result.project.root_path)
+    return _fill_message(
+        template,
+        project=result.project.root_path.name,
+        path=result.project.root_path,
+        files=[github / path for path in result.files_changed],
+    )
+
+
+def format_repository_message(
+    template: str, repository: BareRepository, files_changed: Sequence[Path]
+) -> str:
+    """
+    Fill a commit message template for one bare repository.
+
+    The fields are those of :func:`format_commit_message`; ``{project}`` is
+    the repository's name without ``.git`` and ``{path}`` its git directory.
+
+    Args:
+        template: The message template.
+        repository: The repository receiving the commit.
+        files_changed: The changed files, relative to .github/.
+
+    Returns:
+        The commit message.
+
+    Raises:
+        ValueError: If the template is malformed or uses unknown fields.
+    """
+    return _fill_message(
+        template,
+        project=repository.name,
+        path=repository.git_dir,
+        files=[Path(".github") / path for path in files_changed],
+    )
+
+
+def _fill_message(template: str, *, project: str, path: Path, files: Sequence[Path]) -> str:
+    """Fill the fields of a commit message template."""
+    values = {
+        "project": project,
+        "path": str(path),
+        "count": len(files),
+        "files": ", ".join(file.as_posix() for file in files),
+    }
+    try:
+        return template.format_map(values)
+    except (KeyError, IndexError, AttributeError) as e:
+        msg = f"unknown field {e} in commit message; use {', '.join(COMMIT_MESSAGE_FIELDS)}"
+        raise ValueError(msg) from e
+
+
+def commit_changes(
+    services: AppServices,
+    results: Sequence[CopyResult],
+    *,
+    message: str = DEFAULT_COMMIT_MESSAGE,
+    push: bool = False,
+    max_workers: int | None = None,
+    phase: PhaseMarker = no_phase,
+) -> list[CommitResult]:
+    """
+    Commit the changed files of every successfully updated project.
+
+    Projects whose copy failed, was a dry run or left every file as it was
+    are not touched.
+
+    Args:
+        services: The application services.
+        results: Results of :func:`copy_to_projects`.
+        message: Commit message template (see :func:`format_commit_message`).
+        push: If True, push every new commit.
+        max_workers: Maximum number of repositories processed at once.
+        phase: Marks the ``commit`` phase.
+
+    Returns:
+        One result per committed project, sorted by project root.
+
+    Raises:
+        ValueError: If the message template is invalid.
+    """
+    requests: list[CommitRequest] = []
+    for result in sorted(results, key=lambda result: result.project.root_path):
+        if result.status != CopyStatus.SUCCESS or not result.files_changed:
+            continue
+        github = result.project.github_path.relative_to(result.project.root_path)
+        requests.append(
+            CommitRequest(
+                project=result.project,
+                paths=tuple(github / path for path in result.files_changed),
+                message=format_commit_message(message, result),
+            )
+        )
+    if not requests:
+        return []
+    with phase("commit"):
+        return list(services.commit_changes(requests, push=push, max_workers=max_workers))
+
+
+def update_repositories(
+    services: AppServices,
+    bundles: dict[Path, TemplateBundle],
+    search_roots: Sequence[Path],
+    *,
+    branch: str | None = None,
+    exclude: Sequence[str] = (),
+    message: str = DEFAULT_COMMIT_MESSAGE,
+    dry_run: bool = False,
+    max_workers: int | None = None,
+    phase: PhaseMarker = no_phase,
+) -> list[RepositoryResult]:
+    """
+    Commit the templates directly into the bare repositories below the roots.
+
+    Args:
+        services: The application services.
+        bundles: Bundles keyed by marker, as from :func:`load_bundles`.
+        search_roots: Roots below which bare repositories are searched.
+        branch: Branch to commit to; None means each repository's HEAD branch.
+        exclude: Patterns of directories the search does not descend into.
+        message: Commit message template (see :func:`format_repository_message`).
+        dry_run: If True, only report which files would change.
+        max_workers: Maximum number of repositories processed at once.
+        phase: Marks the ``discover`` and ``commit`` phases.
+
+    Returns:
+        One result per repository carrying a marker, sorted by git directory.
+
+    Raises:
+        ValueError: If the message template is invalid.
+    """
+    with phase("discover"):
+        repositories = sorted(
+            services.discover_bare_repositories(
+                search_roots,
+                list(bundles),
+                branch=branch,
+                exclude=exclude,
+                max_workers=max_workers,
+            ),
+            key=lambda repository: repository.git_dir,
+        )
+    updates = [
+        RepositoryUpdate(repository=repository, bundle=bundles[repository.marker])
+        for repository in repositories
+    ]
+    if not updates:
+        return []
+    with phase("commit"):
+        return list(
+            services.update_repositories(
+                updates,
+                message=lambda repository, files: format_repository_message(
+                    message, repository, files
+                ),
+                dry_run=dry_run,
+                max_workers=max_workers,
+            )
+        )
+
+
+# Read by the renderer from every target, so its changes change the output
+RENDER_CONTEXT_FILE = Path("pyproject.toml")
+
+
+def run_key(
+    families: Sequence[TemplateFamily],
+    bundles: dict[Path, TemplateBundle],
+    *,
+    search_roots: Sequence[Path] = (),
+    target_roots: Sequence[Path] | None = None,
+    exclude: Sequence[str] = (),
+) -> str:
+    """
+    Identify a run by what it distributes where.
+
+    Args:
+        families: Template families of the run.
+        bundles: Their loaded bundles keyed by marker.
+        search_roots: Roots of the run's filesystem walk.
+        target_roots: Known project roots used instead of a walk.
+        exclude: Patterns the walk does not descend into.
+
+    Returns:
+        A digest over every family's marker, source and bundle digest and
+        over the resolved search roots and excludes or the target list.
+    """
+    hasher = hashlib.sha256()
+    for family in families:
+        source = family.source_github_path or "packaged"
+        bundle = bundles[family.marker]
+        hasher.update(f"family\0{family.marker.as_posix()}\0{source}\0{bundle.digest}\n".encode())
+    if target_roots is not None:
+        for root in target_roots:
+            hasher.update(f"target\0{root}\n".encode())
+    else:
+        for root in sorted({root.resolve() for root in search_roots}):
+            hasher.update(f"search\0{root}\n".encode())
+        for pattern in sorted(set(exclude)):
+            hasher.update(f"exclude\0{pattern}\n".encode())
+    return hasher.hexdigest()
+
+
+def record_run(
+    services: AppServices,
+    key: str,
+    bundles: dict[Path, TemplateBundle],
+    discovery: DiscoveryOutcome,
+    copies: CopyOutcome,
+    commits: Sequence[CommitResult] = (),
+    walked: WalkedDirectories | None = None,
+) -> RunRecord | None:
+    """
+    Remember a run whose every copy and commit succeeded.
+
+    The watched files are each target's marker, templates and render
+    context, plus the markers a rejected listed target could gain, and every
+    directory the walk listed. Creating or removing a project below the
+    search roots changes the modification time of a listed directory, so a
+    new project invalidates the record like a changed target does. A later
+    run with the same key can be skipped while none of them change.
+
+    Checking the record costs one stat per watched path, and any change in
+    a walked directory - not only a new project - invalidates it, so a walk
+    that listed more directories than its :class:`WalkedDirectories` limit
+    is not recorded: the next run walks again.
+
+    Args:
+        services: The application services.
+        key: The run's :func:`run_key`.
+        bundles: Template bundles keyed by marker.
+        discovery: Result of :func:`discover_targets`.
+        copies: Result of :func:`copy_to_projects`; dry runs are not recorded.
+        commits: Result of :func:`commit_changes`, if the run committed.
+        walked: The directories the walk listed, from :func:`discover_targets`.
+
+    Returns:
+        The stored record, or None if some project failed and the next run
+        should try again, or if the walk listed too many directories.
+    """
+    done = (CopyStatus.SUCCESS, CopyStatus.SKIPPED_SELF)
+    if any(result.status not in done for result in copies.results):
+        return None
+    if any(result.status == CommitStatus.ERROR for result in commits):
+        return None
+    if walked is not None and walked.overflowed:
+        return None
+
+    watched: list[Path] = []
+    for project in discovery.projects:
+        watched.append(project.root_path / project.marker)
+        watched.append(project.root_path / RENDER_CONTEXT_FILE)
+        watched.extend(project.github_path / path for path in bundles[project.marker].paths)
+    for root in discovery.rejected_targets:
+        watched.extend(root / marker for marker in bundles)
+    if walked is not None:
+        watched.extend(walked.paths)
+    return services.record_run(key, watched, projects=len(discovery.projects))
+
+
+def _copy_lane(project: DiscoveredProject) -> object:
+    """Group copies by the device of the target, falling back to its drive."""
+    return project.device if project.device is not None else project.root_path.anchor
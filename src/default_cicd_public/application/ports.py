@@ -1,25 +1,92 @@
 """Port definitions (protocols) for the application layer."""
 
-from collections.abc import Iterator
+from collections.abc import Callable, Iterator, Mapping, Sequence
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Protocol
 
-from default_cicd_public.domain.models import CopyResult, DiscoveredProject
+from default_cicd_public.domain.models import (
+    DEFAULT_CONCURRENCY,
+    MARKER_FILE,
+    BackupRun,
+    BareRepository,
+    CommitRequest,
+    CommitResult,
+    ConcurrencyBounds,
+    ConcurrencyReport,
+    CopyHistory,
+    CopyResult,
+    DiscoveredProject,
+    IOLimits,
+    LockPolicy,
+    ProjectDrift,
+    RenderedTemplates,
+    RepositoryResult,
+    RepositoryUpdate,
+    RollbackReport,
+    RunRecord,
+    ScanReport,
+    TemplateBundle,
+    WalkedDirectories,
+)
 
 
 class DiscoverProjects(Protocol):
     """Protocol for discovering projects with the marker file."""
 
-    def __call__(self, search_root: Path) -> Iterator[DiscoveredProject]:
+    def __call__(
+        self,
+        search_roots: Sequence[Path],
+        markers: Sequence[Path] = (MARKER_FILE,),
+        *,
+        concurrency: ConcurrencyBounds = DEFAULT_CONCURRENCY,
+        report: ConcurrencyReport | None = None,
+        exclude: Sequence[str] = (),
+        scan_report: ScanReport | None = None,
+        walked: WalkedDirectories | None = None,
+    ) -> Iterator[DiscoveredProject]:
         """
-        Discover projects containing the marker workflow file.
+        Discover projects containing any of the marker files.
 
         Args:
-            search_root: The root directory to start searching from.
+            search_roots: The root directories to search, scanned together.
+                Duplicate roots and roots nested in another are scanned once.
+            markers: Marker paths relative to a project root, in priority order.
+                A directory matching several markers is reported once, for the
+                first marker it carries.
+            concurrency: Bounds for the filesystem operations in flight per mount.
+            report: If given, receives the concurrency chosen per mount.
+            exclude: Shell-style patterns of directories not to descend into;
+                patterns with a slash match the whole path, others the name.
+            scan_report: If given, receives the cost of the walk per subtree.
+            walked: If given, receives the directories the walk listed, up to
+                its limit; excluded and skipped directories are not listed.
 
         Yields:
-            DiscoveredProject instances for each matching project.
+            DiscoveredProject instances for each matching project, each
+            directory at most once even if several roots reach it.
+        """
+        ...
+
+
+class ValidateTargets(Protocol):
+    """Protocol for turning known project roots into discovered projects."""
+
+    def __call__(
+        self,
+        roots: Sequence[Path],
+        markers: Sequence[Path] = (MARKER_FILE,),
+    ) -> Iterator[DiscoveredProject]:
+        """
+        Check the marker files of already-known project roots.
+
+        Args:
+            roots: Project root directories, e.g. from an inventory system.
+            markers: Marker paths relative to a project root, in priority order.
+
+        Yields:
+            DiscoveredProject instances for the roots carrying a marker, in the
+            order of ``roots``. Roots without a marker are left out.
         """
         ...
 
@@ -29,16 +96,16 @@ class CopyTemplates(Protocol):
 
     def __call__(
         self,
-        source_github_path: Path,
+        bundle: TemplateBundle,
         target_project: DiscoveredProject,
         *,
         dry_run: bool = False,
     ) -> CopyResult:
         """
-        Copy all files from source .github/ to target project's .github/.
+        Write all files of the bundle to the target project's .github/.
 
         Args:
-            source_github_path: Path to the source .github/ directory.
+            bundle: The templates loaded from the source .github/ directory.
             target_project: The target project to copy templates to.
             dry_run: If True, simulate the copy without making changes.
 
@@ -48,6 +115,101 @@ class CopyTemplates(Protocol):
         ...
 
 
+class CheckDrift(Protocol):
+    """Protocol for comparing a target project with its bundle without writing."""
+
+    def __call__(self, bundle: TemplateBundle, target_project: DiscoveredProject) -> ProjectDrift:
+        """
+        Compare the target's .github/ with the bundle.
+
+        Args:
+            bundle: The templates the project should carry.
+            target_project: The project to compare.
+
+        Returns:
+            The project's drift state and the differing paths.
+        """
+        ...
+
+
+class LoadTemplates(Protocol):
+    """Protocol for loading a template bundle from a source .github/ directory."""
+
+    def __call__(self, source_github_path: Path) -> TemplateBundle:
+        """
+        Load all template files below a source .github/ directory.
+
+        Args:
+            source_github_path: Path to the source .github/ directory.
+
+        Returns:
+            The bundle with every file's relative path, mode, digest and content.
+        """
+        ...
+
+
+class LoadPackagedTemplates(Protocol):
+    """Protocol for loading the template bundle packaged with the tool."""
+
+    def __call__(self) -> TemplateBundle | None:
+        """
+        Load the packaged bundle.
+
+        Returns:
+            The bundle, or None if this installation carries none (e.g. a
+            source checkout).
+        """
+        ...
+
+
+class RenderTemplates(Protocol):
+    """Protocol for rendering a bundle with each target project's values."""
+
+    def __call__(
+        self, bundle: TemplateBundle, projects: Sequence[DiscoveredProject]
+    ) -> RenderedTemplates:
+        """
+        Render ``bundle`` for every project that needs it.
+
+        Args:
+            bundle: The bundle of the projects' template family.
+            projects: The projects receiving the bundle.
+
+        Returns:
+            Rendered bundles and rendering errors keyed by project root.
+            Projects absent from both receive ``bundle`` unchanged.
+        """
+        ...
+
+
+class CommitChanges(Protocol):
+    """Protocol for committing changed template files in target repositories."""
+
+    def __call__(
+        self,
+        requests: Sequence[CommitRequest],
+        *,
+        push: bool = False,
+        max_workers: int | None = None,
+    ) -> Iterator[CommitResult]:
+        """
+        Stage and commit each request's paths in the project's repository.
+
+        Only the requested paths are committed; other staged or modified
+        files of the repository are left alone.
+
+        Args:
+            requests: Projects with the paths to commit and their messages.
+            push: If True, push every new commit to the branch's upstream.
+            max_workers: Maximum number of repositories processed at once.
+                None uses the implementation's default.
+
+        Yields:
+            One result per request, in the order of ``requests``.
+        """
+        ...
+
+
 class GetSourceGithubPath(Protocol):
     """Protocol for getting the source .github/ directory path."""
 
@@ -61,10 +223,237 @@ class GetSourceGithubPath(Protocol):
         ...
 
 
+class ConfigureIOLimits(Protocol):
+    """Protocol for setting the I/O budget shared by all filesystem services."""
+
+    def __call__(self, limits: IOLimits) -> None:
+        """
+        Apply new I/O limits to discovery, validation and copying.
+
+        Args:
+            limits: The budget for the run. Unset fields are unlimited.
+        """
+        ...
+
+
+class ConfigureLocking(Protocol):
+    """Protocol for setting how copies lock their target projects."""
+
+    def __call__(self, policy: LockPolicy) -> None:
+        """
+        Apply a locking policy to the following copies.
+
+        Args:
+            policy: Whether to lock, how long to wait for a held lock and how
+                long a lock stays valid.
+        """
+        ...
+
+
+class BeginBackupRun(Protocol):
+    """Protocol for starting to back up the files copies overwrite."""
+
+    def __call__(self, backup_dir: Path | None = None) -> BackupRun:
+        """
+        Start a backup run; copies save every file before overwriting it.
+
+        Args:
+            backup_dir: Backup directory. None uses the default location.
+
+        Returns:
+            The new run.
+        """
+        ...
+
+
+class EndBackupRun(Protocol):
+    """Protocol for finishing the active backup run."""
+
+    def __call__(self) -> BackupRun | None:
+        """
+        Stop backing up and close the run's index.
+
+        Returns:
+            The finished run with its file count, or None if none was active.
+        """
+        ...
+
+
+class RollbackRun(Protocol):
+    """Protocol for restoring the files a distribution run changed."""
+
+    def __call__(
+        self, run_id: str, backup_dir: Path | None = None, *, dry_run: bool = False
+    ) -> RollbackReport:
+        """
+        Restore every file the run touched to its state before the run.
+
+        Args:
+            run_id: ID of the backup run.
+            backup_dir: Backup directory holding the run. None uses the default.
+            dry_run: If True, only report what would be restored.
+
+        Returns:
+            The restored and removed paths and per-path errors.
+        """
+        ...
+
+
+class RecordRun(Protocol):
+    """Protocol for remembering a successful run and the state it left behind."""
+
+    def __call__(self, key: str, watched: Sequence[Path], *, projects: int) -> RunRecord:
+        """
+        Record the run ``key`` together with the current state of ``watched``.
+
+        Args:
+            key: Identifies what the run distributed where.
+            watched: Files whose change makes repeating the run worthwhile,
+                e.g. markers and copied templates. Missing files count too:
+                their appearance is a change.
+            projects: Number of targets the run updated, for reporting.
+
+        Returns:
+            The stored record.
+        """
+        ...
+
+
+class FindUnchangedRun(Protocol):
+    """Protocol for finding a recorded run that would be repeated as-is."""
+
+    def __call__(self, key: str, *, max_age: float) -> RunRecord | None:
+        """
+        Look up the last run ``key`` and check its watched files.
+
+        Args:
+            key: Identifies what the run distributes where.
+            max_age: Seconds after which a record no longer counts, so that
+                projects created since are eventually found.
+
+        Returns:
+            The record if it is younger than ``max_age`` and none of its
+            watched files changed, else None.
+        """
+        ...
+
+
+class LoadCopyHistory(Protocol):
+    """Protocol for reading the copy durations of earlier runs."""
+
+    def __call__(self, roots: Sequence[Path]) -> CopyHistory:
+        """
+        Look up the recorded copy durations of the given projects.
+
+        Args:
+            roots: Project roots about to be copied to.
+
+        Returns:
+            The durations known for ``roots`` and the parallelism of the last
+            recorded run; empty if there is no usable history.
+        """
+        ...
+
+
+class RecordCopyHistory(Protocol):
+    """Protocol for remembering the copy durations of a run."""
+
+    def __call__(self, durations: Mapping[Path, float], *, parallelism: float) -> None:
+        """
+        Fold a run's copy durations into the history.
+
+        Args:
+            durations: Seconds each project's copy took, by project root.
+            parallelism: Average number of copies the run had in flight.
+        """
+        ...
+
+
+class DiscoverBareRepositories(Protocol):
+    """Protocol for finding bare git repositories whose HEAD carries a marker."""
+
+    def __call__(
+        self,
+        search_roots: Sequence[Path],
+        markers: Sequence[Path] = (MARKER_FILE,),
+        *,
+        branch: str | None = None,
+        exclude: Sequence[str] = (),
+        max_workers: int | None = None,
+    ) -> Iterator[BareRepository]:
+        """
+        Find bare repositories below the roots whose HEAD tree has a marker.
+
+        Args:
+            search_roots: The root directories to search.
+            markers: Marker paths relative to the repository's top level, in
+                priority order.
+            branch: Branch to commit to; None means the branch HEAD points to.
+                Repositories with a detached HEAD need an explicit branch.
+            exclude: Shell-style patterns of directories not to descend into.
+            max_workers: Maximum number of repositories inspected at once.
+                None uses the implementation's default.
+
+        Yields:
+            The repositories and the commit a new commit would build on, in
+            no particular order.
+        """
+        ...
+
+
+class UpdateRepositories(Protocol):
+    """Protocol for committing template bundles directly into bare repositories."""
+
+    def __call__(
+        self,
+        updates: Sequence[RepositoryUpdate],
+        *,
+        message: Callable[[BareRepository, Sequence[Path]], str],
+        dry_run: bool = False,
+        max_workers: int | None = None,
+    ) -> Iterator[RepositoryResult]:
+        """
+        Commit each bundle into its repository's .github/ without a checkout.
+
+        Files of the bundle whose blob and mode already match the parent
+        commit are left alone, and a repository where all of them match gets
+        no commit. Files of the parent's .github/ outside the bundle are kept.
+
+        Args:
+            updates: Repositories and the bundles they should carry.
+            message: Returns the commit message for a repository and the
+                changed paths, relative to .github/.
+            dry_run: If True, only compare with the parent commit.
+            max_workers: Maximum number of repositories processed at once.
+                None uses the implementation's default.
+
+        Yields:
+            One result per update, in the order of ``updates``.
+        """
+        ...
+
+
 @dataclass
 class AppServices:
     """Container for all application services (ports)."""
 
     discover_projects: DiscoverProjects
     copy_templates: CopyTemplates
+    check_drift: CheckDrift
+    load_templates: LoadTemplates
+    load_packaged_templates: LoadPackagedTemplates
+    render_templates: RenderTemplates
+    commit_changes: CommitChanges
     get_source_github_path: GetSourceGithubPath
+    validate_targets: ValidateTargets
+    configure_io_limits: ConfigureIOLimits
+    configure_locking: ConfigureLocking
+    begin_backup_run: BeginBackupRun
+    end_backup_run: EndBackupRun
+    rollback_run: RollbackRun
+    record_run: RecordRun
+    find_unchanged_run: FindUnchangedRun
+    discover_bare_repositories: DiscoverBareRepositories
+    update_repositories: UpdateRepositories
+    load_copy_history: LoadCopyHistory
+    record_copy_history: RecordCopyHistory
@@ -0,0 +1,204 @@
+"""Attribution of discovery cost to the subtrees of the walk.
+
+Discovery reports every scanned directory to a :class:`ScanCostTracker` with
+the entries it listed and the time its listing and stats took. The tracker
+rolls these up the tree as subtrees complete: a directory is folded into its
+parent once it and all of its subdirectories have been scanned, so only the
+directories of the walk's frontier and their ancestors are held at any time.
+
+When a subtree without projects completes inside a subtree that has projects,
+it is a candidate for a skip rule; the most expensive candidates are kept.
+The names of the directories leading to projects are collected too, so that a
+suggested name pattern never prunes a project elsewhere in the walk.
+"""
+
+import heapq
+from collections import Counter
+from collections.abc import Collection, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from default_cicd_public.domain.models import ScanReport, SubtreeCost
+
+# A directory name must head this many reported subtrees to be suggested as a
+# name pattern instead of one rule per path.
+NAME_RULE_MIN_SUBTREES = 2
+
+
+@dataclass
+class _Node:
+    """Running totals of a subtree whose scan has not completed."""
+
+    path: Path
+    parent: "_Node | None"
+    pending: int = 0
+    directories: int = 1
+    entries: int = 0
+    seconds: float = 0.0
+    projects: int = 0
+    # Completed child subtrees without projects, reported if this one has any
+    candidates: list[SubtreeCost] = field(default_factory=lambda: [])
+
+    def cost(self) -> SubtreeCost:
+        """Return the subtree's totals."""
+        return SubtreeCost(
+            path=self.path,
+            directories=self.directories,
+            entries=self.entries,
+            seconds=self.seconds,
+        )
+
+
+class ScanCostTracker:
+    """Rolls per-directory scan costs up the tree into a :class:`ScanReport`.
+
+    Not thread-safe; discovery calls it from the thread consuming scan results.
+    """
+
+    def __init__(self, report: ScanReport) -> None:
+        """
+        Start tracking a walk.
+
+        Args:
+            report: Receives the totals as directories are visited and the
+                most expensive project-free subtrees on :meth:`close`.
+        """
+        self.report = report
+        self._open: dict[Path, _Node] = {}
+        self._heap: list[tuple[float, int, str, SubtreeCost]] = []
+
+    def visit(
+        self,
+        path: Path,
+        *,
+        is_root: bool,
+        entries: int,
+        seconds: float,
+        project: bool,
+        subdirectories: int,
+        more: bool = False,
+    ) -> None:
+        """
+        Record the scan of one directory.
+
+        Every directory of the walk must be visited exactly once, and after
+        its parent.
+
+        Args:
+            path: The scanned directory.
+            is_root: True for a search root, whose parent is not walked.
+            entries: Number of entries the listing returned.
+            seconds: Time the listing and the stats of its entries took.
+            project: True if the directory is a project.
+            subdirectories: Number of subdirectories queued for scanning.
+            more: True if only part of the listing was read and the rest
+                will be reported through :meth:`resume`.
+        """
+        self.report.directories += 1
+        self.report.entries += entries
+        self.report.seconds += seconds
+        parent = None if is_root else self._open[path.parent]
+        node = _Node(
+            path=path,
+            parent=parent,
+            pending=subdirectories + more,
+            entries=entries,
+            seconds=seconds,
+            projects=int(project),
+        )
+        self._open[path] = node
+        if not node.pending:
+            self._complete(node)
+
+    def resume(
+        self, path: Path, *, entries: int, seconds: float, subdirectories: int, more: bool = False
+    ) -> None:
+        """
+        Record a further chunk of a directory visited with ``more``.
+
+        Args:
+            path: The scanned directory.
+            entries: Number of entries this chunk returned.
+            seconds: Time this chunk and the stats of its entries took.
+            subdirectories: Number of subdirectories queued for scanning.
+            more: True if the listing continues in yet another chunk.
+        """
+        self.report.entries += entries
+        self.report.seconds += seconds
+        node = self._open[path]
+        node.entries += entries
+        node.seconds += seconds
+        # This chunk replaces the pending continuation it was queued as.
+        node.pending += subdirectories + more - 1
+        if not node.pending:
+            self._complete(node)
+
+    def close(self) -> None:
+        """Write the most expensive project-free subtrees to the report."""
+        ranked = sorted(self._heap, reverse=True)
+        self.report.subtrees = [cost for *_key, cost in ranked]
+
+    def _complete(self, node: _Node) -> None:
+        """Fold a finished subtree into its ancestors, finishing them in turn."""
+        current: _Node | None = node
+        while current is not None:
+            del self._open[current.path]
+            parent = current.parent
+            if current.projects:
+                self.report.project_names.add(current.path.name)
+                for candidate in current.candidates:
+                    self._offer(candidate)
+            elif parent is None:
+                self._offer(current.cost())
+            else:
+                # Subsumes the candidates below it.
+                parent.candidates.append(current.cost())
+            current.candidates = []
+            if parent is None:
+                return
+            parent.directories += current.directories
+            parent.entries += current.entries
+            parent.seconds += current.seconds
+            parent.projects += current.projects
+            parent.pending -= 1
+            current = parent if parent.pending == 0 else None
+
+    def _offer(self, cost: SubtreeCost) -> None:
+        """Keep ``cost`` if it is among the ``limit`` most expensive so far."""
+        if self.report.limit <= 0:
+            return
+        key = (cost.seconds, cost.entries, str(cost.path), cost)
+        if len(self._heap) < self.report.limit:
+            heapq.heappush(self._heap, key)
+        elif key[:3] > self._heap[0][:3]:
+            heapq.heapreplace(self._heap, key)
+
+
+def suggest_excludes(
+    subtrees: Sequence[SubtreeCost], project_names: Collection[str] = ()
+) -> list[str]:
+    """
+    Suggest ``--exclude`` patterns that would prune the given subtrees.
+
+    A directory name heading several of the subtrees becomes one name
+    pattern, which also prunes directories of that name elsewhere, unless a
+    directory of that name leads to a project; the other subtrees get a rule
+    for their path.
+
+    Args:
+        subtrees: Project-free subtrees, e.g. from a :class:`ScanReport`.
+        project_names: Names of the directories that are or contain a
+            project, e.g. :attr:`ScanReport.project_names`.
+
+    Returns:
+        The patterns in the order of the subtrees they first cover.
+    """
+    names = Counter(subtree.path.name for subtree in subtrees)
+    rules: dict[str, None] = {}
+    for subtree in subtrees:
+        name = subtree.path.name
+        if names[name] >= NAME_RULE_MIN_SUBTREES and name not in project_names:
+            rules[subtree.path.name] = None
+        else:
+            rules[subtree.path.as_posix()] = None
+    return list(rules)
@@ -2,18 +2,60 @@
 
 from pathlib import Path
 
+from default_cicd_public.adapters.filesystem.backup import BackupStore
+from default_cicd_public.adapters.filesystem.bundle import FilesystemBundleLoader
 from default_cicd_public.adapters.filesystem.copier import FilesystemCopier
 from default_cicd_public.adapters.filesystem.discovery import FilesystemDiscovery
+from default_cicd_public.adapters.filesystem.drift import FilesystemDriftChecker
+from default_cicd_public.adapters.filesystem.history import CopyHistoryStore
+from default_cicd_public.adapters.filesystem.locking import ProjectLocks
+from default_cicd_public.adapters.filesystem.rendering import TemplateRenderer
+from default_cicd_public.adapters.filesystem.runstate import RunStateStore, stat_validator
+from default_cicd_public.adapters.filesystem.targets import FilesystemTargetValidator
+from default_cicd_public.adapters.filesystem.throttle import IOThrottle
+from default_cicd_public.adapters.git import (
+    BareRepositoryDiscovery,
+    FastImportUpdater,
+    GitCommitter,
+)
+from default_cicd_public.adapters.memory import (
+    MemoryCopier,
+    MemoryDiscovery,
+    MemoryDriftChecker,
+    MemoryFilesystem,
+    MemoryTargetValidator,
+)
+from default_cicd_public.adapters.packaged import PackagedBundleLoader
 from default_cicd_public.application.ports import (
     AppServices,
+    BeginBackupRun,
+    CheckDrift,
+    CommitChanges,
+    ConfigureIOLimits,
+    ConfigureLocking,
     CopyTemplates,
+    DiscoverBareRepositories,
     DiscoverProjects,
+    EndBackupRun,
+    FindUnchangedRun,
     GetSourceGithubPath,
+    LoadCopyHistory,
+    LoadPackagedTemplates,
+    LoadTemplates,
+    RecordCopyHistory,
+    RecordRun,
+    RenderTemplates,
+    RollbackRun,
+    UpdateRepositories,
+    ValidateTargets,
 )
 
 
 def _get_package_github_path() -> Path:
-    """Get the .github/ path relative to this package's installation."""
+    """Get the .github/ path of the source checkout this package runs from.
+
+    Only used when the installation carries no packaged template bundle.
+    """
     # Navigate from this file to the project root
     # This file is at: src/default_cicd_public/composition/__init__.py
     # Project root is: ../../.. from src/default_cicd_public/composition/
@@ -29,17 +71,57 @@ def _get_package_github_path() -> Path:
 
 def build_production() -> AppServices:
     """Build the production service container."""
+    throttle = IOThrottle()
+    locks = ProjectLocks(throttle=throttle)
+    backups = BackupStore(throttle=throttle, locks=locks)
+    runs = RunStateStore(throttle=throttle)
+    history = CopyHistoryStore()
     return AppServices(
-        discover_projects=FilesystemDiscovery(),
-        copy_templates=FilesystemCopier(),
+        discover_projects=FilesystemDiscovery(throttle=throttle),
+        copy_templates=FilesystemCopier(throttle=throttle, backups=backups, locks=locks),
+        check_drift=FilesystemDriftChecker(throttle=throttle),
+        load_templates=FilesystemBundleLoader(),
+        load_packaged_templates=PackagedBundleLoader(),
+        render_templates=TemplateRenderer(throttle=throttle),
+        commit_changes=GitCommitter(),
         get_source_github_path=_get_package_github_path,
+        validate_targets=FilesystemTargetValidator(throttle=throttle),
+        configure_io_limits=throttle.configure,
+        configure_locking=locks.configure,
+        begin_backup_run=backups.begin_run,
+        end_backup_run=backups.end_run,
+        rollback_run=backups.rollback,
+        record_run=runs.record,
+        find_unchanged_run=runs.find_unchanged,
+        discover_bare_repositories=BareRepositoryDiscovery(throttle=throttle),
+        update_repositories=FastImportUpdater(),
+        load_copy_history=history.load,
+        record_copy_history=history.record,
     )
 
 
 def build_testing(
     discover_projects: DiscoverProjects | None = None,
     copy_templates: CopyTemplates | None = None,
+    check_drift: CheckDrift | None = None,
+    load_templates: LoadTemplates | None = None,
+    load_packaged_templates: LoadPackagedTemplates | None = None,
+    render_templates: RenderTemplates | None = None,
+    commit_changes: CommitChanges | None = None,
     get_source_github_path: GetSourceGithubPath | None = None,
+    validate_targets: ValidateTargets | None = None,
+    configure_io_limits: ConfigureIOLimits | None = None,
+    configure_locking: ConfigureLocking | None = None,
+    begin_backup_run: BeginBackupRun | None = None,
+    end_backup_run: EndBackupRun | None = None,
+    rollback_run: RollbackRun | None = None,
+    record_run: RecordRun | None = None,
+    find_unchanged_run: FindUnchangedRun | None = None,
+    discover_bare_repositories: DiscoverBareRepositories | None = None,
+    update_repositories: UpdateRepositories | None = None,
+    load_copy_history: LoadCopyHistory | None = None,
+    record_copy_history: RecordCopyHistory | None = None,
+    filesystem: MemoryFilesystem | None = None,
 ) -> AppServices:
     """
     Build a testing service container with optional mock implementations.
@@ -47,13 +129,72 @@ def build_testing(
     Args:
         discover_projects: Custom discovery implementation or None for default.
         copy_templates: Custom copier implementation or None for default.
+        check_drift: Custom drift checker or None for default.
+        load_templates: Custom bundle loader or None for default.
+        load_packaged_templates: Custom packaged bundle loader or None for
+            default.
+        render_templates: Custom renderer or None for default.
+        commit_changes: Custom committer or None for default.
         get_source_github_path: Custom source path getter or None for default.
+        validate_targets: Custom target validator or None for default.
+        configure_io_limits: Custom limits setter or None to configure the
+            throttle shared by the default filesystem services.
+        configure_locking: Custom locking setter or None to configure the
+            project locks of the default copier.
+        begin_backup_run: Custom backup run starter or None for the backup
+            store shared with the default copier.
+        end_backup_run: Custom backup run finisher or None for default.
+        rollback_run: Custom rollback implementation or None for default.
+        record_run: Custom run recorder or None for default.
+        find_unchanged_run: Custom run lookup or None for default.
+        discover_bare_repositories: Custom bare repository discovery or None
+            for default.
+        update_repositories: Custom bare repository updater or None for
+            default.
+        load_copy_history: Custom copy history lookup or None for default.
+        record_copy_history: Custom copy history recorder or None for
+            default.
+        filesystem: If given, the default discovery, copier, drift checker,
+            target validator and run records work on this in-memory tree
+            instead of the disk.
 
     Returns:
         AppServices configured for testing.
     """
+    throttle = IOThrottle()
+    locks = ProjectLocks(throttle=throttle)
+    backups = BackupStore(throttle=throttle, locks=locks)
+    runs = RunStateStore(
+        throttle=throttle,
+        validator=filesystem.fingerprint if filesystem is not None else stat_validator,
+    )
+    history = CopyHistoryStore()
+    if filesystem is not None:
+        discover_projects = discover_projects or MemoryDiscovery(filesystem, throttle=throttle)
+        copy_templates = copy_templates or MemoryCopier(filesystem, throttle=throttle)
+        check_drift = check_drift or MemoryDriftChecker(filesystem, throttle=throttle)
+        validate_targets = validate_targets or MemoryTargetValidator(filesystem, throttle=throttle)
     return AppServices(
-        discover_projects=discover_projects or FilesystemDiscovery(),
-        copy_templates=copy_templates or FilesystemCopier(),
+        discover_projects=discover_projects or FilesystemDiscovery(throttle=throttle),
+        copy_templates=copy_templates
+        or FilesystemCopier(throttle=throttle, backups=backups, locks=locks),
+        check_drift=check_drift or FilesystemDriftChecker(throttle=throttle),
+        load_templates=load_templates or FilesystemBundleLoader(),
+        load_packaged_templates=load_packaged_templates or PackagedBundleLoader(),
+        render_templates=render_templates or TemplateRenderer(throttle=throttle),
+        commit_changes=commit_changes or GitCommitter(),
         get_source_github_path=get_source_github_path or _get_package_github_path,
+        validate_targets=validate_targets or FilesystemTargetValidator(throttle=throttle),
+        configure_io_limits=configure_io_limits or throttle.configure,
+        configure_locking=configure_locking or locks.configure,
+        begin_backup_run=begin_backup_run or backups.begin_run,
+        end_backup_run=end_backup_run or backups.end_run,
+        rollback_run=rollback_run or backups.rollback,
+        record_run=record_run or runs.record,
+        find_unchanged_run=find_unchanged_run or runs.find_unchanged,
+        discover_bare_repositories=discover_bare_repositories
+        or BareRepositoryDiscovery(throttle=throttle),
+        update_repositories=update_repositories or FastImportUpdater(),
+        load_copy_history=load_copy_history or history.load,
+        record_copy_history=record_copy_history or history.record,
     )
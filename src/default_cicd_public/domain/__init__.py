@@ -1,5 +1,65 @@
 """Domain layer - core business models."""
 
-from default_cicd_public.domain.models import CopyResult, CopyStatus, DiscoveredProject
+from default_cicd_public.domain.models import (
+    DEFAULT_CONCURRENCY,
+    MARKER_FILE,
+    BackupRun,
+    BareRepository,
+    CommitRequest,
+    CommitResult,
+    CommitStatus,
+    ConcurrencyBounds,
+    ConcurrencyReport,
+    CopyHistory,
+    CopyResult,
+    CopyStatus,
+    DiscoveredProject,
+    DriftState,
+    IOLimits,
+    LaneStats,
+    LockPolicy,
+    ProjectDrift,
+    RenderedTemplates,
+    RepositoryResult,
+    RepositoryStatus,
+    RepositoryUpdate,
+    RollbackReport,
+    RunRecord,
+    ScanReport,
+    SubtreeCost,
+    TemplateBundle,
+    TemplateFamily,
+    TemplateFile,
+)
 
-__all__ = ["CopyResult", "CopyStatus", "DiscoveredProject"]
+__all__ = [
+    "DEFAULT_CONCURRENCY",
+    "MARKER_FILE",
+    "BackupRun",
+    "BareRepository",
+    "CommitRequest",
+    "CommitResult",
+    "CommitStatus",
+    "ConcurrencyBounds",
+    "ConcurrencyReport",
+    "CopyHistory",
+    "CopyResult",
+    "CopyStatus",
+    "DiscoveredProject",
+    "DriftState",
+    "IOLimits",
+    "LaneStats",
+    "LockPolicy",
+    "ProjectDrift",
+    "RenderedTemplates",
+    "RepositoryResult",
+    "RepositoryStatus",
+    "RepositoryUpdate",
+    "RollbackReport",
+    "RunRecord",
+    "ScanReport",
+    "SubtreeCost",
+    "TemplateBundle",
+    "TemplateFamily",
+    "TemplateFile",
+]
@@ -1,9 +1,17 @@
 """Domain models for CI/CD template distribution."""
 
+import hashlib
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import cached_property
 from pathlib import Path
 
+# The marker file that identifies projects using our CI/CD templates
+MARKER_FILE = Path(".github") / "workflows" / "default_cicd_public.yml"
+
+# Walked directories a run record may watch; see WalkedDirectories
+DEFAULT_MAX_WATCHED_DIRECTORIES = 10_000
+
 
 class CopyStatus(Enum):
     """Status of a copy operation."""
@@ -13,6 +21,7 @@ class CopyStatus(Enum):
     PERMISSION_DENIED = "permission_denied"
     ERROR = "error"
     DRY_RUN = "dry_run"
+    LOCKED = "locked"
 
 
 @dataclass(frozen=True)
@@ -21,11 +30,107 @@ class DiscoveredProject:
 
     root_path: Path
     github_path: Path
+    marker: Path = MARKER_FILE
+    device: int | None = None
 
     @property
     def marker_file(self) -> Path:
         """Return the path to the marker workflow file."""
-        return self.github_path / "workflows" / "default_cicd_public.yml"
+        return self.root_path / self.marker
+
+
+@dataclass(frozen=True)
+class TemplateFile:
+    """One file of a template bundle, relative to the bundle's .github/."""
+
+    path: Path
+    mode: int
+    digest: str
+    content: bytes = field(repr=False)
+
+
+@dataclass(frozen=True)
+class TemplateBundle:
+    """The complete set of template files distributed to a project."""
+
+    source: str
+    files: tuple[TemplateFile, ...]
+
+    @property
+    def paths(self) -> list[Path]:
+        """Return the relative paths of all files, sorted."""
+        return sorted(file.path for file in self.files)
+
+    @cached_property
+    def digest(self) -> str:
+        """Return a digest over every file's path, mode and content digest."""
+        hasher = hashlib.sha256()
+        for file in sorted(self.files, key=lambda f: f.path):
+            hasher.update(f"{file.path.as_posix()}\0{file.mode:o}\0{file.digest}\n".encode())
+        return hasher.hexdigest()
+
+
+@dataclass(frozen=True)
+class TemplateFamily:
+    """A template bundle and the marker file that selects its target projects.
+
+    ``marker`` is relative to a project root; ``source_github_path`` is the
+    .github/ directory copied into every project carrying that marker, or None
+    for the bundle packaged with the tool.
+    """
+
+    marker: Path
+    source_github_path: Path | None = None
+
+
+@dataclass
+class RenderedTemplates:
+    """Per-project bundles produced by the rendering stage.
+
+    ``bundles`` and ``errors`` are keyed by project root. Projects whose
+    templates need no rendering are absent from both and receive the family's
+    bundle unchanged. ``contexts`` counts the distinct contexts seen and
+    ``renders`` the renders actually performed (cache misses).
+    """
+
+    bundles: dict[Path, TemplateBundle] = field(default_factory=lambda: {})
+    errors: dict[Path, str] = field(default_factory=lambda: {})
+    contexts: int = 0
+    renders: int = 0
+
+    def merge(self, other: "RenderedTemplates") -> None:
+        """Add the outcome of another rendering pass to this one."""
+        self.bundles.update(other.bundles)
+        self.errors.update(other.errors)
+        self.contexts += other.contexts
+        self.renders += other.renders
+
+
+@dataclass(frozen=True)
+class RunRecord:
+    """A finished distribution run that an identical later run may skip.
+
+    ``key`` identifies what was distributed where (bundle digests, markers and
+    the search root or target list); ``finished`` is the wall-clock time the
+    run ended and ``projects`` the number of targets it updated.
+    """
+
+    key: str
+    finished: float
+    projects: int
+
+
+@dataclass(frozen=True)
+class CopyHistory:
+    """Copy durations observed by earlier runs.
+
+    ``durations`` maps project roots to their smoothed copy time in seconds;
+    ``parallelism`` is the average number of copies the last recorded run had
+    in flight, or None if no run was recorded.
+    """
+
+    durations: dict[Path, float] = field(default_factory=lambda: {})
+    parallelism: float | None = None
 
 
 @dataclass
@@ -36,8 +141,291 @@ class CopyResult:
     status: CopyStatus
     files_copied: list[Path] = field(default_factory=lambda: [])
     error_message: str | None = None
+    files_changed: list[Path] = field(default_factory=lambda: [])
 
     @property
     def is_success(self) -> bool:
         """Return True if the operation succeeded or was a dry run."""
         return self.status in (CopyStatus.SUCCESS, CopyStatus.DRY_RUN)
+
+
+@dataclass(frozen=True)
+class CommitRequest:
+    """Changed template files of a project to commit in its repository.
+
+    ``paths`` are relative to the project root.
+    """
+
+    project: DiscoveredProject
+    paths: tuple[Path, ...]
+    message: str
+
+
+class DriftState(Enum):
+    """How a target's .github/ compares with its template bundle."""
+
+    CURRENT = "current"
+    DRIFTED = "drifted"
+    UNREACHABLE = "unreachable"
+
+
+@dataclass
+class ProjectDrift:
+    """Differences between a target's .github/ and its bundle.
+
+    Paths are relative to the .github/ directory. ``modified`` files differ in
+    content or mode, ``missing`` ones are in the bundle only and ``extra`` ones
+    in the target only. Extra files, such as a project's own workflows, are
+    reported but do not make a project drifted, since distributing never
+    removes them.
+    """
+
+    project: DiscoveredProject
+    state: DriftState
+    modified: list[Path] = field(default_factory=lambda: [])
+    missing: list[Path] = field(default_factory=lambda: [])
+    extra: list[Path] = field(default_factory=lambda: [])
+    error_message: str | None = None
+
+
+class CommitStatus(Enum):
+    """Status of committing the copied templates in a target repository."""
+
+    COMMITTED = "committed"
+    PUSHED = "pushed"
+    NOTHING_TO_COMMIT = "nothing_to_commit"
+    NOT_A_REPOSITORY = "not_a_repository"
+    ERROR = "error"
+
+
+@dataclass
+class CommitResult:
+    """Result of committing a project's changed template files."""
+
+    project: DiscoveredProject
+    status: CommitStatus
+    commit: str | None = None
+    error_message: str | None = None
+
+    @property
+    def is_success(self) -> bool:
+        """Return True if the changes are committed (and pushed if asked)."""
+        return self.status in (CommitStatus.COMMITTED, CommitStatus.PUSHED)
+
+
+@dataclass(frozen=True)
+class BareRepository:
+    """A bare git repository whose HEAD tree carries a marker file.
+
+    ``ref`` is the branch the templates are committed to and ``parent`` the
+    commit the new commit builds on: the branch's tip, or HEAD's commit if
+    the branch does not exist yet.
+    """
+
+    git_dir: Path
+    ref: str
+    parent: str
+    marker: Path = MARKER_FILE
+
+    @property
+    def name(self) -> str:
+        """Return the repository's name without the ``.git`` suffix."""
+        return self.git_dir.name.removesuffix(".git")
+
+
+@dataclass(frozen=True)
+class RepositoryUpdate:
+    """A template bundle to commit into a bare repository's .github/."""
+
+    repository: BareRepository
+    bundle: TemplateBundle
+
+
+class RepositoryStatus(Enum):
+    """Status of committing templates directly into a bare repository."""
+
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"
+    DRY_RUN = "dry_run"
+    ERROR = "error"
+
+
+@dataclass
+class RepositoryResult:
+    """Result of committing templates into a bare repository.
+
+    ``files_changed`` are relative to .github/ and list the files whose blob
+    or mode differs from the parent commit's tree.
+    """
+
+    repository: BareRepository
+    status: RepositoryStatus
+    files_changed: list[Path] = field(default_factory=lambda: [])
+    commit: str | None = None
+    error_message: str | None = None
+
+    @property
+    def is_success(self) -> bool:
+        """Return True unless the repository could not be read or updated."""
+        return self.status != RepositoryStatus.ERROR
+
+
+@dataclass
+class BackupRun:
+    """A distribution run whose overwritten files are kept for rollback."""
+
+    run_id: str
+    files: int = 0
+
+
+@dataclass
+class RollbackReport:
+    """Outcome of restoring the files a run changed."""
+
+    run_id: str
+    restored: list[Path] = field(default_factory=lambda: [])
+    removed: list[Path] = field(default_factory=lambda: [])
+    errors: dict[Path, str] = field(default_factory=lambda: {})
+
+    @property
+    def is_success(self) -> bool:
+        """Return True if every file was rolled back."""
+        return not self.errors
+
+
+@dataclass(frozen=True)
+class IOLimits:
+    """Sustained I/O budget for a run; None means unlimited."""
+
+    metadata_ops_per_second: float | None = None
+    writes_per_second: float | None = None
+    bytes_per_second: float | None = None
+
+    @property
+    def is_unlimited(self) -> bool:
+        """Return True if no limit is set."""
+        return (
+            self.metadata_ops_per_second is None
+            and self.writes_per_second is None
+            and self.bytes_per_second is None
+        )
+
+
+@dataclass(frozen=True)
+class LockPolicy:
+    """How copies coordinate with other distributors writing the same projects.
+
+    ``wait_seconds`` is how long a copy waits for another holder's lock before
+    the project is reported as locked; 0 skips locked projects immediately.
+    ``lease_seconds`` is how long a lock stays valid unless its holder renews
+    it, which a live holder does while working; after that other distributors
+    may break it (e.g. when its owner crashed).
+    """
+
+    enabled: bool = True
+    wait_seconds: float = 30.0
+    lease_seconds: float = 300.0
+
+    def __post_init__(self) -> None:
+        """Reject negative waits and non-positive leases."""
+        if self.wait_seconds < 0:
+            msg = f"wait_seconds must not be negative, got {self.wait_seconds}"
+            raise ValueError(msg)
+        if self.lease_seconds <= 0:
+            msg = f"lease_seconds must be positive, got {self.lease_seconds}"
+            raise ValueError(msg)
+
+
+@dataclass(frozen=True)
+class ConcurrencyBounds:
+    """User-set bounds for the number of in-flight operations per mount."""
+
+    min_workers: int = 1
+    max_workers: int = 32
+
+    def __post_init__(self) -> None:
+        """Reject bounds that leave no valid concurrency."""
+        if not 1 <= self.min_workers <= self.max_workers:
+            msg = (
+                "Concurrency bounds need 1 <= min_workers <= max_workers, "
+                f"got {self.min_workers}..{self.max_workers}"
+            )
+            raise ValueError(msg)
+
+
+DEFAULT_CONCURRENCY = ConcurrencyBounds()
+
+
+@dataclass(frozen=True)
+class LaneStats:
+    """Concurrency chosen for one mount (lane) during a phase."""
+
+    label: str
+    workers: int
+    peak_in_flight: int
+    operations: int
+    throughput: float
+    mean_latency: float
+
+
+@dataclass
+class ConcurrencyReport:
+    """Per-lane concurrency statistics filled in by an adaptive scheduler.
+
+    ``peak_pending`` is the most directories a discovery walk held pending at
+    once, across all lanes.
+    """
+
+    lanes: list[LaneStats] = field(default_factory=lambda: [])
+    peak_pending: int = 0
+
+
+@dataclass(frozen=True)
+class SubtreeCost:
+    """Discovery cost of a directory and everything below it."""
+
+    path: Path
+    directories: int
+    entries: int
+    seconds: float
+
+
+@dataclass
+class ScanReport:
+    """Where a discovery walk spent its work, filled in by discovery.
+
+    ``subtrees`` holds the ``limit`` most expensive subtrees that contain no
+    project, costliest first; a subtree is only listed if its parent does
+    contain one, so nested entries never repeat each other. Seconds are the
+    summed time of the listings and stats, not wall-clock time.
+    ``project_names`` holds the names of the directories that are or contain
+    a project, which a name pattern must not match.
+    """
+
+    limit: int = 10
+    subtrees: list[SubtreeCost] = field(default_factory=lambda: [])
+    directories: int = 0
+    entries: int = 0
+    seconds: float = 0.0
+    project_names: set[str] = field(default_factory=lambda: set[str]())
+
+
+@dataclass
+class WalkedDirectories:
+    """The directories a discovery walk listed, filled in by discovery.
+
+    A run record watches them so that a new project invalidates it, which
+    costs one stat per directory on every check. Only up to ``limit``
+    directories are kept; ``overflowed`` is set once the walk lists more.
+    """
+
+    limit: int = DEFAULT_MAX_WATCHED_DIRECTORIES
+    paths: list[Path] = field(default_factory=lambda: [])
+    overflowed: bool = False
+
+    def add(self, path: Path) -> None:
+        """Keep ``path``, or note the overflow if the limit is reached."""
+        if len(self.paths) < self.limit:
+            self.paths.append(path)
+        else:
+            self.overflowed = True
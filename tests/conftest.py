@@ -4,6 +4,18 @@ from pathlib import Path
 
 import pytest
 
+from default_cicd_public.adapters.filesystem.bundle import FilesystemBundleLoader
+from default_cicd_public.domain.models import TemplateBundle
+
+
+@pytest.fixture(autouse=True)
+def isolated_state_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep backups and other per-user state inside the test's tmp_path."""
+    state_dir = tmp_path / "state"
+    monkeypatch.setenv("XDG_STATE_HOME", str(state_dir))
+    monkeypatch.setenv("LOCALAPPDATA", str(state_dir))
+    return state_dir
+
 
 @pytest.fixture
 def source_github_dir(tmp_path: Path) -> Path:
@@ -29,6 +41,12 @@ def source_github_dir(tmp_path: Path) -> Path:
     return github_dir
 
 
+@pytest.fixture
+def source_bundle(source_github_dir: Path) -> TemplateBundle:
+    """Load the mock source .github directory into a template bundle."""
+    return FilesystemBundleLoader()(source_github_dir)
+
+
 @pytest.fixture
 def target_project_with_marker(tmp_path: Path) -> Path:
     """Create a target project with the marker file."""
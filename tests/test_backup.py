@@ -0,0 +1,254 @@
+"""Tests for the backup store and the rollback command."""
+
+import os
+import re
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from default_cicd_public.adapters.cli.root import cli
+from default_cicd_public.adapters.filesystem import BackupStore, FilesystemCopier, ProjectLocks
+from default_cicd_public.adapters.filesystem.backup import BackupIndexError
+from default_cicd_public.composition import build_testing
+from default_cicd_public.domain.models import (
+    CopyStatus,
+    DiscoveredProject,
+    LockPolicy,
+    TemplateBundle,
+)
+
+OLD_WORKFLOW = "name: Old CI\n"
+
+
+def _projects(root: Path, count: int) -> list[DiscoveredProject]:
+    """Create projects that all carry the same old workflow."""
+    projects: list[DiscoveredProject] = []
+    for index in range(count):
+        project_root = root / f"project{index}"
+        workflows = project_root / ".github" / "workflows"
+        workflows.mkdir(parents=True)
+        (workflows / "default_cicd_public.yml").write_text(OLD_WORKFLOW)
+        projects.append(
+            DiscoveredProject(root_path=project_root, github_path=project_root / ".github")
+        )
+    return projects
+
+
+class TestBackupStore:
+    """Tests for BackupStore."""
+
+    def test_identical_old_versions_are_stored_once(
+        self, source_bundle: TemplateBundle, tmp_path: Path
+    ) -> None:
+        """Overwritten files with the same content should share one object."""
+        store = BackupStore(tmp_path / "backups")
+        copier = FilesystemCopier(backups=store)
+        projects = _projects(tmp_path / "targets", 5)
+
+        run = store.begin_run()
+        for project in projects:
+            assert copier(source_bundle, project).status == CopyStatus.SUCCESS
+        store.end_run()
+
+        objects = [path for path in (tmp_path / "backups" / "objects").rglob("*") if path.is_file()]
+        assert len(objects) == 1
+        assert objects[0].read_text() == OLD_WORKFLOW
+        assert run.files == 5 * len(source_bundle.files)
+
+    def test_unchanged_files_are_not_backed_up_or_rewritten(
+        self, source_bundle: TemplateBundle, tmp_path: Path
+    ) -> None:
+        """A rerun with nothing to change should record no backups and write nothing."""
+        store = BackupStore(tmp_path / "backups")
+        copier = FilesystemCopier(backups=store)
+        (project,) = _projects(tmp_path / "targets", 1)
+        copier(source_bundle, project)
+        workflow = project.github_path / "workflows" / "default_cicd_public.yml"
+        os.utime(workflow, ns=(0, 0))
+
+        run = store.begin_run()
+        result = copier(source_bundle, project)
+        store.end_run()
+
+        assert result.files_changed == []
+        assert run.files == 0
+        assert not (tmp_path / "backups" / "objects").exists()
+        assert workflow.stat().st_mtime_ns == 0
+
+    def test_rollback_restores_and_removes(
+        self, source_bundle: TemplateBundle, tmp_path: Path
+    ) -> None:
+        """Rollback should restore overwritten files and delete created ones."""
+        store = BackupStore(tmp_path / "backups")
+        copier = FilesystemCopier(backups=store)
+        (project,) = _projects(tmp_path / "targets", 1)
+        workflow = project.github_path / "workflows" / "default_cicd_public.yml"
+        workflow.chmod(0o600)
+
+        run = store.begin_run()
+        copier(source_bundle, project)
+        store.end_run()
+        assert workflow.read_text() == "name: CI\n"
+
+        report = store.rollback(run.run_id)
+
+        assert report.is_success
+        assert report.restored == [workflow]
+        assert len(report.removed) == len(source_bundle.files) - 1
+        assert workflow.read_text() == OLD_WORKFLOW
+        assert workflow.stat().st_mode & 0o777 == 0o600
+        assert not (project.github_path / "dependabot.yml").exists()
+
+    def test_rollback_dry_run_changes_nothing(
+        self, source_bundle: TemplateBundle, tmp_path: Path
+    ) -> None:
+        """A dry-run rollback should only report."""
+        store = BackupStore(tmp_path / "backups")
+        (project,) = _projects(tmp_path / "targets", 1)
+        run = store.begin_run()
+        FilesystemCopier(backups=store)(source_bundle, project)
+        store.end_run()
+
+        report = store.rollback(run.run_id, dry_run=True)
+
+        assert report.restored
+        assert (project.github_path / "dependabot.yml").exists()
+
+    def test_rollback_ignores_a_truncated_last_entry(
+        self, source_bundle: TemplateBundle, tmp_path: Path
+    ) -> None:
+        """An entry cut short by a crashed run should be skipped, others are errors."""
+        store = BackupStore(tmp_path / "backups")
+        (project,) = _projects(tmp_path / "targets", 1)
+        run = store.begin_run()
+        FilesystemCopier(backups=store)(source_bundle, project)
+        store.end_run()
+        index = tmp_path / "backups" / "runs" / f"{run.run_id}.jsonl"
+        complete = index.read_text()
+
+        index.write_text(complete + '{"path": "/targets/proj')
+        assert store.rollback(run.run_id).is_success
+
+        index.write_text('{"path": \n' + complete)
+        with pytest.raises(BackupIndexError, match="line 1"):
+            store.rollback(run.run_id)
+
+    @pytest.mark.parametrize("run_id", ["../../etc/passwd", "nope", "20240101-120000-XYZ123"])
+    def test_rollback_rejects_malformed_run_ids(self, tmp_path: Path, run_id: str) -> None:
+        """Run IDs that distribute cannot have printed should not reach the filesystem."""
+        with pytest.raises(ValueError, match="invalid run ID"):
+            BackupStore(tmp_path / "backups").rollback(run_id)
+
+    def test_rollback_respects_project_locks(
+        self, source_bundle: TemplateBundle, tmp_path: Path
+    ) -> None:
+        """A project locked by a concurrent distributor should be left alone."""
+        policy = LockPolicy(wait_seconds=0)
+        store = BackupStore(tmp_path / "backups", locks=ProjectLocks(policy))
+        locked, free = _projects(tmp_path / "targets", 2)
+        run = store.begin_run()
+        copier = FilesystemCopier(backups=store)
+        for project in (locked, free):
+            copier(source_bundle, project)
+        store.end_run()
+
+        other = ProjectLocks(policy)
+        with other.hold(locked.root_path):
+            report = store.rollback(run.run_id)
+
+        workflow = "workflows/default_cicd_public.yml"
+        assert (free.github_path / workflow).read_text() == OLD_WORKFLOW
+        assert (locked.github_path / workflow).read_text() == "name: CI\n"
+        assert set(report.errors) == {locked.github_path / path for path in source_bundle.paths}
+        assert all("Locked by" in error for error in report.errors.values())
+
+    def test_save_without_run_does_nothing(self, tmp_path: Path) -> None:
+        """Outside a run nothing is backed up."""
+        store = BackupStore(tmp_path / "backups")
+        target = tmp_path / "file.yml"
+        target.write_text("x")
+
+        store.save(target)
+
+        assert not (tmp_path / "backups").exists()
+
+    def test_only_one_active_run(self, tmp_path: Path) -> None:
+        """Starting a second run while one is active should fail."""
+        store = BackupStore(tmp_path / "backups")
+        store.begin_run()
+
+        with pytest.raises(RuntimeError):
+            store.begin_run()
+
+
+class TestRollbackCommand:
+    """Tests for distribute backups and the rollback command."""
+
+    def test_distribute_then_rollback(
+        self, source_github_dir: Path, isolated_state_dir: Path, tmp_path: Path
+    ) -> None:
+        """A run's hint should name a run ID that rollback can undo."""
+        projects = _projects(tmp_path / "targets", 3)
+
+        def mock_discover(
+            search_roots: Sequence[Path], markers: Sequence[Path] = (), **options: object
+        ) -> Iterator[DiscoveredProject]:
+            yield from projects
+
+        services = build_testing(
+            discover_projects=mock_discover, get_source_github_path=lambda: source_github_dir
+        )
+        runner = CliRunner()
+
+        result = runner.invoke(cli, ["distribute", "--search-root", str(tmp_path)], obj=services)
+        assert result.exit_code == 0, result.output
+        match = re.search(r"rollback (\S+)", result.output)
+        assert match is not None
+        assert (isolated_state_dir / "default-cicd-public" / "backups" / "runs").is_dir()
+
+        result = runner.invoke(cli, ["rollback", match.group(1)], obj=services)
+
+        assert result.exit_code == 0, result.output
+        assert "Restored 3 file(s)" in result.output
+        for project in projects:
+            workflow = project.github_path / "workflows" / "default_cicd_public.yml"
+            assert workflow.read_text() == OLD_WORKFLOW
+
+    def test_no_backup_and_dry_run_record_nothing(
+        self, source_github_dir: Path, isolated_state_dir: Path, tmp_path: Path
+    ) -> None:
+        """Neither --no-backup nor --dry-run should start a backup run."""
+        projects = _projects(tmp_path / "targets", 1)
+
+        def mock_discover(
+            search_roots: Sequence[Path], markers: Sequence[Path] = (), **options: object
+        ) -> Iterator[DiscoveredProject]:
+            yield from projects
+
+        services = build_testing(
+            discover_projects=mock_discover, get_source_github_path=lambda: source_github_dir
+        )
+        for flag in ("--no-backup", "--dry-run"):
+            result = CliRunner().invoke(
+                cli, ["distribute", "--search-root", str(tmp_path), flag], obj=services
+            )
+            assert result.exit_code == 0, result.output
+            assert "rollback" not in result.output
+        assert not (isolated_state_dir / "default-cicd-public" / "backups").exists()
+
+    def test_unknown_run(self) -> None:
+        """Rolling back an unknown run should fail clearly."""
+        run_id = "20240101-120000-abcdef"
+        result = CliRunner().invoke(cli, ["rollback", run_id], obj=build_testing())
+
+        assert result.exit_code == 1
+        assert f"No backup run '{run_id}' found" in result.output
+
+    def test_malformed_run_id_is_a_usage_error(self) -> None:
+        """A run ID that is not of the printed form should be rejected up front."""
+        result = CliRunner().invoke(cli, ["rollback", "../runs/x"], obj=build_testing())
+
+        assert result.exit_code == 2
+        assert "invalid run ID" in result.output
@@ -0,0 +1,267 @@
+"""Tests for committing templates directly into bare repositories."""
+
+import subprocess
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from default_cicd_public.adapters.cli.root import cli
+from default_cicd_public.adapters.git import BareRepositoryDiscovery, FastImportUpdater
+from default_cicd_public.composition import build_testing
+from default_cicd_public.domain.models import (
+    MARKER_FILE,
+    BareRepository,
+    RepositoryStatus,
+    RepositoryUpdate,
+    TemplateBundle,
+)
+
+
+def _git(git_dir: Path, *args: str) -> str:
+    """Run git on the repository ``git_dir`` and return its output."""
+    return subprocess.run(
+        ["git", f"--git-dir={git_dir}", *args], check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+@pytest.fixture(autouse=True)
+def git_identity(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Give git an identity and keep it away from the user's configuration."""
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", str(tmp_path / "gitconfig"))
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    for role in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{role}_NAME", "Distributor")
+        monkeypatch.setenv(f"GIT_{role}_EMAIL", "distributor@example.com")
+
+
+def _bare(tmp_path: Path, name: str, files: dict[str, str] | None = None) -> Path:
+    """Create a bare repository whose main branch has one commit of ``files``."""
+    work = tmp_path / "work" / name
+    work.mkdir(parents=True)
+    subprocess.run(
+        ["git", "init", "--quiet", "--initial-branch=main", str(work)],
+        check=True,
+        capture_output=True,
+    )
+    contents = {MARKER_FILE.as_posix(): "name: Old CI\n", "README.md": "# Project\n"}
+    if files is not None:
+        contents = files
+    for path, content in contents.items():
+        (work / path).parent.mkdir(parents=True, exist_ok=True)
+        (work / path).write_text(content)
+    _git(work / ".git", f"--work-tree={work}", "add", ".")
+    _git(work / ".git", f"--work-tree={work}", "commit", "--quiet", "-m", "Initial")
+    bare = tmp_path / "repos" / f"{name}.git"
+    subprocess.run(
+        ["git", "clone", "--quiet", "--bare", str(work), str(bare)],
+        check=True,
+        capture_output=True,
+    )
+    return bare
+
+
+def _discover(tmp_path: Path, branch: str | None = None) -> list[BareRepository]:
+    """Discover the bare repositories below tmp_path/repos."""
+    return sorted(
+        BareRepositoryDiscovery()([tmp_path / "repos"], branch=branch),
+        key=lambda repository: repository.git_dir,
+    )
+
+
+def _message(repository: BareRepository, files: object) -> str:
+    """Return a fixed commit message."""
+    return f"Update {repository.name}"
+
+
+class TestBareRepositoryDiscovery:
+    """Tests for BareRepositoryDiscovery."""
+
+    def test_finds_bare_repositories_with_the_marker(self, tmp_path: Path) -> None:
+        """Only bare repositories whose HEAD tree has the marker should be found."""
+        marked = _bare(tmp_path, "marked")
+        _bare(tmp_path, "unmarked", {"README.md": "# Other\n"})
+        # Creates the working tree nested/work/inner, which must not be found,
+        # next to the bare repository nested/repos/inner.git.
+        (tmp_path / "repos" / "nested").mkdir()
+        inner = _bare(tmp_path / "repos" / "nested", "inner")
+
+        repositories = _discover(tmp_path)
+
+        assert [repository.git_dir for repository in repositories] == [marked, inner]
+        assert repositories[0].ref == "refs/heads/main"
+        assert repositories[0].parent == _git(marked, "rev-parse", "main")
+
+    def test_branch_builds_on_its_tip_or_head(self, tmp_path: Path) -> None:
+        """A chosen branch should start from HEAD until it exists."""
+        bare = _bare(tmp_path, "project")
+        head = _git(bare, "rev-parse", "HEAD")
+
+        (new,) = _discover(tmp_path, branch="ci/templates")
+        assert (new.ref, new.parent) == ("refs/heads/ci/templates", head)
+
+        _git(bare, "update-ref", "refs/heads/ci/templates", head)
+        (existing,) = _discover(tmp_path, branch="ci/templates")
+        assert existing.parent == head
+
+
+class TestFastImportUpdater:
+    """Tests for FastImportUpdater."""
+
+    def test_commits_changed_templates_once(
+        self, source_bundle: TemplateBundle, tmp_path: Path
+    ) -> None:
+        """The bundle should land in one commit; a second run changes nothing."""
+        bare = _bare(tmp_path, "project")
+        before = _git(bare, "rev-parse", "main")
+        updater = FastImportUpdater()
+
+        (result,) = updater(
+            [RepositoryUpdate(_discover(tmp_path)[0], source_bundle)], message=_message
+        )
+
+        assert result.status == RepositoryStatus.UPDATED
+        assert result.commit == _git(bare, "rev-parse", "main")
+        assert _git(bare, "rev-parse", "main^") == before
+        assert _git(bare, "log", "-1", "--format=%s%n%cn", "main") == "Update project\nDistributor"
+        assert _git(bare, "show", "main:.github/dependabot.yml") == "version: 2"
+        assert _git(bare, "show", "main:README.md") == "# Project"
+        assert len(result.files_changed) == len(source_bundle.files)
+
+        (again,) = updater(
+            [RepositoryUpdate(_discover(tmp_path)[0], source_bundle)], message=_message
+        )
+        assert again.status == RepositoryStatus.UNCHANGED
+        assert _git(bare, "rev-parse", "main") == result.commit
+
+    def test_only_differing_files_are_written(
+        self, source_bundle: TemplateBundle, tmp_path: Path
+    ) -> None:
+        """Templates matching the parent's blob and mode should not be rewritten."""
+        bare = _bare(
+            tmp_path,
+            "project",
+            {MARKER_FILE.as_posix(): "name: CI\n", ".github/dependabot.yml": "version: 2\n"},
+        )
+
+        (result,) = FastImportUpdater()(
+            [RepositoryUpdate(_discover(tmp_path)[0], source_bundle)], message=_message
+        )
+
+        assert Path("dependabot.yml") not in result.files_changed
+        assert MARKER_FILE.relative_to(".github") not in result.files_changed
+        changed = _git(bare, "diff", "--name-only", "main^", "main").splitlines()
+        assert changed == sorted(f".github/{path.as_posix()}" for path in result.files_changed)
+
+    def test_branch_and_dry_run(self, source_bundle: TemplateBundle, tmp_path: Path) -> None:
+        """A dry run should write nothing; a branch should leave HEAD's branch alone."""
+        bare = _bare(tmp_path, "project")
+        main = _git(bare, "rev-parse", "main")
+        updater = FastImportUpdater()
+
+        (dry,) = updater(
+            [RepositoryUpdate(_discover(tmp_path, "ci")[0], source_bundle)],
+            message=_message,
+            dry_run=True,
+        )
+        assert dry.status == RepositoryStatus.DRY_RUN
+        assert dry.files_changed
+        assert "refs/heads/ci" not in _git(bare, "for-each-ref")
+
+        (result,) = updater(
+            [RepositoryUpdate(_discover(tmp_path, "ci")[0], source_bundle)], message=_message
+        )
+        assert result.status == RepositoryStatus.UPDATED
+        assert _git(bare, "rev-parse", "ci^") == main
+        assert _git(bare, "rev-parse", "main") == main
+
+    def test_moved_branch_is_not_overwritten(
+        self, source_bundle: TemplateBundle, tmp_path: Path
+    ) -> None:
+        """A branch that moved since discovery should fail instead of losing commits."""
+        bare = _bare(tmp_path, "project")
+        (repository,) = _discover(tmp_path)
+        tree = _git(bare, "rev-parse", "main^{tree}")
+        moved = _git(bare, "commit-tree", tree, "-p", "main", "-m", "Concurrent")
+        _git(bare, "update-ref", "refs/heads/main", moved)
+
+        (result,) = FastImportUpdater()(
+            [RepositoryUpdate(repository, source_bundle)], message=_message
+        )
+
+        assert result.status == RepositoryStatus.ERROR
+        assert "Not updating" in (result.error_message or "")
+        assert _git(bare, "rev-parse", "main") == moved
+
+    def test_placeholders_are_rejected(self, source_bundle: TemplateBundle, tmp_path: Path) -> None:
+        """Templates that need a project's values cannot be rendered without a tree."""
+        _bare(tmp_path, "project")
+        template = source_bundle.files[0]
+        content = b"name: {{ cicd.package_name }}\n"
+        bundle = TemplateBundle(
+            source="templated",
+            files=(
+                type(template)(
+                    path=template.path, mode=template.mode, digest="templated", content=content
+                ),
+            ),
+        )
+
+        (result,) = FastImportUpdater()(
+            [RepositoryUpdate(_discover(tmp_path)[0], bundle)], message=_message
+        )
+
+        assert result.status == RepositoryStatus.ERROR
+        assert "placeholders" in (result.error_message or "")
+
+
+class TestUpdateReposCommand:
+    """Tests for the update-repos command."""
+
+    def test_updates_every_marked_repository(self, source_github_dir: Path, tmp_path: Path) -> None:
+        """Each marked repository should get one commit with the templated message."""
+        first = _bare(tmp_path, "first")
+        second = _bare(tmp_path, "second")
+        arguments = [
+            "update-repos",
+            "--source",
+            str(source_github_dir),
+            "--search-root",
+            str(tmp_path / "repos"),
+            "--commit-message",
+            "ci: {count} file(s) for {project}",
+            "--verbose",
+        ]
+
+        result = CliRunner().invoke(cli, arguments, obj=build_testing())
+
+        assert result.exit_code == 0, result.output
+        assert "Bare Repositories" in result.output
+        assert f"✓ {first}" in result.output
+        count = len(list(source_github_dir.rglob("*.yml")))
+        for bare in (first, second):
+            message = _git(bare, "log", "-1", "--format=%s", "main")
+            assert message == f"ci: {count} file(s) for {bare.name.removesuffix('.git')}"
+
+        again = CliRunner().invoke(cli, arguments, obj=build_testing())
+        assert "unchanged" in again.output
+        assert "✓" not in again.output
+
+    def test_rejects_unknown_message_fields(self, source_github_dir: Path, tmp_path: Path) -> None:
+        """A bad message template should fail before any repository is touched."""
+        result = CliRunner().invoke(
+            cli,
+            [
+                "update-repos",
+                "--source",
+                str(source_github_dir),
+                "--search-root",
+                str(tmp_path),
+                "--commit-message",
+                "{branch}",
+            ],
+            obj=build_testing(),
+        )
+
+        assert result.exit_code == 2
+        assert "unknown field" in result.output
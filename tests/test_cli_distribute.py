@@ -1,6 +1,6 @@
 """Tests for the distribute CLI command."""
 
-from collections.abc import Iterator
+from collections.abc import Iterator, Sequence
 from pathlib import Path
 
 import pytest
@@ -9,7 +9,12 @@ from click.testing import CliRunner
 from default_cicd_public.adapters.cli.root import cli
 from default_cicd_public.application.ports import AppServices
 from default_cicd_public.composition import build_testing
-from default_cicd_public.domain.models import CopyResult, CopyStatus, DiscoveredProject
+from default_cicd_public.domain.models import (
+    CopyResult,
+    CopyStatus,
+    DiscoveredProject,
+    TemplateBundle,
+)
 
 
 @pytest.fixture
@@ -25,7 +30,9 @@ def mock_services(
     """Create mock services for testing."""
     _root, projects_with_marker = search_root_with_projects
 
-    def mock_discover(search_root: Path) -> Iterator[DiscoveredProject]:
+    def mock_discover(
+        search_roots: Sequence[Path], markers: Sequence[Path] = (), **options: object
+    ) -> Iterator[DiscoveredProject]:
         for proj_path in projects_with_marker:
             yield DiscoveredProject(
                 root_path=proj_path,
@@ -33,7 +40,7 @@ def mock_services(
             )
 
     def mock_copy(
-        source_github_path: Path, target_project: DiscoveredProject, *, dry_run: bool = False
+        bundle: TemplateBundle, target_project: DiscoveredProject, *, dry_run: bool = False
     ) -> CopyResult:
         return CopyResult(
             project=target_project,
@@ -122,7 +129,9 @@ class TestDistributeCommand:
     ) -> None:
         """Should handle case when no projects are found."""
 
-        def mock_discover(search_root: Path) -> Iterator[DiscoveredProject]:
+        def mock_discover(
+            search_roots: Sequence[Path], markers: Sequence[Path] = (), **options: object
+        ) -> Iterator[DiscoveredProject]:
             return iter([])
 
         services = build_testing(
@@ -144,7 +153,9 @@ class TestDistributeCommand:
         source_root = source_github_dir.parent
 
         # Create a discovery that returns the source project itself
-        def mock_discover(search_root: Path) -> Iterator[DiscoveredProject]:
+        def mock_discover(
+            search_roots: Sequence[Path], markers: Sequence[Path] = (), **options: object
+        ) -> Iterator[DiscoveredProject]:
             yield DiscoveredProject(
                 root_path=source_root,
                 github_path=source_github_dir,
@@ -184,6 +195,134 @@ class TestDistributeCommand:
         assert "Summary" in result.output or "projects" in result.output.lower()
 
 
+class TestTemplateFamilies:
+    """Tests for the --template option."""
+
+    def test_routes_projects_to_their_source(
+        self, cli_runner: CliRunner, source_github_dir: Path, tmp_path: Path
+    ) -> None:
+        """Each project should receive the bundle registered for its marker."""
+        docs_source = tmp_path / "docs_source" / ".github"
+        (docs_source / "workflows").mkdir(parents=True)
+        (docs_source / "workflows" / "docs.yml").write_text("name: Docs\n")
+        library_marker = Path(".github/workflows/default_cicd_public.yml")
+        docs_marker = Path(".github/workflows/docs.yml")
+        library = DiscoveredProject(tmp_path / "lib", tmp_path / "lib" / ".github", library_marker)
+        docs = DiscoveredProject(tmp_path / "docs", tmp_path / "docs" / ".github", docs_marker)
+        seen_markers: list[Sequence[Path]] = []
+        copies: dict[Path, Path] = {}
+
+        def mock_discover(
+            search_roots: Sequence[Path], markers: Sequence[Path] = (), **options: object
+        ) -> Iterator[DiscoveredProject]:
+            seen_markers.append(markers)
+            yield from (library, docs)
+
+        def mock_copy(
+            bundle: TemplateBundle, target_project: DiscoveredProject, *, dry_run: bool = False
+        ) -> CopyResult:
+            copies[target_project.root_path] = Path(bundle.source)
+            return CopyResult(project=target_project, status=CopyStatus.DRY_RUN)
+
+        services = build_testing(discover_projects=mock_discover, copy_templates=mock_copy)
+
+        result = cli_runner.invoke(
+            cli,
+            [
+                "distribute",
+                "--search-root",
+                str(tmp_path),
+                "--template",
+                f"{library_marker}={source_github_dir}",
+                "--template",
+                f"{docs_marker}={docs_source}",
+                "--dry-run",
+            ],
+            obj=services,
+        )
+
+        assert result.exit_code == 0, result.output
+        assert seen_markers == [[library_marker, docs_marker]]
+        assert copies == {
+            library.root_path: source_github_dir.resolve(),
+            docs.root_path: docs_source.resolve(),
+        }
+
+    @pytest.mark.parametrize(
+        "value",
+        ["no-separator", "=missing-marker", "marker.yml=/does/not/exist"],
+    )
+    def test_rejects_malformed_template(
+        self, cli_runner: CliRunner, mock_services: AppServices, tmp_path: Path, value: str
+    ) -> None:
+        """Should fail with a usage error for a malformed --template."""
+        result = cli_runner.invoke(
+            cli,
+            ["distribute", "--search-root", str(tmp_path), "--template", value],
+            obj=mock_services,
+        )
+
+        assert result.exit_code == 2
+        assert "--template" in result.output
+
+
+class TestTargetsFrom:
+    """Tests for the --targets-from option."""
+
+    def test_reads_targets_from_stdin(
+        self,
+        cli_runner: CliRunner,
+        source_github_dir: Path,
+        search_root_with_projects: tuple[Path, list[Path]],
+    ) -> None:
+        """Should validate listed roots instead of walking a search root."""
+        root, projects_with_marker = search_root_with_projects
+        copied: list[Path] = []
+
+        def failing_discover(
+            search_roots: Sequence[Path], markers: Sequence[Path] = (), **options: object
+        ) -> Iterator[DiscoveredProject]:
+            raise AssertionError("discovery must not run")
+
+        def mock_copy(
+            bundle: TemplateBundle, target_project: DiscoveredProject, *, dry_run: bool = False
+        ) -> CopyResult:
+            copied.append(target_project.root_path)
+            return CopyResult(project=target_project, status=CopyStatus.DRY_RUN)
+
+        services = build_testing(
+            discover_projects=failing_discover,
+            copy_templates=mock_copy,
+            get_source_github_path=lambda: source_github_dir,
+        )
+        listing = "\n".join(str(p) for p in [*projects_with_marker, root / "project3"])
+
+        result = cli_runner.invoke(
+            cli,
+            ["distribute", "--targets-from", "-", "--dry-run"],
+            obj=services,
+            input=listing,
+        )
+
+        assert result.exit_code == 0, result.output
+        assert sorted(copied) == sorted(projects_with_marker)
+        assert "Skipped 1 listed target" in result.output
+
+    def test_rejects_search_root_combination(
+        self, cli_runner: CliRunner, mock_services: AppServices, tmp_path: Path
+    ) -> None:
+        """--targets-from and --search-root should be mutually exclusive."""
+        result = cli_runner.invoke(
+            cli,
+            ["distribute", "--targets-from", "-", "--search-root", str(tmp_path)],
+            obj=mock_services,
+            input="",
+        )
+
+        assert result.exit_code == 2
+        assert "mutually exclusive" in result.output
+
+
 class TestVersionOption:
     """Tests for version option."""
 
@@ -204,6 +343,7 @@ class TestRealFilesystemIntegration:
 
     def test_discovers_real_projects(self, tmp_path: Path) -> None:
         """Integration test with real filesystem discovery."""
+        from default_cicd_public.adapters.filesystem.bundle import FilesystemBundleLoader
         from default_cicd_public.adapters.filesystem.copier import FilesystemCopier
         from default_cicd_public.adapters.filesystem.discovery import FilesystemDiscovery
 
@@ -222,12 +362,12 @@ class TestRealFilesystemIntegration:
         discovery = FilesystemDiscovery()
         copier = FilesystemCopier()
 
-        projects = list(discovery(tmp_path))
+        projects = list(discovery([tmp_path]))
         assert len(projects) == 2  # source and target
 
         # Copy to target (excluding source)
         target_project = next(p for p in projects if p.root_path == target)
-        result = copier(source_github, target_project, dry_run=False)
+        result = copier(FilesystemBundleLoader()(source_github), target_project, dry_run=False)
 
         assert result.status == CopyStatus.SUCCESS
         assert (target / ".github" / "workflows" / "release.yml").exists()
@@ -0,0 +1,215 @@
+"""Tests for the adaptive concurrency controller and scheduler."""
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from default_cicd_public.adapters.cli.root import cli
+from default_cicd_public.adapters.filesystem.discovery import FilesystemDiscovery
+from default_cicd_public.application.concurrency import AdaptiveScheduler, AIMDLimit
+from default_cicd_public.composition import build_testing
+from default_cicd_public.domain.models import ConcurrencyBounds, ConcurrencyReport
+
+
+class TestAIMDLimit:
+    """Tests for AIMDLimit."""
+
+    def test_starts_at_minimum(self) -> None:
+        """The limit should start at the lower bound."""
+        assert AIMDLimit(ConcurrencyBounds(2, 8)).current == 2
+
+    def test_slow_start_grows_when_saturated(self) -> None:
+        """Fast, saturated samples should raise the limit up to the maximum."""
+        limit = AIMDLimit(ConcurrencyBounds(1, 4))
+
+        for _ in range(10):
+            limit.record(0.001, in_flight=limit.current - 1)
+
+        assert limit.current == 4
+
+    def test_does_not_grow_when_underused(self) -> None:
+        """The limit should stay put while it is not being used."""
+        limit = AIMDLimit(ConcurrencyBounds(4, 16))
+
+        for _ in range(10):
+            limit.record(0.001, in_flight=0)
+
+        assert limit.current == 4
+
+    def test_backs_off_on_latency_spike(self) -> None:
+        """A congested sample should shrink the limit, but not below the minimum."""
+        limit = AIMDLimit(ConcurrencyBounds(2, 64))
+        for _ in range(40):
+            limit.record(0.001, in_flight=limit.current - 1)
+        grown = limit.current
+
+        for _ in range(grown):
+            limit.record(0.5, in_flight=0)
+
+        assert limit.current < grown
+        for _ in range(100):
+            limit.record(5.0, in_flight=0)
+        assert limit.current == 2
+
+    def test_rejects_inverted_bounds(self) -> None:
+        """Bounds with min above max should be rejected."""
+        with pytest.raises(ValueError, match="min_workers"):
+            ConcurrencyBounds(8, 4)
+
+
+class TestAdaptiveScheduler:
+    """Tests for AdaptiveScheduler."""
+
+    def test_runs_all_items_and_expansions(self) -> None:
+        """Expansion should let the work feed itself like a tree walk."""
+        scheduler = AdaptiveScheduler[int, int](ConcurrencyBounds(1, 4))
+
+        results = list(
+            scheduler.run(
+                [1],
+                lambda n: n,
+                lane_of=lambda n: 0,
+                expand=lambda n: [2 * n, 2 * n + 1] if n < 8 else [],
+            )
+        )
+
+        assert sorted(results) == list(range(1, 16))
+
+    def test_never_exceeds_max_workers(self) -> None:
+        """In-flight work per lane should stay within the upper bound."""
+        lock = threading.Lock()
+        active = 0
+        peak = 0
+
+        def work(item: int) -> int:
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.002)
+            with lock:
+                active -= 1
+            return item
+
+        scheduler = AdaptiveScheduler[int, int](ConcurrencyBounds(1, 3))
+        results = list(scheduler.run(range(60), work, lane_of=lambda n: 0))
+
+        assert sorted(results) == list(range(60))
+        assert peak <= 3
+        [lane] = scheduler.report()
+        assert lane.peak_in_flight <= 3
+        assert lane.operations == 60
+
+    def test_lanes_are_reported_separately(self) -> None:
+        """Each lane should get its own statistics and a common-ancestor label."""
+        items = ["/a/x", "/a/y", "/b/z"]
+        scheduler = AdaptiveScheduler[str, str](ConcurrencyBounds(1, 2))
+
+        list(scheduler.run(items, lambda s: s, lane_of=lambda s: s.split("/")[1]))
+
+        report = scheduler.report()
+        assert [(lane.label, lane.operations) for lane in report] == [("/a", 2), ("/b/z", 1)]
+
+    def test_max_pending_bounds_the_frontier(self) -> None:
+        """Items should expand within their allowance and the queue stay near the cap."""
+
+        def expand(item: tuple[int, int]) -> list[tuple[int, int]]:
+            depth, allowance = item
+            assert allowance >= 2
+            # Every item wants ten children, but takes only what it is allowed.
+            return [(depth + 1, 0)] * min(10, allowance) if depth < 5 else []
+
+        scheduler = AdaptiveScheduler[tuple[int, int], tuple[int, int]](ConcurrencyBounds(4, 4))
+        results = list(
+            scheduler.run(
+                [(0, 0)],
+                lambda item: item,
+                lane_of=lambda item: 0,
+                expand=expand,
+                max_pending=12,
+                allow=lambda item, allowance: (item[0], allowance),
+            )
+        )
+
+        assert results
+        assert scheduler.peak_pending <= 12 + 5
+
+    def test_max_pending_needs_allow(self) -> None:
+        """A pending cap without a way to hand out allowances should be rejected."""
+        scheduler = AdaptiveScheduler[int, int](ConcurrencyBounds(1, 2))
+
+        with pytest.raises(ValueError, match="max_pending"):
+            list(scheduler.run([1], lambda n: n, lane_of=lambda n: 0, max_pending=8))
+
+    def test_work_errors_propagate(self) -> None:
+        """An exception in the work function should surface to the caller."""
+
+        def work(item: int) -> int:
+            raise RuntimeError(f"boom {item}")
+
+        scheduler = AdaptiveScheduler[int, int](ConcurrencyBounds(1, 2))
+
+        with pytest.raises(RuntimeError, match="boom"):
+            list(scheduler.run([1, 2, 3], work, lane_of=lambda n: 0))
+
+
+class TestConcurrencyReporting:
+    """Tests for reporting chosen concurrency."""
+
+    def test_discovery_fills_report(
+        self, search_root_with_projects: tuple[Path, list[Path]]
+    ) -> None:
+        """Discovery should report one lane per device it walked."""
+        root, expected = search_root_with_projects
+        report = ConcurrencyReport()
+
+        projects = list(
+            FilesystemDiscovery()([root], concurrency=ConcurrencyBounds(1, 8), report=report)
+        )
+
+        assert {p.root_path for p in projects} == set(expected)
+        assert all(p.device is not None for p in projects)
+        assert len(report.lanes) == 1
+        assert report.lanes[0].label == str(root)
+        assert 1 <= report.lanes[0].workers <= 8
+
+    def test_summary_shows_concurrency(
+        self,
+        source_github_dir: Path,
+        search_root_with_projects: tuple[Path, list[Path]],
+    ) -> None:
+        """The run summary should include the concurrency table."""
+        root, _ = search_root_with_projects
+        services = build_testing(get_source_github_path=lambda: source_github_dir)
+
+        result = CliRunner().invoke(
+            cli,
+            ["distribute", "--search-root", str(root), "--dry-run", "--max-workers", "4"],
+            obj=services,
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "Concurrency" in result.output
+        assert "discover" in result.output
+
+    def test_rejects_min_above_max(self, tmp_path: Path) -> None:
+        """--min-workers above --max-workers should be a usage error."""
+        result = CliRunner().invoke(
+            cli,
+            [
+                "distribute",
+                "--search-root",
+                str(tmp_path),
+                "--min-workers",
+                "9",
+                "--max-workers",
+                "2",
+            ],
+            obj=build_testing(),
+        )
+
+        assert result.exit_code == 2
+        assert "--min-workers" in result.output
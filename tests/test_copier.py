@@ -3,14 +3,14 @@
 from pathlib import Path
 
 from default_cicd_public.adapters.filesystem.copier import FilesystemCopier
-from default_cicd_public.domain.models import CopyStatus, DiscoveredProject
+from default_cicd_public.domain.models import CopyStatus, DiscoveredProject, TemplateBundle
 
 
 class TestFilesystemCopier:
     """Tests for FilesystemCopier."""
 
     def test_copies_files_successfully(
-        self, source_github_dir: Path, target_project_with_marker: Path
+        self, source_bundle: TemplateBundle, target_project_with_marker: Path
     ) -> None:
         """Should copy all files from source to target."""
         copier = FilesystemCopier()
@@ -20,7 +20,7 @@ class TestFilesystemCopier:
             github_path=target_github,
         )
 
-        result = copier(source_github_dir, project, dry_run=False)
+        result = copier(source_bundle, project, dry_run=False)
 
         assert result.status == CopyStatus.SUCCESS
         assert len(result.files_copied) > 0
@@ -34,7 +34,7 @@ class TestFilesystemCopier:
         assert (target_github / "actions" / "extract-metadata" / "action.yml").exists()
 
     def test_dry_run_does_not_modify(
-        self, source_github_dir: Path, target_project_with_marker: Path
+        self, source_bundle: TemplateBundle, target_project_with_marker: Path
     ) -> None:
         """Dry run should not modify any files."""
         copier = FilesystemCopier()
@@ -47,7 +47,7 @@ class TestFilesystemCopier:
         # Read original content
         original_content = (target_github / "workflows" / "default_cicd_public.yml").read_text()
 
-        result = copier(source_github_dir, project, dry_run=True)
+        result = copier(source_bundle, project, dry_run=True)
 
         assert result.status == CopyStatus.DRY_RUN
         assert len(result.files_copied) > 0
@@ -56,7 +56,9 @@ class TestFilesystemCopier:
         current_content = (target_github / "workflows" / "default_cicd_public.yml").read_text()
         assert current_content == original_content
 
-    def test_creates_missing_directories(self, source_github_dir: Path, tmp_path: Path) -> None:
+    def test_creates_missing_directories(
+        self, source_bundle: TemplateBundle, tmp_path: Path
+    ) -> None:
         """Should create missing directories in target."""
         copier = FilesystemCopier()
         target_project = tmp_path / "new_project"
@@ -69,7 +71,7 @@ class TestFilesystemCopier:
             github_path=target_github,
         )
 
-        result = copier(source_github_dir, project, dry_run=False)
+        result = copier(source_bundle, project, dry_run=False)
 
         assert result.status == CopyStatus.SUCCESS
         assert target_github.exists()
@@ -77,7 +79,10 @@ class TestFilesystemCopier:
         assert (target_github / "actions" / "extract-metadata").exists()
 
     def test_overwrites_existing_files(
-        self, source_github_dir: Path, target_project_with_marker: Path
+        self,
+        source_github_dir: Path,
+        source_bundle: TemplateBundle,
+        target_project_with_marker: Path,
     ) -> None:
         """Should overwrite existing files in target."""
         copier = FilesystemCopier()
@@ -92,7 +97,7 @@ class TestFilesystemCopier:
         source_content = (source_github_dir / "workflows" / "default_cicd_public.yml").read_text()
         assert original != source_content
 
-        result = copier(source_github_dir, project, dry_run=False)
+        result = copier(source_bundle, project, dry_run=False)
 
         assert result.status == CopyStatus.SUCCESS
 
@@ -101,7 +106,7 @@ class TestFilesystemCopier:
         assert new_content == source_content
 
     def test_returns_relative_paths(
-        self, source_github_dir: Path, target_project_with_marker: Path
+        self, source_bundle: TemplateBundle, target_project_with_marker: Path
     ) -> None:
         """Should return relative paths for copied files."""
         copier = FilesystemCopier()
@@ -111,7 +116,7 @@ class TestFilesystemCopier:
             github_path=target_github,
         )
 
-        result = copier(source_github_dir, project, dry_run=False)
+        result = copier(source_bundle, project, dry_run=False)
 
         # All paths should be relative (no absolute paths)
         for file_path in result.files_copied:
@@ -126,7 +131,7 @@ class TestCopyResultProperties:
     """Tests for CopyResult properties."""
 
     def test_is_success_for_success_status(
-        self, source_github_dir: Path, target_project_with_marker: Path
+        self, source_bundle: TemplateBundle, target_project_with_marker: Path
     ) -> None:
         """is_success should be True for SUCCESS status."""
         copier = FilesystemCopier()
@@ -136,12 +141,12 @@ class TestCopyResultProperties:
             github_path=target_github,
         )
 
-        result = copier(source_github_dir, project, dry_run=False)
+        result = copier(source_bundle, project, dry_run=False)
 
         assert result.is_success is True
 
     def test_is_success_for_dry_run_status(
-        self, source_github_dir: Path, target_project_with_marker: Path
+        self, source_bundle: TemplateBundle, target_project_with_marker: Path
     ) -> None:
         """is_success should be True for DRY_RUN status."""
         copier = FilesystemCopier()
@@ -151,6 +156,23 @@ class TestCopyResultProperties:
             github_path=target_github,
         )
 
-        result = copier(source_github_dir, project, dry_run=True)
+        result = copier(source_bundle, project, dry_run=True)
 
         assert result.is_success is True
+
+    def test_reports_changed_files(
+        self, source_bundle: TemplateBundle, target_project_with_marker: Path
+    ) -> None:
+        """Only files whose content or mode differed should count as changed."""
+        copier = FilesystemCopier()
+        project = DiscoveredProject(
+            root_path=target_project_with_marker,
+            github_path=target_project_with_marker / ".github",
+        )
+
+        first = copier(source_bundle, project)
+        second = copier(source_bundle, project)
+
+        assert first.files_changed == first.files_copied
+        assert second.files_copied == first.files_copied
+        assert second.files_changed == []
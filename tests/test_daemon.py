@@ -0,0 +1,248 @@
+"""Tests for the distribution daemon and its client."""
+
+import socket
+import threading
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from default_cicd_public.adapters.cli.root import cli
+from default_cicd_public.adapters.daemon import DistributionDaemon, send_request
+from default_cicd_public.adapters.daemon.protocol import ProtocolError, decode, encode
+from default_cicd_public.adapters.filesystem import FilesystemDiscovery
+from default_cicd_public.composition import build_testing
+from default_cicd_public.domain.models import (
+    MARKER_FILE,
+    CopyResult,
+    DiscoveredProject,
+    TemplateBundle,
+    TemplateFamily,
+)
+
+needs_unix_sockets = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets"
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        """Start at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+@pytest.fixture
+def walks() -> list[Path]:
+    """Search roots walked by the counting discovery."""
+    return []
+
+
+@pytest.fixture
+def daemon(
+    source_github_dir: Path,
+    search_root_with_projects: tuple[Path, list[Path]],
+    walks: list[Path],
+) -> DistributionDaemon:
+    """Create a daemon over the real filesystem adapters that counts walks."""
+    root, _projects = search_root_with_projects
+    discovery = FilesystemDiscovery()
+
+    def counting_discover(
+        search_roots: Sequence[Path], markers: Sequence[Path] = (), **options: object
+    ) -> Iterator[DiscoveredProject]:
+        walks.extend(search_roots)
+        return discovery(search_roots, markers)
+
+    services = build_testing(discover_projects=counting_discover)
+    family = TemplateFamily(marker=MARKER_FILE, source_github_path=source_github_dir)
+    return DistributionDaemon(services, [family], search_root=root, clock=FakeClock())
+
+
+class TestProtocol:
+    """Tests for the JSON line protocol."""
+
+    def test_round_trip(self) -> None:
+        """An encoded message should decode to itself."""
+        message: dict[str, object] = {"command": "status", "rescan": True}
+
+        assert decode(encode(message)) == message
+
+    def test_rejects_non_objects(self) -> None:
+        """Only JSON objects are messages."""
+        with pytest.raises(ProtocolError):
+            decode(b"[1, 2]\n")
+        with pytest.raises(ProtocolError):
+            decode(b"not json\n")
+
+
+class TestDistributionDaemon:
+    """Tests for request handling."""
+
+    def test_distribute_copies_to_discovered_projects(
+        self,
+        daemon: DistributionDaemon,
+        search_root_with_projects: tuple[Path, list[Path]],
+    ) -> None:
+        """A distribute request should update every project with the marker."""
+        _root, projects = search_root_with_projects
+
+        response = daemon.handle({"command": "distribute"})
+
+        assert response["ok"] is True
+        assert response["index"] == "scanned"
+        assert response["projects"] == 2
+        assert response["updated"] == 2
+        for project in projects:
+            assert (project / ".github" / "dependabot.yml").read_text() == "version: 2\n"
+
+    def test_second_request_reuses_index(
+        self, daemon: DistributionDaemon, walks: list[Path]
+    ) -> None:
+        """A fresh index should be re-validated instead of walked again."""
+        daemon.handle({"command": "dry-run"})
+        response = daemon.handle({"command": "dry-run"})
+
+        assert response["index"] == "warm"
+        assert response["projects"] == 2
+        assert len(walks) == 1
+
+    def test_warm_index_drops_projects_without_marker(
+        self,
+        daemon: DistributionDaemon,
+        search_root_with_projects: tuple[Path, list[Path]],
+    ) -> None:
+        """Re-validation should notice a removed marker."""
+        _root, projects = search_root_with_projects
+        daemon.handle({"command": "dry-run"})
+        (projects[0] / MARKER_FILE).unlink()
+
+        response = daemon.handle({"command": "dry-run"})
+
+        assert response["projects"] == 1
+
+    def test_rescan_and_expired_index_walk_again(
+        self, daemon: DistributionDaemon, walks: list[Path]
+    ) -> None:
+        """An explicit rescan or an expired index should walk the tree."""
+        clock = FakeClock()
+        daemon = DistributionDaemon(
+            daemon.services,
+            daemon.families,
+            search_root=daemon.search_root,
+            index_ttl=10,
+            clock=clock,
+        )
+        daemon.handle({"command": "dry-run"})
+        assert daemon.handle({"command": "dry-run", "rescan": True})["index"] == "scanned"
+        clock.now = 11
+        assert daemon.handle({"command": "dry-run"})["index"] == "scanned"
+        assert len(walks) == 3
+
+    def test_status_reports_index(self, daemon: DistributionDaemon) -> None:
+        """Status should describe requests and the warm index."""
+        daemon.handle({"command": "dry-run"})
+
+        response = daemon.handle({"command": "status"})
+
+        assert response["ok"] is True
+        assert response["requests"] == 2
+        assert response["index"] == [
+            {"search_root": str(daemon.search_root), "projects": 2, "age": 0.0}
+        ]
+
+    def test_invalid_requests_are_errors(self, daemon: DistributionDaemon) -> None:
+        """Bad requests should produce an error response, not an exception."""
+        assert daemon.handle({"command": "explode"})["ok"] is False
+        assert daemon.handle({"command": "distribute", "rescan": "yes"})["ok"] is False
+        assert daemon.handle({"command": "distribute", "search_root": "/does/not/exist"}) == {
+            "ok": False,
+            "error": "search_root is not a directory: /does/not/exist",
+        }
+
+    @pytest.mark.parametrize("error", [ValueError("bad template"), RuntimeError("disk on fire")])
+    def test_failed_runs_are_errors(
+        self,
+        source_github_dir: Path,
+        search_root_with_projects: tuple[Path, list[Path]],
+        error: Exception,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        """A failing service should produce an error response and a logged traceback."""
+
+        def failing_copy(
+            bundle: TemplateBundle, target_project: DiscoveredProject, *, dry_run: bool = False
+        ) -> CopyResult:
+            raise error
+
+        root, _projects = search_root_with_projects
+        services = build_testing(copy_templates=failing_copy)
+        family = TemplateFamily(marker=MARKER_FILE, source_github_path=source_github_dir)
+        daemon = DistributionDaemon(services, [family], search_root=root, clock=FakeClock())
+
+        response = daemon.handle({"command": "distribute"})
+
+        assert response["ok"] is False
+        assert str(error) in str(response["error"])
+        assert any(record.exc_info for record in caplog.records)
+        assert daemon.handle({"command": "status"})["ok"] is True
+
+
+@needs_unix_sockets
+class TestUnixSocket:
+    """Tests for the socket transport and the client command."""
+
+    @pytest.fixture
+    def socket_path(self, daemon: DistributionDaemon, tmp_path: Path) -> Iterator[Path]:
+        """Serve ``daemon`` on a socket in a background thread."""
+        from default_cicd_public.adapters.daemon.server import DaemonServer
+
+        path = tmp_path / "d.sock"
+        server = DaemonServer(path, daemon)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield path
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+    def test_send_request(self, socket_path: Path) -> None:
+        """The client should get the daemon's response over the socket."""
+        response = send_request(socket_path, {"command": "dry-run"}, timeout=10)
+
+        assert response["ok"] is True
+        assert response["projects"] == 2
+
+    def test_second_server_refuses_live_socket(
+        self, socket_path: Path, daemon: DistributionDaemon
+    ) -> None:
+        """Binding over a live daemon's socket should fail."""
+        from default_cicd_public.adapters.daemon.server import (
+            DaemonAlreadyRunningError,
+            DaemonServer,
+        )
+
+        with pytest.raises(DaemonAlreadyRunningError):
+            DaemonServer(socket_path, daemon)
+
+    def test_client_command(self, socket_path: Path) -> None:
+        """The client subcommand should print the summary."""
+        result = CliRunner().invoke(cli, ["client", "dry-run", "--socket", str(socket_path)])
+
+        assert result.exit_code == 0
+        assert "Would update 2/2 projects" in result.output
+
+    def test_client_without_daemon(self, tmp_path: Path) -> None:
+        """The client should explain when no daemon is running."""
+        result = CliRunner().invoke(
+            cli, ["client", "status", "--socket", str(tmp_path / "missing.sock")]
+        )
+
+        assert result.exit_code == 1
+        assert "No daemon is listening" in result.output
@@ -1,10 +1,24 @@
 """Tests for project discovery."""
 
+import os
 from pathlib import Path
+from typing import Any
 
 import pytest
+from click.testing import CliRunner
 
-from default_cicd_public.adapters.filesystem.discovery import FilesystemDiscovery
+from default_cicd_public.adapters.cli.root import cli
+from default_cicd_public.adapters.filesystem.discovery import FilesystemDiscovery, collapse_roots
+from default_cicd_public.adapters.filesystem.throttle import IOThrottle
+from default_cicd_public.composition import build_testing
+from default_cicd_public.domain.models import MARKER_FILE, ConcurrencyBounds, ScanReport
+
+
+def _project(root: Path) -> Path:
+    """Create a project carrying the marker below ``root``."""
+    (root / MARKER_FILE).parent.mkdir(parents=True)
+    (root / MARKER_FILE).write_text("name: CI\n")
+    return root
 
 
 class TestFilesystemDiscovery:
@@ -15,7 +29,7 @@ class TestFilesystemDiscovery:
         discovery = FilesystemDiscovery()
         parent = target_project_with_marker.parent
 
-        projects = list(discovery(parent))
+        projects = list(discovery([parent]))
 
         assert len(projects) == 1
         assert projects[0].root_path == target_project_with_marker
@@ -25,7 +39,7 @@ class TestFilesystemDiscovery:
         """Should not discover a project without the marker file."""
         discovery = FilesystemDiscovery()
 
-        projects = list(discovery(target_project_without_marker.parent))
+        projects = list(discovery([target_project_without_marker.parent]))
 
         assert len(projects) == 0
 
@@ -36,7 +50,7 @@ class TestFilesystemDiscovery:
         root, expected_projects = search_root_with_projects
         discovery = FilesystemDiscovery()
 
-        projects = list(discovery(root))
+        projects = list(discovery([root]))
 
         found_roots = {p.root_path for p in projects}
         expected_roots = set(expected_projects)
@@ -48,7 +62,7 @@ class TestFilesystemDiscovery:
         root, _ = search_root_with_projects
         discovery = FilesystemDiscovery()
 
-        projects = list(discovery(root))
+        projects = list(discovery([root]))
 
         # Check relative paths from the search root, not full paths
         # (pytest temp paths may contain test names like "test_skips_node_modules")
@@ -64,14 +78,14 @@ class TestFilesystemDiscovery:
         nonexistent = tmp_path / "nonexistent"
 
         # Should not raise, just return empty
-        projects = list(discovery(nonexistent))
+        projects = list(discovery([nonexistent]))
         assert projects == []
 
     def test_marker_file_property(self, target_project_with_marker: Path) -> None:
         """Should provide correct marker file path via property."""
         discovery = FilesystemDiscovery()
 
-        projects = list(discovery(target_project_with_marker.parent))
+        projects = list(discovery([target_project_with_marker.parent]))
 
         assert len(projects) == 1
         marker = projects[0].marker_file
@@ -106,7 +120,194 @@ class TestSkippedDirectories:
         )
 
         discovery = FilesystemDiscovery()
-        projects = list(discovery(tmp_path))
+        projects = list(discovery([tmp_path]))
 
         # Should not find the project inside the skip directory
         assert len(projects) == 0
+
+
+class TestMultipleMarkers:
+    """Tests for matching several template markers in one walk."""
+
+    def test_routes_each_project_to_its_marker(self, tmp_path: Path) -> None:
+        """Should report which marker each project carries."""
+        library = tmp_path / "library"
+        (library / ".github" / "workflows").mkdir(parents=True)
+        (library / ".github" / "workflows" / "library.yml").write_text("name: CI\n")
+        docs = tmp_path / "docs_site"
+        (docs / ".github" / "workflows").mkdir(parents=True)
+        (docs / ".github" / "workflows" / "docs.yml").write_text("name: Docs\n")
+        library_marker = Path(".github/workflows/library.yml")
+        docs_marker = Path(".github/workflows/docs.yml")
+
+        projects = list(FilesystemDiscovery()([tmp_path], markers=[library_marker, docs_marker]))
+
+        assert {p.root_path: p.marker for p in projects} == {
+            library: library_marker,
+            docs: docs_marker,
+        }
+
+    def test_first_marker_wins(self, tmp_path: Path) -> None:
+        """A project carrying several markers should be reported once."""
+        project = tmp_path / "both"
+        (project / ".github" / "workflows").mkdir(parents=True)
+        (project / ".github" / "workflows" / "a.yml").write_text("a\n")
+        (project / ".github" / "workflows" / "b.yml").write_text("b\n")
+        marker_a = Path(".github/workflows/a.yml")
+        marker_b = Path(".github/workflows/b.yml")
+
+        projects = list(FilesystemDiscovery()([tmp_path], markers=[marker_b, marker_a]))
+
+        assert len(projects) == 1
+        assert projects[0].marker == marker_b
+
+    def test_marker_outside_github_directory(self, tmp_path: Path) -> None:
+        """Markers do not have to live under .github/."""
+        project = tmp_path / "service"
+        project.mkdir()
+        (project / "service.marker").write_text("")
+
+        projects = list(FilesystemDiscovery()([tmp_path], markers=[Path("service.marker")]))
+
+        assert [p.root_path for p in projects] == [project]
+        assert projects[0].marker_file == project / "service.marker"
+
+
+class TestMultipleSearchRoots:
+    """Tests for scanning several search roots at once."""
+
+    def test_collapse_roots_drops_duplicates_and_nested_roots(self) -> None:
+        """Only the outermost of overlapping roots should remain."""
+        roots = [Path("/srv/b"), Path("/srv/a/x"), Path("/srv/a"), Path("/srv/ab"), Path("/srv/b")]
+
+        assert collapse_roots(roots) == [Path("/srv/a"), Path("/srv/ab"), Path("/srv/b")]
+
+    def test_overlapping_roots_find_each_project_once(self, tmp_path: Path) -> None:
+        """Nested, repeated and symlinked roots should not duplicate projects."""
+        share = tmp_path / "share"
+        projects = {_project(share / "team" / "one"), _project(share / "two")}
+        (tmp_path / "alias").symlink_to(share)
+
+        found = list(
+            FilesystemDiscovery()([share / "team", share, tmp_path / "alias", share / "team"])
+        )
+
+        assert sorted(p.root_path for p in found) == sorted(projects)
+
+    def test_project_reached_twice_is_reported_once(self, tmp_path: Path) -> None:
+        """A symlink into a project should not report it a second time."""
+        project = _project(tmp_path / "real")
+        (tmp_path / "link").symlink_to(project)
+
+        found = list(FilesystemDiscovery()([tmp_path]))
+
+        assert len(found) == 1
+        assert found[0].root_path in (project, tmp_path / "link")
+
+    def test_unreadable_roots_are_skipped(self, tmp_path: Path) -> None:
+        """A missing root should not stop the others from being scanned."""
+        project = _project(tmp_path / "present" / "project")
+
+        found = list(FilesystemDiscovery()([tmp_path / "missing", tmp_path / "present"]))
+
+        assert [p.root_path for p in found] == [project]
+
+    def test_distribute_accepts_repeated_search_roots(
+        self, source_github_dir: Path, tmp_path: Path
+    ) -> None:
+        """Every project below any of the roots should be updated once."""
+        first = _project(tmp_path / "share1" / "project")
+        second = _project(tmp_path / "share2" / "project")
+        services = build_testing(get_source_github_path=lambda: source_github_dir)
+
+        result = CliRunner().invoke(
+            cli,
+            [
+                "distribute",
+                "--search-root",
+                str(tmp_path / "share1"),
+                "--search-root",
+                str(tmp_path / "share2"),
+                "--search-root",
+                str(tmp_path / "share2" / "project"),
+                "--no-backup",
+            ],
+            obj=services,
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "Updated 2/2 projects" in result.output
+        assert (first / ".github" / "dependabot.yml").exists()
+        assert (second / ".github" / "dependabot.yml").exists()
+
+
+class _CountingThrottle(IOThrottle):
+    """Unlimited throttle counting the metadata operations it is asked for."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.operations = 0
+
+    def metadata(self, count: int = 1) -> None:
+        self.operations += count
+
+
+class TestWideDirectories:
+    """Tests for listing directories in chunks."""
+
+    def test_wide_directory_is_walked_in_chunks(self, tmp_path: Path) -> None:
+        """Projects in every chunk, and the wide directory itself, should be found."""
+        wide = _project(tmp_path / "wide")
+        for index in range(20):
+            (wide / f"file{index:02}.txt").write_text("")
+        nested = [_project(wide / f"sub{index}" / "app") for index in range(4)]
+        report = ScanReport()
+
+        projects = list(
+            FilesystemDiscovery(chunk_size=3)(
+                [tmp_path], concurrency=ConcurrencyBounds(1, 4), scan_report=report
+            )
+        )
+
+        assert sorted(p.root_path for p in projects) == sorted([wide, *nested])
+        # tmp_path, wide, .github, workflows and sub/app/.github/workflows x 4
+        assert report.directories == 4 + 4 * 4
+        assert report.entries == 1 + 25 + 1 + 1 + 4 * 4
+
+    def test_files_cost_no_stat(self, tmp_path: Path) -> None:
+        """Only chunks and subdirectories should take metadata operations."""
+        for index in range(100):
+            (tmp_path / f"file{index:03}.txt").write_text("")
+        (tmp_path / "sub").mkdir()
+        throttle = _CountingThrottle()
+
+        list(FilesystemDiscovery(throttle, chunk_size=10)([tmp_path]))
+
+        # The root's stat, 11 chunks of the root and its marker check (it is wider
+        # than a chunk), then one stat and one listing of sub
+        assert throttle.operations == 1 + 11 + 1 + 2
+
+    def test_abandoned_walk_closes_listings(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Stopping early should not leave listings of wide directories open."""
+        for index in range(10):
+            _project(tmp_path / f"project{index}")
+        opened: list[Any] = []
+        scandir = os.scandir
+
+        def recording_scandir(path: Path) -> Any:
+            listing = scandir(path)
+            opened.append(listing)
+            return listing
+
+        monkeypatch.setattr(os, "scandir", recording_scandir)
+        walk = FilesystemDiscovery(chunk_size=2)([tmp_path], concurrency=ConcurrencyBounds(1, 1))
+        next(walk)
+        # Dropping the last reference closes the generator.
+        del walk
+        monkeypatch.undo()
+
+        # A closed scandir iterator raises StopIteration right away.
+        assert opened
+        assert all(next(listing, None) is None for listing in opened)
@@ -0,0 +1,183 @@
+"""Tests for committing distributed templates with git."""
+
+import subprocess
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from default_cicd_public.adapters.cli.root import cli
+from default_cicd_public.adapters.git import GitCommitter
+from default_cicd_public.application.ports import AppServices
+from default_cicd_public.composition import build_testing
+from default_cicd_public.domain.models import (
+    MARKER_FILE,
+    CommitRequest,
+    CommitStatus,
+    DiscoveredProject,
+)
+
+
+def _git(cwd: Path, *args: str) -> str:
+    """Run git in ``cwd`` and return its output."""
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+@pytest.fixture(autouse=True)
+def git_identity(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Give git an identity and keep it away from the user's configuration."""
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", str(tmp_path / "gitconfig"))
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    for role in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{role}_NAME", "Distributor")
+        monkeypatch.setenv(f"GIT_{role}_EMAIL", "distributor@example.com")
+
+
+def _clone(tmp_path: Path, name: str) -> tuple[Path, Path]:
+    """Create a bare repository and a clone carrying the marker file."""
+    remote = tmp_path / "remotes" / f"{name}.git"
+    remote.mkdir(parents=True)
+    _git(remote, "init", "--quiet", "--bare", "--initial-branch=main")
+    clone = tmp_path / "targets" / name
+    _git(tmp_path, "clone", "--quiet", str(remote), str(clone))
+    _git(clone, "checkout", "--quiet", "-b", "main")
+    (clone / MARKER_FILE).parent.mkdir(parents=True)
+    (clone / MARKER_FILE).write_text("name: Old CI\n")
+    (clone / "README.md").write_text("# Project\n")
+    _git(clone, "add", ".")
+    _git(clone, "commit", "--quiet", "-m", "Initial")
+    _git(clone, "push", "--quiet", "-u", "origin", "main")
+    return clone, remote
+
+
+def _services(roots: Sequence[Path], source_github_dir: Path) -> AppServices:
+    """Build services that discover exactly ``roots``."""
+
+    def mock_discover(
+        search_roots: Sequence[Path], markers: Sequence[Path] = (), **options: object
+    ) -> Iterator[DiscoveredProject]:
+        for root in roots:
+            yield DiscoveredProject(root_path=root, github_path=root / ".github")
+
+    return build_testing(
+        discover_projects=mock_discover, get_source_github_path=lambda: source_github_dir
+    )
+
+
+class TestGitCommitter:
+    """Tests for GitCommitter."""
+
+    def test_commits_only_the_requested_paths(self, tmp_path: Path) -> None:
+        """Unrelated modifications in the repository should stay uncommitted."""
+        clone, _ = _clone(tmp_path, "p")
+        (clone / MARKER_FILE).write_text("name: CI\n")
+        (clone / "README.md").write_text("# Edited\n")
+        project = DiscoveredProject(root_path=clone, github_path=clone / ".github")
+
+        (result,) = GitCommitter()([CommitRequest(project, (MARKER_FILE,), "Update templates")])
+
+        assert result.status == CommitStatus.COMMITTED
+        assert result.commit == _git(clone, "rev-parse", "HEAD")
+        assert _git(clone, "log", "-1", "--format=%s") == "Update templates"
+        assert _git(clone, "status", "--porcelain") == "M README.md"
+
+    def test_unchanged_and_foreign_directories(self, tmp_path: Path) -> None:
+        """Paths matching HEAD and directories outside git make no commit."""
+        clone, _ = _clone(tmp_path, "p")
+        plain = tmp_path / "plain"
+        plain.mkdir()
+        requests = [
+            CommitRequest(
+                DiscoveredProject(root_path=root, github_path=root / ".github"),
+                (MARKER_FILE,),
+                "Update",
+            )
+            for root in (clone, plain)
+        ]
+
+        results = list(GitCommitter()(requests))
+
+        assert [result.status for result in results] == [
+            CommitStatus.NOTHING_TO_COMMIT,
+            CommitStatus.NOT_A_REPOSITORY,
+        ]
+
+
+class TestDistributeCommit:
+    """Tests for distribute --commit / --push."""
+
+    def test_push_commits_changed_projects(self, source_github_dir: Path, tmp_path: Path) -> None:
+        """Every changed project should be pushed to its bare remote with its message."""
+        repos = [_clone(tmp_path, name) for name in ("alpha", "beta", "gamma")]
+        roots = [clone for clone, _ in repos]
+
+        result = CliRunner().invoke(
+            cli,
+            [
+                "distribute",
+                "--search-root",
+                str(tmp_path),
+                "--no-backup",
+                "--push",
+                "--git-jobs",
+                "2",
+                "--commit-message",
+                "ci: sync {count} template file(s) into {project}",
+            ],
+            obj=_services(roots, source_github_dir),
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "pushed" in result.output
+        for clone, remote in repos:
+            assert _git(remote, "log", "-1", "--format=%s", "main") == (
+                f"ci: sync 5 template file(s) into {clone.name}"
+            )
+            assert _git(clone, "status", "--porcelain") == ""
+
+    def test_up_to_date_projects_are_not_committed(
+        self, source_github_dir: Path, tmp_path: Path
+    ) -> None:
+        """A second run changes nothing and so commits nothing."""
+        clone, remote = _clone(tmp_path, "alpha")
+        services = _services([clone], source_github_dir)
+        args = ["distribute", "--search-root", str(tmp_path), "--no-backup", "--push"]
+        CliRunner().invoke(cli, args, obj=services)
+        head = _git(remote, "rev-parse", "main")
+
+        result = CliRunner().invoke(cli, [*args, "--force"], obj=services)
+
+        assert result.exit_code == 0, result.output
+        assert "No project had changes to commit" in result.output
+        assert _git(remote, "rev-parse", "main") == head
+
+    def test_push_failures_are_listed(self, source_github_dir: Path, tmp_path: Path) -> None:
+        """A project that cannot be pushed should be reported, the others still pushed."""
+        good, _ = _clone(tmp_path, "good")
+        bad, bad_remote = _clone(tmp_path, "bad")
+        _git(bad, "remote", "set-url", "origin", str(bad_remote.with_name("missing.git")))
+
+        result = CliRunner().invoke(
+            cli,
+            ["distribute", "--search-root", str(tmp_path), "--no-backup", "--push"],
+            obj=_services([good, bad], source_github_dir),
+        )
+
+        assert result.exit_code == 0, result.output
+        assert f"✗ {bad}:" in result.output
+        assert "but git push failed" in result.output
+        assert _git(bad, "log", "-1", "--format=%s").startswith("Update CI/CD templates")
+
+    def test_rejects_unknown_message_fields(self, tmp_path: Path) -> None:
+        """A bad template should be rejected before anything is copied."""
+        result = CliRunner().invoke(
+            cli,
+            ["distribute", "--search-root", str(tmp_path), "--commit", "--commit-message", "{x}"],
+            obj=build_testing(),
+        )
+
+        assert result.exit_code == 2
+        assert "unknown field" in result.output
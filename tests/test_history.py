@@ -0,0 +1,140 @@
+"""Tests for the copy history and longest-first copy scheduling."""
+
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from default_cicd_public.adapters.cli.root import cli
+from default_cicd_public.adapters.filesystem import CopyHistoryStore
+from default_cicd_public.application.distribution import plan_copies
+from default_cicd_public.application.ports import AppServices
+from default_cicd_public.composition import build_testing
+from default_cicd_public.domain.models import (
+    MARKER_FILE,
+    ConcurrencyBounds,
+    CopyHistory,
+    DiscoveredProject,
+)
+
+
+def _project(name: str) -> DiscoveredProject:
+    """Return a project on one device so all copies share a lane."""
+    root = Path("/targets") / name
+    return DiscoveredProject(root_path=root, github_path=root / ".github", device=1)
+
+
+class TestCopyHistoryStore:
+    """Tests for CopyHistoryStore."""
+
+    def test_durations_are_smoothed_across_runs(self, tmp_path: Path) -> None:
+        """A new duration should move the recorded one by the smoothing weight."""
+        store = CopyHistoryStore(tmp_path / "history.sqlite3", smoothing=0.5)
+        a, b = Path("/targets/a"), Path("/targets/b")
+
+        assert store.load([a]) == CopyHistory()
+
+        store.record({a: 4.0}, parallelism=2.0)
+        store.record({a: 2.0, b: 1.0}, parallelism=3.0)
+
+        history = store.load([a, b, Path("/targets/unknown")])
+        assert history.durations == {a: 3.0, b: 1.0}
+        assert history.parallelism == 3.0
+
+    def test_stale_projects_are_forgotten(self, tmp_path: Path) -> None:
+        """Rows older than the retention period should be pruned on record."""
+        now = 1000.0
+        store = CopyHistoryStore(tmp_path / "history.sqlite3", retention=60, clock=lambda: now)
+        store.record({Path("/old"): 1.0}, parallelism=1.0)
+
+        now += 120
+        store.record({Path("/new"): 1.0}, parallelism=1.0)
+
+        assert store.load([Path("/old"), Path("/new")]).durations == {Path("/new"): 1.0}
+
+    def test_unreadable_database_reads_as_empty(self, tmp_path: Path) -> None:
+        """A corrupt database should neither fail loading nor recording."""
+        path = tmp_path / "history.sqlite3"
+        path.write_text("not a database")
+        store = CopyHistoryStore(path)
+
+        store.record({Path("/a"): 1.0}, parallelism=1.0)
+
+        assert store.load([Path("/a")]) == CopyHistory()
+
+
+class TestPlanCopies:
+    """Tests for plan_copies."""
+
+    def test_longest_copies_start_first(self) -> None:
+        """Projects should be ordered by recorded duration, unknown ones by the median."""
+        projects = [_project(name) for name in ("a", "b", "c", "d", "e")]
+        durations = {
+            Path("/targets/a"): 1.0,
+            Path("/targets/b"): 9.0,
+            Path("/targets/c"): 3.0,
+            Path("/targets/d"): 5.0,
+        }
+        services = build_testing(
+            load_copy_history=lambda roots: CopyHistory(durations=durations, parallelism=2.0)
+        )
+
+        plan = plan_copies(services, projects)
+
+        # e is unknown and assumed to take the median of 4s.
+        assert [p.root_path.name for p in plan.projects] == ["b", "d", "e", "c", "a"]
+        # Two workers: 9 | 5+4=9 -> 3 on the first free -> 12, 1 -> 10.
+        assert plan.estimate == 12.0
+        assert plan.known == 4
+
+    def test_no_history_keeps_discovery_order(self) -> None:
+        """Without any recorded duration there should be no estimate."""
+        projects = [_project(name) for name in ("b", "a")]
+        services = build_testing(load_copy_history=lambda roots: CopyHistory())
+
+        plan = plan_copies(services, projects)
+
+        assert plan.projects == projects
+        assert plan.estimate is None
+
+    def test_workers_are_bounded_by_the_scheduler(self) -> None:
+        """The estimate should not assume more workers than max_workers allows."""
+        projects = [_project(name) for name in ("a", "b", "c")]
+        durations = {project.root_path: 2.0 for project in projects}
+        services = build_testing(
+            load_copy_history=lambda roots: CopyHistory(durations=durations, parallelism=8.0)
+        )
+
+        plan = plan_copies(
+            services, projects, concurrency=ConcurrencyBounds(min_workers=1, max_workers=1)
+        )
+
+        assert plan.estimate == pytest.approx(6.0)
+
+
+class TestDistributeEstimate:
+    """Tests for the copy time estimate of distribute."""
+
+    def test_second_run_prints_an_estimate(self, source_github_dir: Path, tmp_path: Path) -> None:
+        """The first run should record durations that the next run estimates from."""
+        for index in range(2):
+            marker = tmp_path / "targets" / f"project{index}" / MARKER_FILE
+            marker.parent.mkdir(parents=True)
+            marker.write_text("name: Old CI\n")
+        args = ["distribute", "--search-root", str(tmp_path / "targets"), "--no-backup"]
+        args += ["--force", "--verbose"]
+
+        def services() -> AppServices:
+            return build_testing(get_source_github_path=lambda: source_github_dir)
+
+        first = CliRunner().invoke(cli, args, obj=services())
+        second = CliRunner().invoke(cli, args, obj=services())
+
+        assert first.exit_code == 0, first.output
+        assert "Estimated copy time" not in first.output
+        assert second.exit_code == 0, second.output
+        assert "Estimated copy time: ~" in second.output
+        assert "(2/2 project(s) with history)" in second.output
+
+        dry = CliRunner().invoke(cli, [*args, "--dry-run"], obj=services())
+        assert "Estimated copy time" not in dry.output
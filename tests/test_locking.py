@@ -0,0 +1,197 @@
+"""Tests for advisory project locks."""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from default_cicd_public.adapters.cli.root import cli
+from default_cicd_public.adapters.filesystem import FilesystemCopier, ProjectLocks
+from default_cicd_public.adapters.filesystem.locking import LOCK_FILE_NAME, ProjectLockedError
+from default_cicd_public.composition import build_testing
+from default_cicd_public.domain.models import (
+    CopyStatus,
+    DiscoveredProject,
+    LockPolicy,
+    TemplateBundle,
+)
+
+
+def _lock_by_other(project_root: Path, *, expires: float) -> Path:
+    """Write a lock file owned by another distributor."""
+    lock_path = project_root / LOCK_FILE_NAME
+    lock_path.write_text(
+        json.dumps({"host": "build07", "pid": 4242, "token": "other", "expires": expires})
+    )
+    return lock_path
+
+
+class TestProjectLocks:
+    """Tests for ProjectLocks."""
+
+    def test_hold_creates_and_removes_the_lock(self, tmp_path: Path) -> None:
+        """The lock file should exist exactly while the lock is held."""
+        locks = ProjectLocks()
+
+        with locks.hold(tmp_path):
+            record = json.loads((tmp_path / LOCK_FILE_NAME).read_text())
+            assert record["pid"] == os.getpid()
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_held_lock_is_reported_with_its_owner(self, tmp_path: Path) -> None:
+        """Without waiting, a live lock of another owner should be reported."""
+        lock_path = _lock_by_other(tmp_path, expires=time.time() + 60)
+        locks = ProjectLocks(LockPolicy(wait_seconds=0))
+
+        with pytest.raises(ProjectLockedError, match="build07:4242") as info, locks.hold(tmp_path):
+            pass
+
+        assert info.value.owner is not None
+        assert info.value.owner.token == "other"
+        assert lock_path.exists()
+
+    def test_expired_lock_is_broken(self, tmp_path: Path) -> None:
+        """A lock past its lease should be taken over."""
+        _lock_by_other(tmp_path, expires=time.time() - 1)
+        locks = ProjectLocks(LockPolicy(wait_seconds=0))
+
+        with locks.hold(tmp_path):
+            record = json.loads((tmp_path / LOCK_FILE_NAME).read_text())
+            assert record["pid"] == os.getpid()
+
+    def test_unreadable_lock_expires_by_age(self, tmp_path: Path) -> None:
+        """A corrupt lock file should only be broken once a lease has passed."""
+        lock_path = tmp_path / LOCK_FILE_NAME
+        lock_path.write_text("{")
+        locks = ProjectLocks(LockPolicy(wait_seconds=0, lease_seconds=60))
+
+        with pytest.raises(ProjectLockedError, match="unknown owner"), locks.hold(tmp_path):
+            pass
+
+        os.utime(lock_path, (time.time() - 120, time.time() - 120))
+        with locks.hold(tmp_path):
+            pass
+
+    def test_waits_for_release(self, tmp_path: Path) -> None:
+        """A waiting distributor should get the lock once it is released."""
+        lock_path = _lock_by_other(tmp_path, expires=time.time() + 60)
+        threading.Timer(0.2, lock_path.unlink).start()
+        locks = ProjectLocks(LockPolicy(wait_seconds=5))
+
+        with locks.hold(tmp_path):
+            assert json.loads(lock_path.read_text())["pid"] == os.getpid()
+
+    def test_excludes_concurrent_holders(self, tmp_path: Path) -> None:
+        """At most one thread should be inside the lock at any time."""
+        locks = ProjectLocks(LockPolicy(wait_seconds=30))
+        inside = 0
+        peak = 0
+        counter = threading.Lock()
+
+        def work() -> None:
+            nonlocal inside, peak
+            with locks.hold(tmp_path):
+                with counter:
+                    inside += 1
+                    peak = max(peak, inside)
+                time.sleep(0.01)
+                with counter:
+                    inside -= 1
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert peak == 1
+        assert list(tmp_path.iterdir()) == []
+
+    def test_lease_is_renewed_while_held(self, tmp_path: Path) -> None:
+        """A lock held longer than its lease should stay ours, not be broken."""
+        now = 1000.0
+        policy = LockPolicy(wait_seconds=0, lease_seconds=0.3)
+        ours = ProjectLocks(policy, clock=lambda: now)
+        other = ProjectLocks(policy, clock=lambda: now)
+        lock_path = tmp_path / LOCK_FILE_NAME
+
+        with ours.hold(tmp_path):
+            # Long past the first lease; the heartbeat renews every 0.1s.
+            now += 60
+            deadline = time.monotonic() + 5
+            while json.loads(lock_path.read_text())["expires"] < now:
+                assert time.monotonic() < deadline, "lease was not renewed"
+                time.sleep(0.02)
+
+            with pytest.raises(ProjectLockedError), other.hold(tmp_path):
+                pass
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_disabled_policy_takes_no_lock(self, tmp_path: Path) -> None:
+        """With locking disabled, held locks are ignored."""
+        _lock_by_other(tmp_path, expires=time.time() + 60)
+        locks = ProjectLocks(LockPolicy(enabled=False))
+
+        with locks.hold(tmp_path):
+            pass
+
+
+class TestLockedCopies:
+    """Tests for locking during copies and distribute."""
+
+    def test_copier_reports_locked_project(
+        self, source_bundle: TemplateBundle, target_project_with_marker: Path
+    ) -> None:
+        """A locked project should be left untouched and reported as locked."""
+        _lock_by_other(target_project_with_marker, expires=time.time() + 60)
+        copier = FilesystemCopier(locks=ProjectLocks(LockPolicy(wait_seconds=0)))
+        project = DiscoveredProject(
+            root_path=target_project_with_marker,
+            github_path=target_project_with_marker / ".github",
+        )
+
+        result = copier(source_bundle, project)
+
+        assert result.status == CopyStatus.LOCKED
+        assert result.error_message == "Locked by build07:4242"
+        assert not (project.github_path / "dependabot.yml").exists()
+
+    def test_distribute_lists_contended_projects(
+        self, source_github_dir: Path, tmp_path: Path
+    ) -> None:
+        """Skipped projects should appear in the summary and the contention table."""
+        roots = [tmp_path / "targets" / name for name in ("free", "busy")]
+        for root in roots:
+            (root / ".github" / "workflows").mkdir(parents=True)
+            (root / ".github" / "workflows" / "default_cicd_public.yml").write_text("old\n")
+        _lock_by_other(roots[1], expires=time.time() + 60)
+
+        def mock_discover(
+            search_roots: Sequence[Path], markers: Sequence[Path] = (), **options: object
+        ) -> Iterator[DiscoveredProject]:
+            for root in roots:
+                yield DiscoveredProject(root_path=root, github_path=root / ".github")
+
+        services = build_testing(
+            discover_projects=mock_discover, get_source_github_path=lambda: source_github_dir
+        )
+
+        result = CliRunner().invoke(
+            cli,
+            ["distribute", "--search-root", str(tmp_path), "--lock-wait", "0", "--no-backup"],
+            obj=services,
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "Updated 1/2 projects" in result.output
+        assert "Contended Projects" in result.output
+        assert "build07:4242" in result.output
+        assert (roots[0] / ".github" / "dependabot.yml").exists()
+        assert not (roots[1] / ".github" / "dependabot.yml").exists()
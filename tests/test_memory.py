@@ -0,0 +1,222 @@
+"""Tests for the in-memory filesystem adapters."""
+
+import errno
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from default_cicd_public.adapters.cli.root import cli
+from default_cicd_public.adapters.memory import (
+    Fault,
+    MemoryCopier,
+    MemoryDiscovery,
+    MemoryFilesystem,
+    MemoryTargetValidator,
+    SyntheticTree,
+)
+from default_cicd_public.composition import build_testing
+from default_cicd_public.domain.models import (
+    MARKER_FILE,
+    ConcurrencyBounds,
+    ConcurrencyReport,
+    CopyStatus,
+    DiscoveredProject,
+    TemplateBundle,
+)
+
+ROOT = Path("/srv")
+
+
+class TestMemoryFilesystem:
+    """Tests for MemoryFilesystem."""
+
+    def test_synthetic_tree_is_generated_on_demand(self) -> None:
+        """Listing a synthetic tree should follow its shape."""
+        filesystem = MemoryFilesystem()
+        filesystem.add_synthetic_tree(ROOT / "tree", SyntheticTree(fanout=3, depth=2))
+
+        assert filesystem.listdir(ROOT / "tree") == ["d0", "d1", "d2"]
+        assert filesystem.listdir(ROOT / "tree" / "d2") == ["d0", "d1", "d2"]
+        assert filesystem.listdir(ROOT / "tree" / "d2" / "d0") == []
+        with pytest.raises(FileNotFoundError):
+            filesystem.listdir(ROOT / "tree" / "d3")
+
+    def test_writes_materialize_only_their_path(self) -> None:
+        """A write into a synthetic tree should keep the rest of it generated."""
+        filesystem = MemoryFilesystem()
+        filesystem.add_synthetic_tree(ROOT, SyntheticTree(fanout=2, depth=3))
+
+        filesystem.makedirs(ROOT / "d1" / "d0" / "new")
+        filesystem.write(ROOT / "d1" / "d0" / "new" / "file", b"data", 0o600)
+
+        assert filesystem.read(ROOT / "d1" / "d0" / "new" / "file") == b"data"
+        assert filesystem.stat(ROOT / "d1" / "d0" / "new" / "file").mode & 0o777 == 0o600
+        assert sorted(filesystem.listdir(ROOT / "d1" / "d0")) == ["d0", "d1", "new"]
+        assert filesystem.listdir(ROOT / "d0" / "d1") == ["d0", "d1"]
+
+    def test_failures_depend_only_on_seed_and_path(self) -> None:
+        """The same seed should fail the same paths on every run."""
+
+        def failing(seed: int) -> set[int]:
+            filesystem = MemoryFilesystem({"stat": Fault(failure_rate=0.3)}, seed=seed)
+            filesystem.add_directory(ROOT)
+            failed: set[int] = set()
+            for index in range(200):
+                try:
+                    filesystem.stat(ROOT / str(index))
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    failed.add(index)
+            return failed
+
+        assert failing(1) == failing(1)
+        assert failing(1) != failing(2)
+        assert 30 < len(failing(1)) < 90
+
+    def test_latency_is_injected_per_operation(self) -> None:
+        """Every faulted operation should sleep for its latency."""
+        sleeps: list[float] = []
+        filesystem = MemoryFilesystem({"list": Fault(latency=0.5)}, sleep=sleeps.append)
+        filesystem.add_directory(ROOT)
+
+        filesystem.listdir(ROOT)
+        filesystem.stat(ROOT)
+
+        assert sleeps == [0.5]
+        assert filesystem.operations == {"list": 1, "stat": 1}
+
+    def test_rejects_unknown_operations(self) -> None:
+        """Faults for operations the adapters never perform are a mistake."""
+        with pytest.raises(ValueError, match="Unknown operations"):
+            MemoryFilesystem({"read": Fault(latency=1)})
+
+
+class TestMemoryAdapters:
+    """Tests for discovery, validation and copying on a memory filesystem."""
+
+    def test_discovers_every_project_of_a_large_tree(self) -> None:
+        """Discovery should find exactly the projects the tree's shape implies."""
+        tree = SyntheticTree(fanout=10, depth=4, project_every=7)
+        filesystem = MemoryFilesystem()
+        filesystem.add_synthetic_tree(ROOT, tree, device=5)
+        report = ConcurrencyReport()
+
+        projects = list(MemoryDiscovery(filesystem)([ROOT], report=report))
+
+        assert len(projects) == tree.projects == 11110 // 7
+        assert all(project.device == 5 for project in projects)
+        # The root, every directory, and .github/ and workflows/ of every project
+        assert filesystem.operations["list"] == 1 + tree.directories + 2 * tree.projects
+        assert [lane.label for lane in report.lanes] == [str(ROOT)]
+
+    def test_discovery_reads_wide_directories_in_chunks(self) -> None:
+        """The memory walk should resume wide listings like the filesystem walk."""
+        tree = SyntheticTree(fanout=50, depth=1, project_every=1)
+        filesystem = MemoryFilesystem()
+        filesystem.add_synthetic_tree(ROOT, tree)
+        report = ConcurrencyReport()
+
+        projects = list(MemoryDiscovery(filesystem, chunk_size=8)([ROOT], report=report))
+
+        assert len(projects) == 50
+        # One listing per directory: the root, 50 projects, their .github/workflows
+        assert filesystem.operations["list"] == 1 + 50 + 2 * 50
+        # ... but the root's listing is read in seven chunks.
+        assert report.lanes[0].operations == 7 + 50 + 2 * 50
+
+    def test_discovery_frontier_is_bounded(self) -> None:
+        """A deep, wide walk should hold at most max_pending plus depth directories."""
+        tree = SyntheticTree(fanout=6, depth=4, project_every=5)
+        filesystem = MemoryFilesystem({"list": Fault(latency=0.0001)})
+        filesystem.add_synthetic_tree(ROOT, tree)
+        report = ConcurrencyReport()
+
+        projects = list(
+            MemoryDiscovery(filesystem, chunk_size=8, max_pending=16)(
+                [ROOT], concurrency=ConcurrencyBounds(8, 8), report=report
+            )
+        )
+
+        assert len(projects) == tree.projects
+        # Uncapped, the eight workers' interleaved paths hold over a hundred.
+        assert report.peak_pending <= 16 + tree.depth
+
+    def test_discovery_survives_failing_listings(self) -> None:
+        """Directories that cannot be listed should only hide their own subtree."""
+        tree = SyntheticTree(fanout=4, depth=4, project_every=1)
+        filesystem = MemoryFilesystem({"list": Fault(failure_rate=0.2)}, seed=3)
+        filesystem.add_synthetic_tree(ROOT, tree)
+
+        projects = list(MemoryDiscovery(filesystem)([ROOT]))
+
+        assert 0 < len(projects) < tree.projects
+
+    def test_validates_known_roots(self) -> None:
+        """Only roots carrying a marker should be returned, in order."""
+        filesystem = MemoryFilesystem()
+        filesystem.add_project(ROOT / "a")
+        filesystem.add_directory(ROOT / "b")
+        filesystem.add_project(ROOT / "c")
+
+        projects = list(MemoryTargetValidator(filesystem)([ROOT / "c", ROOT / "b", ROOT / "a"]))
+
+        assert [project.root_path for project in projects] == [ROOT / "c", ROOT / "a"]
+
+    def test_copy_writes_bundle(self, source_bundle: TemplateBundle) -> None:
+        """The copier should write every changed file with its mode, and only those."""
+        filesystem = MemoryFilesystem()
+        filesystem.add_project(ROOT / "p")
+        project = DiscoveredProject(root_path=ROOT / "p", github_path=ROOT / "p" / ".github")
+
+        result = MemoryCopier(filesystem)(source_bundle, project)
+
+        assert result.status == CopyStatus.SUCCESS
+        assert filesystem.read(ROOT / "p" / MARKER_FILE) == b"name: CI\n"
+        # The marker already had the template's content.
+        assert len(result.files_copied) == len(source_bundle.files)
+        assert filesystem.operations["write"] == len(result.files_changed)
+        assert filesystem.operations["write"] == len(source_bundle.files) - 1
+
+    @pytest.mark.parametrize(
+        ("error", "status"),
+        [(errno.EIO, CopyStatus.ERROR), (errno.EACCES, CopyStatus.PERMISSION_DENIED)],
+    )
+    def test_copy_failures_map_to_statuses(
+        self, source_bundle: TemplateBundle, error: int, status: CopyStatus
+    ) -> None:
+        """Injected write failures should surface like real ones."""
+        filesystem = MemoryFilesystem({"write": Fault(failure_rate=1.0, error=error)})
+        project = DiscoveredProject(root_path=ROOT / "p", github_path=ROOT / "p" / ".github")
+
+        result = MemoryCopier(filesystem)(source_bundle, project)
+
+        assert result.status == status
+        assert "Injected write failure" in (result.error_message or "")
+
+
+class TestDistributeInMemory:
+    """Tests for running distribute against build_testing(filesystem=...)."""
+
+    def test_distribute_updates_memory_projects(
+        self, source_github_dir: Path, tmp_path: Path
+    ) -> None:
+        """The whole command should run on the memory tree, not the disk."""
+        filesystem = MemoryFilesystem()
+        filesystem.add_synthetic_tree(tmp_path, SyntheticTree(fanout=3, depth=3, project_every=4))
+        services = build_testing(
+            filesystem=filesystem, get_source_github_path=lambda: source_github_dir
+        )
+
+        result = CliRunner().invoke(
+            cli, ["distribute", "--search-root", str(tmp_path), "--no-backup"], obj=services
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "Updated 9/9 projects" in result.output
+        assert (
+            filesystem.read(tmp_path / "d0" / "d0" / ".github" / "dependabot.yml")
+            == b"version: 2\n"
+        )
+        assert not (tmp_path / "d0").exists()
@@ -0,0 +1,127 @@
+"""Tests for the template bundle packaged into the wheel."""
+
+import json
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from default_cicd_public.adapters.cli.root import cli
+from default_cicd_public.adapters.packaged import (
+    BundleFormatError,
+    PackagedBundleLoader,
+    dump_bundle,
+    parse_bundle,
+)
+from default_cicd_public.application.distribution import load_bundles
+from default_cicd_public.composition import build_testing
+from default_cicd_public.domain.models import (
+    MARKER_FILE,
+    CopyResult,
+    CopyStatus,
+    DiscoveredProject,
+    TemplateBundle,
+    TemplateFamily,
+)
+
+
+class TestBundleResource:
+    """Tests for serializing bundles into the packaged resource."""
+
+    def test_round_trip(self, source_bundle: TemplateBundle) -> None:
+        """A dumped bundle should parse back to the same files."""
+        parsed = parse_bundle(dump_bundle(source_bundle, version="1.2.3"))
+
+        assert parsed.source == "packaged:1.2.3"
+        assert parsed.digest == source_bundle.digest
+        assert sorted(parsed.files, key=lambda f: f.path) == sorted(
+            source_bundle.files, key=lambda f: f.path
+        )
+
+    def test_rejects_manifest_mismatch(self, source_bundle: TemplateBundle) -> None:
+        """Editing a file's manifest entry should invalidate the bundle digest."""
+        document = json.loads(dump_bundle(source_bundle, version="1"))
+        document["files"][0]["mode"] = 0o777
+
+        with pytest.raises(BundleFormatError, match="digest"):
+            parse_bundle(json.dumps(document).encode())
+
+    @pytest.mark.parametrize(
+        "data",
+        [b"not json", b"[]", b'{"format": 99}', b'{"format": 1, "files": [{}]}'],
+    )
+    def test_rejects_malformed_documents(self, data: bytes) -> None:
+        """Malformed resources should raise BundleFormatError."""
+        with pytest.raises(BundleFormatError):
+            parse_bundle(data)
+
+
+class TestPackagedBundleLoader:
+    """Tests for PackagedBundleLoader."""
+
+    def test_loads_resource_once(self, source_bundle: TemplateBundle, tmp_path: Path) -> None:
+        """The resource should be read on first use and cached afterwards."""
+        resource = tmp_path / "templates.bundle.json"
+        resource.write_bytes(dump_bundle(source_bundle, version="1"))
+        loader = PackagedBundleLoader(resource)
+
+        first = loader()
+        resource.unlink()
+
+        assert first is not None
+        assert first.digest == source_bundle.digest
+        assert loader() is first
+
+    def test_missing_resource_returns_none(self, tmp_path: Path) -> None:
+        """A source checkout carries no packaged bundle."""
+        assert PackagedBundleLoader(tmp_path / "missing.json")() is None
+
+    def test_load_bundles_requires_packaged_bundle(self) -> None:
+        """A packaged family without a packaged bundle should fail clearly."""
+        services = build_testing(load_packaged_templates=lambda: None)
+
+        with pytest.raises(FileNotFoundError, match="packaged"):
+            load_bundles(services, [TemplateFamily(marker=MARKER_FILE)])
+
+
+class TestDistributeWithPackagedBundle:
+    """Tests for distribute defaulting to the packaged bundle."""
+
+    def test_uses_packaged_bundle_without_source(
+        self, source_bundle: TemplateBundle, tmp_path: Path
+    ) -> None:
+        """Without --source, the packaged bundle is copied and no path is looked up."""
+        project = DiscoveredProject(root_path=tmp_path / "p", github_path=tmp_path / "p/.github")
+        copied: list[TemplateBundle] = []
+
+        def mock_discover(
+            search_roots: Sequence[Path], markers: Sequence[Path] = (), **options: object
+        ) -> Iterator[DiscoveredProject]:
+            yield project
+
+        def mock_copy(
+            bundle: TemplateBundle, target_project: DiscoveredProject, *, dry_run: bool = False
+        ) -> CopyResult:
+            copied.append(bundle)
+            return CopyResult(project=target_project, status=CopyStatus.DRY_RUN)
+
+        def no_source_lookup() -> Path:
+            raise AssertionError("the source checkout should not be consulted")
+
+        services = build_testing(
+            discover_projects=mock_discover,
+            copy_templates=mock_copy,
+            load_packaged_templates=lambda: source_bundle,
+            get_source_github_path=no_source_lookup,
+        )
+
+        result = CliRunner().invoke(
+            cli,
+            ["distribute", "--search-root", str(tmp_path), "--dry-run", "--verbose"],
+            obj=services,
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "packaged with the tool" in result.output
+        assert copied == [source_bundle]
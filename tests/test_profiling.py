@@ -0,0 +1,172 @@
+"""Tests for run profiling."""
+
+import pstats
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from default_cicd_public.adapters.cli.root import cli
+from default_cicd_public.adapters.profiling import RunProfiler, phase
+from default_cicd_public.composition import build_testing
+from default_cicd_public.domain.models import MARKER_FILE, DiscoveredProject
+
+
+def _busy(seconds: float) -> None:
+    """Spin for a while so the sampler sees the frame."""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestRunProfiler:
+    """Tests for RunProfiler."""
+
+    def test_phase_is_noop_without_profiler(self) -> None:
+        """Phase markers should work when nothing is profiling."""
+        with phase("discover"):
+            value = 1
+
+        assert value == 1
+
+    def test_cprofile_writes_pstats_per_phase(self, tmp_path: Path) -> None:
+        """Should write a pstats file for each phase plus a merged run file."""
+        profiler = RunProfiler("cprofile", tmp_path)
+        profiler.start()
+        with phase("discover"):
+            _busy(0.01)
+        with phase("copy"):
+            _busy(0.01)
+        written = profiler.stop()
+
+        names = {path.name for path in written}
+        assert names == {"discover.pstats", "copy.pstats", "run.pstats"}
+        stats = pstats.Stats(str(tmp_path / "discover.pstats"))
+        assert "_busy" in stats.get_stats_profile().func_profiles
+
+    def test_cprofile_restricted_to_selected_phase(self, tmp_path: Path) -> None:
+        """Only selected phases should be profiled."""
+        profiler = RunProfiler("cprofile", tmp_path, frozenset({"copy"}))
+        profiler.start()
+        with phase("discover"):
+            _busy(0.001)
+        with phase("copy"):
+            _busy(0.001)
+        written = profiler.stop()
+
+        assert {path.name for path in written} == {"copy.pstats", "run.pstats"}
+
+    def test_cprofile_sees_worker_threads(self, tmp_path: Path) -> None:
+        """Work on threads started inside a phase should land in that phase."""
+        profiler = RunProfiler("cprofile", tmp_path)
+        profiler.start()
+        with phase("copy"), ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(_busy, [0.001, 0.001]))
+        profiler.stop()
+
+        stats = pstats.Stats(str(tmp_path / "copy.pstats"))
+        assert stats.get_stats_profile().func_profiles["_busy"].ncalls == "2"
+
+    def test_cprofile_threaded_phase_finishes(self, tmp_path: Path) -> None:
+        """Worker threads must not fail to start their own profile and stall the pool."""
+        profiler = RunProfiler("cprofile", tmp_path)
+        results: list[None] = []
+
+        def run() -> None:
+            profiler.start()
+            try:
+                with phase("copy"), ThreadPoolExecutor(max_workers=4) as pool:
+                    results.extend(pool.map(_busy, [0.001] * 8))
+            finally:
+                profiler.stop()
+
+        runner = threading.Thread(target=run, daemon=True)
+        runner.start()
+        runner.join(timeout=30)
+
+        assert not runner.is_alive()
+        assert len(results) == 8
+        assert (tmp_path / "copy.pstats").exists()
+
+    def test_sampling_writes_collapsed_stacks_with_phase_roots(self, tmp_path: Path) -> None:
+        """Every collapsed stack should be rooted at its phase."""
+        profiler = RunProfiler("sampling", tmp_path, sample_interval=0.001)
+        profiler.start()
+        with phase("discover"):
+            _busy(0.05)
+        written = profiler.stop()
+
+        assert [path.name for path in written] == ["run.collapsed"]
+        lines = (tmp_path / "run.collapsed").read_text().splitlines()
+        assert lines
+        assert all(line.startswith("phase:") for line in lines)
+        assert any(line.startswith("phase:discover;") and "_busy" in line for line in lines)
+
+
+class TestProfileOption:
+    """Tests for the --profile group option."""
+
+    def test_profile_option_writes_files(self, source_github_dir: Path, tmp_path: Path) -> None:
+        """Should write profile output for a CLI run."""
+
+        def mock_discover(
+            search_roots: Sequence[Path], markers: Sequence[Path] = (), **options: object
+        ) -> Iterator[DiscoveredProject]:
+            return iter([])
+
+        services = build_testing(
+            discover_projects=mock_discover,
+            get_source_github_path=lambda: source_github_dir,
+        )
+        profile_dir = tmp_path / "profile"
+
+        result = CliRunner().invoke(
+            cli,
+            [
+                "--profile",
+                "cprofile",
+                "--profile-dir",
+                str(profile_dir),
+                "distribute",
+                "--search-root",
+                str(tmp_path),
+            ],
+            obj=services,
+        )
+
+        assert result.exit_code == 0
+        assert (profile_dir / "discover.pstats").exists()
+        assert (profile_dir / "run.pstats").exists()
+
+    def test_cprofile_covers_the_copy_workers(
+        self, source_github_dir: Path, tmp_path: Path
+    ) -> None:
+        """The copies run on scheduler threads and should show up in copy.pstats."""
+        marker = tmp_path / "targets" / "project" / MARKER_FILE
+        marker.parent.mkdir(parents=True)
+        marker.write_text("name: Old CI\n")
+        profile_dir = tmp_path / "profile"
+
+        result = CliRunner().invoke(
+            cli,
+            [
+                "--profile",
+                "cprofile",
+                "--profile-phase",
+                "copy",
+                "--profile-dir",
+                str(profile_dir),
+                "distribute",
+                "--search-root",
+                str(tmp_path / "targets"),
+                "--no-backup",
+            ],
+            obj=build_testing(get_source_github_path=lambda: source_github_dir),
+        )
+
+        assert result.exit_code == 0, result.output
+        stats = pstats.Stats(str(profile_dir / "copy.pstats"))
+        assert "_write_files" in stats.get_stats_profile().func_profiles
@@ -0,0 +1,182 @@
+"""Tests for per-project template rendering."""
+
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from default_cicd_public.adapters.cli.root import cli
+from default_cicd_public.adapters.filesystem import FilesystemBundleLoader, TemplateRenderer
+from default_cicd_public.adapters.filesystem.rendering import (
+    RenderError,
+    compile_bundle,
+    read_project_context,
+    render_bundle,
+)
+from default_cicd_public.composition import build_testing
+from default_cicd_public.domain.models import DiscoveredProject, TemplateBundle
+
+WORKFLOW = (
+    "name: ${{ github.workflow }}\n"
+    "package: {{ cicd.package_name }}\n"
+    "python: {{cicd.python_versions}}\n"
+    "runs-on: {{ cicd.ci_os }}\n"
+)
+
+PYPROJECT = """\
+[project]
+name = "My-Package"
+classifiers = [
+    "Programming Language :: Python :: 3.11",
+    "Programming Language :: Python :: 3.12",
+]
+
+[tool.ci]
+os = ["ubuntu-latest"]
+"""
+
+
+@pytest.fixture
+def template_bundle(tmp_path: Path) -> TemplateBundle:
+    """Create a bundle with one templated and one plain file."""
+    github = tmp_path / "templates" / ".github"
+    (github / "workflows").mkdir(parents=True)
+    (github / "workflows" / "ci.yml").write_text(WORKFLOW)
+    (github / "dependabot.yml").write_text("version: 2\n")
+    return FilesystemBundleLoader()(github)
+
+
+def _project(root: Path, pyproject: str | None = PYPROJECT) -> DiscoveredProject:
+    """Create a project directory, optionally with a pyproject.toml."""
+    root.mkdir(parents=True)
+    if pyproject is not None:
+        (root / "pyproject.toml").write_text(pyproject)
+    return DiscoveredProject(root_path=root, github_path=root / ".github")
+
+
+class TestCompileAndRender:
+    """Tests for compiling and rendering bundles."""
+
+    def test_only_templated_files_are_compiled(self, template_bundle: TemplateBundle) -> None:
+        """Files without placeholders should not be compiled."""
+        compiled = compile_bundle(template_bundle)
+
+        assert list(compiled.templates) == [Path("workflows/ci.yml")]
+        assert compiled.names == {"package_name", "python_versions", "ci_os"}
+
+    def test_render_fills_placeholders_and_keeps_github_expressions(
+        self, template_bundle: TemplateBundle, tmp_path: Path
+    ) -> None:
+        """Placeholders are replaced; GitHub expressions and plain files are untouched."""
+        context = read_project_context(_project(tmp_path / "p").root_path)
+
+        rendered = render_bundle(compile_bundle(template_bundle), context)
+
+        files = {file.path: file for file in rendered.files}
+        assert files[Path("workflows/ci.yml")].content.decode() == (
+            "name: ${{ github.workflow }}\n"
+            "package: My-Package\n"
+            'python: ["3.11", "3.12"]\n'
+            'runs-on: ["ubuntu-latest"]\n'
+        )
+        plain = next(f for f in template_bundle.files if f.path == Path("dependabot.yml"))
+        assert files[Path("dependabot.yml")] is plain
+
+    def test_missing_value_is_an_error(self, template_bundle: TemplateBundle) -> None:
+        """A context without a used name cannot render."""
+        with pytest.raises(RenderError, match=r"cicd\.ci_os"):
+            render_bundle(
+                compile_bundle(template_bundle),
+                {"package_name": "x", "python_versions": "[]"},
+            )
+
+    def test_context_without_pyproject(self, tmp_path: Path) -> None:
+        """Projects without pyproject.toml only know their directory name."""
+        root = _project(tmp_path / "bare", pyproject=None).root_path
+
+        assert read_project_context(root) == {"directory_name": "bare"}
+
+
+class TestTemplateRenderer:
+    """Tests for TemplateRenderer."""
+
+    def test_identical_contexts_render_once(
+        self, template_bundle: TemplateBundle, tmp_path: Path
+    ) -> None:
+        """Projects that agree on the used values should share one render."""
+        projects = [_project(tmp_path / f"p{index}") for index in range(20)]
+        renderer = TemplateRenderer(max_workers=8)
+
+        outcome = renderer(template_bundle, projects)
+
+        assert outcome.contexts == 1
+        assert outcome.renders == 1
+        assert len({id(bundle) for bundle in outcome.bundles.values()}) == 1
+        assert renderer(template_bundle, projects).renders == 0
+
+    def test_render_cache_is_bounded(self, template_bundle: TemplateBundle, tmp_path: Path) -> None:
+        """The least recently used renders should be dropped beyond the cache size."""
+        projects = [
+            _project(tmp_path / f"p{index}", PYPROJECT.replace("My-Package", f"pkg{index}"))
+            for index in range(3)
+        ]
+        renderer = TemplateRenderer(max_workers=1, cache_size=2)
+
+        assert renderer(template_bundle, projects).renders == 3
+        # p0 was evicted; p1 and p2 are still cached.
+        assert renderer(template_bundle, projects[1:]).renders == 0
+        assert renderer(template_bundle, projects[:1]).renders == 1
+
+    def test_errors_are_reported_per_project(
+        self, template_bundle: TemplateBundle, tmp_path: Path
+    ) -> None:
+        """A project that cannot be rendered should not affect the others."""
+        good = _project(tmp_path / "good")
+        bad = _project(tmp_path / "bad", pyproject="[project\n")
+
+        outcome = TemplateRenderer()(template_bundle, [good, bad])
+
+        assert set(outcome.bundles) == {good.root_path}
+        assert "invalid pyproject.toml" in outcome.errors[bad.root_path]
+
+    def test_plain_bundle_reads_nothing(
+        self, source_bundle: TemplateBundle, tmp_path: Path
+    ) -> None:
+        """Bundles without placeholders should not need any project context."""
+        outcome = TemplateRenderer()(source_bundle, [_project(tmp_path / "p", pyproject="[")])
+
+        assert outcome.bundles == {}
+        assert outcome.errors == {}
+
+
+class TestDistributeRendering:
+    """Tests for rendering during distribute."""
+
+    def test_writes_rendered_files_and_reports_failures(
+        self, template_bundle: TemplateBundle, tmp_path: Path
+    ) -> None:
+        """Rendered projects get their values; failed ones are reported as errors."""
+        good = _project(tmp_path / "good")
+        bad = _project(tmp_path / "bad", pyproject='[project]\nname = "bad"\n')
+
+        def mock_discover(
+            search_roots: Sequence[Path], markers: Sequence[Path] = (), **options: object
+        ) -> Iterator[DiscoveredProject]:
+            yield from (good, bad)
+
+        services = build_testing(
+            discover_projects=mock_discover,
+            get_source_github_path=lambda: Path(template_bundle.source),
+        )
+
+        result = CliRunner().invoke(
+            cli,
+            ["distribute", "--search-root", str(tmp_path), "--source", template_bundle.source],
+            obj=services,
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "package: My-Package" in (good.github_path / "workflows" / "ci.yml").read_text()
+        assert not (bad.github_path / "workflows" / "ci.yml").exists()
+        assert "Updated 1/2 projects" in result.output
@@ -0,0 +1,200 @@
+"""Tests for run records and the no-op fast path of distribute."""
+
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from default_cicd_public.adapters.cli.root import cli
+from default_cicd_public.adapters.filesystem import RunStateStore
+from default_cicd_public.adapters.memory import MemoryFilesystem, SyntheticTree
+from default_cicd_public.application.ports import AppServices
+from default_cicd_public.composition import build_testing
+from default_cicd_public.domain.models import MARKER_FILE, DiscoveredProject
+
+SKIPPED = "Nothing changed since the run at"
+
+
+def _projects(root: Path, count: int) -> list[Path]:
+    """Create project roots that carry the marker."""
+    roots: list[Path] = []
+    for index in range(count):
+        project_root = root / f"project{index}"
+        (project_root / MARKER_FILE).parent.mkdir(parents=True)
+        (project_root / MARKER_FILE).write_text("name: Old CI\n")
+        roots.append(project_root)
+    return roots
+
+
+def _services(source_github_dir: Path, roots: list[Path]) -> AppServices:
+    """Build services discovering exactly ``roots``."""
+
+    def mock_discover(
+        search_roots: Sequence[Path], markers: Sequence[Path] = (), **options: object
+    ) -> Iterator[DiscoveredProject]:
+        for root in roots:
+            yield DiscoveredProject(root_path=root, github_path=root / ".github")
+
+    return build_testing(
+        discover_projects=mock_discover, get_source_github_path=lambda: source_github_dir
+    )
+
+
+class TestRunStateStore:
+    """Tests for RunStateStore."""
+
+    def test_unchanged_files_keep_the_record(self, tmp_path: Path) -> None:
+        """A record should hold until a watched file changes or appears."""
+        present, absent = tmp_path / "present", tmp_path / "absent"
+        present.write_text("a\n")
+        store = RunStateStore(tmp_path / "state")
+        store.record("key", [present, absent], projects=1)
+
+        assert store.find_unchanged("key", max_age=60) is not None
+        assert store.find_unchanged("other", max_age=60) is None
+
+        absent.write_text("new\n")
+        assert store.find_unchanged("key", max_age=60) is None
+
+    def test_modified_file_invalidates_the_record(self, tmp_path: Path) -> None:
+        """Rewriting a watched file, even with the same size, should count."""
+        watched = tmp_path / "watched"
+        watched.write_text("a\n")
+        store = RunStateStore(tmp_path / "state")
+        store.record("key", [watched], projects=1)
+
+        watched.unlink()
+        watched.write_text("b\n")
+
+        assert store.find_unchanged("key", max_age=60) is None
+
+    def test_old_record_expires(self, tmp_path: Path) -> None:
+        """Records older than max_age should no longer count."""
+        now = 1000.0
+        store = RunStateStore(tmp_path / "state", clock=lambda: now)
+        record = store.record("key", [], projects=3)
+
+        now += 30
+        assert store.find_unchanged("key", max_age=60) == record
+        now += 60
+        assert store.find_unchanged("key", max_age=60) is None
+
+
+class TestDistributeFastPath:
+    """Tests for skipping distribute runs that would change nothing."""
+
+    def test_identical_run_is_skipped(self, source_github_dir: Path, tmp_path: Path) -> None:
+        """A second run should exit early until a target changes or --force is given."""
+        roots = _projects(tmp_path / "targets", 2)
+        services = _services(source_github_dir, roots)
+        args = ["distribute", "--search-root", str(tmp_path), "--no-backup"]
+
+        first = CliRunner().invoke(cli, args, obj=services)
+        second = CliRunner().invoke(cli, args, obj=services)
+
+        assert first.exit_code == 0, first.output
+        assert "Updated 2/2 projects" in first.output
+        assert second.exit_code == 0, second.output
+        assert SKIPPED in second.output
+        assert "(2 project(s))" in second.output
+
+        forced = CliRunner().invoke(cli, [*args, "--force"], obj=services)
+        assert "Updated 2/2 projects" in forced.output
+
+        (roots[1] / ".github" / "dependabot.yml").write_text("version: 3\n")
+        third = CliRunner().invoke(cli, args, obj=services)
+        assert "Updated 2/2 projects" in third.output
+        assert (roots[1] / ".github" / "dependabot.yml").read_text() == "version: 2\n"
+
+    def test_changed_source_or_targets_run_again(
+        self, source_github_dir: Path, tmp_path: Path
+    ) -> None:
+        """A new bundle digest or a different target list should not be skipped."""
+        roots = _projects(tmp_path / "targets", 2)
+        services = _services(source_github_dir, roots)
+        targets = tmp_path / "targets.txt"
+        targets.write_text(f"{roots[0]}\n")
+        args = ["distribute", "--targets-from", str(targets), "--no-backup"]
+        CliRunner().invoke(cli, args, obj=services)
+
+        targets.write_text(f"{roots[0]}\n{roots[1]}\n")
+        assert SKIPPED not in CliRunner().invoke(cli, args, obj=services).output
+
+        (source_github_dir / "dependabot.yml").write_text("version: 3\n")
+        assert SKIPPED not in CliRunner().invoke(cli, args, obj=services).output
+        assert SKIPPED in CliRunner().invoke(cli, args, obj=services).output
+
+    def test_failed_and_dry_runs_are_not_recorded(
+        self, source_github_dir: Path, tmp_path: Path
+    ) -> None:
+        """Only runs that updated every target should allow skipping."""
+        roots = _projects(tmp_path / "targets", 1)
+        services = _services(source_github_dir, roots)
+        args = ["distribute", "--search-root", str(tmp_path), "--no-backup"]
+        (roots[0] / "pyproject.toml").write_text("[project\n")
+        (source_github_dir / "dependabot.yml").write_text("name: {{ cicd.name }}\n")
+
+        CliRunner().invoke(cli, [*args, "--dry-run"], obj=services)
+        failed = CliRunner().invoke(cli, [*args, "--verbose"], obj=services)
+        assert "Rendering failed" in failed.output
+
+        assert SKIPPED not in CliRunner().invoke(cli, args, obj=services).output
+
+    def test_new_project_is_distributed(self, source_github_dir: Path, tmp_path: Path) -> None:
+        """A project created below the search root should end the fast path."""
+        tree = tmp_path / "tree"
+        _projects(tree, 2)
+        services = build_testing(get_source_github_path=lambda: source_github_dir)
+        args = ["distribute", "--search-root", str(tree), "--no-backup"]
+        CliRunner().invoke(cli, args, obj=services)
+        assert SKIPPED in CliRunner().invoke(cli, args, obj=services).output
+
+        (new,) = _projects(tree / "nested", 1)
+
+        result = CliRunner().invoke(cli, args, obj=services)
+        assert "Updated 3/3 projects" in result.output
+        assert (new / ".github" / "dependabot.yml").read_text() == "version: 2\n"
+        assert SKIPPED in CliRunner().invoke(cli, args, obj=services).output
+
+    def test_walk_above_the_watch_limit_is_not_recorded(
+        self, source_github_dir: Path, tmp_path: Path
+    ) -> None:
+        """A walk listing more directories than --max-watched-dirs should walk again."""
+        tree = tmp_path / "tree"
+        _projects(tree, 2)
+        services = build_testing(get_source_github_path=lambda: source_github_dir)
+        args = ["distribute", "--search-root", str(tree), "--no-backup", "--verbose"]
+
+        first = CliRunner().invoke(cli, [*args, "--max-watched-dirs", "3"], obj=services)
+
+        assert "Not recorded: the walk listed more than 3 directories" in first.output
+        assert SKIPPED not in CliRunner().invoke(cli, args, obj=services).output
+        assert SKIPPED in CliRunner().invoke(cli, args, obj=services).output
+
+    def test_own_state_below_the_search_root_is_ignored(
+        self, source_github_dir: Path, tmp_path: Path
+    ) -> None:
+        """Writing the run's own records must not invalidate them."""
+        assert (tmp_path / "state").is_relative_to(tmp_path)
+        _projects(tmp_path / "tree", 1)
+        services = build_testing(get_source_github_path=lambda: source_github_dir)
+        args = ["distribute", "--search-root", str(tmp_path)]
+        CliRunner().invoke(cli, args, obj=services)
+
+        assert SKIPPED in CliRunner().invoke(cli, args, obj=services).output
+
+    def test_memory_tree_changes_are_seen(self, source_github_dir: Path, tmp_path: Path) -> None:
+        """Run records should validate files on the memory tree of build_testing."""
+        filesystem = MemoryFilesystem()
+        filesystem.add_synthetic_tree(tmp_path, SyntheticTree(fanout=2, depth=2, project_every=2))
+        services = build_testing(
+            filesystem=filesystem, get_source_github_path=lambda: source_github_dir
+        )
+        args = ["distribute", "--search-root", str(tmp_path), "--no-backup"]
+        CliRunner().invoke(cli, args, obj=services)
+
+        assert SKIPPED in CliRunner().invoke(cli, args, obj=services).output
+
+        dependabot = tmp_path / "d1" / ".github" / "dependabot.yml"
+        filesystem.add_file(dependabot, "version: 3\n")
+        assert SKIPPED not in CliRunner().invoke(cli, args, obj=services).output
@@ -0,0 +1,200 @@
+"""Tests for scan-cost attribution and exclude rules."""
+
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from default_cicd_public.adapters.cli.root import cli
+from default_cicd_public.adapters.filesystem import FilesystemDiscovery
+from default_cicd_public.adapters.memory import MemoryDiscovery, MemoryFilesystem, SyntheticTree
+from default_cicd_public.application.scan_report import ScanCostTracker, suggest_excludes
+from default_cicd_public.composition import build_testing
+from default_cicd_public.domain.models import MARKER_FILE, ScanReport, SubtreeCost
+
+ROOT = Path("/srv")
+
+
+def _project(root: Path) -> Path:
+    """Create a project carrying the marker below ``root``."""
+    (root / MARKER_FILE).parent.mkdir(parents=True)
+    (root / MARKER_FILE).write_text("name: CI\n")
+    return root
+
+
+def _dump(root: Path, files: int) -> Path:
+    """Create a project-free directory full of files."""
+    root.mkdir(parents=True)
+    for index in range(files):
+        (root / f"file{index}.bin").write_bytes(b"")
+    return root
+
+
+class TestScanCostTracker:
+    """Tests for ScanCostTracker."""
+
+    def test_rolls_up_project_free_subtrees(self) -> None:
+        """Only the outermost project-free subtree should be reported, with its totals."""
+        report = ScanReport()
+        tracker = ScanCostTracker(report)
+
+        tracker.visit(ROOT, is_root=True, entries=3, seconds=1, project=False, subdirectories=2)
+        tracker.visit(
+            ROOT / "app", is_root=False, entries=2, seconds=1, project=True, subdirectories=1
+        )
+        tracker.visit(
+            ROOT / "data", is_root=False, entries=5, seconds=2, project=False, subdirectories=1
+        )
+        tracker.visit(
+            ROOT / "data" / "raw",
+            is_root=False,
+            entries=100,
+            seconds=4,
+            project=False,
+            subdirectories=0,
+        )
+        tracker.visit(
+            ROOT / "app" / "docs",
+            is_root=False,
+            entries=7,
+            seconds=3,
+            project=False,
+            subdirectories=0,
+        )
+        tracker.close()
+
+        assert report.subtrees == [
+            SubtreeCost(path=ROOT / "data", directories=2, entries=105, seconds=6),
+            SubtreeCost(path=ROOT / "app" / "docs", directories=1, entries=7, seconds=3),
+        ]
+        assert (report.directories, report.entries, report.seconds) == (5, 117, 11)
+
+    def test_project_free_root_and_limit(self) -> None:
+        """A root without projects is reported itself; only ``limit`` subtrees are kept."""
+        report = ScanReport(limit=1)
+        tracker = ScanCostTracker(report)
+
+        for index, seconds in enumerate([1.0, 5.0, 2.0]):
+            tracker.visit(
+                ROOT / str(index),
+                is_root=True,
+                entries=1,
+                seconds=seconds,
+                project=False,
+                subdirectories=0,
+            )
+        tracker.close()
+
+        assert [subtree.path for subtree in report.subtrees] == [ROOT / "1"]
+
+    def test_suggestions_prefer_repeated_names(self) -> None:
+        """A name heading several subtrees should become one name pattern."""
+        subtrees = [
+            SubtreeCost(Path("/a/datasets"), 1, 1, 3.0),
+            SubtreeCost(Path("/home/bob/media"), 1, 1, 2.0),
+            SubtreeCost(Path("/b/datasets"), 1, 1, 1.0),
+        ]
+
+        assert suggest_excludes(subtrees) == ["datasets", "/home/bob/media"]
+
+    def test_names_leading_to_projects_get_path_rules(self, tmp_path: Path) -> None:
+        """A name pattern must not prune a same-named directory holding a project."""
+        app = _project(tmp_path / "a" / "src" / "app")
+        _dump(tmp_path / "a" / "src" / "app" / "cache", 5)
+        _dump(tmp_path / "b" / "src", 20)
+        _dump(tmp_path / "c" / "src", 10)
+        _project(tmp_path / "b" / "app")
+        _project(tmp_path / "c" / "app")
+        report = ScanReport()
+
+        list(FilesystemDiscovery()([tmp_path], scan_report=report))
+        rules = suggest_excludes(report.subtrees, report.project_names)
+
+        assert "src" in report.project_names
+        assert "src" not in rules
+        assert {(tmp_path / "b" / "src").as_posix(), (tmp_path / "c" / "src").as_posix()} <= set(
+            rules
+        )
+        found = FilesystemDiscovery()([tmp_path], exclude=rules)
+        assert app in {project.root_path for project in found}
+
+
+class TestDiscoveryScanReport:
+    """Tests for the scan report and exclude rules of discovery."""
+
+    def test_filesystem_walk_finds_the_dump(self, tmp_path: Path) -> None:
+        """A large project-free directory should lead the report."""
+        _project(tmp_path / "app")
+        dump = _dump(tmp_path / "app" / "dump", 200)
+        _dump(tmp_path / "app" / "small", 1)
+        report = ScanReport(limit=5)
+
+        list(FilesystemDiscovery()([tmp_path], scan_report=report))
+
+        assert report.subtrees[0].path == dump
+        assert report.subtrees[0].entries == 200
+        assert tmp_path not in [subtree.path for subtree in report.subtrees]
+
+    def test_exclude_patterns_prune_the_walk(self, tmp_path: Path) -> None:
+        """Name and path patterns should both keep the walk out of a directory."""
+        kept = _project(tmp_path / "keep")
+        _project(tmp_path / "datasets" / "hidden")
+        _project(tmp_path / "home" / "bob" / "Downloads" / "hidden")
+
+        found = FilesystemDiscovery()(
+            [tmp_path], exclude=["datasets", f"{tmp_path.as_posix()}/home/*/Downloads"]
+        )
+
+        assert [project.root_path for project in found] == [kept]
+
+    def test_memory_walk_reports_costs(self) -> None:
+        """The memory discovery should attribute costs like the filesystem one."""
+        filesystem = MemoryFilesystem()
+        tree = SyntheticTree(fanout=3, depth=3)
+        filesystem.add_synthetic_tree(ROOT, tree)
+        filesystem.add_project(ROOT / "d1")
+        report = ScanReport()
+
+        list(MemoryDiscovery(filesystem)([ROOT], scan_report=report, exclude=["d2"]))
+
+        # The root, d0 and d1 with two levels below each, and d1's .github/workflows
+        assert report.directories == 1 + 2 * (1 + 2 + 2 * 2) + 2
+        assert {subtree.path for subtree in report.subtrees} == {
+            ROOT / "d0",
+            ROOT / "d1" / "d0",
+            ROOT / "d1" / "d1",
+            ROOT / "d1" / ".github",
+        }
+
+
+class TestScanReportOption:
+    """Tests for distribute --scan-report."""
+
+    def test_prints_subtrees_and_rules(self, source_github_dir: Path, tmp_path: Path) -> None:
+        """The report should name the dump and suggest excluding it."""
+        _project(tmp_path / "app")
+        dump = _dump(tmp_path / "dump", 50)
+        services = build_testing(get_source_github_path=lambda: source_github_dir)
+
+        result = CliRunner().invoke(
+            cli,
+            ["distribute", "--search-root", str(tmp_path), "--scan-report", "--dry-run"],
+            obj=services,
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "Most Expensive Subtrees Without Projects" in result.output
+        assert f"--exclude {dump.as_posix()}" in result.output
+
+    def test_rejects_targets_from(self, tmp_path: Path) -> None:
+        """Listed targets are not walked, so there is nothing to report."""
+        targets = tmp_path / "targets.txt"
+        targets.write_text("")
+
+        result = CliRunner().invoke(
+            cli,
+            ["distribute", "--targets-from", str(targets), "--scan-report"],
+            obj=build_testing(),
+        )
+
+        assert result.exit_code == 2
+        assert "--scan-report" in result.output
@@ -0,0 +1,192 @@
+"""Tests for drift checking and the status command."""
+
+import json
+import shutil
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from default_cicd_public.adapters.cli.root import cli
+from default_cicd_public.adapters.filesystem import FilesystemDriftChecker
+from default_cicd_public.adapters.memory import MemoryDriftChecker, MemoryFilesystem
+from default_cicd_public.application.ports import AppServices
+from default_cicd_public.composition import build_testing
+from default_cicd_public.domain.models import DiscoveredProject, DriftState, TemplateBundle
+
+
+def _current_project(source_github_dir: Path, root: Path) -> DiscoveredProject:
+    """Create a project whose .github/ is an exact copy of the source."""
+    shutil.copytree(source_github_dir, root / ".github")
+    return DiscoveredProject(root_path=root, github_path=root / ".github")
+
+
+def _services(source_github_dir: Path, roots: list[Path]) -> AppServices:
+    """Build services discovering exactly ``roots``."""
+
+    def mock_discover(
+        search_roots: Sequence[Path], markers: Sequence[Path] = (), **options: object
+    ) -> Iterator[DiscoveredProject]:
+        for root in roots:
+            yield DiscoveredProject(root_path=root, github_path=root / ".github")
+
+    return build_testing(
+        discover_projects=mock_discover, get_source_github_path=lambda: source_github_dir
+    )
+
+
+class TestFilesystemDriftChecker:
+    """Tests for FilesystemDriftChecker."""
+
+    def test_identical_copy_is_current(
+        self, source_bundle: TemplateBundle, source_github_dir: Path, tmp_path: Path
+    ) -> None:
+        """A verbatim copy of the bundle should be current."""
+        project = _current_project(source_github_dir, tmp_path / "project")
+
+        result = FilesystemDriftChecker()(source_bundle, project)
+
+        assert result.state == DriftState.CURRENT
+        assert (result.modified, result.missing, result.extra) == ([], [], [])
+
+    @pytest.mark.parametrize("content", ["name: CI, but longer\n", "name: XX\n"])
+    def test_modified_file_is_reported(
+        self,
+        source_bundle: TemplateBundle,
+        source_github_dir: Path,
+        tmp_path: Path,
+        content: str,
+    ) -> None:
+        """Changes of size and same-size changes of content should both count."""
+        project = _current_project(source_github_dir, tmp_path / "project")
+        (project.github_path / "workflows" / "default_cicd_public.yml").write_text(content)
+
+        result = FilesystemDriftChecker()(source_bundle, project)
+
+        assert result.state == DriftState.DRIFTED
+        assert result.modified == [Path("workflows/default_cicd_public.yml")]
+
+    def test_missing_and_extra_files_are_reported(
+        self, source_bundle: TemplateBundle, source_github_dir: Path, tmp_path: Path
+    ) -> None:
+        """Files absent from the target or from the bundle should be listed."""
+        project = _current_project(source_github_dir, tmp_path / "project")
+        (project.github_path / "dependabot.yml").unlink()
+        (project.github_path / "workflows" / "local.yml").write_text("name: Local\n")
+
+        result = FilesystemDriftChecker()(source_bundle, project)
+
+        assert result.state == DriftState.DRIFTED
+        assert result.missing == [Path("dependabot.yml")]
+        assert result.extra == [Path("workflows/local.yml")]
+
+    def test_extra_files_alone_are_not_drift(
+        self, source_bundle: TemplateBundle, source_github_dir: Path, tmp_path: Path
+    ) -> None:
+        """A project's own workflows are reported but keep it current."""
+        project = _current_project(source_github_dir, tmp_path / "project")
+        (project.github_path / "workflows" / "local.yml").write_text("name: Local\n")
+
+        result = FilesystemDriftChecker()(source_bundle, project)
+
+        assert result.state == DriftState.CURRENT
+        assert result.extra == [Path("workflows/local.yml")]
+
+    def test_missing_github_directory_misses_every_file(
+        self, source_bundle: TemplateBundle, tmp_path: Path
+    ) -> None:
+        """A project without .github/ should miss the whole bundle."""
+        root = tmp_path / "project"
+        root.mkdir()
+
+        result = FilesystemDriftChecker()(
+            source_bundle, DiscoveredProject(root_path=root, github_path=root / ".github")
+        )
+
+        assert result.state == DriftState.DRIFTED
+        assert len(result.missing) == len(source_bundle.files)
+
+    def test_unreadable_target_is_unreachable(
+        self, source_bundle: TemplateBundle, tmp_path: Path
+    ) -> None:
+        """A .github that is not a directory should make the project unreachable."""
+        root = tmp_path / "project"
+        root.mkdir()
+        (root / ".github").write_text("not a directory\n")
+
+        result = FilesystemDriftChecker()(
+            source_bundle, DiscoveredProject(root_path=root, github_path=root / ".github")
+        )
+
+        assert result.state == DriftState.UNREACHABLE
+        assert result.error_message
+
+
+class TestMemoryDriftChecker:
+    """Tests for MemoryDriftChecker."""
+
+    def test_reports_drift(self, source_bundle: TemplateBundle) -> None:
+        """The memory checker should classify files like the filesystem one."""
+        filesystem = MemoryFilesystem()
+        root = Path("/srv/project")
+        for file in source_bundle.files:
+            filesystem.add_file(root / ".github" / file.path, file.content, file.mode)
+        filesystem.add_file(root / ".github" / "dependabot.yml", "version: 3\n", 0o644)
+        project = DiscoveredProject(root_path=root, github_path=root / ".github")
+
+        result = MemoryDriftChecker(filesystem)(source_bundle, project)
+
+        assert result.state == DriftState.DRIFTED
+        assert result.modified == [Path("dependabot.yml")]
+
+
+class TestStatusCommand:
+    """Tests for the status command."""
+
+    def test_table_lists_only_drifted_projects(
+        self, source_github_dir: Path, tmp_path: Path
+    ) -> None:
+        """Current projects should only be counted, drifted ones listed."""
+        current = _current_project(source_github_dir, tmp_path / "current")
+        drifted = _current_project(source_github_dir, tmp_path / "drifted")
+        (drifted.github_path / "dependabot.yml").unlink()
+        services = _services(source_github_dir, [current.root_path, drifted.root_path])
+
+        result = CliRunner().invoke(cli, ["status", "--search-root", str(tmp_path)], obj=services)
+
+        assert result.exit_code == 0, result.output
+        assert "Template Status" in result.output
+        assert "1 current, 1 drifted, 0 unreachable." in result.output
+        assert "drifted" in result.output
+        assert not (drifted.github_path / "dependabot.yml").exists()
+
+    def test_json_output(self, source_github_dir: Path, tmp_path: Path) -> None:
+        """--json should print the counts and every project's differences."""
+        drifted = _current_project(source_github_dir, tmp_path / "drifted")
+        (drifted.github_path / "dependabot.yml").unlink()
+        (drifted.github_path / "extra.yml").write_text("x\n")
+        services = _services(source_github_dir, [drifted.root_path])
+
+        result = CliRunner().invoke(
+            cli, ["status", "--search-root", str(tmp_path), "--json"], obj=services
+        )
+
+        assert result.exit_code == 0, result.output
+        document = json.loads(result.stdout)
+        assert document["counts"] == {"current": 0, "drifted": 1, "unreachable": 0}
+        assert document["projects"][0]["state"] == "drifted"
+        assert document["projects"][0]["missing"] == ["dependabot.yml"]
+        assert document["projects"][0]["extra"] == ["extra.yml"]
+
+    def test_exit_code_reports_drift(self, source_github_dir: Path, tmp_path: Path) -> None:
+        """--exit-code should fail exactly when a project is not current."""
+        project = _current_project(source_github_dir, tmp_path / "project")
+        services = _services(source_github_dir, [project.root_path])
+        arguments = ["status", "--search-root", str(tmp_path), "--exit-code"]
+
+        assert CliRunner().invoke(cli, arguments, obj=services).exit_code == 0
+        (project.github_path / "workflows" / "local.yml").write_text("name: Local\n")
+        assert CliRunner().invoke(cli, arguments, obj=services).exit_code == 0
+        (project.github_path / "dependabot.yml").write_text("version: 3\n")
+        assert CliRunner().invoke(cli, arguments, obj=services).exit_code == 1
@@ -0,0 +1,68 @@
+"""Tests for known-target validation."""
+
+from pathlib import Path
+
+import click
+import pytest
+
+from default_cicd_public.adapters.cli.commands.distribute import read_target_roots
+from default_cicd_public.adapters.filesystem.targets import FilesystemTargetValidator
+from default_cicd_public.domain.models import MARKER_FILE
+
+
+class TestFilesystemTargetValidator:
+    """Tests for FilesystemTargetValidator."""
+
+    def test_keeps_roots_with_marker_in_order(
+        self, search_root_with_projects: tuple[Path, list[Path]]
+    ) -> None:
+        """Should yield projects for marked roots, preserving input order."""
+        root, projects_with_marker = search_root_with_projects
+        roots = [*reversed(projects_with_marker), root / "project3", root / "missing"]
+
+        projects = list(FilesystemTargetValidator(max_workers=4)(roots))
+
+        assert [p.root_path for p in projects] == list(reversed(projects_with_marker))
+        assert all(p.github_path == p.root_path / ".github" for p in projects)
+        assert all(p.marker == MARKER_FILE for p in projects)
+
+    def test_uses_first_matching_marker(self, tmp_path: Path) -> None:
+        """Should record the first marker the root carries."""
+        (tmp_path / "service.marker").write_text("")
+        (tmp_path / "docs.marker").write_text("")
+
+        projects = list(
+            FilesystemTargetValidator()([tmp_path], [Path("docs.marker"), Path("service.marker")])
+        )
+
+        assert [p.marker for p in projects] == [Path("docs.marker")]
+
+    def test_empty_roots(self) -> None:
+        """Should yield nothing for an empty list."""
+        assert list(FilesystemTargetValidator()([])) == []
+
+
+class TestReadTargetRoots:
+    """Tests for parsing --targets-from input."""
+
+    def test_reads_plain_and_ndjson_lines(self) -> None:
+        """Should accept paths, JSON strings and JSON objects."""
+        lines = [
+            "/srv/a\n",
+            "\n",
+            "# comment\n",
+            '{"root_path": "/srv/b", "owner": "team"}\n',
+            '{"path": "/srv/c"}\n',
+            '"/srv/d"\n',
+            "/srv/a\n",
+        ]
+
+        roots = read_target_roots(lines)
+
+        assert roots == [Path("/srv/a"), Path("/srv/b"), Path("/srv/c"), Path("/srv/d")]
+
+    @pytest.mark.parametrize("line", ["{not json", '{"owner": "team"}', '{"root_path": 5}'])
+    def test_rejects_unusable_json(self, line: str) -> None:
+        """Should raise a usage error naming the line."""
+        with pytest.raises(click.BadParameter, match="line 1"):
+            read_target_roots([line])
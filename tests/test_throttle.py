@@ -0,0 +1,160 @@
+"""Tests for token-bucket I/O throttling."""
+
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from default_cicd_public.adapters.cli.root import cli
+from default_cicd_public.adapters.filesystem.discovery import FilesystemDiscovery
+from default_cicd_public.adapters.filesystem.throttle import IOThrottle, TokenBucket
+from default_cicd_public.composition import build_testing
+from default_cicd_public.domain.models import DiscoveredProject, IOLimits
+
+
+class FakeClock:
+    """Manually advanced clock whose sleep advances time."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.slept: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class CountingThrottle(IOThrottle):
+    """Unlimited throttle that counts metadata operations."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.metadata_ops = 0
+
+    def metadata(self, count: int = 1) -> None:
+        self.metadata_ops += count
+        super().metadata(count)
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket."""
+
+    def test_burst_then_waits_at_rate(self) -> None:
+        """Should admit a burst of capacity, then pace at the rate."""
+        clock = FakeClock()
+        bucket = TokenBucket(10, clock=clock, sleep=clock.sleep)
+
+        waits = [bucket.acquire() for _ in range(12)]
+
+        assert waits[:10] == [0.0] * 10
+        assert waits[10] == pytest.approx(0.1)
+        assert waits[11] == pytest.approx(0.1)
+
+    def test_refills_while_idle(self) -> None:
+        """Idle time should refill the bucket up to its capacity."""
+        clock = FakeClock()
+        bucket = TokenBucket(10, clock=clock, sleep=clock.sleep)
+        bucket.acquire(10)
+
+        clock.now += 5.0
+
+        assert bucket.acquire(10) == 0.0
+        assert bucket.acquire() == pytest.approx(0.1)
+
+    def test_oversized_request_runs_into_debt(self) -> None:
+        """A request above capacity should be delayed, not rejected."""
+        clock = FakeClock()
+        bucket = TokenBucket(100, clock=clock, sleep=clock.sleep)
+
+        assert bucket.acquire(300) == pytest.approx(2.0)
+
+    def test_rejects_non_positive_rate(self) -> None:
+        """Should refuse a zero rate."""
+        with pytest.raises(ValueError, match="positive"):
+            TokenBucket(0)
+
+
+class TestIOThrottle:
+    """Tests for IOThrottle."""
+
+    def test_unlimited_by_default(self) -> None:
+        """Should not build any bucket without limits."""
+        throttle = IOThrottle()
+
+        throttle.metadata(1000)
+        throttle.write(10**9)
+
+        assert throttle.limits.is_unlimited
+
+    def test_discovery_takes_metadata_tokens(
+        self, search_root_with_projects: tuple[Path, list[Path]]
+    ) -> None:
+        """Discovery should charge its listings and stats to the shared budget."""
+        root, expected = search_root_with_projects
+        throttle = CountingThrottle()
+
+        projects = list(FilesystemDiscovery(throttle=throttle)([root]))
+
+        assert {p.root_path for p in projects} == set(expected)
+        assert throttle.metadata_ops > len(expected)
+
+
+class TestThrottleOptions:
+    """Tests for the distribute throttling options."""
+
+    def test_options_and_envvars_configure_limits(
+        self, source_github_dir: Path, tmp_path: Path
+    ) -> None:
+        """CLI options and environment variables should reach the services."""
+        configured: list[IOLimits] = []
+
+        def record_limits(limits: IOLimits) -> None:
+            configured.append(limits)
+
+        def mock_discover(
+            search_roots: Sequence[Path], markers: Sequence[Path] = (), **options: object
+        ) -> Iterator[DiscoveredProject]:
+            return iter([])
+
+        services = build_testing(
+            discover_projects=mock_discover,
+            get_source_github_path=lambda: source_github_dir,
+            configure_io_limits=record_limits,
+        )
+
+        result = CliRunner().invoke(
+            cli,
+            ["distribute", "--search-root", str(tmp_path), "--max-metadata-ops", "200"],
+            obj=services,
+            env={"DEFAULT_CICD_PUBLIC_MAX_BYTES": "20M"},
+        )
+
+        assert result.exit_code == 0, result.output
+        assert configured == [IOLimits(metadata_ops_per_second=200, bytes_per_second=20 * 1024**2)]
+
+    @pytest.mark.parametrize("value", ["0", "abc", "K", "-5M", "nan", "inf", "1e400"])
+    def test_rejects_bad_sizes(self, tmp_path: Path, value: str) -> None:
+        """Should reject sizes that are not positive and finite."""
+        result = CliRunner().invoke(
+            cli,
+            ["distribute", "--search-root", str(tmp_path), "--max-bytes", value],
+            obj=build_testing(),
+        )
+
+        assert result.exit_code == 2
+
+    @pytest.mark.parametrize("value", ["nan", "inf"])
+    def test_rejects_non_finite_rates(self, tmp_path: Path, value: str) -> None:
+        """Should reject rates that are not finite."""
+        result = CliRunner().invoke(
+            cli,
+            ["distribute", "--search-root", str(tmp_path), "--max-writes", value],
+            obj=build_testing(),
+        )
+
+        assert result.exit_code == 2
+        assert "finite" in result.output